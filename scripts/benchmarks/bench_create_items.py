@@ -0,0 +1,92 @@
+# scripts/benchmarks/bench_create_items.py
+"""
+create_item の1件ずつのループと create_items の一括作成のスループットを比較します。
+
+使い方:
+    python scripts/benchmarks/bench_create_items.py --count 200000
+"""
+
+import argparse
+import gc
+import random
+import sys
+import time
+from collections.abc import Callable
+from pathlib import Path
+from typing import Any
+
+# プロジェクトのルートディレクトリを取得
+ROOT_DIR = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(ROOT_DIR / "src"))
+
+from core.services.item_service import create_item, create_items  # noqa: E402
+from domain.models.item import Item  # noqa: E402
+
+
+def make_rows(count: int, invalid_ratio: float, seed: int) -> list[dict[str, Any]]:
+    """再現可能な合成データを作成します。"""
+    rng = random.Random(seed)
+    rows = []
+    for i in range(count):
+        price = round(rng.uniform(1, 1000), 2)
+        if rng.random() < invalid_ratio:
+            price = -price
+        rows.append({"id": i, "name": f"item-{i}", "price": price, "description": None})
+    return rows
+
+
+def per_item_loop(rows: list[dict[str, Any]]) -> list[Item]:
+    """現行の create_item を1件ずつ呼び出し、成功した商品を集めます。"""
+    items = []
+    for row in rows:
+        try:
+            items.append(create_item(row["id"], row["name"], row["price"], row["description"]))
+        except ValueError:  # noqa: PERF203
+            pass
+    return items
+
+
+def measure(label: str, func: Callable[[], Any], count: int, repeat: int) -> float:
+    """最良の実行時間から items/sec を求めて表示します。"""
+    best = min(_elapsed(func) for _ in range(repeat))
+    rate = count / best
+    print(f"{label:<28} {rate:>14,.0f} items/sec")
+    return rate
+
+
+def _elapsed(func: Callable[[], Any]) -> float:
+    # timeitと同様に、計測中はGCを止めて揺らぎを抑える
+    gc.collect()
+    gc.disable()
+    try:
+        start = time.perf_counter()
+        func()
+        return time.perf_counter() - start
+    finally:
+        gc.enable()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="商品の一括作成のベンチマーク")
+    parser.add_argument("--count", type=int, default=200_000, help="商品数")
+    parser.add_argument("--invalid-ratio", type=float, default=0.0, help="不正な行の割合")
+    parser.add_argument("--repeat", type=int, default=3, help="計測の繰り返し回数")
+    parser.add_argument("--seed", type=int, default=42, help="乱数シード")
+    args = parser.parse_args()
+
+    rows = make_rows(args.count, args.invalid_ratio, args.seed)
+    tuples = [(r["id"], r["name"], r["price"], r["description"]) for r in rows]
+    columns = {name: [r[name] for r in rows] for name in ("id", "name", "price", "description")}
+
+    baseline = measure("create_item (loop)", lambda: per_item_loop(rows), args.count, args.repeat)
+    for label, batch in (
+        ("create_items (dicts)", rows),
+        ("create_items (tuples)", tuples),
+        ("create_items (columns)", columns),
+    ):
+        rate = measure(label, lambda b=batch: create_items(b), args.count, args.repeat)  # type: ignore[misc]
+        print(f"{'':<28} x{rate / baseline:.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+# scripts/benchmarks/bench_item_file.py
+"""
+商品のスナップショットを読み込む時間を、NDJSONとバイナリ形式で比較します。
+
+計測する操作:
+    - ndjson: NDJSONを1行ずつ解析して Item として検証(Item.model_validate_json)
+    - ndjson (bulk): インポートパイプライン(create_items による一括検証)で読み込み
+    - binary open: バイナリ形式のファイルを開く(CRC32の検証あり・なし)
+    - binary find: 開いたファイルからidで1,000件を取得
+    - binary all: バイナリ形式のファイルからすべての商品を Item として組み立て
+
+使い方:
+    python scripts/benchmarks/bench_item_file.py --sizes 100000 1000000
+"""
+
+import argparse
+import random
+import sys
+import tempfile
+import time
+from collections.abc import Callable
+from pathlib import Path
+
+# プロジェクトのルートディレクトリを取得
+ROOT_DIR = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(ROOT_DIR / "src"))
+
+from domain.models.item import Item  # noqa: E402
+from domain.models.item_file import ItemFile, write_item_file  # noqa: E402
+from domain.models.item_store import ItemStore  # noqa: E402
+from pipelines.item_import import run_import  # noqa: E402
+
+
+def make_store(count: int, seed: int) -> ItemStore:
+    """商品を作成し、ItemStoreに格納します。"""
+    rng = random.Random(seed)
+    return ItemStore.from_items(
+        Item(
+            id=i,
+            name=f"item-{i}",
+            price=round(rng.uniform(1, 100_000), 2),
+            description=None if rng.random() < 0.3 else f"description {i}",
+        )
+        for i in range(count)
+    )
+
+
+def report(label: str, func: Callable[[], object]) -> float:
+    """1回実行し、経過時間を表示します。"""
+    started = time.perf_counter()
+    func()
+    elapsed = time.perf_counter() - started
+    print(f"  {label:<22} {elapsed * 1000:>10.1f} ms")
+    return elapsed
+
+
+def load_ndjson(path: Path) -> list[Item]:
+    with path.open("rb") as file:
+        return [Item.model_validate_json(line) for line in file]
+
+
+def load_ndjson_bulk(path: Path) -> None:
+    with path.open("rb") as file:
+        run_import(file, None)
+
+
+def open_binary(path: Path, verify: bool) -> None:
+    with ItemFile(path, verify=verify):
+        pass
+
+
+def find_binary(path: Path, ids: list[int]) -> None:
+    with ItemFile(path, verify=False) as item_file:
+        for item_id in ids:
+            item_file.find(item_id)
+
+
+def load_binary(path: Path) -> list[Item]:
+    with ItemFile(path) as item_file:
+        return item_file.to_items()
+
+
+def run(size: int, seed: int, directory: Path) -> None:
+    store = make_store(size, seed)
+    ndjson_path = directory / f"items-{size}.ndjson"
+    binary_path = directory / f"items-{size}.items"
+    with ndjson_path.open("wb") as file:
+        for view in store:
+            file.write(view.to_item().model_dump_json().encode() + b"\n")
+    write_item_file(binary_path, store)
+    del store
+    rng = random.Random(seed)
+    lookup_ids = [rng.randrange(size) for _ in range(1_000)]
+
+    print(
+        f"size={size:,}  ndjson={ndjson_path.stat().st_size / 2**20:.1f} MiB  "
+        f"binary={binary_path.stat().st_size / 2**20:.1f} MiB"
+    )
+    ndjson = report("ndjson", lambda: load_ndjson(ndjson_path))
+    report("ndjson (bulk)", lambda: load_ndjson_bulk(ndjson_path))
+    report("binary open", lambda: open_binary(binary_path, verify=False))
+    report("binary open (verify)", lambda: open_binary(binary_path, verify=True))
+    report("binary find x1000", lambda: find_binary(binary_path, lookup_ids))
+    binary = report("binary all", lambda: load_binary(binary_path))
+    print(f"  binary all / ndjson: {binary / ndjson:.2f}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="バイナリ形式の読み込みのベンチマーク")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100_000, 1_000_000], help="商品数")
+    parser.add_argument("--seed", type=int, default=42, help="乱数シード")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        for size in args.sizes:
+            run(size, args.seed, Path(directory))
+
+
+if __name__ == "__main__":
+    main()
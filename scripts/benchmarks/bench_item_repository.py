@@ -0,0 +1,93 @@
+# scripts/benchmarks/bench_item_repository.py
+"""
+ItemRepository の構築・更新・検索の性能を、件数ごとに計測します。
+
+計測する操作:
+    - extend: 空のリポジトリへの一括登録(価格の索引をまとめて構築)
+    - add / remove: 索引を保ったままの1件ずつの挿入と削除
+    - get: idによる取得
+    - range: 価格の範囲検索(上限100件)
+    - cheapest / priciest: 価格の安い順・高い順の上位10件
+
+1,000万件では商品オブジェクトだけで数GBのメモリを使用します。
+
+使い方:
+    python scripts/benchmarks/bench_item_repository.py --sizes 1000000 10000000
+"""
+
+import argparse
+import random
+import sys
+import time
+from collections.abc import Callable
+from pathlib import Path
+
+# プロジェクトのルートディレクトリを取得
+ROOT_DIR = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(ROOT_DIR / "src"))
+
+from core.services.item_repository import ItemRepository  # noqa: E402
+from core.services.item_service import create_items  # noqa: E402
+from domain.models.item import Item  # noqa: E402
+
+
+def make_items(count: int, start: int, seed: int) -> list[Item]:
+    """価格が一様に分布した商品を作成します(検証済みの一括作成を使用)。"""
+    rng = random.Random(seed)
+    ids = range(start, start + count)
+    return create_items(
+        {
+            "id": ids,
+            "name": [f"item-{i}" for i in ids],
+            "price": [round(rng.uniform(1, 100_000), 2) for _ in ids],
+            "description": [None] * count,
+        }
+    ).items
+
+
+def report(label: str, ops: int, func: Callable[[], object]) -> None:
+    """1回実行し、1操作あたりの時間とスループットを表示します。"""
+    started = time.perf_counter()
+    func()
+    elapsed = time.perf_counter() - started
+    print(f"  {label:<12} {elapsed / ops * 1e6:>10.2f} us/op  {ops / elapsed:>14,.0f} ops/sec")
+
+
+def run(size: int, operations: int, seed: int) -> None:
+    items = make_items(size, 0, seed)
+    extra = make_items(operations, size, seed + 1)
+    rng = random.Random(seed)
+    lookup_ids = [rng.randrange(size) for _ in range(operations)]
+    ranges = [sorted(rng.uniform(1, 100_000) for _ in range(2)) for _ in range(operations // 10)]
+
+    print(f"size={size:,}")
+    repository = ItemRepository()
+    report("extend", size, lambda: repository.extend(items))
+    report("add", operations, lambda: repository.extend(extra))
+    report("get", operations, lambda: [repository.get(i) for i in lookup_ids])
+    report(
+        "range",
+        len(ranges),
+        lambda: [repository.find_by_price(low, high, limit=100) for low, high in ranges],
+    )
+    report("cheapest", len(ranges), lambda: [repository.cheapest(10) for _ in ranges])
+    report("priciest", len(ranges), lambda: [repository.priciest(10) for _ in ranges])
+    report("remove", operations, lambda: [repository.remove(item.id) for item in extra])
+    assert len(repository) == size
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="ItemRepository のベンチマーク")
+    parser.add_argument(
+        "--sizes", type=int, nargs="+", default=[1_000_000, 10_000_000], help="登録する商品数"
+    )
+    parser.add_argument("--operations", type=int, default=100_000, help="更新・検索の回数")
+    parser.add_argument("--seed", type=int, default=42, help="乱数シード")
+    args = parser.parse_args()
+
+    for size in args.sizes:
+        run(size, args.operations, args.seed)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+# scripts/benchmarks/bench_item_store_memory.py
+"""
+list[Item] と ItemStore の1件あたりのメモリ使用量を tracemalloc で比較します。
+
+使い方:
+    python scripts/benchmarks/bench_item_store_memory.py --count 1000000
+"""
+
+import argparse
+import gc
+import sys
+import tracemalloc
+from collections.abc import Callable
+from pathlib import Path
+from typing import Any
+
+# プロジェクトのルートディレクトリを取得
+ROOT_DIR = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(ROOT_DIR / "src"))
+
+from domain.models.item import Item  # noqa: E402
+from domain.models.item_store import ItemStore  # noqa: E402
+
+
+def make_items(count: int) -> list[Item]:
+    """再現可能な合成データを作成します。"""
+    return [
+        Item(
+            id=i,
+            name=f"item-{i}",
+            price=float(i % 1000) + 0.99,
+            description=f"description of item {i}" if i % 2 else None,
+        )
+        for i in range(count)
+    ]
+
+
+def retained_bytes(build: Callable[[], Any]) -> int:
+    """build() が返したオブジェクトが保持しているメモリ量を計測します。"""
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    result = build()
+    gc.collect()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del result
+    return after - before
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="ItemStoreのメモリ使用量のベンチマーク")
+    parser.add_argument("--count", type=int, default=200_000, help="商品数")
+    args = parser.parse_args()
+
+    list_bytes = retained_bytes(lambda: make_items(args.count))
+    items = make_items(args.count)
+    store_bytes = retained_bytes(lambda: ItemStore.from_items(items))
+
+    print(f"{'list[Item]':<12} {list_bytes / args.count:>8.1f} bytes/item")
+    print(f"{'ItemStore':<12} {store_bytes / args.count:>8.1f} bytes/item")
+    print(f"{'':<12} x{list_bytes / store_bytes:.1f} smaller")
+
+
+if __name__ == "__main__":
+    main()
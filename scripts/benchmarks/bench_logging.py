@@ -0,0 +1,74 @@
+# scripts/benchmarks/bench_logging.py
+"""
+LOG_FORMAT=rich (同期的なRichHandler) と LOG_FORMAT=json (キュー経由の非同期出力) の
+ログ呼び出しのスループットを比較します。
+
+各モードは環境変数で設定を切り替えた子プロセスで計測し、ログの出力先は破棄します。
+
+使い方:
+    python scripts/benchmarks/bench_logging.py --count 20000
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+# プロジェクトのルートディレクトリを取得
+ROOT_DIR = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(ROOT_DIR / "src"))
+
+MODES = ("rich", "json")
+
+
+def run_child(count: int) -> None:
+    """現在の設定でログを count 回出力し、計測結果をJSONで標準出力へ書き出します。"""
+    from shared.logging import get_logger, setup_logging, shutdown_logging
+
+    result_stream = sys.stdout
+    # ログの出力先(標準出力・標準エラー)を破棄する
+    sys.stdout = sys.stderr = open(os.devnull, "w")
+    setup_logging()
+    logger = get_logger("bench")
+
+    start = time.perf_counter()
+    for i in range(count):
+        logger.info("request %d handled in %.1f ms for user%d@example.com", i, 1.5, i)
+    caller = time.perf_counter() - start
+    shutdown_logging()
+    total = time.perf_counter() - start
+
+    json.dump({"caller": caller, "total": total}, result_stream)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="ロギングのスループットのベンチマーク")
+    parser.add_argument("--count", type=int, default=20_000, help="ログ呼び出しの回数")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        run_child(args.count)
+        return
+
+    for mode in MODES:
+        env = {**os.environ, "LOG_FORMAT": mode, "LOG_LEVEL": "INFO"}
+        output = subprocess.run(
+            [sys.executable, __file__, "--child", "--count", str(args.count)],
+            env=env,
+            check=True,
+            capture_output=True,
+            text=True,
+        ).stdout
+        result = json.loads(output)
+        print(
+            f"{mode:<6} caller: {args.count / result['caller']:>12,.0f} calls/sec   "
+            f"end-to-end: {args.count / result['total']:>12,.0f} records/sec"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+# scripts/benchmarks/bench_mask_sensitive_data.py
+"""
+ネストしたJSONドキュメントに対する mask_sensitive_data(メモリ上の辞書)と
+iter_masked_json(JSONテキストのストリーミング)のスループットを計測します。
+
+使い方:
+    python scripts/benchmarks/bench_mask_sensitive_data.py --records 20000
+"""
+
+import argparse
+import json
+import random
+import sys
+import time
+import tracemalloc
+from collections.abc import Callable
+from pathlib import Path
+from typing import Any
+
+# プロジェクトのルートディレクトリを取得
+ROOT_DIR = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(ROOT_DIR / "src"))
+
+from shared.security import iter_masked_json, mask_sensitive_data  # noqa: E402
+
+
+def make_document(records: int, seed: int) -> dict[str, Any]:
+    """ユーザーと注文のレコードを含む、再現可能な合成ドキュメントを作成します。"""
+    rng = random.Random(seed)
+    return {
+        "meta": {"generated_by": "bench", "token": "t-123"},
+        "users": [
+            {
+                "id": i,
+                "name": f"user{i}",
+                "email": f"user{i}@example.com",
+                "password": "hunter2",
+                "address": {"city": "Tokyo", "phone": "090-0000-0000"},
+                "orders": [
+                    {"order_id": i * 10 + j, "amount": rng.random() * 100, "card_number": "4111"}
+                    for j in range(rng.randint(0, 3))
+                ],
+            }
+            for i in range(records)
+        ],
+    }
+
+
+def measure(label: str, func: Callable[[], object], records: int, repeat: int) -> None:
+    """最良の実行時間から records/sec を求めて表示します。"""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    print(f"{label:<28} {records / best:>12,.0f} records/sec")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="mask_sensitive_data のベンチマーク")
+    parser.add_argument("--records", type=int, default=20_000, help="ユーザーレコード数")
+    parser.add_argument("--repeat", type=int, default=3, help="計測の繰り返し回数")
+    parser.add_argument("--chunk-size", type=int, default=64 * 1024, help="ストリーミングの断片長")
+    parser.add_argument("--seed", type=int, default=42, help="乱数シード")
+    args = parser.parse_args()
+
+    document = make_document(args.records, args.seed)
+    text = json.dumps(document)
+    chunks = [text[i : i + args.chunk_size] for i in range(0, len(text), args.chunk_size)]
+    assert json.loads("".join(iter_masked_json(chunks))) == mask_sensitive_data(document)
+
+    measure("mask_sensitive_data", lambda: mask_sensitive_data(document), args.records, args.repeat)
+    measure(
+        "json.loads + mask + dumps",
+        lambda: json.dumps(mask_sensitive_data(json.loads(text))),
+        args.records,
+        args.repeat,
+    )
+    measure(
+        "iter_masked_json",
+        lambda: sum(len(c) for c in iter_masked_json(chunks)),
+        args.records,
+        args.repeat,
+    )
+
+    # ピークメモリ(入力テキスト自体は計測前に確保済み)
+    for label, func in (
+        ("json.loads + mask + dumps", lambda: json.dumps(mask_sensitive_data(json.loads(text)))),
+        ("iter_masked_json", lambda: sum(len(c) for c in iter_masked_json(iter(chunks)))),
+    ):
+        tracemalloc.start()
+        func()
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        print(f"{label:<28} peak {peak / 1024 / 1024:>8.1f} MiB")
+
+
+if __name__ == "__main__":
+    main()
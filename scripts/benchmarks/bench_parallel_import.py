@@ -0,0 +1,82 @@
+# scripts/benchmarks/bench_parallel_import.py
+"""
+run_import のワーカー数ごとのスループットと、1プロセスに対する速度向上率を計測します。
+
+入力はメモリ上に生成したNDJSONで、出力はメモリ上のバッファに書き出します。
+ワーカー数を省略した場合は 1, 2, 4, ... をCPUコア数まで計測します。
+
+使い方:
+    python scripts/benchmarks/bench_parallel_import.py --count 1000000
+    python scripts/benchmarks/bench_parallel_import.py --workers 1 8 16 32
+"""
+
+import argparse
+import io
+import json
+import os
+import random
+import sys
+from pathlib import Path
+
+# プロジェクトのルートディレクトリを取得
+ROOT_DIR = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(ROOT_DIR / "src"))
+
+from pipelines.item_import import run_import  # noqa: E402
+
+
+def make_ndjson(count: int, seed: int, invalid_ratio: float) -> bytes:
+    """再現可能な合成NDJSONを作成します。"""
+    rng = random.Random(seed)
+    lines = []
+    for i in range(count):
+        price = -1.0 if rng.random() < invalid_ratio else round(rng.uniform(1, 10_000), 2)
+        record = {"id": i, "name": f"item-{i}", "price": price, "description": f"商品 {i}"}
+        lines.append(json.dumps(record, ensure_ascii=False).encode())
+    return b"\n".join(lines) + b"\n"
+
+
+def default_workers() -> list[int]:
+    """1からCPUコア数までの2の累乗と、CPUコア数を返します。"""
+    cores = os.cpu_count() or 1
+    workers = [1]
+    while workers[-1] * 2 < cores:
+        workers.append(workers[-1] * 2)
+    if workers[-1] != cores:
+        workers.append(cores)
+    return workers
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="並列インポートのベンチマーク")
+    parser.add_argument("--count", type=int, default=200_000, help="レコード数")
+    parser.add_argument("--batch-size", type=int, default=10_000, help="チャンクのレコード数")
+    parser.add_argument("--workers", type=int, nargs="+", help="計測するワーカー数")
+    parser.add_argument("--invalid-ratio", type=float, default=0.05, help="不正なレコードの割合")
+    parser.add_argument("--seed", type=int, default=42, help="乱数シード")
+    args = parser.parse_args()
+
+    data = make_ndjson(args.count, args.seed, args.invalid_ratio)
+    print(
+        f"records: {args.count:,}  input: {len(data) / 1024 / 1024:.1f} MiB  cpus: {os.cpu_count()}"
+    )
+
+    baseline = None
+    expected = None
+    for workers in args.workers or default_workers():
+        sink = io.BytesIO()
+        stats = run_import(io.BytesIO(data), sink, "ndjson", args.batch_size, workers)
+        output = sink.getvalue()
+        if expected is None:
+            expected = output
+        assert output == expected, "ワーカー数によって出力が異なります"
+        rate = stats.items_per_second
+        baseline = baseline or rate
+        print(
+            f"workers={workers:<3} {rate:>14,.0f} items/sec  x{rate / baseline:5.2f}"
+            f"  (imported {stats.imported:,}, rejected {stats.rejected:,})"
+        )
+
+
+if __name__ == "__main__":
+    main()
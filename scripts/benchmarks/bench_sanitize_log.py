@@ -0,0 +1,99 @@
+# scripts/benchmarks/bench_sanitize_log.py
+"""
+sanitize_log_message の従来実装(呼び出しごとに3パターンを順に適用)と
+事前コンパイル済みの1パス実装のスループットを比較します。
+
+使い方:
+    python scripts/benchmarks/bench_sanitize_log.py --count 100000
+"""
+
+import argparse
+import random
+import re
+import sys
+import time
+from collections.abc import Callable
+from pathlib import Path
+
+# プロジェクトのルートディレクトリを取得
+ROOT_DIR = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(ROOT_DIR / "src"))
+
+from shared.security import mask_email, sanitize_log_bytes, sanitize_log_message  # noqa: E402
+
+
+def legacy_sanitize_log_message(message: str) -> str:
+    """変更前の sanitize_log_message と同じ実装。"""
+    email_pattern = r"\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b"
+    message = re.sub(email_pattern, lambda m: mask_email(m.group()), message)
+    api_key_pattern = r"\b[a-zA-Z]{2,4}-[a-zA-Z0-9]{16,}\b"
+    message = re.sub(api_key_pattern, "***", message)
+    uuid_pattern = r"\b[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}\b"
+    return re.sub(uuid_pattern, "***", message, flags=re.IGNORECASE)
+
+
+TEMPLATES = [
+    "Request handled in {n}ms",
+    "GET /api/v1/items/{n} 200 OK",
+    "2024-05-01 12:00:{n:02d} worker-{n} finished batch",
+    "User user{n}@example.com logged in",
+    "Using key sk-{n:016d}abcdef for upstream",
+    "Processing request 123e4567-e89b-12d3-a456-{n:012d}",
+]
+
+
+def make_messages(count: int, seed: int) -> list[str]:
+    """再現可能な合成ログメッセージを作成します。"""
+    rng = random.Random(seed)
+    return [rng.choice(TEMPLATES).format(n=rng.randint(0, 59)) for _ in range(count)]
+
+
+def measure(label: str, func: Callable[[], object], count: int, repeat: int) -> float:
+    """最良の実行時間から messages/sec を求めて表示します。"""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    rate = count / best
+    print(f"{label:<24} {rate:>14,.0f} messages/sec")
+    return rate
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="ログサニタイズのベンチマーク")
+    parser.add_argument("--count", type=int, default=100_000, help="メッセージ数")
+    parser.add_argument("--repeat", type=int, default=3, help="計測の繰り返し回数")
+    parser.add_argument("--seed", type=int, default=42, help="乱数シード")
+    args = parser.parse_args()
+
+    messages = make_messages(args.count, args.seed)
+    buffers = [m.encode() for m in messages]
+    assert [sanitize_log_message(m) for m in messages] == [
+        legacy_sanitize_log_message(m) for m in messages
+    ]
+
+    baseline = measure(
+        "legacy",
+        lambda: [legacy_sanitize_log_message(m) for m in messages],
+        args.count,
+        args.repeat,
+    )
+    rate = measure(
+        "sanitize_log_message",
+        lambda: [sanitize_log_message(m) for m in messages],
+        args.count,
+        args.repeat,
+    )
+    print(f"{'':<24} x{rate / baseline:.2f}")
+    rate = measure(
+        "sanitize_log_bytes",
+        lambda: [sanitize_log_bytes(b) for b in buffers],
+        args.count,
+        args.repeat,
+    )
+    print(f"{'':<24} x{rate / baseline:.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,3 +1,65 @@
-from .settings import settings
+"""
+設定モジュール。
 
-__all__ = ["settings"]
+起動を速くするため、pydantic-settings の読み込みと設定値の解析は
+`settings` または `get_settings` などに初めてアクセスしたときに行われます。
+
+`settings` はアクセスした時点のスナップショットです。.envファイルの変更を
+反映させたい長時間動作するプロセスでは、`get_settings()` を都度呼び出してください。
+
+実装は `config._settings` にあります。`config.settings` サブモジュールは既存のコードの
+ための再エクスポートで、読み込まれてもパッケージの属性 `settings` は設定のままです。
+"""
+
+import importlib
+import sys
+import types
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from ._settings import (
+        ReloadListener,
+        Settings,
+        add_reload_listener,
+        get_settings,
+        reload_settings,
+        remove_reload_listener,
+    )
+
+    settings: Settings
+
+__all__ = [
+    "ReloadListener",
+    "Settings",
+    "add_reload_listener",
+    "get_settings",
+    "reload_settings",
+    "remove_reload_listener",
+    "settings",
+]
+
+
+def __getattr__(name: str) -> Any:
+    if name not in __all__:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module("._settings", __name__), name)
+    globals()[name] = value
+    return value
+
+
+class _ConfigModule(types.ModuleType):
+    """属性 `settings` をアクセスのたびに最新の設定とするパッケージのモジュール型。"""
+
+    @property
+    def settings(self) -> "Settings":
+        settings: Settings = importlib.import_module("._settings", __name__).get_settings()
+        return settings
+
+    @settings.setter
+    def settings(self, value: object) -> None:
+        # サブモジュール config.settings を読み込んだときの、インポート機構による
+        # パッケージの属性の設定を無視する
+        pass
+
+
+sys.modules[__name__].__class__ = _ConfigModule
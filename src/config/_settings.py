@@ -0,0 +1,187 @@
+import logging
+import os
+import threading
+import time
+from collections.abc import Callable
+from typing import Literal
+
+from pydantic import Field
+from pydantic_settings import BaseSettings, SettingsConfigDict
+
+logger = logging.getLogger(__name__)
+
+
+class Settings(BaseSettings):
+    """
+    アプリケーションの設定を管理するクラス。
+
+    .envファイルや環境変数から設定値を読み込みます。
+    インスタンスは変更できないスナップショットです。
+    """
+
+    model_config = SettingsConfigDict(
+        env_file=".env",
+        env_file_encoding="utf-8",
+        extra="ignore",
+        frozen=True,
+    )
+
+    APP_NAME: str = "dev-template-python"
+    LOG_LEVEL: str = "INFO"
+    LOG_REDACT: bool = True
+    LOG_FORMAT: Literal["rich", "json"] = "rich"
+    # ロガー・レベル・メッセージの書式が同じログを1件にまとめる間隔(秒)。0の場合はまとめない
+    LOG_DEDUP_INTERVAL: float = Field(default=0.0, ge=0)
+    # ロガーごとの1秒あたりのログの出力数の上限。0の場合は制限しない
+    LOG_RATE_LIMIT: float = Field(default=0.0, ge=0)
+    # LOG_RATE_LIMIT を一時的に超えて出力できるログの件数
+    LOG_RATE_BURST: int = Field(default=100, ge=1)
+    # DEBUGレベルのログを出力する割合(0〜1)
+    LOG_DEBUG_SAMPLE_RATE: float = Field(default=1.0, ge=0, le=1)
+    # 商品のインポートで検証に使うプロセス数(0の場合はCPUコア数)
+    INGEST_WORKERS: int = Field(default=1, ge=0)
+    # .envファイルの変更を確認する最短の間隔(秒)。0の場合は取得のたびに確認する
+    SETTINGS_RELOAD_INTERVAL: float = Field(default=5.0, ge=0)
+
+
+# 変更を監視する.envファイルのパス(作業ディレクトリからの相対パス)
+_ENV_FILE = str(Settings.model_config.get("env_file"))
+# 設定が再読み込みされたときに (変更前, 変更後) の設定で呼び出される関数
+ReloadListener = Callable[[Settings, Settings], None]
+# .envファイルの状態 (更新時刻, サイズ)。ファイルがない場合はNone
+_FileSignature = tuple[int, int] | None
+
+
+def _env_file_signature() -> _FileSignature:
+    """.envファイルの更新時刻とサイズを返します。"""
+    try:
+        stat = os.stat(_ENV_FILE)
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+def _notify(listener: ReloadListener, previous: Settings, current: Settings) -> None:
+    """再読み込みを通知します。通知先のエラーは他の通知先や呼び出し元に影響させません。"""
+    try:
+        listener(previous, current)
+    except Exception:
+        logger.exception("設定の再読み込みを通知する関数でエラーが発生しました")
+
+
+class _SettingsCache:
+    """
+    設定のスナップショットを保持し、.envファイルが変更された場合にのみ読み込み直すキャッシュ。
+
+    .envファイルの確認(os.stat)は SETTINGS_RELOAD_INTERVAL 秒に1回までに抑えるため、
+    確認間隔内の取得は属性の読み出しだけで済みます。
+    """
+
+    # 確認間隔の計測に使う時計(テストで置き換えられるようにする)
+    clock: Callable[[], float] = staticmethod(time.monotonic)
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._settings: Settings | None = None
+        self._signature: _FileSignature = None
+        self._checked_at = 0.0
+        self._listeners: list[ReloadListener] = []
+
+    def get(self) -> Settings:
+        settings = self._settings
+        if settings is not None and (
+            self.clock() - self._checked_at < settings.SETTINGS_RELOAD_INTERVAL
+        ):
+            return settings
+        return self._refresh(force=False)
+
+    def reload(self) -> Settings:
+        return self._refresh(force=True)
+
+    def _refresh(self, force: bool) -> Settings:
+        with self._lock:
+            previous = self._settings
+            signature = _env_file_signature()
+            self._checked_at = self.clock()
+            if previous is not None and not force and signature == self._signature:
+                return previous
+            # 読み込み中に変更された場合に次回の確認で検出できるよう、読み込み前の状態を記録する
+            self._signature = signature
+            try:
+                current = Settings()
+            except ValueError:
+                if previous is None:
+                    raise
+                logger.exception("設定の再読み込みに失敗したため、以前の設定を使用します")
+                return previous
+            self._settings = current
+            listeners = list(self._listeners)
+        if previous is not None:
+            for listener in listeners:
+                _notify(listener, previous, current)
+        return current
+
+    def add_listener(self, listener: ReloadListener) -> None:
+        with self._lock:
+            if listener not in self._listeners:
+                self._listeners.append(listener)
+
+    def remove_listener(self, listener: ReloadListener) -> None:
+        with self._lock:
+            if listener in self._listeners:
+                self._listeners.remove(listener)
+
+
+_cache = _SettingsCache()
+
+
+def get_settings() -> Settings:
+    """
+    現在の設定のスナップショットを返します。
+
+    初回の呼び出しで .envファイルと環境変数を解析し、以降はキャッシュを返します。
+    前回の確認から SETTINGS_RELOAD_INTERVAL 秒以上経過している場合は .envファイルの
+    更新時刻とサイズを確認し、変更されていた場合にのみ解析し直します。
+    再読み込みに失敗した場合は、エラーをログに出力して以前の設定を返します。
+
+    Returns:
+        Settingsインスタンス
+
+    Raises:
+        pydantic.ValidationError: 初回の読み込みで設定値が不正な場合
+    """
+    return _cache.get()
+
+
+def reload_settings() -> Settings:
+    """
+    .envファイルの状態に関係なく、設定を読み込み直します。
+
+    環境変数をプロセス内で変更した場合などに使用します。
+
+    Returns:
+        読み込み直したSettingsインスタンス
+    """
+    return _cache.reload()
+
+
+def add_reload_listener(listener: ReloadListener) -> None:
+    """
+    設定が読み込み直されたときに呼び出す関数を登録します。
+
+    同じ関数を複数回登録しても、呼び出されるのは1回です。
+
+    Args:
+        listener: (変更前, 変更後) の設定を受け取る関数
+    """
+    _cache.add_listener(listener)
+
+
+def remove_reload_listener(listener: ReloadListener) -> None:
+    """
+    add_reload_listener で登録した関数を解除します。
+
+    Args:
+        listener: 解除する関数
+    """
+    _cache.remove_listener(listener)
@@ -1,21 +1,38 @@
-from pydantic_settings import BaseSettings, SettingsConfigDict
+"""
+設定モジュールの互換用の入口。
 
+`import config.settings` や `from config.settings import Settings` を使う既存のコードの
+ために、`config._settings` の公開APIを再エクスポートします。新しいコードでは
+`config` パッケージから直接インポートしてください。
+"""
 
-class Settings(BaseSettings):
-    """
-    アプリケーションの設定を管理するクラス。
+from typing import TYPE_CHECKING, Any
 
-    .envファイルや環境変数から設定値を読み込みます。
-    """
+from ._settings import (
+    ReloadListener,
+    Settings,
+    add_reload_listener,
+    get_settings,
+    reload_settings,
+    remove_reload_listener,
+)
 
-    model_config = SettingsConfigDict(
-        env_file=".env",
-        env_file_encoding="utf-8",
-        extra="ignore",
-    )
+if TYPE_CHECKING:
+    settings: Settings
 
-    APP_NAME: str = "dev-template-python"
-    LOG_LEVEL: str = "INFO"
+__all__ = [
+    "ReloadListener",
+    "Settings",
+    "add_reload_listener",
+    "get_settings",
+    "reload_settings",
+    "remove_reload_listener",
+    "settings",
+]
 
 
-settings = Settings()
+def __getattr__(name: str) -> Any:
+    # `from config.settings import settings` には、アクセスした時点の設定を返す
+    if name == "settings":
+        return get_settings()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
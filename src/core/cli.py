@@ -1,34 +1,141 @@
+# 起動を速くするため、モジュールの読み込み時にはtyperと軽量なモジュールのみを読み込む。
+# 設定(pydantic-settings)、rich、サービス層などは、それを使うコマンドの中で読み込む。
 from __future__ import annotations
 
+import functools
+import os
+import sys
+import time
+from collections.abc import Iterator
+from contextlib import ExitStack, contextmanager
+from typing import TYPE_CHECKING, BinaryIO, cast
+
 import typer
-from rich.console import Console
 
-from config import settings
-from core.services import item_service
 from shared.logging import get_logger, setup_logging
 
+if TYPE_CHECKING:
+    from rich.console import Console
+
 # typerアプリケーションを作成
 app = typer.Typer(
     name="dev-template-python",
     help="堅牢で保守性の高いPythonアプリケーションを迅速に開発するための標準テンプレートです。",
     add_completion=False,
 )
-console = Console()
+
+# import-items などの --batch-size の既定値(pipelines.item_import.DEFAULT_BATCH_SIZE と同じ値)
+_DEFAULT_BATCH_SIZE = 10_000
+
+
+@functools.cache
+def _console(stderr: bool = False) -> Console:
+    """出力用のConsoleを初回利用時に作成して返します。"""
+    from rich.console import Console
+
+    return Console(stderr=stderr)
+
+
+@contextmanager
+def _file_errors(err_console: Console) -> Iterator[None]:
+    """入出力のファイルを開けない・読み書きできない場合に、トレースバックなしでエラー終了します。"""
+    try:
+        yield
+    except UnicodeDecodeError as e:
+        err_console.print(f"入力をUTF-8として読み込めません: {e}")
+        raise typer.Exit(code=1) from e
+    except OSError as e:
+        err_console.print(f"ファイルを読み書きできません: {e}")
+        raise typer.Exit(code=1) from e
+
+
+def _report_metrics(command: str | None, started: int) -> None:
+    """コマンド全体の処理時間を記録し、スパンごとのパーセンタイルを標準エラーへ表示します。"""
+    from shared import metrics
+
+    metrics.get_registry().record(f"cli.{command}", time.perf_counter_ns() - started)
+    typer.echo(metrics.format_summary(), err=True)
+
+
+def _start_profiling(ctx: typer.Context, cpu_path: str | None, memory: bool) -> None:
+    """コマンドの実行をプロファイリングし、コンテキストを閉じる際に結果を報告します。"""
+    from shared import profiling
+
+    name = ctx.invoked_subcommand or "dev-template"
+    # ExitStackは逆順に閉じるため、CPUの計測を内側にしてメモリの計測結果を先に確定させない
+    stack = ExitStack()
+    memory_profile = stack.enter_context(profiling.profile_memory(name)) if memory else None
+    if cpu_path is not None:
+        stack.enter_context(profiling.profile_cpu(cpu_path, name))
+
+    def finish() -> None:
+        stack.close()
+        if cpu_path is not None:
+            typer.echo(
+                f"CPUプロファイルを書き出しました: {cpu_path} (python -m pstats {cpu_path} で表示)",
+                err=True,
+            )
+        if memory_profile is not None:
+            typer.echo(memory_profile.format(), err=True)
+
+    ctx.call_on_close(finish)
 
 
 @app.callback()
-def callback() -> None:
+def callback(
+    ctx: typer.Context,
+    profile_startup: bool = typer.Option(
+        False,
+        "--profile-startup",
+        hidden=True,
+        help="コマンドを実行し、起動時のインポート時間の内訳を標準エラーへ表示します。",
+    ),
+    show_metrics: bool = typer.Option(
+        False,
+        "--metrics",
+        help="処理時間を計測し、終了時にスパンごとの p50/p95/p99 を標準エラーへ表示します。",
+    ),
+    profile_cpu: str | None = typer.Option(
+        None,
+        "--profile-cpu",
+        metavar="PATH",
+        help="コマンドを cProfile で計測し、結果を pstats 形式でファイルに書き出します。",
+    ),
+    profile_mem: bool = typer.Option(
+        False,
+        "--profile-mem",
+        help="コマンドを tracemalloc で計測し、ピークのメモリ使用量とモジュールごとの内訳を"
+        "標準エラーへ表示します。",
+    ),
+) -> None:
     """アプリケーションのセットアップ(ロギングなど)を行います。"""
+    if profile_startup:
+        from core.startup_profile import profile_startup as run_profile
+
+        args = [arg for arg in sys.argv[1:] if arg != "--profile-startup"]
+        raise typer.Exit(code=run_profile(args))
     setup_logging()
+    if show_metrics:
+        from shared import metrics
+
+        metrics.enable()
+        # コマンドが例外で終了した場合も、コンテキストを閉じる際に表示する
+        ctx.call_on_close(
+            functools.partial(_report_metrics, ctx.invoked_subcommand, time.perf_counter_ns())
+        )
+    if profile_cpu is not None or profile_mem:
+        _start_profiling(ctx, profile_cpu, profile_mem)
 
 
 @app.command()
 def show_config() -> None:
     """現在のアプリケーション設定を表示します。"""
+    from config import settings
+
     logger = get_logger(__name__)
     logger.info("現在の設定:")
     # settingsオブジェクトを辞書に変換して表示
-    console.print(settings.model_dump())
+    _console().print(settings.model_dump())
 
 
 @app.command()
@@ -38,18 +145,456 @@ def create_item(
     price: float = typer.Option(100.0, "--price", help="価格"),
 ) -> None:
     """新しい商品を作成し、その情報を表示します。"""
+    from core.services import item_service
+
     logger = get_logger(__name__)
     logger.info(f"商品を作成します: id={item_id}, name='{name}', price={price}")
 
     try:
         item = item_service.create_item(item_id=item_id, name=name, price=price)
         logger.info("商品が正常に作成されました。")
-        console.print(item.model_dump())
+        _console().print(item.model_dump())
     except ValueError as e:
         logger.error(f"商品の作成に失敗しました: {e}")
         raise typer.Exit(code=1) from e
 
 
+@app.command()
+def import_items(
+    source: str = typer.Argument("-", help="入力ファイル(`-` で標準入力)"),
+    output: str | None = typer.Option(
+        None, "--output", "-o", help="有効な商品をNDJSONで書き出すファイル(`-` で標準出力)"
+    ),
+    input_format: str | None = typer.Option(
+        None, "--format", help="入力形式(ndjson または csv)。省略時は拡張子から推定"
+    ),
+    batch_size: int = typer.Option(
+        _DEFAULT_BATCH_SIZE, "--batch-size", min=1, help="1回の検証で扱うレコード数"
+    ),
+    workers: int | None = typer.Option(
+        None,
+        "--workers",
+        min=0,
+        help="検証に使うプロセス数(0でCPUコア数)。省略時は設定 INGEST_WORKERS",
+    ),
+    checkpoint: str | None = typer.Option(
+        None,
+        "--checkpoint",
+        metavar="PATH",
+        help="進捗を定期的に書き込むチェックポイントのファイル(NDJSONのみ)",
+    ),
+    resume: bool = typer.Option(
+        False, "--resume", help="チェックポイントが存在する場合は、その続きからインポートする"
+    ),
+    checkpoint_interval: float = typer.Option(
+        5.0, "--checkpoint-interval", min=0, help="チェックポイントを書き込む間隔(秒)"
+    ),
+    skip_index: str | None = typer.Option(
+        None,
+        "--skip-index",
+        metavar="PATH",
+        help="取り込み済みの商品の索引ファイル。索引にある商品は読み飛ばす(NDJSONのみ)",
+    ),
+    shards: int | None = typer.Option(
+        None,
+        "--shards",
+        min=1,
+        help="idのハッシュで指定した数のファイルに分割し、--output のディレクトリに書き出す",
+    ),
+    trusted: bool = typer.Option(
+        False,
+        "--trusted",
+        help=(
+            "バイナリ形式の商品を検証せずに読み込む。CRC32は破損がないことを確認するだけで"
+            "出所は保証しないため、自分で書き出したファイルにだけ指定する"
+        ),
+    ),
+) -> None:
+    """
+    NDJSONまたはCSVから商品をストリーミングで読み込み、検証して書き出します。
+
+    バイナリ形式のファイル(拡張子 .items、または --format binary)を指定した場合は、
+    export-items で書き出した商品を検証してNDJSONに変換します。--trusted を指定すると
+    検証を省略しますが、CRC32はファイルの出所を保証しないため、外部から受け取った
+    ファイルには指定しないでください。
+
+    --checkpoint を指定すると進捗を定期的に記録し、中断した場合は --resume で
+    続きから再開できます。--skip-index を指定すると、以前に取り込んだ商品を読み飛ばし、
+    新しい商品や変更された商品だけを書き出します。
+
+    --shards を指定すると、商品をidのハッシュでシャードのファイル(part-00000.ndjson など)に
+    分割し、シャードごとの件数とSHA-256を記録した manifest.json とともに書き出します。
+    """
+    from config import get_settings
+    from pipelines import item_import
+
+    if workers is None:
+        workers = get_settings().INGEST_WORKERS
+
+    # 標準出力をデータの出力先に使うコマンドのため、メッセージは標準エラーへ表示する
+    err_console = _console(stderr=True)
+    fmt = input_format or item_import.detect_format(source)
+    if fmt == item_import.BINARY_FORMAT and source == "-":
+        err_console.print("バイナリ形式は標準入力から読み込めません")
+        raise typer.Exit(code=2)
+    if fmt not in (*item_import.SUPPORTED_FORMATS, item_import.BINARY_FORMAT):
+        err_console.print(f"未対応の入力形式です: {fmt}")
+        raise typer.Exit(code=2)
+    resumable = checkpoint is not None or skip_index is not None
+    if resumable and fmt != "ndjson":
+        err_console.print("--checkpoint と --skip-index はNDJSONの入力でのみ利用できます")
+        raise typer.Exit(code=2)
+    if resume and checkpoint is None:
+        err_console.print("--resume には --checkpoint の指定が必要です")
+        raise typer.Exit(code=2)
+    if checkpoint is not None and "-" in (source, output):
+        err_console.print("--checkpoint を指定した場合、入力と出力にはファイルを指定してください")
+        raise typer.Exit(code=2)
+    if trusted and fmt != item_import.BINARY_FORMAT:
+        err_console.print("--trusted はバイナリ形式の入力でのみ利用できます")
+        raise typer.Exit(code=2)
+    if shards is not None and (output in (None, "-") or checkpoint is not None):
+        err_console.print(
+            "--shards には出力先のディレクトリの指定が必要です(--checkpoint とは併用できません)"
+        )
+        raise typer.Exit(code=2)
+
+    # 再開する場合は、出力ファイルをチェックポイントの時点の大きさに切り詰めて追記する
+    resuming = resume and checkpoint is not None and os.path.exists(checkpoint)
+    with _file_errors(err_console), ExitStack() as stack:
+        writer: BinaryIO | None = None
+        if output == "-":
+            writer = sys.stdout.buffer
+        elif output is not None and shards is not None:
+            from pipelines.item_shard import ShardedWriter
+
+            # ShardedWriter は正規化されたNDJSONを受け取り、シャードのファイルに振り分ける
+            writer = cast(BinaryIO, stack.enter_context(ShardedWriter(output, shards)))
+        elif output is not None:
+            if resuming and os.path.exists(output):
+                writer = stack.enter_context(open(output, "r+b"))
+            else:
+                writer = stack.enter_context(open(output, "wb"))
+        if fmt == item_import.BINARY_FORMAT:
+            try:
+                stats = item_import.import_item_file(source, writer, batch_size, trusted)
+            except ValueError as e:
+                err_console.print(f"商品の読み込みに失敗しました: {e}")
+                raise typer.Exit(code=1) from e
+        else:
+            reader: BinaryIO = (
+                sys.stdin.buffer if source == "-" else stack.enter_context(open(source, "rb"))
+            )
+            if resumable:
+                from pipelines.item_checkpoint import SkipIndex
+
+                try:
+                    stats = item_import.run_resumable_import(
+                        reader,
+                        writer,
+                        checkpoint,
+                        resume=resume,
+                        skip_index=SkipIndex(skip_index) if skip_index is not None else None,
+                        batch_size=batch_size,
+                        workers=workers,
+                        interval=checkpoint_interval,
+                    )
+                except ValueError as e:
+                    err_console.print(f"インポートを再開できません: {e}")
+                    raise typer.Exit(code=1) from e
+            else:
+                stats = item_import.run_import(reader, writer, fmt, batch_size, workers)
+        if writer is not None:
+            writer.flush()
+
+    skipped = f"読み飛ばし: {stats.skipped}件, " if skip_index is not None else ""
+    err_console.print(
+        f"読み込み: {stats.read}件, インポート: {stats.imported}件, "
+        f"拒否: {stats.rejected}件, {skipped}{stats.elapsed:.2f}秒 "
+        f"({stats.items_per_second:,.0f} items/sec)"
+    )
+    if shards is not None and output is not None:
+        err_console.print(f"シャード: {shards}個 ({os.path.join(output, 'manifest.json')})")
+
+
+@app.command()
+def export_items(
+    source: str = typer.Argument("-", help="入力ファイル(`-` で標準入力)"),
+    output: str = typer.Option(
+        ..., "--output", "-o", help="書き出すバイナリ形式のファイル(拡張子 .items を推奨)"
+    ),
+    input_format: str | None = typer.Option(
+        None, "--format", help="入力形式(ndjson または csv)。省略時は拡張子から推定"
+    ),
+    batch_size: int = typer.Option(
+        _DEFAULT_BATCH_SIZE, "--batch-size", min=1, help="1回の検証で扱うレコード数"
+    ),
+    shards: int | None = typer.Option(
+        None,
+        "--shards",
+        min=1,
+        help="idのハッシュで指定した数のファイルに分割し、--output のディレクトリに書き出す",
+    ),
+) -> None:
+    """
+    NDJSONまたはCSVから商品を読み込んで検証し、バイナリ形式のファイルに書き出します。
+
+    --shards を指定すると、商品をidのハッシュでシャードのファイル(part-00000.items など)に
+    分割し、シャードごとの件数とSHA-256を記録した manifest.json とともに書き出します。
+    """
+    from pipelines import item_import
+
+    err_console = _console(stderr=True)
+    fmt = input_format or item_import.detect_format(source)
+    if fmt not in item_import.SUPPORTED_FORMATS:
+        err_console.print(f"未対応の入力形式です: {fmt}")
+        raise typer.Exit(code=2)
+
+    with _file_errors(err_console), ExitStack() as stack:
+        reader: BinaryIO = (
+            sys.stdin.buffer if source == "-" else stack.enter_context(open(source, "rb"))
+        )
+        if shards is None:
+            stats = item_import.export_item_file(reader, output, fmt, batch_size)
+        else:
+            from pipelines.item_shard import export_sharded_item_files
+
+            stats, _ = export_sharded_item_files(reader, output, shards, fmt, batch_size)
+
+    err_console.print(
+        f"読み込み: {stats.read}件, 書き出し: {stats.imported}件, "
+        f"拒否: {stats.rejected}件, {stats.elapsed:.2f}秒"
+    )
+    if shards is not None:
+        err_console.print(f"シャード: {shards}個 ({os.path.join(output, 'manifest.json')})")
+
+
+@app.command()
+def dedup_items(
+    source: str = typer.Argument("-", help="入力ファイル(`-` で標準入力)"),
+    output: str = typer.Option(
+        "-", "--output", "-o", help="重複を除いた商品(NDJSON)の出力先(`-` で標準出力)"
+    ),
+    policy: str = typer.Option(
+        "first",
+        "--policy",
+        help="重複の扱い(first: 最初の商品を残す, last: 最後の商品を残す, "
+        "error: 内容の異なる重複でエラーにする)",
+    ),
+    capacity: int = typer.Option(
+        10_000_000, "--expected-items", min=1, help="想定するidの種類数(Bloomフィルタの大きさ)"
+    ),
+    error_rate: float = typer.Option(
+        0.01, "--false-positive-rate", help="Bloomフィルタの偽陽性率の目標"
+    ),
+    spill: str | None = typer.Option(
+        None,
+        "--spill",
+        metavar="PATH",
+        help="ディスク上の索引のファイル。省略時は一時ファイルを使う。既存の他のデータベースは指定できない",
+    ),
+    input_format: str | None = typer.Option(
+        None, "--format", help="入力形式(ndjson または csv)。省略時は拡張子から推定"
+    ),
+    batch_size: int = typer.Option(
+        _DEFAULT_BATCH_SIZE, "--batch-size", min=1, help="1回の検証で扱うレコード数"
+    ),
+) -> None:
+    """
+    商品を読み込んで検証し、idの重複を取り除いてNDJSONで書き出します。
+
+    出現済みのidはBloomフィルタとディスク上の索引で管理するため、
+    入力の件数に関係なくメモリ使用量はほぼ一定です。
+    """
+    from pipelines import item_import
+    from pipelines.item_dedup import ConflictingItemError, ItemDeduplicator, deduplicate_items
+    from shared.files import atomic_output
+
+    err_console = _console(stderr=True)
+    fmt = input_format or item_import.detect_format(source)
+    if fmt not in item_import.SUPPORTED_FORMATS:
+        err_console.print(f"未対応の入力形式です: {fmt}")
+        raise typer.Exit(code=2)
+    try:
+        with _file_errors(err_console):
+            deduplicator = ItemDeduplicator(policy, capacity, error_rate, spill)
+    except ValueError as e:
+        raise typer.BadParameter(str(e)) from e
+
+    with _file_errors(err_console), ExitStack() as stack:
+        stack.enter_context(deduplicator)
+        reader: BinaryIO = (
+            sys.stdin.buffer if source == "-" else stack.enter_context(open(source, "rb"))
+        )
+        # policy="error" で途中まで書き出したファイルが残らないよう、一時ファイルに書き込み、
+        # 成功した場合だけ置き換える(例外で抜けると一時ファイルは削除される)
+        writer: BinaryIO = (
+            sys.stdout.buffer if output == "-" else stack.enter_context(atomic_output(output))
+        )
+        try:
+            stats = deduplicate_items(reader, writer, deduplicator, fmt, batch_size)
+        except ConflictingItemError as e:
+            err_console.print(f"重複を取り除けませんでした: {e}")
+            raise typer.Exit(code=1) from e
+        writer.flush()
+
+    dedup = deduplicator.stats
+    err_console.print(
+        f"読み込み: {stats.read}件, 出力: {stats.imported}件, 拒否: {stats.rejected}件, "
+        f"重複: {dedup.duplicates}件 (内容の異なる重複: {dedup.conflicts}件), "
+        f"{stats.elapsed:.2f}秒"
+    )
+    err_console.print(
+        f"偽陽性率: {dedup.false_positive_rate:.4%} "
+        f"(理論値 {dedup.expected_false_positive_rate:.4%}), "
+        f"メモリ: {dedup.memory_bytes / 2**20:.1f} MiB "
+        f"(Bloomフィルタ {dedup.bloom_bytes / 2**20:.1f} MiB), "
+        f"索引: {dedup.spill_bytes / 2**20:.1f} MiB"
+    )
+
+
+@app.command()
+def query_items(
+    source: str = typer.Argument("-", help="入力ファイル(`-` で標準入力)"),
+    min_price: float | None = typer.Option(None, "--min-price", help="価格の下限(この値を含む)"),
+    max_price: float | None = typer.Option(None, "--max-price", help="価格の上限(この値を含む)"),
+    limit: int | None = typer.Option(None, "--limit", min=0, help="出力する最大件数"),
+    descending: bool = typer.Option(False, "--desc", help="価格の高い順に出力する"),
+    input_format: str | None = typer.Option(
+        None, "--format", help="入力形式(ndjson または csv)。省略時は拡張子から推定"
+    ),
+) -> None:
+    """商品を読み込んで価格で索引付けし、価格の範囲に一致する商品をNDJSONで出力します。"""
+    from core.services.item_repository import ItemRepository
+    from domain.models.item_json import write_ndjson
+    from pipelines import item_import
+
+    err_console = _console(stderr=True)
+    fmt = input_format or item_import.detect_format(source)
+    if fmt not in item_import.SUPPORTED_FORMATS:
+        err_console.print(f"未対応の入力形式です: {fmt}")
+        raise typer.Exit(code=2)
+
+    repository = ItemRepository()
+    stats = item_import.ImportStats()
+    with _file_errors(err_console), ExitStack() as stack:
+        reader: BinaryIO = (
+            sys.stdin.buffer if source == "-" else stack.enter_context(open(source, "rb"))
+        )
+        records = item_import.read_records(reader, fmt)
+        batches = item_import.batched(records, _DEFAULT_BATCH_SIZE)
+        try:
+            for items in item_import.validate_batches(batches, stats):
+                repository.extend(items)
+        except ValueError as e:
+            err_console.print(f"商品の読み込みに失敗しました: {e}")
+            raise typer.Exit(code=1) from e
+
+    matches = repository.find_by_price(min_price, max_price, limit, descending)
+    write_ndjson(sys.stdout.buffer, matches)
+    sys.stdout.buffer.flush()
+    err_console.print(
+        f"該当: {len(matches)}件 (読み込み: {len(repository)}件, 拒否: {stats.rejected}件)"
+    )
+
+
+def _parse_floats(value: str, option: str) -> list[float]:
+    """カンマ区切りの数値のリストを解析します。"""
+    try:
+        return [float(part) for part in value.split(",") if part.strip()]
+    except ValueError as e:
+        raise typer.BadParameter(
+            f"数値のカンマ区切りで指定してください: {value}", param_hint=option
+        ) from e
+
+
+@app.command()
+def item_stats(
+    source: str = typer.Argument("-", help="入力ファイル(`-` で標準入力)"),
+    input_format: str | None = typer.Option(
+        None, "--format", help="入力形式(ndjson、csv または binary)。省略時は拡張子から推定"
+    ),
+    batch_size: int = typer.Option(
+        _DEFAULT_BATCH_SIZE, "--batch-size", min=1, help="1回に集計するレコード数"
+    ),
+    percentiles: str = typer.Option(
+        "50,90,95,99", "--percentiles", help="計算するパーセンタイル(カンマ区切り)"
+    ),
+    edges: str = typer.Option(
+        "1,10,100,1000,10000,100000",
+        "--edges",
+        help="ヒストグラムの価格帯の境界(カンマ区切り、昇順)",
+    ),
+    group_width: int | None = typer.Option(
+        None, "--group-by-id-width", min=1, help="指定した幅のidの範囲ごとに集計する"
+    ),
+    exact: bool = typer.Option(
+        False, "--exact", help="価格をすべて保持し、正確なパーセンタイルを計算する"
+    ),
+    trusted: bool = typer.Option(
+        False,
+        "--trusted",
+        help=(
+            "バイナリ形式の商品を検証せずに集計する。CRC32は破損がないことを確認するだけで"
+            "出所は保証しないため、自分で書き出したファイルにだけ指定する"
+        ),
+    ),
+) -> None:
+    """
+    商品の価格の統計量(件数、合計、平均、パーセンタイル、ヒストグラム)をJSONで出力します。
+
+    入力はチャンクごとに集計するため、入力の大きさに関係なくメモリ使用量は一定です
+    (--exact を指定した場合を除く)。numpy が必要です(pip install -e ".[stats]")。
+    バイナリ形式のファイルは import-items と同じく商品を検証してから集計します。
+    """
+    from pipelines import item_import
+
+    err_console = _console(stderr=True)
+    fmt = input_format or item_import.detect_format(source)
+    if fmt == item_import.BINARY_FORMAT and source == "-":
+        err_console.print("バイナリ形式は標準入力から読み込めません")
+        raise typer.Exit(code=2)
+    if fmt not in (*item_import.SUPPORTED_FORMATS, item_import.BINARY_FORMAT):
+        err_console.print(f"未対応の入力形式です: {fmt}")
+        raise typer.Exit(code=2)
+    if trusted and fmt != item_import.BINARY_FORMAT:
+        err_console.print("--trusted はバイナリ形式の入力でのみ利用できます")
+        raise typer.Exit(code=2)
+    qs = _parse_floats(percentiles, "--percentiles")
+    bounds = _parse_floats(edges, "--edges")
+
+    try:
+        from pipelines.item_stats import PriceStats, compute_item_stats
+
+        stats = PriceStats(bounds, group_width, exact)
+        # パーセンタイルの範囲は入力を読み込む前に確認する
+        stats.percentiles(qs)
+    except ImportError as e:
+        err_console.print(str(e))
+        raise typer.Exit(code=1) from e
+    except ValueError as e:
+        raise typer.BadParameter(str(e)) from e
+
+    with _file_errors(err_console), ExitStack() as stack:
+        reader: BinaryIO | str = source
+        if fmt != item_import.BINARY_FORMAT:
+            reader = sys.stdin.buffer if source == "-" else stack.enter_context(open(source, "rb"))
+        try:
+            result = compute_item_stats(stats, reader, fmt, batch_size, trusted)
+        except ValueError as e:
+            err_console.print(f"商品の読み込みに失敗しました: {e}")
+            raise typer.Exit(code=1) from e
+
+    import json
+
+    sys.stdout.write(json.dumps(stats.to_dict(qs), ensure_ascii=False, indent=2) + "\n")
+    sys.stdout.flush()
+    err_console.print(
+        f"集計: {result.imported}件 (読み込み: {result.read}件, 拒否: {result.rejected}件), "
+        f"{result.elapsed:.2f}秒"
+    )
+
+
 def main() -> None:
     """CLIアプリケーションのエントリーポイント。"""
     app()
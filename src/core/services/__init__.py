@@ -1,3 +1,8 @@
-from .item_service import create_item
+from .item_service import BulkCreateResult, ItemRejection, create_item, create_items
 
-__all__ = ["create_item"]
+__all__ = [
+    "BulkCreateResult",
+    "ItemRejection",
+    "create_item",
+    "create_items",
+]
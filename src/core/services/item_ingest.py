@@ -0,0 +1,191 @@
+# -----------------------------------------------------------------------------
+# サンプルコード (Sample Code)
+#
+# このファイルは、本テンプレートのアーキテクチャを理解していただくためのサンプルです。
+# `core`層に、asyncioベースのサービスから使う非同期APIを配置する例を示します。
+#
+# 実際の開発を開始する際は、このファイルを削除し、ご自身のサービスに
+# 置き換えてください。
+# -----------------------------------------------------------------------------
+"""
+生レコードの非同期イテレータから商品を取り込む非同期API。
+
+レコードは上限付きのキューを介して受け取り、キューにたまっている分を
+マイクロバッチとしてまとめて create_items で検証します。キューが満杯の間は
+生産側の読み込みが止まるため、検証が追いつかない場合でもメモリ使用量は一定です。
+
+検証はイベントループ上で行う場合、1回の処理時間が max_block 秒以内に収まるよう
+バッチを小さなチャンクに分け、チャンクごとにイベントループへ制御を返します。
+executor を指定した場合は、検証をイベントループの外(スレッドやプロセス)で行います。
+"""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from collections.abc import AsyncGenerator, AsyncIterable
+from concurrent.futures import Executor
+from contextlib import suppress
+from dataclasses import dataclass, field
+from typing import Any
+
+from domain.models.item import Item
+from shared.errors import ErrorCollector
+
+from .item_service import BulkCreateResult, ItemRecord, create_items
+
+DEFAULT_BATCH_SIZE = 1_000
+DEFAULT_QUEUE_SIZE = 10_000
+# イベントループ上で検証する場合に、1回の処理でイベントループを占有してよい時間(秒)
+DEFAULT_MAX_BLOCK = 0.01
+# イベントループ上で最初に検証するチャンクの件数(以降は計測した処理時間から調整する)
+_INITIAL_CHUNK = 16
+
+
+@dataclass(slots=True)
+class IngestStats:
+    """非同期取り込みの集計結果。"""
+
+    read: int = 0
+    imported: int = 0
+    rejected: int = 0
+    # 拒否された行(row は取り込み開始からの通し番号)
+    rejections: ErrorCollector = field(default_factory=ErrorCollector)
+    # イベントループ上での検証1回あたりの最長の処理時間(秒)
+    longest_block: float = 0.0
+
+
+@dataclass(slots=True)
+class _End:
+    """生産側の終了を消費側へ伝える目印。"""
+
+    error: BaseException | None = None
+
+
+class _BatchValidator:
+    """マイクロバッチを検証し、結果を集計するクラス。"""
+
+    __slots__ = ("_chunk", "_executor", "_max_block", "_stats")
+
+    def __init__(self, stats: IngestStats, max_block: float, executor: Executor | None) -> None:
+        self._stats = stats
+        self._max_block = max_block
+        self._executor = executor
+        self._chunk = _INITIAL_CHUNK
+
+    async def validate(self, batch: list[ItemRecord]) -> list[Item]:
+        if self._executor is not None:
+            loop = asyncio.get_running_loop()
+            result = await loop.run_in_executor(self._executor, create_items, batch)
+            self._record(len(batch), result)
+            return result.items
+
+        items: list[Item] = []
+        start = 0
+        while start < len(batch):
+            chunk = batch[start : start + self._chunk]
+            started = time.perf_counter()
+            result = create_items(chunk)
+            elapsed = time.perf_counter() - started
+            self._record(len(chunk), result)
+            self._stats.longest_block = max(self._stats.longest_block, elapsed)
+            self._resize(len(chunk), elapsed)
+            items += result.items
+            start += len(chunk)
+            # 次のチャンクの前に、他のタスクへ制御を渡す
+            await asyncio.sleep(0)
+        return items
+
+    def _resize(self, size: int, elapsed: float) -> None:
+        # 計測した1件あたりの時間から、上限の半分に収まる件数を次のチャンクの大きさにする
+        per_record = elapsed / size
+        if per_record > 0:
+            self._chunk = max(1, int(self._max_block / 2 / per_record))
+
+    def _record(self, size: int, result: BulkCreateResult) -> None:
+        # 検証は入力順に1つずつ行うため、集計済みの件数がこの検証の先頭行の通し番号になる
+        stats = self._stats
+        base = stats.read
+        stats.read += size
+        stats.imported += len(result.items)
+        if result.rejections:
+            stats.rejected += len({r.row for r in result.rejections})
+            stats.rejections.extend(result.rejections, offset=base)
+
+
+async def ingest_items(
+    records: AsyncIterable[ItemRecord],
+    stats: IngestStats | None = None,
+    *,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    queue_size: int = DEFAULT_QUEUE_SIZE,
+    max_block: float = DEFAULT_MAX_BLOCK,
+    executor: Executor | None = None,
+) -> AsyncGenerator[Item, None]:
+    """
+    生レコードの非同期イテレータを検証し、有効な商品を入力順に返します。
+
+    レコードは queue_size 件までのキューにためられ、キューが満杯の間は
+    records からの読み込みを止めます(バックプレッシャー)。消費側はキューに
+    たまっているレコードを最大 batch_size 件ずつまとめて検証します。
+
+    Args:
+        records: 検証するレコード(create_items と同じ辞書またはタプル)の非同期イテレータ
+        stats: 件数と拒否理由を集計するオブジェクト(省略時は集計しない)
+        batch_size: 1回に検証する最大のレコード数
+        queue_size: 検証待ちのレコードを保持する最大数
+        max_block: イベントループ上で検証する場合に、1回の処理でイベントループを
+            占有してよい時間(秒)
+        executor: 検証を実行するExecutor。指定した場合はイベントループの外で検証する。
+            ProcessPoolExecutorを使う場合、レコードはpickle可能である必要がある
+
+    Yields:
+        有効な商品
+
+    Raises:
+        ValueError: batch_size、queue_size、max_block が不正な場合
+    """
+    if batch_size <= 0:
+        raise ValueError("バッチサイズは1以上である必要があります")
+    if queue_size <= 0:
+        raise ValueError("キューの大きさは1以上である必要があります")
+    if max_block <= 0:
+        raise ValueError("max_blockは0より大きい必要があります")
+
+    validator = _BatchValidator(stats if stats is not None else IngestStats(), max_block, executor)
+    queue: asyncio.Queue[Any] = asyncio.Queue(maxsize=queue_size)
+
+    async def produce() -> None:
+        # キューに空きがある間は put で制御が戻らないため、一定時間ごとに自分で制御を渡す
+        time_slice = max_block / 2
+        deadline = time.perf_counter() + time_slice
+        error: BaseException | None = None
+        try:
+            async for record in records:
+                await queue.put(record)
+                if time.perf_counter() >= deadline:
+                    await asyncio.sleep(0)
+                    deadline = time.perf_counter() + time_slice
+        except Exception as e:
+            error = e
+        await queue.put(_End(error))
+
+    producer = asyncio.create_task(produce())
+    try:
+        while True:
+            batch = [await queue.get()]
+            while len(batch) < batch_size and not queue.empty():
+                batch.append(queue.get_nowait())
+            # 終了の目印は生産側が最後に入れるため、あるとすればバッチの末尾にある
+            end = batch.pop() if isinstance(batch[-1], _End) else None
+            if batch:
+                for item in await validator.validate(batch):
+                    yield item
+            if end is not None:
+                if end.error is not None:
+                    raise end.error
+                return
+    finally:
+        producer.cancel()
+        with suppress(asyncio.CancelledError):
+            await producer
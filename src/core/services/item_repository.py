@@ -0,0 +1,272 @@
+# -----------------------------------------------------------------------------
+# サンプルコード (Sample Code)
+#
+# このファイルは、本テンプレートのアーキテクチャを理解していただくためのサンプルです。
+# `core`層に、ドメインモデルを保持・検索するリポジトリを配置する例を示します。
+#
+# 実際の開発を開始する際は、このファイルを削除し、ご自身のリポジトリに
+# 置き換えてください。
+# -----------------------------------------------------------------------------
+"""
+商品をメモリ上に保持し、idと価格で検索するリポジトリ。
+
+idの索引は辞書(O(1))、価格の索引は (price, id) 順に並べた要素を
+一定の大きさのバケットに分けたソート済みリストです。挿入と削除は対象の
+バケットだけを更新するため、全体を並べ直すことはありません。
+"""
+
+from __future__ import annotations
+
+from bisect import bisect_left, bisect_right
+from collections.abc import Iterable, Iterator
+from itertools import islice
+
+from domain.models.item import Item
+
+# バケットの基準の大きさ。この2倍を超えたバケットは半分に分割する
+DEFAULT_BUCKET_SIZE = 1_000
+
+
+def _composite_left(prices: list[float], ids: list[int], price: float, item_id: int) -> int:
+    """(price, id) 順に並んだ2つのリストで、(price, item_id) を挿入する位置を返します。"""
+    lo = bisect_left(prices, price)
+    hi = bisect_right(prices, price, lo)
+    return bisect_left(ids, item_id, lo, hi)
+
+
+class _PriceIndex:
+    """(price, id) 順のバケット分割されたソート済みリスト。"""
+
+    __slots__ = ("_bucket_size", "_ids", "_max_ids", "_max_prices", "_prices", "_size")
+
+    def __init__(self, bucket_size: int = DEFAULT_BUCKET_SIZE) -> None:
+        self._bucket_size = bucket_size
+        # バケットごとの価格とid(バケット内・バケット間ともに (price, id) 順)
+        self._prices: list[list[float]] = []
+        self._ids: list[list[int]] = []
+        # 各バケットの最後の要素(バケットの探索に使う)
+        self._max_prices: list[float] = []
+        self._max_ids: list[int] = []
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def load(self, entries: list[tuple[float, int]]) -> None:
+        """空の索引に、(price, id) のリストをまとめて格納します。"""
+        entries.sort()
+        size = self._bucket_size
+        for start in range(0, len(entries), size):
+            chunk = entries[start : start + size]
+            self._prices.append([price for price, _ in chunk])
+            self._ids.append([item_id for _, item_id in chunk])
+            self._max_prices.append(chunk[-1][0])
+            self._max_ids.append(chunk[-1][1])
+        self._size = len(entries)
+
+    def insert(self, price: float, item_id: int) -> None:
+        if not self._prices:
+            self._prices.append([price])
+            self._ids.append([item_id])
+            self._max_prices.append(price)
+            self._max_ids.append(item_id)
+            self._size = 1
+            return
+        index = _composite_left(self._max_prices, self._max_ids, price, item_id)
+        if index == len(self._prices):
+            # 最大の要素より大きい場合は最後のバケットの末尾に追加する
+            index -= 1
+            self._max_prices[index] = price
+            self._max_ids[index] = item_id
+            self._prices[index].append(price)
+            self._ids[index].append(item_id)
+        else:
+            prices, ids = self._prices[index], self._ids[index]
+            position = _composite_left(prices, ids, price, item_id)
+            prices.insert(position, price)
+            ids.insert(position, item_id)
+        self._size += 1
+        if len(self._prices[index]) > self._bucket_size * 2:
+            self._split(index)
+
+    def _split(self, index: int) -> None:
+        prices, ids = self._prices[index], self._ids[index]
+        half = len(prices) // 2
+        self._prices[index : index + 1] = [prices[:half], prices[half:]]
+        self._ids[index : index + 1] = [ids[:half], ids[half:]]
+        self._max_prices.insert(index, prices[half - 1])
+        self._max_ids.insert(index, ids[half - 1])
+
+    def remove(self, price: float, item_id: int) -> None:
+        index = _composite_left(self._max_prices, self._max_ids, price, item_id)
+        prices, ids = self._prices[index], self._ids[index]
+        position = _composite_left(prices, ids, price, item_id)
+        del prices[position]
+        del ids[position]
+        self._size -= 1
+        if not prices:
+            del self._prices[index], self._ids[index]
+            del self._max_prices[index], self._max_ids[index]
+        elif position == len(prices):
+            self._max_prices[index] = prices[-1]
+            self._max_ids[index] = ids[-1]
+
+    def ascending(self, min_price: float | None, max_price: float | None) -> Iterator[int]:
+        """min_price 以上 max_price 以下の要素のidを、安い順に返します。"""
+        if min_price is None:
+            bucket, position = 0, 0
+        else:
+            bucket = bisect_left(self._max_prices, min_price)
+            position = (
+                bisect_left(self._prices[bucket], min_price) if bucket < len(self._prices) else 0
+            )
+        for index in range(bucket, len(self._prices)):
+            prices, ids = self._prices[index], self._ids[index]
+            end = len(prices) if max_price is None else bisect_right(prices, max_price, position)
+            yield from ids[position:end]
+            if end < len(prices):
+                return
+            position = 0
+
+    def descending(self, min_price: float | None, max_price: float | None) -> Iterator[int]:
+        """min_price 以上 max_price 以下の要素のidを、高い順に返します。"""
+        last = len(self._prices) - 1
+        if max_price is not None:
+            last = min(bisect_right(self._max_prices, max_price), last)
+        for index in range(last, -1, -1):
+            prices, ids = self._prices[index], self._ids[index]
+            end = len(prices) if max_price is None else bisect_right(prices, max_price)
+            start = 0 if min_price is None else bisect_left(prices, min_price, 0, end)
+            yield from reversed(ids[start:end])
+            if start > 0:
+                return
+
+
+class ItemRepository:
+    """
+    商品をメモリ上に保持し、idと価格の索引で検索するリポジトリ。
+
+    Examples:
+        >>> repository = ItemRepository()
+        >>> repository.extend(
+        ...     Item(id=i, name=f"item-{i}", price=p, description=None)
+        ...     for i, p in enumerate([30.0, 10.0, 20.0])
+        ... )
+        >>> [item.id for item in repository.cheapest(2)]
+        [1, 2]
+        >>> [item.price for item in repository.find_by_price(min_price=15)]
+        [20.0, 30.0]
+    """
+
+    __slots__ = ("_items", "_prices")
+
+    def __init__(self, bucket_size: int = DEFAULT_BUCKET_SIZE) -> None:
+        """
+        空のリポジトリを作成します。
+
+        Args:
+            bucket_size: 価格の索引のバケットの基準の大きさ
+        """
+        if bucket_size <= 0:
+            raise ValueError("バケットの大きさは1以上である必要があります")
+        self._items: dict[int, Item] = {}
+        self._prices = _PriceIndex(bucket_size)
+
+    def add(self, item: Item) -> None:
+        """
+        商品を追加します。
+
+        Args:
+            item: 追加する商品
+
+        Raises:
+            ValueError: 同じidの商品がすでに存在する場合
+        """
+        if item.id in self._items:
+            raise ValueError(f"id={item.id} の商品はすでに存在します")
+        self._items[item.id] = item
+        self._prices.insert(item.price, item.id)
+
+    def extend(self, items: Iterable[Item]) -> None:
+        """
+        複数の商品を追加します。
+
+        リポジトリが空の場合は、価格の索引をまとめて構築します。
+
+        Raises:
+            ValueError: 同じidの商品がすでに存在する、または入力内で重複している場合
+        """
+        if self._items:
+            for item in items:
+                self.add(item)
+            return
+        by_id = self._items
+        for item in items:
+            if by_id.setdefault(item.id, item) is not item:
+                by_id.clear()
+                raise ValueError(f"id={item.id} の商品が重複しています")
+        self._prices.load([(item.price, item.id) for item in by_id.values()])
+
+    def remove(self, item_id: int) -> Item:
+        """
+        商品を削除します。
+
+        Args:
+            item_id: 削除する商品のid
+
+        Returns:
+            削除した商品
+
+        Raises:
+            KeyError: 商品が存在しない場合
+        """
+        item = self._items.pop(item_id)
+        self._prices.remove(item.price, item_id)
+        return item
+
+    def get(self, item_id: int) -> Item | None:
+        """idで商品を取得します。存在しない場合はNoneを返します。"""
+        return self._items.get(item_id)
+
+    def find_by_price(
+        self,
+        min_price: float | None = None,
+        max_price: float | None = None,
+        limit: int | None = None,
+        descending: bool = False,
+    ) -> list[Item]:
+        """
+        価格が範囲内の商品を価格順(同じ価格はid順)に返します。
+
+        Args:
+            min_price: 価格の下限(この値を含む)。Noneの場合は下限なし
+            max_price: 価格の上限(この値を含む)。Noneの場合は上限なし
+            limit: 返す最大件数。Noneの場合はすべて
+            descending: Trueの場合は高い順に返す
+
+        Returns:
+            条件に一致する商品のリスト
+        """
+        if min_price is not None and max_price is not None and min_price > max_price:
+            return []
+        scan = self._prices.descending if descending else self._prices.ascending
+        ids = scan(min_price, max_price)
+        items = self._items
+        return [items[item_id] for item_id in islice(ids, limit)]
+
+    def cheapest(self, n: int) -> list[Item]:
+        """価格の安い順に最大n件の商品を返します。"""
+        return self.find_by_price(limit=n)
+
+    def priciest(self, n: int) -> list[Item]:
+        """価格の高い順に最大n件の商品を返します。"""
+        return self.find_by_price(limit=n, descending=True)
+
+    def __contains__(self, item_id: object) -> bool:
+        return item_id in self._items
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def __iter__(self) -> Iterator[Item]:
+        return iter(self._items.values())
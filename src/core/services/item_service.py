@@ -7,9 +7,31 @@
 # 実際の開発を開始する際は、このファイルを削除し、ご自身のドメインサービスに
 # 置き換えてください。
 # -----------------------------------------------------------------------------
-from domain.models.item import Item
+from __future__ import annotations
 
+import functools
+import sys
+from collections.abc import Iterable, Mapping, Sequence
+from dataclasses import dataclass, field
+from typing import Annotated, Any, cast
 
+import annotated_types
+from pydantic import TypeAdapter
+from pydantic import ValidationError as PydanticValidationError
+
+from domain.models.item import Item, construct_items
+from shared.errors import BulkValidationError, ErrorCollector, ErrorRecord
+from shared.metrics import timed
+
+# 行データの1件分。フィールド名をキーとする辞書、または (id, name, price[, description]) のタプル
+ItemRecord = Mapping[str, Any] | Sequence[Any]
+
+_FIELD_NAMES: tuple[str, ...] = tuple(Item.model_fields)
+_FIELD_ORDER = {name: i for i, name in enumerate(_FIELD_NAMES)}
+_MISSING: Any = object()
+
+
+@timed("item_service.create_item")
 def create_item(item_id: int, name: str, price: float, description: str | None = None) -> Item:
     """
     新しい商品インスタンスを作成します。
@@ -29,3 +51,241 @@ def create_item(item_id: int, name: str, price: float, description: str | None =
     if price <= 0:
         raise ValueError("Price must be positive")
     return Item(id=item_id, name=name, price=price, description=description)
+
+
+# 一括作成で拒否された行の情報(行番号, フィールド名, エラーコード, メッセージ)
+ItemRejection = ErrorRecord
+
+
+@dataclass(slots=True)
+class BulkCreateResult:
+    """一括作成の結果。"""
+
+    items: list[Item] = field(default_factory=list)
+    # 拒否理由(行番号順。同じ行ではフィールドの定義順)
+    rejections: list[ItemRejection] = field(default_factory=list)
+
+    def to_error(self) -> BulkValidationError | None:
+        """
+        拒否された行を1つの例外にまとめます。
+
+        Returns:
+            拒否された行がある場合は BulkValidationError、それ以外はNone
+        """
+        errors = ErrorCollector()
+        errors.extend(self.rejections)
+        return errors.to_error("商品データが無効です")
+
+
+def _field_adapter(name: str) -> TypeAdapter[Any]:
+    """Itemのフィールド定義(型と制約)から単一値用のTypeAdapterを作成します。"""
+    info = Item.model_fields[name]
+    annotation: Any = info.annotation
+    if info.metadata:
+        annotation = cast(Any, Annotated)[tuple([annotation, *info.metadata])]
+    return TypeAdapter(annotation)
+
+
+def _field_constraint(name: str, kind: type[Any], attr: str) -> Any:
+    """Itemのフィールド定義から制約値(min_length, gtなど)を取り出します。"""
+    for constraint in Item.model_fields[name].metadata:
+        if isinstance(constraint, kind):
+            return getattr(constraint, attr)
+    raise LookupError(f"Item.{name} に {kind.__name__} 制約がありません")
+
+
+_ADAPTERS: dict[str, TypeAdapter[Any]] = {name: _field_adapter(name) for name in _FIELD_NAMES}
+_ID_MIN: int = _field_constraint("id", annotated_types.Ge, "ge")
+_ID_MAX: int = _field_constraint("id", annotated_types.Le, "le")
+_NAME_MIN_LENGTH: int = _field_constraint("name", annotated_types.MinLen, "min_length")
+_PRICE_GT: float = _field_constraint("price", annotated_types.Gt, "gt")
+# 型は正しく制約だけを満たさない値には、pydanticと同じメッセージを直接返す
+_NAME_TOO_SHORT = (
+    f"String should have at least {_NAME_MIN_LENGTH} "
+    f"character{'' if _NAME_MIN_LENGTH == 1 else 's'}"
+)
+_PRICE_NOT_GREATER = f"Input should be greater than {_PRICE_GT}"
+_FLOAT_MAX = sys.float_info.max
+# pydanticのエラーの種類("type")をエラーコードとして使う
+_MISSING_CODE = "missing"
+_FIELD_REQUIRED = "Field required"
+_NAME_TOO_SHORT_CODE = "string_too_short"
+_PRICE_NOT_GREATER_CODE = "greater_than"
+# 検証結果をキャッシュする値の型(ハッシュ可能で、等しい値の検証結果が同じになる型)
+_CACHEABLE_TYPES = frozenset({str, int, float, bool, bytes, type(None)})
+
+
+def _row_values(row: object) -> list[Any]:
+    """1行分のレコードから、フィールドの定義順の値を取り出します(ない値は _MISSING)。"""
+    if isinstance(row, Mapping):
+        return [row.get(name, _MISSING) for name in _FIELD_NAMES]
+    if isinstance(row, Sequence) and not isinstance(row, str | bytes):
+        return [row[pos] if len(row) > pos else _MISSING for pos in range(len(_FIELD_NAMES))]
+    # 辞書でもタプルでもない行は、すべてのフィールドが欠けている行として拒否する
+    return [_MISSING] * len(_FIELD_NAMES)
+
+
+def _columns_from_records(records: Iterable[ItemRecord]) -> dict[str, list[Any]]:
+    """行形式のレコードを列形式に転置します。"""
+    rows = records if isinstance(records, list) else list(records)
+    if all(isinstance(row, Mapping) for row in rows):
+        mappings = cast(list[Mapping[str, Any]], rows)
+        return {name: [row.get(name, _MISSING) for row in mappings] for name in _FIELD_NAMES}
+    if all(isinstance(row, tuple | list) for row in rows):
+        sequences = cast(list[Sequence[Any]], rows)
+        return {
+            name: [row[pos] if len(row) > pos else _MISSING for row in sequences]
+            for pos, name in enumerate(_FIELD_NAMES)
+        }
+    # 辞書とタプルが混在するバッチは、1行ずつ形式を判定する
+    values = [_row_values(row) for row in rows]
+    return {name: [row[pos] for row in values] for pos, name in enumerate(_FIELD_NAMES)}
+
+
+def _columns_from_mapping(columns: Mapping[str, Sequence[Any]]) -> dict[str, list[Any]]:
+    """列形式の入力を、長さを揃えた作業用のリストに変換します。"""
+    lengths = {len(values) for values in columns.values()}
+    if len(lengths) > 1:
+        raise ValueError("すべての列は同じ長さである必要があります")
+    size = lengths.pop() if lengths else 0
+    return {
+        name: list(columns[name]) if name in columns else [_MISSING] * size for name in _FIELD_NAMES
+    }
+
+
+@functools.lru_cache(maxsize=4096)
+def _validate_cached(name: str, type_name: str, value: Any) -> tuple[bool, Any]:
+    """
+    _validate_value の結果をキャッシュします。
+
+    汚れた入力では同じ不正な値("N/A"、空文字など)が繰り返し現れるため、
+    検証エラーの例外を値ごとに1回だけ発生させます。type_name はキーに型名を含めて
+    1 と True のような等しい値を区別するための引数です。
+    """
+    return _validate_value(name, value)
+
+
+def _validate_value(name: str, value: Any) -> tuple[bool, Any]:
+    """
+    値をフィールド定義どおりに検証します。
+
+    Returns:
+        成功した場合は (True, 変換後の値)、失敗した場合は (False, (エラーコード, メッセージ))
+    """
+    try:
+        return True, _ADAPTERS[name].validate_python(value)
+    except PydanticValidationError as e:
+        error = e.errors(include_url=False, include_context=False, include_input=False)[0]
+        return False, (error["type"], error["msg"])
+
+
+def _revalidate(name: str, values: list[Any], row: int, errors: ErrorCollector) -> None:
+    """
+    高速チェックで確定できなかった値を、フィールド定義どおりに検証し直します。
+
+    型変換(例: 文字列の数値)が成功した値は列内で置き換えられます。
+    """
+    value = values[row]
+    if value is _MISSING:
+        info = Item.model_fields[name]
+        if info.is_required():
+            errors.add(row, name, _MISSING_CODE, _FIELD_REQUIRED)
+        else:
+            values[row] = info.get_default()
+        return
+    value_type = type(value)
+    if value_type in _CACHEABLE_TYPES:
+        ok, result = _validate_cached(name, value_type.__name__, value)
+    else:
+        ok, result = _validate_value(name, value)
+    if ok:
+        values[row] = result
+    else:
+        errors.add(row, name, *result)
+
+
+def _check_ids(values: list[Any], errors: ErrorCollector) -> None:
+    id_min, id_max = _ID_MIN, _ID_MAX
+    for row in [i for i, v in enumerate(values) if type(v) is not int or not id_min <= v <= id_max]:
+        _revalidate("id", values, row, errors)
+
+
+def _check_names(values: list[Any], errors: ErrorCollector) -> None:
+    min_length = _NAME_MIN_LENGTH
+    for row in [i for i, v in enumerate(values) if type(v) is not str or len(v) < min_length]:
+        if type(values[row]) is str:
+            errors.add(row, "name", _NAME_TOO_SHORT_CODE, _NAME_TOO_SHORT)
+        else:
+            _revalidate("name", values, row, errors)
+
+
+def _check_prices(values: list[Any], errors: ErrorCollector) -> None:
+    price_gt = _PRICE_GT
+    for row in [i for i, v in enumerate(values) if type(v) is not float or not v > price_gt]:
+        value = values[row]
+        # floatで表せない大きさの整数は、pydanticと同じエラーにするため検証し直す
+        if type(value) is not float and (type(value) is not int or value > _FLOAT_MAX):
+            _revalidate("price", values, row, errors)
+        elif value > price_gt:
+            values[row] = float(value)
+        else:
+            errors.add(row, "price", _PRICE_NOT_GREATER_CODE, _PRICE_NOT_GREATER)
+
+
+def _check_descriptions(values: list[Any], errors: ErrorCollector) -> None:
+    for row in [i for i, v in enumerate(values) if v is not None and type(v) is not str]:
+        _revalidate("description", values, row, errors)
+
+
+@timed("item_service.create_items")
+def create_items(
+    records: Iterable[ItemRecord] | Mapping[str, Sequence[Any]],
+) -> BulkCreateResult:
+    """
+    複数の商品インスタンスを一括で作成します。
+
+    検証はItemのフィールド定義(nameのmin_length、priceのgtなど)に従い、
+    行ごとではなく列ごとにまとめて行います。典型的な値は型と制約の
+    高速チェックだけで確定し、それ以外の値のみpydanticで検証し直します。
+    検証済みの値からは、バリデータを再度通さずにItemを組み立てます。
+
+    不正な行は例外を送出せずに ErrorRecord(行番号、フィールド、pydanticのエラーの
+    種類をエラーコードとしたもの、メッセージ)として記録します。すべての拒否を
+    1つの例外にまとめる場合は、結果の to_error() を使います。
+
+    Args:
+        records: 次のいずれかの形式のバッチ
+            - フィールド名をキーとする辞書のリスト
+            - (id, name, price[, description]) のタプルのリスト
+            - フィールド名から値の列へのマッピング
+
+    Returns:
+        有効な商品(入力順)と、行ごとの拒否理由を含む結果
+
+    Raises:
+        ValueError: 列形式の入力で列の長さが揃っていない場合
+    """
+    if isinstance(records, Mapping):
+        columns = _columns_from_mapping(records)
+    else:
+        columns = _columns_from_records(records)
+
+    # 不正な値は例外を送出せずに記録し、すべての列を検証してから行を除外する
+    errors = ErrorCollector()
+    _check_ids(columns["id"], errors)
+    _check_names(columns["name"], errors)
+    _check_prices(columns["price"], errors)
+    _check_descriptions(columns["description"], errors)
+
+    rejections = errors.records
+    if rejections:
+        rejections.sort(key=lambda r: (r.row, _FIELD_ORDER[r.field]))
+        rejected = {r.row for r in rejections}
+        keep = [i for i in range(len(columns["id"])) if i not in rejected]
+        for name, values in columns.items():
+            columns[name] = [values[i] for i in keep]
+
+    items = construct_items(
+        columns["id"], columns["name"], columns["price"], columns["description"]
+    )
+    return BulkCreateResult(items=items, rejections=rejections)
@@ -0,0 +1,130 @@
+"""
+CLI起動時のインポート時間を計測するモジュール。
+
+`dev-template --profile-startup <コマンド>` から利用します。指定されたコマンドを
+`python -X importtime` 付きの子プロセスで実行し、その標準エラーに出力される
+インポート時間を集計して表示します。
+"""
+
+from __future__ import annotations
+
+import os
+import subprocess
+import sys
+import time
+from collections import defaultdict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import TextIO
+
+# 子プロセスで実行するコード。プログラム名を通常の起動時と揃える
+_CHILD_CODE = "import sys; sys.argv[0] = 'dev-template'; from core.cli import main; main()"
+_IMPORTTIME_PREFIX = "import time:"
+# coreパッケージの親ディレクトリ(子プロセスのPYTHONPATHに追加する)
+_SOURCE_ROOT = Path(__file__).resolve().parent.parent
+
+
+@dataclass(slots=True)
+class ImportTiming:
+    """1モジュール分のインポート時間(マイクロ秒)。"""
+
+    module: str
+    self_us: int
+    cumulative_us: int
+
+
+def parse_importtime(lines: list[str]) -> tuple[list[ImportTiming], list[str]]:
+    """
+    `-X importtime` の出力を解析します。
+
+    Args:
+        lines: 子プロセスの標準エラーの各行
+
+    Returns:
+        インポート時間の一覧と、インポート時間以外の行のタプル
+    """
+    timings: list[ImportTiming] = []
+    others: list[str] = []
+    for line in lines:
+        if not line.startswith(_IMPORTTIME_PREFIX):
+            others.append(line)
+            continue
+        fields = line[len(_IMPORTTIME_PREFIX) :].split("|")
+        if len(fields) != 3 or not fields[0].strip().isdigit():
+            continue  # 見出し行
+        timings.append(
+            ImportTiming(
+                module=fields[2].strip(),
+                self_us=int(fields[0]),
+                cumulative_us=int(fields[1]),
+            )
+        )
+    return timings, others
+
+
+def format_report(timings: list[ImportTiming], wall_seconds: float, top: int = 15) -> str:
+    """
+    インポート時間の内訳をテキストに整形します。
+
+    Args:
+        timings: parse_importtime で取得したインポート時間
+        wall_seconds: 子プロセス全体の実行時間(秒)
+        top: 表示するモジュール数
+
+    Returns:
+        パッケージ別の合計と、累積時間の大きいモジュールの一覧
+    """
+    by_package: dict[str, int] = defaultdict(int)
+    for timing in timings:
+        by_package[timing.module.partition(".")[0]] += timing.self_us
+    total_us = sum(by_package.values())
+
+    lines = [
+        f"起動時間: {wall_seconds * 1000:.1f} ms (インポート合計: {total_us / 1000:.1f} ms)",
+        "",
+        "パッケージ別 (self の合計):",
+    ]
+    for package, self_us in sorted(by_package.items(), key=lambda kv: kv[1], reverse=True)[:top]:
+        lines.append(f"  {self_us / 1000:9.1f} ms  {package}")
+    lines += ["", "累積時間の大きいモジュール:"]
+    for timing in sorted(timings, key=lambda t: t.cumulative_us, reverse=True)[:top]:
+        lines.append(
+            f"  {timing.cumulative_us / 1000:9.1f} ms  "
+            f"(self {timing.self_us / 1000:7.1f} ms)  {timing.module}"
+        )
+    return "\n".join(lines)
+
+
+def profile_startup(args: list[str], out: TextIO | None = None, top: int = 15) -> int:
+    """
+    コマンドを子プロセスで実行し、インポート時間の内訳を表示します。
+
+    子プロセスの標準出力はそのまま引き継ぎ、インポート時間以外の標準エラーの行は
+    レポートの前に転送します。
+
+    Args:
+        args: 実行するコマンドと引数(`--profile-startup` は含めない)
+        out: レポートの出力先(省略時は標準エラー)
+        top: 表示するモジュール数
+
+    Returns:
+        子プロセスの終了コード
+    """
+    out = out or sys.stderr
+    env = os.environ.copy()
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [str(_SOURCE_ROOT), env.get("PYTHONPATH")]))
+    started = time.perf_counter()
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", _CHILD_CODE, *args],
+        stderr=subprocess.PIPE,
+        env=env,
+        text=True,
+        check=False,
+    )
+    wall_seconds = time.perf_counter() - started
+
+    timings, others = parse_importtime(completed.stderr.splitlines())
+    for line in others:
+        print(line, file=out)
+    print(format_report(timings, wall_seconds, top), file=out)
+    return completed.returncode
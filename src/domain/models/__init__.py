@@ -1,3 +1,51 @@
-from .item import Item
+"""
+ドメインモデル。
 
-__all__ = ["Item"]
+起動を速くするため、Item 以外(列形式の格納やバイナリ形式のファイルなど)は
+初めてアクセスしたときに読み込みます。
+"""
+
+import importlib
+from typing import TYPE_CHECKING, Any
+
+from .item import Item, construct_item, construct_items
+
+if TYPE_CHECKING:
+    from .item_file import ItemFile, write_item_file
+    from .item_json import item_to_json, items_to_json, items_to_ndjson
+    from .item_store import ItemColumns, ItemStore, ItemView
+
+__all__ = [
+    "Item",
+    "ItemColumns",
+    "ItemFile",
+    "ItemStore",
+    "ItemView",
+    "construct_item",
+    "construct_items",
+    "item_to_json",
+    "items_to_json",
+    "items_to_ndjson",
+    "write_item_file",
+]
+
+# 遅延して読み込む属性と、それを定義するサブモジュール
+_LAZY_ATTRIBUTES = {
+    "ItemFile": ".item_file",
+    "write_item_file": ".item_file",
+    "item_to_json": ".item_json",
+    "items_to_json": ".item_json",
+    "items_to_ndjson": ".item_json",
+    "ItemColumns": ".item_store",
+    "ItemStore": ".item_store",
+    "ItemView": ".item_store",
+}
+
+
+def __getattr__(name: str) -> Any:
+    submodule = _LAZY_ATTRIBUTES.get(name)
+    if submodule is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(submodule, __name__), name)
+    globals()[name] = value
+    return value
@@ -7,13 +7,82 @@
 # 実際の開発を開始する際は、このファイルを削除し、ご自身のドメインモデルに
 # 置き換えてください。
 # -----------------------------------------------------------------------------
+from collections.abc import Iterable
+
 from pydantic import BaseModel, Field
 
 
 class Item(BaseModel):
     """商品データを表すドメインモデル。"""
 
-    id: int = Field(..., description="商品ID")
+    # 列形式の格納やバイナリ形式のファイルで int64 として扱うため、範囲を制限する
+    id: int = Field(..., ge=-(2**63), le=2**63 - 1, description="商品ID(64ビット符号付き整数)")
     name: str = Field(..., min_length=1, description="商品名")
     price: float = Field(..., gt=0, description="価格(0より大きい必要があります)")
     description: str | None = Field(None, description="商品説明")
+
+
+# construct_item() で使う、BaseModelのスロットへの代入(Item.model_construct() と同じ属性を設定する)
+_object_new = object.__new__
+_object_setattr = object.__setattr__
+_set_fields_set = BaseModel.__dict__["__pydantic_fields_set__"].__set__
+_set_extra = BaseModel.__dict__["__pydantic_extra__"].__set__
+_set_private = BaseModel.__dict__["__pydantic_private__"].__set__
+_FIELD_NAMES = frozenset(Item.model_fields)
+
+
+def construct_item(id: int, name: str, price: float, description: str | None) -> Item:
+    """
+    検証を省略してItemを組み立てます(信頼済みの読み込み用)。
+
+    Item.model_construct() と同じ状態のインスタンスを、キーワード引数の処理や
+    既定値の補完を省いて組み立てます(検証する場合の約半分の時間)。制約(nameが空でない、priceが0より大きいなど)は確認しないため、
+    このシステムが検証してから書き出し、形式のバージョンとチェックサムを確認した
+    データにだけ使います。
+
+    Examples:
+        >>> construct_item(1, "A", 1.5, None) == Item(id=1, name="A", price=1.5)
+        True
+    """
+    item: Item = _object_new(Item)
+    _object_setattr(
+        item, "__dict__", {"id": id, "name": name, "price": price, "description": description}
+    )
+    _set_fields_set(item, set(_FIELD_NAMES))
+    _set_extra(item, None)
+    _set_private(item, None)
+    return item
+
+
+def construct_items(
+    ids: Iterable[int],
+    names: Iterable[str],
+    prices: Iterable[float],
+    descriptions: Iterable[str | None],
+) -> list[Item]:
+    """
+    列ごとの値から、検証を省略して複数のItemを組み立てます(信頼済みの読み込み用)。
+
+    construct_item() を1件ずつ呼び出すより、関数呼び出しの分だけ高速です。
+    使ってよいデータの条件は construct_item() と同じです。
+
+    Examples:
+        >>> construct_items([1, 2], ["A", "B"], [1.5, 2.0], [None, "b"])[1]
+        Item(id=2, name='B', price=2.0, description='b')
+    """
+    new, setattr_, fields = _object_new, _object_setattr, _FIELD_NAMES
+    set_fields_set, set_extra, set_private = _set_fields_set, _set_extra, _set_private
+    items: list[Item] = []
+    append = items.append
+    for item_id, name, price, description in zip(ids, names, prices, descriptions, strict=True):
+        item = new(Item)
+        setattr_(
+            item,
+            "__dict__",
+            {"id": item_id, "name": name, "price": price, "description": description},
+        )
+        set_fields_set(item, set(fields))
+        set_extra(item, None)
+        set_private(item, None)
+        append(item)
+    return items
@@ -0,0 +1,416 @@
+"""
+商品データのバイナリファイル形式。
+
+ItemStoreと同じ列指向のレイアウトをそのままファイルに書き出します。読み込み時は
+ファイルを mmap し、各列を memoryview として参照するため、ファイル全体を解析したり
+メモリへ読み込んだりせずに、位置またはidで任意の1件を取り出せます。
+
+ファイルの構成(数値はすべてリトルエンディアン、各セクションは8バイト境界に整列)::
+
+    ヘッダ (64バイト)         マジック, バージョン, CRC32, 件数, 各文字列ヒープのバイト数
+    id                       int64[件数]
+    price                    float64[件数]
+    nameのオフセット          uint64[件数 + 1]
+    descriptionのオフセット   uint64[件数 + 1]
+    idの索引                  int64[件数] (idの昇順に並べた位置)
+    descriptionのNULL         uint8[件数]
+    nameのヒープ              UTF-8
+    descriptionのヒープ       UTF-8
+
+CRC32はヘッダより後ろのすべてのバイトに対して計算します。
+"""
+
+from __future__ import annotations
+
+import mmap
+import struct
+import sys
+import zlib
+from array import array
+from bisect import bisect_left
+from collections.abc import Iterable, Iterator
+from itertools import pairwise
+from os import PathLike
+from types import TracebackType
+from typing import Any, BinaryIO, TypeVar, cast
+
+from pydantic import TypeAdapter
+
+from utils.files import atomic_output
+
+from .item import Item, construct_item, construct_items
+from .item_store import ItemStore
+
+ITEM_FILE_MAGIC = b"ITEMBIN\x00"
+ITEM_FILE_VERSION = 1
+# 推奨する拡張子
+ITEM_FILE_SUFFIX = ".items"
+
+# マジック, バージョン, 予約, CRC32, 件数, nameのヒープ, descriptionのヒープ
+_HEADER = struct.Struct("<8sHHIQQQ")
+_HEADER_SIZE = 64
+_ALIGNMENT = 8
+
+# 反復時に一度に変換する件数
+_ITER_CHUNK = 4_096
+
+_ITEM_LIST = TypeAdapter(list[Item])
+_View = TypeVar("_View", bound="memoryview[Any]")
+
+
+def _padding(size: int) -> int:
+    return -size % _ALIGNMENT
+
+
+def _section_sizes(count: int, names_size: int, descriptions_size: int) -> list[int]:
+    """ヘッダ以降の各セクションのバイト数(整列用の詰め物を含む)を返します。"""
+    return [
+        8 * count,
+        8 * count,
+        8 * (count + 1),
+        8 * (count + 1),
+        8 * count,
+        count + _padding(count),
+        names_size,
+        descriptions_size,
+    ]
+
+
+def _check_byteorder() -> None:
+    # 列を memoryview.cast でそのまま参照するため、ホストのバイト順がファイルと一致する必要がある
+    if sys.byteorder != "little":
+        raise ValueError("バイナリ形式はリトルエンディアンの環境でのみ利用できます")
+
+
+def write_item_file(path: str | PathLike[str], items: Iterable[Item] | ItemStore) -> int:
+    """
+    商品をバイナリ形式でファイルに書き出します。
+
+    同じディレクトリの一時ファイルに書き出してから置き換えるため、途中で失敗しても
+    書きかけのファイルが残ることはありません。
+
+    Args:
+        path: 書き出すファイルのパス
+        items: 書き出す商品(ItemStoreを渡した場合は変換せずにそのまま書き出す)
+
+    Returns:
+        書き出した件数
+    """
+    _check_byteorder()
+    store = items if isinstance(items, ItemStore) else ItemStore.from_items(items)
+    columns = store.columns()
+    count = len(store)
+    ids = columns.ids
+    order = array("q", sorted(range(count), key=ids.__getitem__))
+
+    # 書き込みの途中で中断しても既存のファイルが壊れないよう、一時ファイルから置き換える
+    with atomic_output(path) as file:
+        file.write(bytes(_HEADER_SIZE))
+        crc = 0
+        for section in (
+            ids,
+            columns.prices,
+            columns.name_offsets,
+            columns.description_offsets,
+            order,
+            columns.description_nulls,
+            bytes(_padding(count)),
+            columns.name_heap,
+            columns.description_heap,
+        ):
+            crc = zlib.crc32(section, crc)
+            file.write(section)
+        header = _HEADER.pack(
+            ITEM_FILE_MAGIC,
+            ITEM_FILE_VERSION,
+            0,
+            crc,
+            count,
+            len(columns.name_heap),
+            len(columns.description_heap),
+        )
+        file.seek(0)
+        file.write(header)
+    return count
+
+
+class ItemFile:
+    """
+    バイナリ形式の商品ファイルを mmap して読み出すリーダー。
+
+    列は memoryview としてファイルを直接参照するため、開く処理はファイルの大きさに
+    関係なく一定の時間で終わります(verify=True の場合はCRC32の計算が加わります)。
+    Itemはアクセスのたびに組み立てて検証します。trusted=True の場合は、形式の
+    バージョンとCRC32を確認したうえで、検証を省略して組み立てます。CRC32は内容が
+    壊れていないことを確認するだけで、このシステムが書き出したことは保証しないため、
+    trusted=True は自分で書き出したファイルにだけ使います。
+
+    Examples:
+        >>> import tempfile, os
+        >>> path = os.path.join(tempfile.mkdtemp(), "sample.items")
+        >>> write_item_file(path, [Item(id=7, name="A", price=1.5, description=None)])
+        1
+        >>> with ItemFile(path) as item_file:
+        ...     item_file.find(7)
+        Item(id=7, name='A', price=1.5, description=None)
+    """
+
+    __slots__ = (
+        "_description_heap",
+        "_description_offsets",
+        "_file",
+        "_id_column",
+        "_ids",
+        "_map",
+        "_name_heap",
+        "_name_offsets",
+        "_nulls",
+        "_order",
+        "_price_column",
+        "_prices",
+        "_views",
+        "checksum",
+        "trusted",
+    )
+
+    def __init__(
+        self, path: str | PathLike[str], verify: bool = True, trusted: bool = False
+    ) -> None:
+        """
+        ファイルを開き、ヘッダを検証します。
+
+        Args:
+            path: 読み込むファイルのパス
+            verify: Trueの場合はCRC32を計算してデータが破損していないことを確認する
+            trusted: Trueの場合はItemを検証せずに組み立てる(verify=True が必要)
+
+        Raises:
+            ValueError: バイナリ形式のファイルでない、未対応のバージョン、
+                ファイルが破損している場合、または verify=False で trusted=True の場合
+        """
+        if trusted and not verify:
+            raise ValueError("検証を省略するにはチェックサムの確認が必要です")
+        self.trusted = trusted
+        _check_byteorder()
+        self._file: BinaryIO | None = open(path, "rb")
+        self._map: mmap.mmap | None = None
+        self._views: list[memoryview] = []
+        self._id_column: memoryview[int] | None = None
+        self._price_column: memoryview[float] | None = None
+        try:
+            self._open(verify)
+        except BaseException:
+            self.close()
+            raise
+
+    def _open(self, verify: bool) -> None:
+        assert self._file is not None
+        header = self._file.read(_HEADER_SIZE)
+        if len(header) < _HEADER_SIZE or not header.startswith(ITEM_FILE_MAGIC):
+            raise ValueError("商品のバイナリ形式のファイルではありません")
+        _, version, _, checksum, count, names_size, descriptions_size = _HEADER.unpack_from(header)
+        if version != ITEM_FILE_VERSION:
+            raise ValueError(f"未対応のバージョンです: {version}")
+        sizes = _section_sizes(count, names_size, descriptions_size)
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        if len(self._map) != _HEADER_SIZE + sum(sizes):
+            raise ValueError("ファイルの大きさがヘッダと一致しません(ファイルが破損しています)")
+
+        base = self._view(memoryview(self._map))
+        body = self._view(base[_HEADER_SIZE:])
+        if verify and zlib.crc32(body) != checksum:
+            raise ValueError("チェックサムが一致しません(ファイルが破損しています)")
+        self.checksum: int = checksum
+
+        sections: list[memoryview] = []
+        offset = 0
+        for size in sizes:
+            sections.append(self._view(body[offset : offset + size]))
+            offset += size
+        self._ids = self._view(sections[0].cast("q"))
+        self._prices = self._view(sections[1].cast("d"))
+        self._name_offsets = self._view(sections[2].cast("Q"))
+        self._description_offsets = self._view(sections[3].cast("Q"))
+        self._order = self._view(sections[4].cast("q"))
+        self._nulls = sections[5]
+        self._name_heap = sections[6]
+        self._description_heap = sections[7]
+
+    def _view(self, view: _View) -> _View:
+        # close() で mmap を閉じる前にすべてのビューを解放する必要があるため記録しておく
+        self._views.append(view)
+        return view
+
+    def close(self) -> None:
+        """
+        ファイルを閉じます。閉じた後に取得したItemはそのまま利用できます。
+
+        id_column と price_column のビューは閉じるときに解放されます。
+
+        Raises:
+            BufferError: id_column などのビューから作成した配列(np.frombuffer など)が
+                まだ使われている場合。それらを破棄してから再び close() を呼び出せます
+        """
+        # ビューを参照している配列が残っている場合、そのビューは解放できないため残しておく
+        self._views = [view for view in reversed(self._views) if not _release(view)][::-1]
+        if self._file is not None:
+            # mmap はファイル記述子を複製して保持するため、ファイルは先に閉じてよい
+            self._file.close()
+            self._file = None
+        if self._map is not None:
+            try:
+                self._map.close()
+            except BufferError:
+                raise BufferError(
+                    "ItemFileの列のビュー(id_column など)から作成した配列が使用中のため、"
+                    "ファイルを閉じられません"
+                ) from None
+            self._map = None
+
+    def __enter__(self) -> ItemFile:
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        self.close()
+
+    def item(self, index: int) -> Item:
+        """
+        指定位置の商品をItemとして組み立てます。
+
+        Args:
+            index: 位置(負の値は末尾からの位置)
+
+        Returns:
+            Itemインスタンス
+
+        Raises:
+            IndexError: 位置が範囲外の場合
+        """
+        size = len(self)
+        if index < 0:
+            index += size
+        if not 0 <= index < size:
+            raise IndexError("ItemFileのインデックスが範囲外です")
+        return self._build(index)
+
+    def _build(self, index: int) -> Item:
+        name_offsets = self._name_offsets
+        description: str | None = None
+        if not self._nulls[index]:
+            offsets = self._description_offsets
+            description = str(self._description_heap[offsets[index] : offsets[index + 1]], "utf-8")
+        name = str(self._name_heap[name_offsets[index] : name_offsets[index + 1]], "utf-8")
+        if self.trusted:
+            return construct_item(self._ids[index], name, self._prices[index], description)
+        return Item(
+            id=self._ids[index], name=name, price=self._prices[index], description=description
+        )
+
+    def index_of(self, item_id: int) -> int:
+        """
+        idの索引を二分探索し、商品の位置を返します。
+
+        同じidの商品が複数ある場合は、最も前の位置を返します。
+
+        Raises:
+            KeyError: 商品が存在しない場合
+        """
+        ids = self._ids
+        order = self._order
+        position = bisect_left(order, item_id, key=ids.__getitem__)
+        if position == len(order) or ids[order[position]] != item_id:
+            raise KeyError(item_id)
+        return int(order[position])
+
+    def find(self, item_id: int) -> Item | None:
+        """idで商品を取得します。存在しない場合はNoneを返します。"""
+        try:
+            return self._build(self.index_of(item_id))
+        except KeyError:
+            return None
+
+    def items(self, start: int = 0, stop: int | None = None) -> list[Item]:
+        """
+        指定範囲の商品をまとめてItemに変換します。
+
+        各列を範囲ごとに一括で取り出し、1回の呼び出しでまとめて検証するため
+        (trusted=True の場合は検証せずに組み立てるため)、1件ずつ item() を呼び出すより高速です。
+
+        Args:
+            start: 開始位置
+            stop: 終了位置(この位置を含まない)。Noneの場合は末尾まで
+
+        Returns:
+            Itemのリスト
+        """
+        start, stop, _ = slice(start, stop).indices(len(self))
+        if start >= stop:
+            return []
+        names = _texts(self._name_heap, self._name_offsets, start, stop)
+        descriptions = _texts(self._description_heap, self._description_offsets, start, stop)
+        for i, null in enumerate(self._nulls[start:stop]):
+            if null:
+                descriptions[i] = None
+        ids = self._ids[start:stop].tolist()
+        prices = cast(list[float], self._prices[start:stop].tolist())
+        if self.trusted:
+            # nameはNULLにならない列のため、すべてstr
+            return construct_items(ids, cast(list[str], names), prices, descriptions)
+        records = [
+            {"id": item_id, "name": name, "price": price, "description": description}
+            for item_id, name, price, description in zip(
+                ids, names, prices, descriptions, strict=True
+            )
+        ]
+        return _ITEM_LIST.validate_python(records)
+
+    @property
+    def id_column(self) -> memoryview[int]:
+        """idの列(int64)への読み取り専用ビュー。ファイルを閉じると解放されます。"""
+        # アクセスのたびにビューを作ると self._views が増え続けるため、一度だけ作成する
+        if self._id_column is None:
+            self._id_column = self._view(self._ids[:])
+        return self._id_column
+
+    @property
+    def price_column(self) -> memoryview[float]:
+        """priceの列(float64)への読み取り専用ビュー。ファイルを閉じると解放されます。"""
+        if self._price_column is None:
+            self._price_column = self._view(self._prices[:])
+        return self._price_column
+
+    def to_items(self) -> list[Item]:
+        """すべての商品をItemのリストに変換します。"""
+        return self.items()
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def __getitem__(self, index: int) -> Item:
+        return self.item(index)
+
+    def __iter__(self) -> Iterator[Item]:
+        for start in range(0, len(self), _ITER_CHUNK):
+            yield from self.items(start, start + _ITER_CHUNK)
+
+
+def _release(view: memoryview) -> bool:
+    """ビューを解放します。ビューを参照する配列が残っていて解放できない場合は False を返します。"""
+    try:
+        view.release()
+    except BufferError:
+        return False
+    return True
+
+
+def _texts(heap: memoryview, offsets: memoryview, start: int, stop: int) -> list[str | None]:
+    """文字列ヒープの start から stop までの文字列を、まとめてデコードします。"""
+    bounds = offsets[start : stop + 1].tolist()
+    base = bounds[0]
+    chunk = bytes(heap[base : bounds[-1]])
+    return [chunk[begin - base : end - base].decode("utf-8") for begin, end in pairwise(bounds)]
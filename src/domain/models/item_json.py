@@ -0,0 +1,131 @@
+"""
+商品(Item)をまとめてJSONまたはNDJSONのバイト列に変換する関数。
+
+1件ごとに model_dump() と json.dumps() を呼び出す方法では、Pythonの辞書の作成と
+JSONへの変換が商品ごとに行われます。このモジュールの関数は、pydantic-core の
+シリアライザ(Rustで実装)で商品を直接JSONのバイト列に変換します。
+
+- JSON配列: キャッシュした TypeAdapter(list[Item]) で、バッチ全体を1回の呼び出しで変換します。
+- NDJSON: 商品ごとにモデルのシリアライザを直接呼び出し、行をまとめて連結します
+  (model_dump_json() の引数の処理と str への変換を省きます)。
+
+出力は model_dump_json() と同じ形式(キーの順序、空白なし、UTF-8)です。
+"""
+
+from __future__ import annotations
+
+from collections.abc import Iterable, Sequence
+from itertools import islice
+from typing import IO
+
+from pydantic import TypeAdapter
+
+from .item import Item
+
+# ストリームに書き出すときに、1回に変換する商品数
+DEFAULT_CHUNK_SIZE = 10_000
+
+_ITEM_LIST_ADAPTER = TypeAdapter(list[Item])
+_item_to_json = Item.__pydantic_serializer__.to_json
+
+
+def item_to_json(item: Item) -> bytes:
+    """
+    1件の商品をJSONのバイト列に変換します(item.model_dump_json().encode() と同じ結果)。
+
+    Examples:
+        >>> item_to_json(Item(id=1, name="A", price=2))
+        b'{"id":1,"name":"A","price":2.0,"description":null}'
+    """
+    return _item_to_json(item)
+
+
+def items_to_json(items: Sequence[Item]) -> bytes:
+    """
+    商品をJSON配列のバイト列に変換します。
+
+    Examples:
+        >>> items_to_json([Item(id=1, name="A", price=2), Item(id=2, name="B", price=3)])
+        b'[{"id":1,"name":"A","price":2.0,"description":null},{"id":2,"name":"B","price":3.0,"description":null}]'
+    """
+    return _ITEM_LIST_ADAPTER.dump_json(list(items))
+
+
+def items_to_ndjson(items: Iterable[Item]) -> bytes:
+    """
+    商品をNDJSON(1行に1件、末尾は改行)のバイト列に変換します。商品がない場合は空になります。
+
+    Examples:
+        >>> items_to_ndjson([Item(id=1, name="A", price=2), Item(id=2, name="B", price=3)])
+        b'{"id":1,"name":"A","price":2.0,"description":null}\\n{"id":2,"name":"B","price":3.0,"description":null}\\n'
+    """
+    lines = list(map(_item_to_json, items))
+    if not lines:
+        return b""
+    lines.append(b"")
+    return b"\n".join(lines)
+
+
+def _chunks(items: Iterable[Item], size: int) -> Iterable[list[Item]]:
+    iterator = iter(items)
+    while chunk := list(islice(iterator, size)):
+        yield chunk
+
+
+def write_json(
+    stream: IO[bytes], items: Iterable[Item], chunk_size: int = DEFAULT_CHUNK_SIZE
+) -> int:
+    """
+    商品をJSON配列として、chunk_size 件ずつ変換しながらストリームに書き出します。
+
+    入力全体をメモリに載せずに、1つのJSON配列を書き出せます。
+
+    Args:
+        stream: 書き出し先のバイナリストリーム
+        items: 書き出す商品
+        chunk_size: 1回に変換する商品数
+
+    Returns:
+        書き出した件数
+
+    Raises:
+        ValueError: chunk_size が1未満の場合
+    """
+    if chunk_size < 1:
+        raise ValueError("1回に変換する商品数は1以上である必要があります")
+    count = 0
+    stream.write(b"[")
+    for chunk in _chunks(items, chunk_size):
+        # チャンクのJSON配列の括弧を外し、前のチャンクとカンマでつなぐ
+        if count:
+            stream.write(b",")
+        stream.write(_ITEM_LIST_ADAPTER.dump_json(chunk)[1:-1])
+        count += len(chunk)
+    stream.write(b"]")
+    return count
+
+
+def write_ndjson(
+    stream: IO[bytes], items: Iterable[Item], chunk_size: int = DEFAULT_CHUNK_SIZE
+) -> int:
+    """
+    商品をNDJSONとして、chunk_size 件ずつ変換しながらストリームに書き出します。
+
+    Args:
+        stream: 書き出し先のバイナリストリーム
+        items: 書き出す商品
+        chunk_size: 1回に変換する商品数
+
+    Returns:
+        書き出した件数
+
+    Raises:
+        ValueError: chunk_size が1未満の場合
+    """
+    if chunk_size < 1:
+        raise ValueError("1回に変換する商品数は1以上である必要があります")
+    count = 0
+    for chunk in _chunks(items, chunk_size):
+        stream.write(items_to_ndjson(chunk))
+        count += len(chunk)
+    return count
@@ -0,0 +1,254 @@
+"""
+商品データを列指向で保持するストア。
+
+大量のItemをpydanticオブジェクトのまま保持するとメモリを大きく消費するため、
+id・priceは配列に、name・descriptionはUTF-8のバイト列ヒープとオフセット配列に
+格納します。Itemが必要な場合は、ビューまたは変換メソッドで都度組み立てます。
+"""
+
+from __future__ import annotations
+
+import sys
+from array import array
+from collections.abc import Iterable, Iterator
+from dataclasses import dataclass
+
+from .item import Item, construct_item, construct_items
+
+
+class _StringColumn:
+    """UTF-8のバイト列ヒープとオフセット配列で文字列を保持する列。"""
+
+    __slots__ = ("_heap", "_nulls", "_offsets")
+
+    def __init__(self, nullable: bool = False) -> None:
+        self._heap = bytearray()
+        self._offsets = array("Q", [0])
+        self._nulls: bytearray | None = bytearray() if nullable else None
+
+    def append(self, value: str | None) -> None:
+        if value is None:
+            if self._nulls is None:
+                raise ValueError("この列にNoneは格納できません")
+            self._nulls.append(1)
+        else:
+            self._heap += value.encode("utf-8")
+            if self._nulls is not None:
+                self._nulls.append(0)
+        self._offsets.append(len(self._heap))
+
+    def text(self, index: int) -> str:
+        return self._heap[self._offsets[index] : self._offsets[index + 1]].decode("utf-8")
+
+    def __getitem__(self, index: int) -> str | None:
+        if self._nulls is not None and self._nulls[index]:
+            return None
+        return self.text(index)
+
+    @property
+    def nbytes(self) -> int:
+        size = sys.getsizeof(self._heap) + sys.getsizeof(self._offsets)
+        if self._nulls is not None:
+            size += sys.getsizeof(self._nulls)
+        return size
+
+
+@dataclass(frozen=True, slots=True)
+class ItemColumns:
+    """
+    ItemStoreの列データへの読み取り専用ビュー(コピーせずに参照します)。
+
+    文字列の列は、i番目の値が heap[offsets[i]:offsets[i + 1]] のUTF-8です。
+    ビューを保持している間は、ストアに商品を追加できません(BufferErrorになります)。
+    """
+
+    # int64[件数]
+    ids: memoryview
+    # float64[件数]
+    prices: memoryview
+    # uint64[件数 + 1]
+    name_offsets: memoryview
+    name_heap: memoryview
+    # uint64[件数 + 1]
+    description_offsets: memoryview
+    description_heap: memoryview
+    # uint8[件数](1の場合、descriptionはNone)
+    description_nulls: memoryview
+
+
+class ItemView:
+    """ItemStore内の1件を参照する軽量なビュー。値はアクセス時に列から読み出します。"""
+
+    __slots__ = ("_index", "_store")
+
+    def __init__(self, store: ItemStore, index: int) -> None:
+        self._store = store
+        self._index = index
+
+    @property
+    def id(self) -> int:
+        return self._store._ids[self._index]
+
+    @property
+    def name(self) -> str:
+        return self._store._names.text(self._index)
+
+    @property
+    def price(self) -> float:
+        return self._store._prices[self._index]
+
+    @property
+    def description(self) -> str | None:
+        return self._store._descriptions[self._index]
+
+    def to_item(self) -> Item:
+        """ビューが指す1件をItemとして組み立てます。"""
+        return self._store.item(self._index)
+
+    def __repr__(self) -> str:
+        return (
+            f"ItemView(id={self.id!r}, name={self.name!r}, price={self.price!r}, "
+            f"description={self.description!r})"
+        )
+
+
+class ItemStore:
+    """
+    商品データを列指向で保持するコンパクトなストア。
+
+    Examples:
+        >>> store = ItemStore.from_items([Item(id=1, name="A", price=10.0, description=None)])
+        >>> store[0].name
+        'A'
+        >>> store.to_items()
+        [Item(id=1, name='A', price=10.0, description=None)]
+    """
+
+    __slots__ = ("_descriptions", "_ids", "_names", "_prices")
+
+    def __init__(self) -> None:
+        self._ids = array("q")
+        self._prices = array("d")
+        self._names = _StringColumn()
+        self._descriptions = _StringColumn(nullable=True)
+
+    @classmethod
+    def from_items(cls, items: Iterable[Item]) -> ItemStore:
+        """
+        Itemの集合からストアを作成します。
+
+        Args:
+            items: 格納する商品
+
+        Returns:
+            新しいItemStoreインスタンス
+        """
+        store = cls()
+        store.extend(items)
+        return store
+
+    def append(self, item: Item) -> None:
+        """商品を1件追加します。"""
+        self._ids.append(item.id)
+        self._prices.append(item.price)
+        self._names.append(item.name)
+        self._descriptions.append(item.description)
+
+    def extend(self, items: Iterable[Item]) -> None:
+        """複数の商品を追加します。"""
+        for item in items:
+            self.append(item)
+
+    def item(self, index: int) -> Item:
+        """
+        指定位置の商品をItemとして組み立てます。
+
+        Args:
+            index: 位置(負の値は末尾からの位置)
+
+        Returns:
+            Itemインスタンス
+
+        Raises:
+            IndexError: 位置が範囲外の場合
+        """
+        index = self._normalize_index(index)
+        # ストアには検証済みのItemからしか値を追加できないため、検証を省略して組み立てる
+        return construct_item(
+            self._ids[index],
+            self._names.text(index),
+            self._prices[index],
+            self._descriptions[index],
+        )
+
+    def to_items(self) -> list[Item]:
+        """すべての商品をItemのリストに変換します。"""
+        names = self._names
+        descriptions = self._descriptions
+        count = len(self)
+        return construct_items(
+            self._ids,
+            [names.text(i) for i in range(count)],
+            self._prices,
+            [descriptions[i] for i in range(count)],
+        )
+
+    @property
+    def id_column(self) -> memoryview:
+        """idの列(int64)への読み取り専用ビュー。"""
+        return memoryview(self._ids).toreadonly()
+
+    @property
+    def price_column(self) -> memoryview:
+        """priceの列(float64)への読み取り専用ビュー。"""
+        return memoryview(self._prices).toreadonly()
+
+    def columns(self) -> ItemColumns:
+        """
+        すべての列への読み取り専用ビューを返します。
+
+        Examples:
+            >>> store = ItemStore.from_items([Item(id=1, name="ab", price=2.0, description=None)])
+            >>> columns = store.columns()
+            >>> columns.ids.tolist(), columns.name_offsets.tolist(), bytes(columns.name_heap)
+            ([1], [0, 2], b'ab')
+        """
+        names = self._names
+        descriptions = self._descriptions
+        assert descriptions._nulls is not None
+        return ItemColumns(
+            ids=memoryview(self._ids).toreadonly(),
+            prices=memoryview(self._prices).toreadonly(),
+            name_offsets=memoryview(names._offsets).toreadonly(),
+            name_heap=memoryview(names._heap).toreadonly(),
+            description_offsets=memoryview(descriptions._offsets).toreadonly(),
+            description_heap=memoryview(descriptions._heap).toreadonly(),
+            description_nulls=memoryview(descriptions._nulls).toreadonly(),
+        )
+
+    @property
+    def nbytes(self) -> int:
+        """列データが使用しているバイト数(Pythonオブジェクトのヘッダを含む)。"""
+        return (
+            sys.getsizeof(self._ids)
+            + sys.getsizeof(self._prices)
+            + self._names.nbytes
+            + self._descriptions.nbytes
+        )
+
+    def _normalize_index(self, index: int) -> int:
+        size = len(self)
+        if index < 0:
+            index += size
+        if not 0 <= index < size:
+            raise IndexError("ItemStoreのインデックスが範囲外です")
+        return index
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def __getitem__(self, index: int) -> ItemView:
+        return ItemView(self, self._normalize_index(index))
+
+    def __iter__(self) -> Iterator[ItemView]:
+        return (ItemView(self, i) for i in range(len(self)))
@@ -0,0 +1,208 @@
+"""
+中断したインポートを再開するためのチェックポイントと、取り込み済みの商品の索引。
+
+チェックポイントには、処理済みの入力のバイト数とレコード数、処理済みの入力の
+CRC32(連続して更新するハッシュ)、出力ファイルと索引ファイルの大きさを記録します。
+再開時は入力をそのバイト位置へシークし、出力と索引をチェックポイントの時点の
+大きさに切り詰めてから処理を続けます。
+
+チェックポイントは utils.files.write_atomic で一時ファイルに書き込んでから置き換えるため、
+書き込みの途中で中断しても前回のチェックポイントが壊れることはありません。
+
+SkipIndex は商品の内容(NDJSONの1行)の64ビットのハッシュを保持し、
+すでに取り込んだ商品を読み飛ばします。ファイルには追記だけを行います。
+"""
+
+from __future__ import annotations
+
+import io
+import json
+import os
+from array import array
+from collections.abc import Iterable
+from dataclasses import asdict, dataclass, fields
+from hashlib import blake2b
+from os import PathLike
+from typing import IO, Any
+
+from utils.files import write_atomic
+
+CHECKPOINT_VERSION = 1
+# チェックポイントを書き込む既定の間隔(秒)
+DEFAULT_CHECKPOINT_INTERVAL = 5.0
+
+
+@dataclass(slots=True)
+class ImportCheckpoint:
+    """インポートの進捗。"""
+
+    # 入力の名前(ファイルのパス。確認用)
+    source: str = ""
+    # 処理済みの入力のバイト数(再開時はこの位置から読み込む)
+    offset: int = 0
+    # 処理済みのレコード数と、そのうちインポート・拒否・読み飛ばした件数
+    read: int = 0
+    imported: int = 0
+    rejected: int = 0
+    skipped: int = 0
+    # 処理済みの入力(先頭から offset まで)のCRC32
+    content_crc: int = 0
+    # 最後に処理したチャンクの開始位置とCRC32(再開時に入力が変わっていないことを確認する)
+    tail_offset: int = 0
+    tail_crc: int = 0
+    # チェックポイントの時点の出力ファイルと索引ファイルの大きさ(バイト)
+    output_size: int = 0
+    index_size: int = 0
+    # 入力の末尾まで処理したかどうか
+    completed: bool = False
+
+    def to_json(self) -> str:
+        """JSON文字列に変換します。"""
+        return json.dumps({"version": CHECKPOINT_VERSION, **asdict(self)}, ensure_ascii=False)
+
+    @classmethod
+    def from_json(cls, text: str) -> ImportCheckpoint:
+        """
+        to_json() の結果からチェックポイントを復元します。
+
+        Raises:
+            ValueError: 形式が不正、または未対応のバージョンの場合
+        """
+        try:
+            data = json.loads(text)
+        except ValueError as e:
+            raise ValueError("チェックポイントの形式が不正です") from e
+        if not isinstance(data, dict) or data.get("version") != CHECKPOINT_VERSION:
+            raise ValueError("未対応のチェックポイントです")
+        names = {f.name for f in fields(cls)}
+        return cls(**{key: value for key, value in data.items() if key in names})
+
+
+def write_checkpoint(path: str | PathLike[str], checkpoint: ImportCheckpoint) -> None:
+    """チェックポイントを不可分に書き込みます。"""
+    write_atomic(path, checkpoint.to_json().encode("utf-8"))
+
+
+def read_checkpoint(path: str | PathLike[str]) -> ImportCheckpoint:
+    """
+    チェックポイントを読み込みます。
+
+    Raises:
+        OSError: ファイルを読み込めない場合
+        ValueError: 形式が不正、または未対応のバージョンの場合
+    """
+    with open(path, encoding="utf-8") as file:
+        return ImportCheckpoint.from_json(file.read())
+
+
+def sync(stream: IO[Any]) -> None:
+    """ストリームの内容をフラッシュし、ファイルであればディスクへ書き出します。"""
+    stream.flush()
+    try:
+        fileno = stream.fileno()
+    except (AttributeError, io.UnsupportedOperation):
+        return
+    os.fsync(fileno)
+
+
+class SkipIndex:
+    """
+    取り込み済みの商品の内容のハッシュ(64ビット)の索引。
+
+    索引ファイルにはハッシュを符号なし64ビット整数として追記していきます。
+    ハッシュが衝突した場合は新しい商品を誤って読み飛ばしますが、
+    1,000万件の中で1組でも衝突する確率は約0.0003%です。
+
+    Examples:
+        >>> import tempfile, os
+        >>> index = SkipIndex(os.path.join(tempfile.mkdtemp(), "items.idx"))
+        >>> index.filter_new([b'{"id":1}\\n', b'{"id":2}\\n', b'{"id":1}\\n'])
+        [b'{"id":1}\\n', b'{"id":2}\\n']
+        >>> index.filter_new([b'{"id":2}\\n', b'{"id":3}\\n'])
+        [b'{"id":3}\\n']
+    """
+
+    __slots__ = ("_keys", "_path", "_pending")
+
+    def __init__(self, path: str | PathLike[str]) -> None:
+        """
+        索引ファイルを読み込みます。ファイルが存在しない場合は空の索引になります。
+
+        Args:
+            path: 索引ファイルのパス
+        """
+        self._path = os.fspath(path)
+        self._keys: set[int] = set()
+        self._pending = array("Q")
+        self._load()
+
+    def _load(self) -> None:
+        keys = array("Q")
+        try:
+            with open(self._path, "rb") as file:
+                data = file.read()
+        except FileNotFoundError:
+            data = b""
+        size = len(data) - len(data) % keys.itemsize
+        if size != len(data):
+            # 追記の途中で中断した末尾の半端なバイトは、以降の追記がずれないよう取り除く
+            with open(self._path, "r+b") as file:
+                file.truncate(size)
+        keys.frombytes(data[:size])
+        self._keys = set(keys)
+
+    @staticmethod
+    def key(line: bytes) -> int:
+        """商品の内容(NDJSONの1行)のハッシュを返します。"""
+        return int.from_bytes(blake2b(line, digest_size=8).digest(), "little")
+
+    def filter_new(self, lines: Iterable[bytes]) -> list[bytes]:
+        """
+        索引にない行だけを返し、それらを索引に追加します。
+
+        同じ呼び出しの中で重複する行は、最初の1行だけを返します。
+        追加した分は flush() を呼び出すまでファイルには書き込まれません。
+        """
+        keys = self._keys
+        pending = self._pending
+        key = self.key
+        new: list[bytes] = []
+        for line in lines:
+            value = key(line)
+            if value not in keys:
+                keys.add(value)
+                pending.append(value)
+                new.append(line)
+        return new
+
+    def flush(self) -> int:
+        """
+        追加したハッシュを索引ファイルに追記し、ディスクへ書き出します。
+
+        Returns:
+            書き出した後の索引ファイルの大きさ(バイト)
+        """
+        with open(self._path, "ab") as file:
+            if self._pending:
+                file.write(self._pending.tobytes())
+                self._pending = array("Q")
+            sync(file)
+            return file.tell()
+
+    def truncate(self, size: int) -> None:
+        """
+        索引ファイルを指定の大きさに切り詰め、索引を読み込み直します。
+
+        チェックポイントより後に追記されたハッシュを取り消す場合に使います。
+        """
+        self._pending = array("Q")
+        if os.path.exists(self._path):
+            with open(self._path, "r+b") as file:
+                file.truncate(size)
+        self._load()
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def __contains__(self, line: object) -> bool:
+        return isinstance(line, bytes) and self.key(line) in self._keys
@@ -0,0 +1,430 @@
+"""
+商品のidの重複を、一定のメモリ使用量で取り除くパイプライン。
+
+出現済みのidをPythonのsetで保持すると、メモリ使用量が入力の件数に比例して増え続けます。
+ItemDeduplicator は、固定の大きさのBloomフィルタで新しいidかどうかを高速に判定し、
+Bloomフィルタが「出現済みかもしれない」と判定したidだけを、ディスク上の索引
+(一時ファイルのSQLiteデータベース)で正確に確認します。
+
+重複の扱い(policy)は次のいずれかです。
+
+- "first": 最初に出現した商品を残し、以降の重複は取り除きます。
+- "last": 最後に出現した商品を、最初に出現した位置に残します。入力の末尾まで
+  読み込むまで出力が確定しないため、商品はすべてディスク上の索引に書き込み、
+  最後にまとめて出力します。
+- "error": 内容(検証後のNDJSONの1行)が同じ重複は取り除き、内容の異なる重複が
+  あった場合は ConflictingItemError を送出します。
+
+Bloomフィルタの偽陽性率(新しいidを出現済みかもしれないと判定した割合)とメモリ使用量は
+DedupStats で報告します。
+"""
+
+from __future__ import annotations
+
+import math
+import sqlite3
+import time
+from collections.abc import Iterable, Iterator
+from dataclasses import dataclass
+from hashlib import blake2b
+from types import TracebackType
+from typing import BinaryIO
+
+from domain.models.item import Item
+from domain.models.item_json import item_to_json
+from shared import metrics
+from shared.errors import ValidationError
+
+from .item_import import DEFAULT_BATCH_SIZE, ImportStats, batched, read_records, validate_batches
+
+DEDUP_POLICIES = ("first", "last", "error")
+# ディスク上の索引のファイルであることを示す、SQLiteの application_id ("IDDP")
+_SPILL_APPLICATION_ID = 0x49444450
+# Bloomフィルタの容量(想定するidの種類数)と偽陽性率の既定値
+DEFAULT_CAPACITY = 10_000_000
+DEFAULT_ERROR_RATE = 0.01
+# ディスク上の索引にまとめて書き込む件数
+DEFAULT_SPILL_BATCH = 10_000
+# ディスク上の索引(SQLite)がメモリに保持するページキャッシュの上限(KiB)
+_SPILL_CACHE_KIB = 16 * 1024
+_MASK64 = (1 << 64) - 1
+
+
+class BloomFilter:
+    """
+    キーの集合を固定の大きさのビット配列で表す確率的なデータ構造。
+
+    含まれないキーを「含まれるかもしれない」と誤って判定すること(偽陽性)はありますが、
+    追加したキーを「含まれない」と判定することはありません。
+
+    Examples:
+        >>> bloom = BloomFilter(1_000, 0.01)
+        >>> bloom.add(b"1"), bloom.add(b"1")
+        (False, True)
+        >>> b"1" in bloom, b"2" in bloom
+        (True, False)
+    """
+
+    __slots__ = ("_bits", "_size", "count", "hashes")
+
+    def __init__(self, capacity: int, error_rate: float = DEFAULT_ERROR_RATE) -> None:
+        """
+        容量と偽陽性率から、ビット配列の大きさとハッシュ関数の数を決めます。
+
+        Args:
+            capacity: 追加するキーの想定数
+            error_rate: 想定数のキーを追加した時点の偽陽性率
+
+        Raises:
+            ValueError: 容量が1未満、または偽陽性率が0より大きく1未満でない場合
+        """
+        if capacity < 1:
+            raise ValueError("Bloomフィルタの容量は1以上である必要があります")
+        if not 0 < error_rate < 1:
+            raise ValueError("偽陽性率は0より大きく1未満である必要があります")
+        size = math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2)
+        self._size = max(size, 8)
+        self._bits = bytearray((self._size + 7) // 8)
+        self.hashes = max(round(self._size / capacity * math.log(2)), 1)
+        # 追加した(含まれないと判定された)キーの数
+        self.count = 0
+
+    @property
+    def nbytes(self) -> int:
+        """ビット配列の大きさ(バイト)。"""
+        return len(self._bits)
+
+    def _positions(self, key: bytes) -> Iterator[int]:
+        # 1回のハッシュから2つの値を取り出し、h1 + i * h2 でk個の位置を作る(double hashing)
+        digest = int.from_bytes(blake2b(key, digest_size=16).digest(), "little")
+        first, second = digest & _MASK64, (digest >> 64) | 1
+        size = self._size
+        for i in range(self.hashes):
+            yield (first + i * second) % size
+
+    def add(self, key: bytes) -> bool:
+        """
+        キーを追加します。
+
+        Returns:
+            追加する前からキーが含まれていた(かもしれない)場合はTrue
+        """
+        bits = self._bits
+        present = True
+        for position in self._positions(key):
+            mask = 1 << (position & 7)
+            if not bits[position >> 3] & mask:
+                bits[position >> 3] |= mask
+                present = False
+        if not present:
+            self.count += 1
+        return present
+
+    def __contains__(self, key: object) -> bool:
+        if not isinstance(key, bytes):
+            return False
+        bits = self._bits
+        return all(bits[p >> 3] & (1 << (p & 7)) for p in self._positions(key))
+
+    @property
+    def expected_error_rate(self) -> float:
+        """現在のキーの数での偽陽性率の理論値。"""
+        return float((1 - math.exp(-self.hashes * self.count / self._size)) ** self.hashes)
+
+
+class ConflictingItemError(ValidationError):
+    """
+    policy="error" で、内容の異なる同じidの商品が見つかった場合のエラー。
+
+    それまでに返した行は取り消せないため、出力先をファイルに書き出す場合は
+    置き換え先を変更しないよう不可分に書き込んでください(dedup-items コマンドを参照)。
+    """
+
+    def __init__(self, item_id: int) -> None:
+        super().__init__(f"id {item_id} の商品が異なる内容で重複しています")
+        self.item_id = item_id
+
+
+@dataclass(slots=True)
+class DedupStats:
+    """重複除去の集計結果。"""
+
+    read: int = 0
+    # 取り除いた重複の件数と、そのうち内容が異なっていた件数
+    duplicates: int = 0
+    conflicts: int = 0
+    # Bloomフィルタが出現済みかもしれないと判定し、ディスク上の索引を確認した件数
+    lookups: int = 0
+    # そのうち新しいidだった件数(偽陽性)
+    false_positives: int = 0
+    expected_false_positive_rate: float = 0.0
+    # Bloomフィルタのビット配列と、ディスク上の索引のページキャッシュの上限(バイト)
+    bloom_bytes: int = 0
+    cache_bytes: int = 0
+    # ディスク上の索引のファイルの大きさ(バイト)
+    spill_bytes: int = 0
+
+    @property
+    def unique(self) -> int:
+        """重複を除いた商品の件数。"""
+        return self.read - self.duplicates
+
+    @property
+    def false_positive_rate(self) -> float:
+        """新しいidのうち、Bloomフィルタが出現済みかもしれないと判定した割合。"""
+        return self.false_positives / self.unique if self.unique else 0.0
+
+    @property
+    def memory_bytes(self) -> int:
+        """入力の件数に関係なく一定の、メモリ使用量の上限の目安(バイト)。"""
+        return self.bloom_bytes + self.cache_bytes
+
+
+def _item_key(item_id: int) -> bytes:
+    return b"%d" % item_id
+
+
+def _content_digest(line: bytes) -> int:
+    # SQLiteの整数(符号付き64ビット)に収まるよう符号付きで変換する
+    return int.from_bytes(blake2b(line, digest_size=8).digest(), "little", signed=True)
+
+
+class ItemDeduplicator:
+    """
+    商品のidの重複を取り除くクラス。
+
+    Examples:
+        >>> items = [Item(id=1, name="A", price=1), Item(id=1, name="B", price=2)]
+        >>> with ItemDeduplicator("last", capacity=100) as dedup:
+        ...     [line.decode() for line in dedup.deduplicate(items)]
+        ['{"id":1,"name":"B","price":2.0,"description":null}\\n']
+    """
+
+    def __init__(
+        self,
+        policy: str = "first",
+        capacity: int = DEFAULT_CAPACITY,
+        error_rate: float = DEFAULT_ERROR_RATE,
+        spill_path: str | None = None,
+        spill_batch: int = DEFAULT_SPILL_BATCH,
+    ) -> None:
+        """
+        重複除去の状態を初期化します。
+
+        Args:
+            policy: 重複の扱い("first"、"last" または "error")
+            capacity: 想定するidの種類数(Bloomフィルタの大きさを決める)
+            error_rate: idの種類数が capacity の時点のBloomフィルタの偽陽性率
+            spill_path: ディスク上の索引のファイルのパス。Noneの場合は一時ファイルを使い、
+                close() で削除する。既存のファイルは、以前の索引のファイルの場合にだけ使える
+            spill_batch: ディスク上の索引にまとめて書き込む件数
+
+        Raises:
+            ValueError: 未対応の policy、不正な容量・偽陽性率・件数が指定された場合、
+                または spill_path が索引のファイルではない既存のファイルの場合
+        """
+        if policy not in DEDUP_POLICIES:
+            raise ValueError(f"未対応の重複の扱いです: {policy}")
+        if spill_batch < 1:
+            raise ValueError("索引にまとめて書き込む件数は1以上である必要があります")
+        self.policy = policy
+        self._bloom = BloomFilter(capacity, error_rate)
+        self._spill_batch = spill_batch
+        # ディスク上の索引に書き込んでいない商品(キー → [位置, 内容のハッシュ, NDJSONの行])
+        self._pending: dict[bytes, list[int | bytes]] = {}
+        self._sequence = 0
+        self.stats = DedupStats(bloom_bytes=self._bloom.nbytes, cache_bytes=_SPILL_CACHE_KIB * 1024)
+        # 空のパスを指定すると、SQLiteは閉じたときに削除される一時ファイルを使う
+        self._db = sqlite3.connect(spill_path or "", isolation_level=None)
+        try:
+            self._prepare_spill()
+        except BaseException:
+            self._db.close()
+            raise
+
+    def _prepare_spill(self) -> None:
+        """
+        ディスク上の索引を作成します。
+
+        以前の索引のファイルは作り直しますが、それ以外の既存のデータベースは変更しません。
+
+        Raises:
+            ValueError: ファイルがSQLiteのデータベースでない、または索引のファイルではない
+                既存のデータベースの場合
+        """
+        db = self._db
+        try:
+            (application_id,) = db.execute("PRAGMA application_id").fetchone()
+            (tables,) = db.execute("SELECT count(*) FROM sqlite_master").fetchone()
+        except sqlite3.DatabaseError as e:
+            raise ValueError(f"索引のファイルを開けません: {e}") from e
+        if tables and application_id != _SPILL_APPLICATION_ID:
+            raise ValueError(
+                "索引のファイルに、重複除去の索引ではない既存のデータベースは使えません"
+            )
+        db.execute(f"PRAGMA application_id = {_SPILL_APPLICATION_ID}")
+        # 索引は処理中にだけ使う一時的なデータのため、耐久性より書き込みの速さを優先する
+        db.execute("PRAGMA journal_mode = OFF")
+        db.execute("PRAGMA synchronous = OFF")
+        db.execute(f"PRAGMA cache_size = -{_SPILL_CACHE_KIB}")
+        db.execute("DROP TABLE IF EXISTS items")
+        db.execute(
+            "CREATE TABLE items (seq INTEGER PRIMARY KEY, key BLOB NOT NULL UNIQUE,"
+            " digest INTEGER NOT NULL, line BLOB)"
+        )
+
+    def __enter__(self) -> ItemDeduplicator:
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """ディスク上の索引を閉じます。一時ファイルの場合は削除されます。"""
+        self._db.close()
+
+    def _lookup(self, key: bytes) -> int | None:
+        """出現済みのidの内容のハッシュを返します。出現していない場合はNoneを返します。"""
+        pending = self._pending.get(key)
+        if pending is not None:
+            return int(pending[1])
+        row = self._db.execute("SELECT digest FROM items WHERE key = ?", (key,)).fetchone()
+        return None if row is None else int(row[0])
+
+    @metrics.timed("item_dedup.spill")
+    def _spill(self) -> None:
+        """書き込んでいない商品を、ディスク上の索引にまとめて書き込みます。"""
+        if not self._pending:
+            return
+        rows = ((key, *values) for key, values in self._pending.items())
+        with self._db:
+            self._db.execute("BEGIN")
+            self._db.executemany(
+                "INSERT INTO items (key, seq, digest, line) VALUES (?, ?, ?, ?)"
+                " ON CONFLICT (key) DO UPDATE SET digest = excluded.digest, line = excluded.line",
+                rows,
+            )
+        self._pending.clear()
+
+    def add(self, item_id: int, line: bytes) -> bool:
+        """
+        1件の商品を処理します。
+
+        Args:
+            item_id: 商品のid
+            line: 商品の内容(NDJSONの1行)
+
+        Returns:
+            policy が "first" または "error" で、商品をそのまま出力する場合はTrue
+            ("last" の場合は常にFalse。出力は finish() で行う)
+
+        Raises:
+            ConflictingItemError: policy="error" で、内容の異なる重複が見つかった場合
+        """
+        stats = self.stats
+        stats.read += 1
+        key = _item_key(item_id)
+        digest = _content_digest(line)
+        previous = None
+        if self._bloom.add(key):
+            stats.lookups += 1
+            previous = self._lookup(key)
+            if previous is None:
+                stats.false_positives += 1
+        keep_line = self.policy == "last"
+        if previous is not None:
+            stats.duplicates += 1
+            if previous != digest:
+                stats.conflicts += 1
+                if self.policy == "error":
+                    raise ConflictingItemError(item_id)
+            if not keep_line:
+                return False
+            pending = self._pending.get(key)
+            if pending is not None:
+                pending[1:] = [digest, line]
+                return False
+        self._pending[key] = [self._sequence, digest, line if keep_line else b""]
+        self._sequence += 1
+        if len(self._pending) >= self._spill_batch:
+            self._spill()
+        return not keep_line
+
+    def finish(self) -> Iterator[bytes]:
+        """
+        処理を終え、集計結果を確定します。
+
+        Yields:
+            policy="last" の場合に、重複を除いた商品の行(最初に出現した順)
+        """
+        self._spill()
+        stats = self.stats
+        stats.expected_false_positive_rate = self._bloom.expected_error_rate
+        page_count = self._db.execute("PRAGMA page_count").fetchone()[0]
+        page_size = self._db.execute("PRAGMA page_size").fetchone()[0]
+        stats.spill_bytes = int(page_count) * int(page_size)
+        metrics.increment("item_dedup.duplicates", stats.duplicates)
+        metrics.increment("item_dedup.false_positives", stats.false_positives)
+        if self.policy == "last":
+            for (line,) in self._db.execute("SELECT line FROM items ORDER BY seq"):
+                yield bytes(line)
+
+    def deduplicate(self, items: Iterable[Item]) -> Iterator[bytes]:
+        """
+        商品の重複を取り除き、残った商品をNDJSONの行として返します。
+
+        policy が "first" または "error" の場合は入力と同時に、"last" の場合は
+        入力の末尾まで読み込んでから返します。
+
+        Raises:
+            ConflictingItemError: policy="error" で、内容の異なる重複が見つかった場合
+        """
+        add = self.add
+        for item in items:
+            line = item_to_json(item) + b"\n"
+            if add(item.id, line):
+                yield line
+        yield from self.finish()
+
+
+def deduplicate_items(
+    source: BinaryIO,
+    sink: BinaryIO | None,
+    deduplicator: ItemDeduplicator,
+    input_format: str = "ndjson",
+    batch_size: int = DEFAULT_BATCH_SIZE,
+) -> ImportStats:
+    """
+    入力を1チャンクずつ検証し、idの重複を取り除いてNDJSONで書き出します。
+
+    Args:
+        source: 入力のバイナリストリーム
+        sink: 出力先のバイナリストリーム(Noneの場合は集計のみ行う)
+        deduplicator: 重複除去の状態(集計結果は deduplicator.stats に設定される)
+        input_format: 入力形式("ndjson" または "csv")
+        batch_size: 1回の検証で扱うレコード数
+
+    Returns:
+        読み込み件数、出力した件数、拒否件数、処理時間の集計結果
+
+    Raises:
+        ValueError: 未対応の形式、または不正なバッチサイズが指定された場合
+        ConflictingItemError: policy="error" で、内容の異なる重複が見つかった場合
+    """
+    if batch_size <= 0:
+        raise ValueError("バッチサイズは1以上である必要があります")
+    stats = ImportStats()
+    started = time.perf_counter()
+    batches = validate_batches(batched(read_records(source, input_format), batch_size), stats)
+    items = (item for batch in batches for item in batch)
+    for lines in batched(deduplicator.deduplicate(items), batch_size):
+        if sink is not None:
+            sink.write(b"".join(lines))
+    stats.imported = deduplicator.stats.unique
+    stats.elapsed = time.perf_counter() - started
+    return stats
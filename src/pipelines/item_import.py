@@ -0,0 +1,621 @@
+"""
+商品データのインポートパイプライン。
+
+NDJSONまたはCSVの入力を、ジェネレータを連結したパイプライン
+(読み込み → バッチ化 → Itemとして検証 → 書き出し)で1バッチずつ処理します。
+入力全体をメモリに載せないため、入力サイズに関係なくメモリ使用量は一定です。
+
+ワーカー数に2以上を指定した場合は、バッチ(チャンク)ごとの解析・検証・書き出し用の
+整形を ProcessPoolExecutor で並列に実行します。結果は入力順に書き出されます。
+
+検証済みの商品は、バイナリ形式のファイル(domain.models.item_file)との間で
+相互に変換することもできます。
+"""
+
+from __future__ import annotations
+
+import csv
+import io
+import json
+import os
+import time
+import zlib
+from collections import Counter, deque
+from collections.abc import Iterable, Iterator
+from concurrent.futures import Future, ProcessPoolExecutor
+from dataclasses import dataclass, field
+from itertools import islice
+from os import PathLike
+from typing import Any, BinaryIO, cast
+
+from core.services.item_service import create_items
+from domain.models.item import Item
+from domain.models.item_file import ITEM_FILE_SUFFIX, ItemFile, write_item_file
+from domain.models.item_json import items_to_ndjson
+from domain.models.item_store import ItemStore
+from shared import metrics
+from shared.logging import get_logger
+
+from .item_checkpoint import (
+    DEFAULT_CHECKPOINT_INTERVAL,
+    ImportCheckpoint,
+    SkipIndex,
+    read_checkpoint,
+    sync,
+    write_checkpoint,
+)
+
+logger = get_logger(__name__)
+
+SUPPORTED_FORMATS = ("ndjson", "csv")
+# バイナリ形式(ストリームではなくファイルのパスで扱う)
+BINARY_FORMAT = "binary"
+DEFAULT_BATCH_SIZE = 10_000
+
+
+@dataclass(slots=True)
+class InvalidRecord:
+    """読み込み段階で解析できなかったレコード。"""
+
+    message: str
+
+
+@dataclass(slots=True)
+class ChunkErrors:
+    """1チャンク(バッチ)分の拒否理由の集計。"""
+
+    index: int
+    # チャンク先頭のレコードの行番号(0始まり)
+    start: int
+    rejected: int
+    # "フィールド: メッセージ" 形式の拒否理由ごとの件数
+    reasons: dict[str, int]
+
+
+@dataclass(slots=True)
+class ImportStats:
+    """インポート処理の集計結果。"""
+
+    read: int = 0
+    imported: int = 0
+    rejected: int = 0
+    # 取り込み済みの索引(SkipIndex)にあったため読み飛ばした件数
+    skipped: int = 0
+    elapsed: float = 0.0
+    # 拒否された行を含むチャンクごとの集計
+    chunk_errors: list[ChunkErrors] = field(default_factory=list)
+
+    @property
+    def items_per_second(self) -> float:
+        """読み込んだレコードに対するスループット。"""
+        return self.read / self.elapsed if self.elapsed > 0 else 0.0
+
+
+def detect_format(path: str) -> str:
+    """
+    ファイル名の拡張子から入力形式を推定します。
+
+    Args:
+        path: 入力ファイルのパス(`-` は標準入力)
+
+    Returns:
+        "csv"、"binary"(拡張子 .items)、または "ndjson"
+    """
+    lowered = path.lower()
+    if lowered.endswith(".csv"):
+        return "csv"
+    if lowered.endswith(ITEM_FILE_SUFFIX):
+        return BINARY_FORMAT
+    return "ndjson"
+
+
+def read_ndjson(stream: BinaryIO) -> Iterator[dict[str, Any] | InvalidRecord]:
+    """NDJSONを1行ずつ読み込み、レコードを順に返します。空行は読み飛ばします。"""
+    for line in stream:
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError:
+            yield InvalidRecord("Invalid JSON")
+            continue
+        yield record if isinstance(record, dict) else InvalidRecord("Record must be an object")
+
+
+def read_csv(stream: BinaryIO) -> Iterator[dict[str, Any] | InvalidRecord]:
+    """ヘッダ付きCSVを1行ずつ読み込みます。空のdescriptionはNoneとして扱います。"""
+    text = io.TextIOWrapper(stream, encoding="utf-8", newline="")
+    try:
+        for row in csv.DictReader(text):
+            if not row.get("description"):
+                row["description"] = None
+            yield row
+    finally:
+        text.detach()
+
+
+def read_records(stream: BinaryIO, input_format: str) -> Iterator[dict[str, Any] | InvalidRecord]:
+    """
+    指定された形式でレコードを読み込みます。
+
+    Raises:
+        ValueError: 未対応の形式が指定された場合
+    """
+    if input_format == "ndjson":
+        return read_ndjson(stream)
+    if input_format == "csv":
+        return read_csv(stream)
+    raise ValueError(f"未対応の入力形式です: {input_format}")
+
+
+def batched(records: Iterable[Any], size: int) -> Iterator[list[Any]]:
+    """レコードを最大size件ずつのリストにまとめます。"""
+    iterator = iter(records)
+    while batch := list(islice(iterator, size)):
+        yield batch
+
+
+@metrics.timed("item_import.validate_batch")
+def _validate_batch(
+    batch: list[dict[str, Any] | InvalidRecord],
+) -> tuple[list[Item], list[tuple[int, str]]]:
+    """
+    1バッチを create_items で検証します。
+
+    Returns:
+        有効な商品(入力順)と、(バッチ内の行番号, 拒否理由) のリスト(行番号順)
+    """
+    positions = [i for i, record in enumerate(batch) if type(record) is dict]
+    records = cast(list[dict[str, Any]], batch)
+    invalid: list[tuple[int, str]] = []
+    if len(positions) != len(batch):
+        invalid = [
+            (i, record.message) for i, record in enumerate(batch) if type(record) is InvalidRecord
+        ]
+        records = [records[i] for i in positions]
+    result = create_items(records)
+    rejections = [(positions[r.row], f"{r.field}: {r.message}") for r in result.rejections]
+    if invalid:
+        rejections = sorted(invalid + rejections, key=lambda r: r[0])
+    return result.items, rejections
+
+
+def _record_chunk(
+    stats: ImportStats, index: int, read: int, imported: int, rejections: list[tuple[int, str]]
+) -> None:
+    """1チャンク分の結果を stats に集計し、拒否された行をDEBUGログへ出力します。"""
+    start = stats.read
+    stats.read += read
+    stats.imported += imported
+    metrics.increment("item_import.read", read)
+    metrics.increment("item_import.imported", imported)
+    if not rejections:
+        return
+    rejected = len({row for row, _ in rejections})
+    stats.rejected += rejected
+    metrics.increment("item_import.rejected", rejected)
+    for row, reason in rejections:
+        logger.debug("行 %d を拒否しました: %s", start + row, reason)
+    reasons = Counter(reason for _, reason in rejections)
+    stats.chunk_errors.append(ChunkErrors(index, start, rejected, dict(reasons)))
+
+
+def validate_batches(
+    batches: Iterable[list[dict[str, Any] | InvalidRecord]], stats: ImportStats
+) -> Iterator[list[Item]]:
+    """
+    バッチごとに create_items で検証し、有効な商品のリストを返します。
+
+    拒否された行は件数と理由をチャンク(バッチ)ごとに stats に集計し、
+    行番号(0始まり)とともにDEBUGログへ出力します。
+    """
+    for index, batch in enumerate(batches):
+        items, rejections = _validate_batch(batch)
+        _record_chunk(stats, index, len(batch), len(items), rejections)
+        yield items
+
+
+@metrics.timed("item_import.serialize")
+def _to_ndjson(items: list[Item]) -> bytes:
+    return items_to_ndjson(items)
+
+
+def write_ndjson(batches: Iterable[list[Item]], sink: BinaryIO | None) -> Iterator[list[Item]]:
+    """商品をNDJSONとして書き出し、バッチをそのまま次の段へ渡します。"""
+    for items in batches:
+        if sink is not None and items:
+            sink.write(_to_ndjson(items))
+        yield items
+
+
+@dataclass(slots=True)
+class _ChunkResult:
+    """ワーカープロセスから返される1チャンク分の結果。"""
+
+    read: int
+    imported: int
+    rejections: list[tuple[int, str]]
+    output: bytes | None
+    # ワーカープロセスで記録した計測値(shared.metrics のスナップショット)
+    metrics: dict[str, Any] | None = None
+
+
+def _init_worker() -> None:
+    """
+    ワーカープロセスを初期化します。
+
+    fork で起動したワーカーは親プロセスの計測値を引き継ぐため、消去してから処理を始めます
+    (消去しないと、親プロセスの記録が最初のスナップショットで送り返され、二重に統合される)。
+    """
+    metrics.get_registry().reset()
+
+
+def _process_chunk(
+    payload: bytes | list[dict[str, Any]], serialize: bool, collect_metrics: bool = False
+) -> _ChunkResult:
+    """
+    ワーカープロセスで1チャンクを解析・検証し、必要に応じてNDJSONに整形します。
+
+    Args:
+        payload: NDJSONの行を連結したバイト列、または読み込み済みのレコード
+        serialize: 有効な商品をNDJSONに整形して返すかどうか
+        collect_metrics: 処理時間を計測し、結果に含めて返すかどうか
+    """
+    if collect_metrics:
+        metrics.enable()
+    batch: list[dict[str, Any] | InvalidRecord]
+    if isinstance(payload, bytes):
+        batch = list(read_ndjson(io.BytesIO(payload)))
+    else:
+        batch = list(payload)
+    items, rejections = _validate_batch(batch)
+    output = _to_ndjson(items) if serialize and items else None
+    result = _ChunkResult(len(batch), len(items), rejections, output)
+    if collect_metrics:
+        # ワーカーの記録は親プロセスで統合するため、送った分は消去しておく
+        registry = metrics.get_registry()
+        result.metrics = registry.snapshot()
+        registry.reset()
+    return result
+
+
+def resolve_workers(workers: int) -> int:
+    """
+    ワーカー数の設定値を実際のプロセス数に変換します。
+
+    Args:
+        workers: ワーカー数(0の場合はCPUコア数)
+
+    Returns:
+        1以上のワーカー数
+
+    Raises:
+        ValueError: 負の値が指定された場合
+    """
+    if workers < 0:
+        raise ValueError("ワーカー数は0以上である必要があります")
+    return workers or os.cpu_count() or 1
+
+
+def _chunk_payloads(
+    source: BinaryIO, input_format: str, batch_size: int
+) -> Iterator[bytes | list[dict[str, Any]]]:
+    """入力をワーカーへ渡すチャンクに分割します。NDJSONは解析せずに行単位で分割します。"""
+    if input_format == "ndjson":
+        for lines in batched(source, batch_size):
+            yield b"".join(lines)
+    else:
+        yield from cast(Iterator[list[dict[str, Any]]], batched(read_csv(source), batch_size))
+
+
+def _run_parallel(
+    source: BinaryIO,
+    sink: BinaryIO | None,
+    input_format: str,
+    batch_size: int,
+    workers: int,
+    stats: ImportStats,
+) -> None:
+    """チャンクを ProcessPoolExecutor で並列に処理し、入力順に集計・書き出します。"""
+
+    def collect(index: int, future: Future[_ChunkResult]) -> None:
+        result = future.result()
+        if result.metrics is not None:
+            metrics.get_registry().merge(result.metrics)
+        _record_chunk(stats, index, result.read, result.imported, result.rejections)
+        if sink is not None and result.output:
+            sink.write(result.output)
+
+    # メモリ使用量を一定に保つため、処理中のチャンクはワーカー数の2倍までに抑える
+    max_pending = workers * 2
+    collect_metrics = metrics.is_enabled()
+    pending: deque[tuple[int, Future[_ChunkResult]]] = deque()
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool:
+        for index, payload in enumerate(_chunk_payloads(source, input_format, batch_size)):
+            future = pool.submit(_process_chunk, payload, sink is not None, collect_metrics)
+            pending.append((index, future))
+            if len(pending) >= max_pending:
+                collect(*pending.popleft())
+        while pending:
+            collect(*pending.popleft())
+
+
+@metrics.timed("item_import.run_import")
+def run_import(
+    source: BinaryIO,
+    sink: BinaryIO | None,
+    input_format: str = "ndjson",
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    workers: int = 1,
+) -> ImportStats:
+    """
+    入力を読み込み、検証し、有効な商品をNDJSONで書き出します。
+
+    workers が2以上の場合は、バッチ単位のチャンクを複数のプロセスで並列に検証します。
+    検証の規則・出力の順序・集計結果は、1プロセスで処理した場合と同じです。
+
+    Args:
+        source: 入力のバイナリストリーム
+        sink: 出力先のバイナリストリーム(Noneの場合は検証のみ行う)
+        input_format: 入力形式("ndjson" または "csv")
+        batch_size: 1回の検証で扱うレコード数(並列処理ではチャンクの大きさ)
+        workers: 検証に使うプロセス数(0の場合はCPUコア数)
+
+    Returns:
+        読み込み件数、インポート件数、拒否件数、処理時間、チャンクごとの拒否理由の集計結果
+
+    Raises:
+        ValueError: 未対応の形式、または不正なバッチサイズやワーカー数が指定された場合
+    """
+    if batch_size <= 0:
+        raise ValueError("バッチサイズは1以上である必要があります")
+    if input_format not in SUPPORTED_FORMATS:
+        raise ValueError(f"未対応の入力形式です: {input_format}")
+    workers = resolve_workers(workers)
+    stats = ImportStats()
+    started = time.perf_counter()
+    if workers > 1:
+        _run_parallel(source, sink, input_format, batch_size, workers, stats)
+    else:
+        records = read_records(source, input_format)
+        pipeline = write_ndjson(validate_batches(batched(records, batch_size), stats), sink)
+        for _ in pipeline:
+            pass
+    stats.elapsed = time.perf_counter() - started
+    return stats
+
+
+def _completed_chunk(payload: bytes, future: Future[_ChunkResult]) -> tuple[bytes, _ChunkResult]:
+    result = future.result()
+    if result.metrics is not None:
+        metrics.get_registry().merge(result.metrics)
+    return payload, result
+
+
+def _process_payloads(
+    payloads: Iterable[bytes], serialize: bool, workers: int
+) -> Iterator[tuple[bytes, _ChunkResult]]:
+    """NDJSONのチャンクを処理し、(チャンク, 結果) を入力順に返します。"""
+    if workers == 1:
+        for payload in payloads:
+            yield payload, _process_chunk(payload, serialize)
+        return
+    collect_metrics = metrics.is_enabled()
+    # メモリ使用量を一定に保つため、処理中のチャンクはワーカー数の2倍までに抑える
+    max_pending = workers * 2
+    pending: deque[tuple[bytes, Future[_ChunkResult]]] = deque()
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool:
+        for payload in payloads:
+            pending.append(
+                (payload, pool.submit(_process_chunk, payload, serialize, collect_metrics))
+            )
+            if len(pending) >= max_pending:
+                yield _completed_chunk(*pending.popleft())
+        while pending:
+            yield _completed_chunk(*pending.popleft())
+
+
+def _restore_checkpoint(
+    checkpoint: ImportCheckpoint,
+    source: BinaryIO,
+    sink: BinaryIO | None,
+    skip_index: SkipIndex | None,
+) -> None:
+    """入力・出力・索引を、チェックポイントの時点の位置と大きさに戻します。"""
+    # 最後に処理したチャンクだけを読み直し、入力が変わっていないことを確認する
+    source.seek(checkpoint.tail_offset)
+    tail = source.read(checkpoint.offset - checkpoint.tail_offset)
+    if len(tail) != checkpoint.offset - checkpoint.tail_offset or (
+        zlib.crc32(tail) != checkpoint.tail_crc
+    ):
+        raise ValueError("入力がチェックポイントの時点の内容と一致しません")
+    if sink is not None:
+        # チェックポイントより後に書き出した分は、再開後にもう一度書き出す
+        if sink.seek(0, os.SEEK_END) < checkpoint.output_size:
+            raise ValueError("出力ファイルがチェックポイントの時点より短くなっています")
+        sink.truncate(checkpoint.output_size)
+        sink.seek(checkpoint.output_size)
+    if skip_index is not None:
+        skip_index.truncate(checkpoint.index_size)
+
+
+def _save_checkpoint(
+    path: str | PathLike[str],
+    checkpoint: ImportCheckpoint,
+    stats: ImportStats,
+    sink: BinaryIO | None,
+    skip_index: SkipIndex | None,
+) -> None:
+    """出力と索引をディスクへ書き出してから、その大きさを記録したチェックポイントを書き込みます。"""
+    if sink is not None:
+        sync(sink)
+        checkpoint.output_size = sink.tell()
+    if skip_index is not None:
+        checkpoint.index_size = skip_index.flush()
+    checkpoint.read = stats.read
+    checkpoint.imported = stats.imported
+    checkpoint.rejected = stats.rejected
+    checkpoint.skipped = stats.skipped
+    write_checkpoint(path, checkpoint)
+
+
+@metrics.timed("item_import.run_resumable_import")
+def run_resumable_import(
+    source: BinaryIO,
+    sink: BinaryIO | None,
+    checkpoint_path: str | PathLike[str] | None = None,
+    *,
+    resume: bool = False,
+    skip_index: SkipIndex | None = None,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    workers: int = 1,
+    interval: float = DEFAULT_CHECKPOINT_INTERVAL,
+) -> ImportStats:
+    """
+    NDJSONを読み込み、チェックポイントを書き込みながらインポートします。
+
+    チャンクを処理するたびに、前回の書き込みから interval 秒以上経過していれば
+    チェックポイントを書き込みます。resume=True でチェックポイントが存在する場合は、
+    入力をチェックポイントのバイト位置へシークし、出力と索引をチェックポイントの
+    時点の大きさに切り詰めてから続きを処理します。
+
+    skip_index を指定した場合は、索引にある商品(検証後のNDJSONの1行が同じもの)を
+    読み飛ばし、新しい商品だけを書き出して索引に追加します。
+
+    Args:
+        source: 入力のバイナリストリーム(再開する場合はシーク可能であること)
+        sink: 出力先のバイナリストリーム(チェックポイントを書き込む場合はシーク可能であること。
+            Noneの場合は検証のみ行う)
+        checkpoint_path: チェックポイントのファイルのパス。Noneの場合は書き込まない
+        resume: チェックポイントが存在する場合に、その続きから処理するかどうか
+        skip_index: 取り込み済みの商品の索引
+        batch_size: 1回の検証で扱うレコード数
+        workers: 検証に使うプロセス数(0の場合はCPUコア数)
+        interval: チェックポイントを書き込む最短の間隔(秒)
+
+    Returns:
+        チェックポイントから引き継いだ分を含む、入力全体の集計結果
+        (処理時間とチャンクごとの拒否理由は、この呼び出しで処理した分のみ)
+
+    Raises:
+        ValueError: 不正な引数、チェックポイントの形式が不正、または入力や出力が
+            チェックポイントの時点と一致しない場合
+    """
+    if batch_size <= 0:
+        raise ValueError("バッチサイズは1以上である必要があります")
+    if interval < 0:
+        raise ValueError("チェックポイントの間隔は0以上である必要があります")
+    workers = resolve_workers(workers)
+    checkpoint = ImportCheckpoint(source=str(getattr(source, "name", "")))
+    if resume and checkpoint_path is not None and os.path.exists(checkpoint_path):
+        checkpoint = read_checkpoint(checkpoint_path)
+        _restore_checkpoint(checkpoint, source, sink, skip_index)
+    stats = ImportStats(
+        read=checkpoint.read,
+        imported=checkpoint.imported,
+        rejected=checkpoint.rejected,
+        skipped=checkpoint.skipped,
+    )
+    if checkpoint.completed:
+        return stats
+
+    started = time.perf_counter()
+    saved = time.monotonic()
+    serialize = sink is not None or skip_index is not None
+    payloads = cast(Iterator[bytes], _chunk_payloads(source, "ndjson", batch_size))
+    for index, (payload, result) in enumerate(_process_payloads(payloads, serialize, workers)):
+        output, imported = result.output, result.imported
+        if skip_index is not None and output:
+            lines = skip_index.filter_new(output.splitlines(keepends=True))
+            stats.skipped += imported - len(lines)
+            output, imported = b"".join(lines), len(lines)
+        if sink is not None and output:
+            sink.write(output)
+        _record_chunk(stats, index, result.read, imported, result.rejections)
+        checkpoint.tail_offset = checkpoint.offset
+        checkpoint.tail_crc = zlib.crc32(payload)
+        checkpoint.content_crc = zlib.crc32(payload, checkpoint.content_crc)
+        checkpoint.offset += len(payload)
+        if checkpoint_path is not None and time.monotonic() - saved >= interval:
+            _save_checkpoint(checkpoint_path, checkpoint, stats, sink, skip_index)
+            saved = time.monotonic()
+
+    checkpoint.completed = True
+    if checkpoint_path is not None:
+        _save_checkpoint(checkpoint_path, checkpoint, stats, sink, skip_index)
+    elif skip_index is not None:
+        skip_index.flush()
+    stats.elapsed = time.perf_counter() - started
+    return stats
+
+
+def export_item_file(
+    source: BinaryIO,
+    path: str,
+    input_format: str = "ndjson",
+    batch_size: int = DEFAULT_BATCH_SIZE,
+) -> ImportStats:
+    """
+    入力を読み込み、検証し、有効な商品をバイナリ形式のファイルに書き出します。
+
+    有効な商品は列指向の ItemStore に蓄積してから、まとめて書き出します。
+
+    Args:
+        source: 入力のバイナリストリーム
+        path: 書き出すバイナリ形式のファイルのパス
+        input_format: 入力形式("ndjson" または "csv")
+        batch_size: 1回の検証で扱うレコード数
+
+    Returns:
+        読み込み件数、書き出した件数、拒否件数、処理時間の集計結果
+
+    Raises:
+        ValueError: 未対応の形式、または不正なバッチサイズが指定された場合
+    """
+    if batch_size <= 0:
+        raise ValueError("バッチサイズは1以上である必要があります")
+    stats = ImportStats()
+    started = time.perf_counter()
+    store = ItemStore()
+    for items in validate_batches(batched(read_records(source, input_format), batch_size), stats):
+        store.extend(items)
+    write_item_file(path, store)
+    stats.elapsed = time.perf_counter() - started
+    return stats
+
+
+def import_item_file(
+    path: str,
+    sink: BinaryIO | None,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    trusted: bool = False,
+) -> ImportStats:
+    """
+    バイナリ形式のファイルを読み込み、商品をNDJSONで書き出します。
+
+    商品は読み込み時にも検証し、不正な商品があれば読み込みを中止します。
+    CRC32はファイルが壊れていないことを確認するだけで、このシステムが書き出したことは
+    保証しません。自分で書き出したファイルに限り、trusted=True で検証を省略できます。
+
+    Args:
+        path: 読み込むバイナリ形式のファイルのパス
+        sink: 出力先のバイナリストリーム(Noneの場合は読み込みのみ行う)
+        batch_size: 1回に書き出す商品数
+        trusted: Trueの場合は商品を検証せずに組み立てる
+
+    Returns:
+        読み込み件数、インポート件数、処理時間の集計結果
+
+    Raises:
+        ValueError: ファイルがバイナリ形式でない、破損している、または不正な商品を含む場合
+    """
+    if batch_size <= 0:
+        raise ValueError("バッチサイズは1以上である必要があります")
+    stats = ImportStats()
+    started = time.perf_counter()
+    with ItemFile(path, trusted=trusted) as item_file:
+        for items in write_ndjson(batched(item_file, batch_size), sink):
+            stats.read += len(items)
+            stats.imported += len(items)
+    stats.elapsed = time.perf_counter() - started
+    return stats
@@ -0,0 +1,389 @@
+"""
+商品をidのハッシュでN個のファイル(シャード)に分割して書き出すパイプライン。
+
+シャードの番号は shard_of() で決めます。idの10進表記のblake2b(8バイト、リトルエンディアン)を
+シャード数で割った余りのため、実行環境やPythonのハッシュのランダム化に関係なく、
+同じidは常に同じシャードに書き出されます。
+
+ShardedWriter はシャードごとに大きなバッファを持つファイルと書き込み用のスレッドを用意し、
+書き込みとチェックサムの計算をシャードごとに並行して行います。各スレッドへのキューは
+有限の長さのため、1つのディスクが一時的に遅くなっても、キューが埋まるまでは
+他のシャードへの書き込みは止まりません。
+
+書き出したディレクトリにはマニフェスト(manifest.json)を書き込み、シャードごとの
+件数・大きさ・SHA-256を記録します。
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import queue
+import threading
+import time
+from collections.abc import Iterable
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass, field
+from hashlib import blake2b
+from os import PathLike
+from types import TracebackType
+from typing import BinaryIO
+
+from domain.models.item import Item
+from domain.models.item_file import ITEM_FILE_SUFFIX, write_item_file
+from domain.models.item_json import items_to_ndjson
+from domain.models.item_store import ItemStore
+from shared import metrics
+from utils.files import write_atomic
+
+from .item_import import DEFAULT_BATCH_SIZE, ImportStats, batched, read_records, validate_batches
+
+MANIFEST_NAME = "manifest.json"
+MANIFEST_VERSION = 1
+NDJSON_SUFFIX = ".ndjson"
+# シャードごとのファイルの書き込みバッファの既定の大きさ(バイト)
+DEFAULT_SHARD_BUFFER = 1 << 20
+# シャードごとに、書き込みを待つことのできるチャンクの数
+DEFAULT_QUEUE_CHUNKS = 16
+# ファイルのチェックサムを計算するときに1回に読み込む大きさ(バイト)
+_READ_CHUNK = 1 << 20
+# 正規化されたNDJSONの各行の先頭(Item.model_dump_json() はidを最初に出力する)
+_ID_PREFIX = b'{"id":'
+
+
+def shard_of(item_id: int, shards: int) -> int:
+    """
+    idを書き出すシャードの番号(0始まり)を返します。
+
+    Examples:
+        >>> [shard_of(item_id, 4) for item_id in range(6)]
+        [0, 2, 3, 2, 1, 3]
+    """
+    digest = blake2b(b"%d" % item_id, digest_size=8).digest()
+    return int.from_bytes(digest, "little") % shards
+
+
+def shard_name(index: int, suffix: str) -> str:
+    """シャードのファイル名を返します(例: part-00003.ndjson)。"""
+    return f"part-{index:05d}{suffix}"
+
+
+@dataclass(slots=True)
+class ShardInfo:
+    """1シャード分のマニフェストの項目。"""
+
+    index: int
+    # マニフェストのあるディレクトリからの相対パス
+    path: str
+    items: int = 0
+    size: int = 0
+    sha256: str = ""
+
+
+@dataclass(slots=True)
+class ShardManifest:
+    """シャードに分割して書き出したファイルの一覧。"""
+
+    # シャードのファイルの形式("ndjson" または "binary")
+    format: str
+    shards: list[ShardInfo] = field(default_factory=list)
+
+    @property
+    def items(self) -> int:
+        """全シャードの件数の合計。"""
+        return sum(shard.items for shard in self.shards)
+
+    def to_json(self) -> str:
+        """JSON文字列に変換します。"""
+        data = {"version": MANIFEST_VERSION, "format": self.format, "shard_count": len(self.shards)}
+        data["shards"] = [asdict(shard) for shard in self.shards]
+        return json.dumps(data, ensure_ascii=False, indent=2)
+
+    @classmethod
+    def from_json(cls, text: str) -> ShardManifest:
+        """
+        to_json() の結果からマニフェストを復元します。
+
+        Raises:
+            ValueError: 形式が不正、または未対応のバージョンの場合
+        """
+        try:
+            data = json.loads(text)
+            if data["version"] != MANIFEST_VERSION:
+                raise ValueError("未対応のマニフェストです")
+            return cls(data["format"], [ShardInfo(**shard) for shard in data["shards"]])
+        except (KeyError, TypeError) as e:
+            raise ValueError("マニフェストの形式が不正です") from e
+
+
+def write_manifest(directory: str | PathLike[str], manifest: ShardManifest) -> str:
+    """
+    マニフェストをディレクトリに不可分に書き込みます。
+
+    Returns:
+        書き込んだマニフェストのパス
+    """
+    path = os.path.join(directory, MANIFEST_NAME)
+    write_atomic(path, (manifest.to_json() + "\n").encode("utf-8"))
+    return path
+
+
+def read_manifest(directory: str | PathLike[str]) -> ShardManifest:
+    """
+    ディレクトリのマニフェストを読み込みます。
+
+    Raises:
+        OSError: ファイルを読み込めない場合
+        ValueError: 形式が不正、または未対応のバージョンの場合
+    """
+    with open(os.path.join(directory, MANIFEST_NAME), encoding="utf-8") as file:
+        return ShardManifest.from_json(file.read())
+
+
+def _file_digest(path: str) -> tuple[int, str]:
+    """ファイルの大きさとSHA-256を返します。"""
+    digest = hashlib.sha256()
+    size = 0
+    with open(path, "rb") as file:
+        while chunk := file.read(_READ_CHUNK):
+            digest.update(chunk)
+            size += len(chunk)
+    return size, digest.hexdigest()
+
+
+def verify_shards(directory: str | PathLike[str]) -> list[int]:
+    """
+    シャードのファイルの大きさとSHA-256を、マニフェストの記録と照合します。
+
+    Returns:
+        一致しない、または存在しないシャードの番号のリスト(すべて一致する場合は空)
+    """
+    manifest = read_manifest(directory)
+    mismatched: list[int] = []
+    for shard in manifest.shards:
+        path = os.path.join(directory, shard.path)
+        if not os.path.exists(path) or _file_digest(path) != (shard.size, shard.sha256):
+            mismatched.append(shard.index)
+    return mismatched
+
+
+class _ShardThread(threading.Thread):
+    """1シャードのファイルへの書き込みとチェックサムの計算を行うスレッド。"""
+
+    def __init__(self, path: str, buffer_size: int, queue_chunks: int) -> None:
+        super().__init__(name=f"shard-writer-{os.path.basename(path)}", daemon=True)
+        self.file = open(path, "wb", buffering=buffer_size)
+        self.chunks: queue.Queue[bytes | None] = queue.Queue(maxsize=queue_chunks)
+        self.digest = hashlib.sha256()
+        self.size = 0
+        self.error: BaseException | None = None
+
+    def run(self) -> None:
+        try:
+            while (chunk := self.chunks.get()) is not None:
+                self.file.write(chunk)
+                self.digest.update(chunk)
+                self.size += len(chunk)
+        except BaseException as e:  # 呼び出し元のスレッドで送出し直す
+            self.error = e
+            # 書き込み側が put() で止まらないよう、残りのチャンクを読み捨てる
+            while self.chunks.get() is not None:
+                pass
+        finally:
+            self.file.close()
+
+
+class ShardedWriter:
+    """
+    正規化されたNDJSONの行を、idのハッシュでシャードのファイルに振り分けて書き出すクラス。
+
+    write() には Item.model_dump_json() で出力した行(各行が {"id": で始まる)を渡します。
+    バイナリストリームの代わりに run_import() の出力先として使えます。
+
+    Examples:
+        >>> import tempfile
+        >>> directory = tempfile.mkdtemp()
+        >>> with ShardedWriter(directory, 2) as writer:
+        ...     writer.write(b'{"id":1,"name":"A"}\\n{"id":2,"name":"B"}\\n')
+        40
+        >>> [shard.items for shard in writer.manifest.shards]
+        [1, 1]
+    """
+
+    def __init__(
+        self,
+        directory: str | PathLike[str],
+        shards: int,
+        buffer_size: int = DEFAULT_SHARD_BUFFER,
+        queue_chunks: int = DEFAULT_QUEUE_CHUNKS,
+    ) -> None:
+        """
+        ディレクトリを作成し、シャードのファイルと書き込み用のスレッドを用意します。
+
+        Args:
+            directory: 書き出すディレクトリ(存在しない場合は作成する)
+            shards: シャードの数
+            buffer_size: シャードごとのファイルの書き込みバッファの大きさ(バイト)
+            queue_chunks: シャードごとに、書き込みを待つことのできるチャンクの数
+
+        Raises:
+            ValueError: シャードの数、バッファの大きさ、またはチャンクの数が1未満の場合
+        """
+        if shards < 1:
+            raise ValueError("シャードの数は1以上である必要があります")
+        if buffer_size < 1 or queue_chunks < 1:
+            raise ValueError("バッファの大きさとチャンクの数は1以上である必要があります")
+        self.directory = os.fspath(directory)
+        os.makedirs(self.directory, exist_ok=True)
+        self.manifest = ShardManifest(
+            "ndjson", [ShardInfo(i, shard_name(i, NDJSON_SUFFIX)) for i in range(shards)]
+        )
+        self._threads: list[_ShardThread] = []
+        try:
+            for shard in self.manifest.shards:
+                path = os.path.join(self.directory, shard.path)
+                self._threads.append(_ShardThread(path, buffer_size, queue_chunks))
+        except OSError:
+            for thread in self._threads:
+                thread.file.close()
+            raise
+        for thread in self._threads:
+            thread.start()
+        self._closed = False
+
+    def __enter__(self) -> ShardedWriter:
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        self.close(complete=exc_type is None)
+
+    def _put(self, index: int, chunk: bytes) -> None:
+        thread = self._threads[index]
+        if thread.error is not None:
+            raise OSError(f"シャード {index} の書き込みに失敗しました") from thread.error
+        thread.chunks.put(chunk)
+
+    @metrics.timed("item_shard.write")
+    def write(self, data: bytes) -> int:
+        """
+        NDJSONの行を、idのシャードに振り分けて書き込みます。
+
+        Args:
+            data: 正規化されたNDJSON(1行以上。末尾は改行)
+
+        Returns:
+            受け付けたバイト数
+
+        Raises:
+            ValueError: 行が {"id": で始まらない場合
+            OSError: シャードへの書き込みに失敗した場合
+        """
+        count = len(self._threads)
+        parts: list[list[bytes]] = [[] for _ in range(count)]
+        for line in data.splitlines(keepends=True):
+            if not line.startswith(_ID_PREFIX):
+                raise ValueError("正規化されたNDJSONの行ではありません")
+            end = line.find(b",", len(_ID_PREFIX))
+            item_id = int(line[len(_ID_PREFIX) : end if end >= 0 else line.rfind(b"}")])
+            parts[shard_of(item_id, count)].append(line)
+        shards = self.manifest.shards
+        for index, lines in enumerate(parts):
+            if lines:
+                shards[index].items += len(lines)
+                self._put(index, b"".join(lines))
+        return len(data)
+
+    def write_items(self, items: Iterable[Item]) -> None:
+        """商品をNDJSONに変換して書き込みます。"""
+        self.write(items_to_ndjson(items))
+
+    def flush(self) -> None:
+        """何もしません(書き込みはスレッドが行うため)。バイナリストリームとの互換のためのメソッドです。"""
+
+    def close(self, complete: bool = True) -> ShardManifest:
+        """
+        スレッドの書き込みの完了を待ってファイルを閉じ、マニフェストを書き込みます。
+
+        Args:
+            complete: マニフェストを書き込むかどうか(処理が失敗した場合はFalse)
+
+        Returns:
+            シャードごとの件数・大きさ・SHA-256を設定したマニフェスト
+
+        Raises:
+            OSError: シャードへの書き込みに失敗した場合
+        """
+        if self._closed:
+            return self.manifest
+        self._closed = True
+        for thread in self._threads:
+            thread.chunks.put(None)
+        for thread in self._threads:
+            thread.join()
+        for shard, thread in zip(self.manifest.shards, self._threads, strict=True):
+            if thread.error is not None:
+                raise OSError(f"シャード {shard.index} の書き込みに失敗しました") from thread.error
+            shard.size = thread.size
+            shard.sha256 = thread.digest.hexdigest()
+        if complete:
+            write_manifest(self.directory, self.manifest)
+        return self.manifest
+
+
+def export_sharded_item_files(
+    source: BinaryIO,
+    directory: str | PathLike[str],
+    shards: int,
+    input_format: str = "ndjson",
+    batch_size: int = DEFAULT_BATCH_SIZE,
+) -> tuple[ImportStats, ShardManifest]:
+    """
+    入力を読み込んで検証し、有効な商品をidのシャードごとのバイナリ形式のファイルに書き出します。
+
+    有効な商品はシャードごとの ItemStore に蓄積し、最後にシャードごとのスレッドで
+    並行して書き出してから、マニフェストを書き込みます。
+
+    Args:
+        source: 入力のバイナリストリーム
+        directory: 書き出すディレクトリ(存在しない場合は作成する)
+        shards: シャードの数
+        input_format: 入力形式("ndjson" または "csv")
+        batch_size: 1回の検証で扱うレコード数
+
+    Returns:
+        集計結果と、シャードごとの件数・大きさ・SHA-256を設定したマニフェスト
+
+    Raises:
+        ValueError: 未対応の形式、不正なバッチサイズ、またはシャードの数が1未満の場合
+    """
+    if batch_size <= 0:
+        raise ValueError("バッチサイズは1以上である必要があります")
+    if shards < 1:
+        raise ValueError("シャードの数は1以上である必要があります")
+    stats = ImportStats()
+    started = time.perf_counter()
+    stores = [ItemStore() for _ in range(shards)]
+    for items in validate_batches(batched(read_records(source, input_format), batch_size), stats):
+        for item in items:
+            stores[shard_of(item.id, shards)].append(item)
+
+    os.makedirs(directory, exist_ok=True)
+
+    def write_shard(index: int) -> ShardInfo:
+        name = shard_name(index, ITEM_FILE_SUFFIX)
+        path = os.path.join(directory, name)
+        count = write_item_file(path, stores[index])
+        size, sha256 = _file_digest(path)
+        return ShardInfo(index, name, count, size, sha256)
+
+    with ThreadPoolExecutor(max_workers=min(shards, os.cpu_count() or 1, 8)) as pool:
+        manifest = ShardManifest("binary", list(pool.map(write_shard, range(shards))))
+    write_manifest(directory, manifest)
+    stats.elapsed = time.perf_counter() - started
+    return stats, manifest
@@ -0,0 +1,431 @@
+"""
+商品の価格の統計量を計算するパイプライン(任意依存: numpy)。
+
+入力を1チャンクずつ検証し、idとpriceを連続したNumPy配列に取り出して、
+件数・合計・最小・最大・平均・標準偏差、価格帯ごとのヒストグラム、idの範囲ごとの
+集計をベクトル演算で更新します。チャンクの結果は統合できる形で保持するため、
+入力の大きさに関係なくメモリ使用量は一定です。
+
+パーセンタイルは、対数目盛のバケット(1桁あたり BUCKETS_PER_DECADE 個)の件数から
+推定します(相対誤差は約0.6%以内)。exact=True の場合は価格をすべて保持し、
+正確な値を計算します。
+
+numpy は任意の依存パッケージです。`pip install -e ".[stats]"` でインストールします。
+"""
+
+from __future__ import annotations
+
+import math
+import time
+from collections.abc import Iterator, Sequence
+from dataclasses import dataclass
+from itertools import pairwise
+from operator import attrgetter
+from typing import TYPE_CHECKING, Any, BinaryIO
+
+from domain.models.item import Item
+from domain.models.item_file import ItemFile
+
+from .item_import import DEFAULT_BATCH_SIZE, ImportStats, batched, read_records, validate_batches
+
+if TYPE_CHECKING:
+    import numpy as np
+    from numpy.typing import NDArray
+
+    IdArray = NDArray[np.int64]
+    PriceArray = NDArray[np.float64]
+
+# 対数目盛のバケットの細かさ(1桁あたりのバケット数)と範囲(10の指数)
+BUCKETS_PER_DECADE = 200
+_MIN_EXPONENT = -4
+_MAX_EXPONENT = 12
+_BUCKET_COUNT = (_MAX_EXPONENT - _MIN_EXPONENT) * BUCKETS_PER_DECADE
+# ヒストグラムの既定の価格帯の境界(1桁ごと)
+DEFAULT_EDGES: tuple[float, ...] = (1.0, 10.0, 100.0, 1_000.0, 10_000.0, 100_000.0)
+DEFAULT_PERCENTILES: tuple[float, ...] = (50.0, 90.0, 95.0, 99.0)
+
+_get_id = attrgetter("id")
+_get_price = attrgetter("price")
+
+
+def _numpy() -> Any:
+    """numpyを読み込みます。インストールされていない場合は対処方法を含むImportErrorを送出します。"""
+    try:
+        import numpy
+    except ImportError as e:
+        raise ImportError(
+            '商品の統計量の計算には numpy が必要です: pip install -e ".[stats]"'
+        ) from e
+    return numpy
+
+
+def columns_from_items(items: Sequence[Item]) -> tuple[IdArray, PriceArray]:
+    """
+    商品のidとpriceを連続したNumPy配列に取り出します。
+
+    Args:
+        items: 商品
+
+    Returns:
+        (id の int64 配列, price の float64 配列)
+    """
+    np = _numpy()
+    count = len(items)
+    ids = np.fromiter(map(_get_id, items), dtype=np.int64, count=count)
+    prices = np.fromiter(map(_get_price, items), dtype=np.float64, count=count)
+    return ids, prices
+
+
+@dataclass(slots=True)
+class GroupStats:
+    """idの範囲ごとの集計結果。"""
+
+    # idの範囲 [id_from, id_to)
+    id_from: int
+    id_to: int
+    count: int
+    total: float
+    min: float
+    max: float
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.count
+
+
+class PriceStats:
+    """
+    チャンクごとに更新できる価格の統計量。
+
+    Examples:
+        >>> import numpy as np
+        >>> stats = PriceStats(group_width=10)
+        >>> stats.update(np.array([1, 2, 15]), np.array([10.0, 20.0, 30.0]))
+        >>> stats.count, stats.mean
+        (3, 20.0)
+        >>> [(g.id_from, g.count) for g in stats.groups()]
+        [(0, 2), (10, 1)]
+    """
+
+    def __init__(
+        self,
+        edges: Sequence[float] = DEFAULT_EDGES,
+        group_width: int | None = None,
+        exact: bool = False,
+    ) -> None:
+        """
+        空の統計量を作成します。
+
+        Args:
+            edges: ヒストグラムの価格帯の境界(昇順)。最初の境界未満と最後の境界以上も数える
+            group_width: idの範囲ごとに集計する場合の範囲の幅。Noneの場合は集計しない
+            exact: Trueの場合は価格をすべて保持し、正確なパーセンタイルを計算する
+
+        Raises:
+            ImportError: numpyがインストールされていない場合
+            ValueError: 境界が昇順でない、または範囲の幅が1未満の場合
+        """
+        np = _numpy()
+        self._np = np
+        self._edges = np.asarray(edges, dtype=np.float64)
+        if self._edges.ndim != 1 or np.any(np.diff(self._edges) <= 0):
+            raise ValueError("ヒストグラムの境界は昇順である必要があります")
+        if group_width is not None and group_width < 1:
+            raise ValueError("idの範囲の幅は1以上である必要があります")
+        self._group_width = group_width
+        self.count = 0
+        self.total = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+        # 平均からの偏差の二乗和(チャンクごとの値を並列アルゴリズムで統合する)
+        self._m2 = 0.0
+        self._histogram = np.zeros(len(self._edges) + 1, dtype=np.int64)
+        self._buckets = np.zeros(_BUCKET_COUNT, dtype=np.int64)
+        self._chunks: list[PriceArray] | None = [] if exact else None
+        # idの範囲ごとの集計(キーの昇順)
+        empty = np.empty(0)
+        self._group_keys = empty.astype(np.int64)
+        self._group_counts = empty.astype(np.int64)
+        self._group_totals = empty
+        self._group_mins = empty
+        self._group_maxs = empty
+
+    @property
+    def mean(self) -> float:
+        """平均値。件数が0の場合はNaN。"""
+        return self.total / self.count if self.count else math.nan
+
+    @property
+    def std(self) -> float:
+        """母標準偏差。件数が0の場合はNaN。"""
+        return math.sqrt(self._m2 / self.count) if self.count else math.nan
+
+    def update(self, ids: IdArray, prices: PriceArray) -> None:
+        """
+        1チャンク分のidとpriceで統計量を更新します。
+
+        Args:
+            ids: idの配列
+            prices: priceの配列(ids と同じ長さ)
+        """
+        np = self._np
+        count = len(prices)
+        if count == 0:
+            return
+        if len(ids) != count:
+            raise ValueError("idとpriceの配列は同じ長さである必要があります")
+        total = float(prices.sum())
+        mean = total / count
+        m2 = float(np.square(prices - mean).sum())
+        # 2つの集団の平均と偏差の二乗和を統合する(Chanらの並列アルゴリズム)
+        if self.count:
+            delta = mean - self.mean
+            merged = self.count + count
+            m2 += self._m2 + delta * delta * self.count * count / merged
+        self._m2 = m2
+        self.count += count
+        self.total += total
+        self.min = min(self.min, float(prices.min()))
+        self.max = max(self.max, float(prices.max()))
+
+        self._histogram += np.bincount(
+            np.searchsorted(self._edges, prices, side="right"), minlength=len(self._histogram)
+        )
+        self._buckets += np.bincount(_bucket_indices(prices), minlength=_BUCKET_COUNT)
+        if self._chunks is not None:
+            self._chunks.append(np.array(prices, dtype=np.float64))
+        if self._group_width is not None:
+            self._update_groups(ids, prices)
+
+    def _update_groups(self, ids: IdArray, prices: PriceArray) -> None:
+        np = self._np
+        keys = np.floor_divide(ids, self._group_width)
+        order = np.argsort(keys, kind="stable")
+        keys = keys[order]
+        prices = prices[order]
+        starts = _group_starts(keys)
+        self._merge_groups(
+            keys[starts],
+            np.diff(np.append(starts, len(keys))),
+            np.add.reduceat(prices, starts),
+            np.minimum.reduceat(prices, starts),
+            np.maximum.reduceat(prices, starts),
+        )
+
+    def _merge_groups(
+        self,
+        keys: IdArray,
+        counts: IdArray,
+        totals: PriceArray,
+        mins: PriceArray,
+        maxs: PriceArray,
+    ) -> None:
+        np = self._np
+        keys = np.concatenate([self._group_keys, keys])
+        order = np.argsort(keys, kind="stable")
+        keys = keys[order]
+        starts = _group_starts(keys)
+        self._group_keys = keys[starts]
+        self._group_counts = np.add.reduceat(
+            np.concatenate([self._group_counts, counts])[order], starts
+        )
+        self._group_totals = np.add.reduceat(
+            np.concatenate([self._group_totals, totals])[order], starts
+        )
+        self._group_mins = np.minimum.reduceat(
+            np.concatenate([self._group_mins, mins])[order], starts
+        )
+        self._group_maxs = np.maximum.reduceat(
+            np.concatenate([self._group_maxs, maxs])[order], starts
+        )
+
+    def percentiles(self, qs: Sequence[float] = DEFAULT_PERCENTILES) -> dict[float, float]:
+        """
+        パーセンタイルを計算します。
+
+        Args:
+            qs: 0以上100以下のパーセンタイル
+
+        Returns:
+            パーセンタイルから値への辞書(件数が0の場合はNaN)
+        """
+        np = self._np
+        if any(not 0 <= q <= 100 for q in qs):
+            raise ValueError("パーセンタイルは0以上100以下である必要があります")
+        if not self.count:
+            return {q: math.nan for q in qs}
+        if self._chunks is not None:
+            values = np.percentile(np.concatenate(self._chunks), list(qs))
+            return {q: float(v) for q, v in zip(qs, values, strict=True)}
+        # 順位 q/100*(count-1) の値を含むバケットを探し、その幾何平均を推定値とする
+        cumulative = np.cumsum(self._buckets)
+        ranks = np.asarray(qs, dtype=np.float64) / 100 * (self.count - 1)
+        indices = np.searchsorted(cumulative, ranks, side="right")
+        exponents = (indices + 0.5) / BUCKETS_PER_DECADE + _MIN_EXPONENT
+        estimates = np.clip(np.power(10.0, exponents), self.min, self.max)
+        return {q: float(v) for q, v in zip(qs, estimates, strict=True)}
+
+    def histogram(self) -> list[tuple[float, float, int]]:
+        """価格帯ごとの件数を (下限, 上限, 件数) のリストで返します。下限・上限は±infを含みます。"""
+        bounds = [-math.inf, *self._edges.tolist(), math.inf]
+        return [
+            (low, high, count)
+            for (low, high), count in zip(pairwise(bounds), self._histogram.tolist(), strict=True)
+        ]
+
+    def groups(self) -> list[GroupStats]:
+        """idの範囲ごとの集計結果を、範囲の昇順で返します。"""
+        width = self._group_width
+        if width is None:
+            return []
+        return [
+            GroupStats(key * width, (key + 1) * width, count, total, low, high)
+            for key, count, total, low, high in zip(
+                self._group_keys.tolist(),
+                self._group_counts.tolist(),
+                self._group_totals.tolist(),
+                self._group_mins.tolist(),
+                self._group_maxs.tolist(),
+                strict=True,
+            )
+        ]
+
+    def to_dict(self, qs: Sequence[float] = DEFAULT_PERCENTILES) -> dict[str, Any]:
+        """統計量をJSONに変換できる辞書にします。"""
+        empty = not self.count
+        result: dict[str, Any] = {
+            "count": self.count,
+            "sum": self.total,
+            "min": None if empty else self.min,
+            "max": None if empty else self.max,
+            "mean": None if empty else self.mean,
+            "std": None if empty else self.std,
+            "percentiles": {
+                f"p{q:g}": None if empty else value for q, value in self.percentiles(qs).items()
+            },
+            "exact": self._chunks is not None,
+            "histogram": [
+                {"from": _finite(low), "to": _finite(high), "count": count}
+                for low, high, count in self.histogram()
+            ],
+        }
+        if self._group_width is not None:
+            result["groups"] = [
+                {
+                    "id_from": group.id_from,
+                    "id_to": group.id_to,
+                    "count": group.count,
+                    "sum": group.total,
+                    "min": group.min,
+                    "max": group.max,
+                    "mean": group.mean,
+                }
+                for group in self.groups()
+            ]
+        return result
+
+
+def _finite(value: float) -> float | None:
+    return value if math.isfinite(value) else None
+
+
+def _bucket_indices(prices: PriceArray) -> IdArray:
+    """価格を対数目盛のバケットの位置に変換します。範囲外の価格は両端のバケットに入れます。"""
+    np = _numpy()
+    with np.errstate(divide="ignore", invalid="ignore"):
+        positions = np.floor((np.log10(prices) - _MIN_EXPONENT) * BUCKETS_PER_DECADE)
+    indices: IdArray = np.clip(np.nan_to_num(positions, nan=0.0), 0, _BUCKET_COUNT - 1)
+    return indices.astype(np.int64)
+
+
+def _group_starts(sorted_keys: IdArray) -> IdArray:
+    """ソート済みのキーで、値が変わる位置(各グループの先頭)を返します。"""
+    np = _numpy()
+    if not len(sorted_keys):
+        empty: IdArray = np.empty(0, dtype=np.int64)
+        return empty
+    starts: IdArray = np.flatnonzero(np.concatenate([[True], sorted_keys[1:] != sorted_keys[:-1]]))
+    return starts
+
+
+def _item_file_chunks(item_file: ItemFile, batch_size: int) -> Iterator[tuple[Any, Any]]:
+    """バイナリ形式のファイルのid・price列を、コピーせずにチャンクごとの配列として返します。"""
+    np = _numpy()
+    ids, prices = item_file.id_column, item_file.price_column
+    for start in range(0, len(ids), batch_size):
+        stop = start + batch_size
+        yield (
+            np.frombuffer(ids[start:stop], dtype=np.int64),
+            np.frombuffer(prices[start:stop], dtype=np.float64),
+        )
+
+
+def _update_from_item_file(
+    stats: PriceStats, item_file: ItemFile, batch_size: int, result: ImportStats
+) -> None:
+    """
+    バイナリ形式のファイルの商品で統計量を更新します。
+
+    trusted=True で開いたファイルはmmapした列をそのまま集計し、それ以外は
+    チャンクごとに商品を組み立てて検証してから集計します。ファイルを参照する配列は
+    関数から戻るときにすべて破棄されるため、呼び出し元はその後にファイルを閉じられます。
+    """
+    if not item_file.trusted:
+        for start in range(0, len(item_file), batch_size):
+            items = item_file.items(start, start + batch_size)
+            stats.update(*columns_from_items(items))
+            result.read += len(items)
+            result.imported += len(items)
+        return
+    for ids, prices in _item_file_chunks(item_file, batch_size):
+        stats.update(ids, prices)
+        result.read += len(ids)
+        result.imported += len(ids)
+
+
+def compute_item_stats(
+    stats: PriceStats,
+    source: BinaryIO | str,
+    input_format: str = "ndjson",
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    trusted: bool = False,
+) -> ImportStats:
+    """
+    入力をチャンクごとに読み込み、価格の統計量を更新します。
+
+    NDJSONとCSVは1チャンクずつ create_items で検証し、有効な商品だけを集計します。
+    バイナリ形式(input_format="binary")のファイルは import_item_file と同じく
+    商品を検証し、不正な商品があれば集計を中止します。CRC32はファイルの出所を
+    保証しないため、mmapした列を検証せずにそのまま集計するのは trusted=True の場合だけです。
+
+    Args:
+        stats: 更新する統計量
+        source: 入力のバイナリストリーム(バイナリ形式の場合はファイルのパス)
+        input_format: 入力形式("ndjson"、"csv" または "binary")
+        batch_size: 1チャンクのレコード数
+        trusted: Trueの場合はバイナリ形式の商品を検証せずに集計する
+
+    Returns:
+        読み込み件数、集計した件数、拒否件数、処理時間の集計結果
+
+    Raises:
+        ValueError: 未対応の形式、不正なバッチサイズ、入力とパスの組み合わせが不正な場合、
+            またはバイナリ形式のファイルが破損しているか不正な商品を含む場合
+    """
+    if batch_size <= 0:
+        raise ValueError("バッチサイズは1以上である必要があります")
+    result = ImportStats()
+    started = time.perf_counter()
+    if input_format == "binary":
+        if not isinstance(source, str):
+            raise ValueError("バイナリ形式はファイルのパスで指定する必要があります")
+        with ItemFile(source, trusted=trusted) as item_file:
+            _update_from_item_file(stats, item_file, batch_size, result)
+    else:
+        if isinstance(source, str):
+            raise ValueError("NDJSONとCSVはストリームで指定する必要があります")
+        batches = batched(read_records(source, input_format), batch_size)
+        for items in validate_batches(batches, result):
+            stats.update(*columns_from_items(items))
+    result.elapsed = time.perf_counter() - started
+    return result
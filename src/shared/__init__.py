@@ -8,16 +8,24 @@ from .errors import (
     AuthenticationError,
     AuthorizationError,
     BaseApplicationError,
+    BulkValidationError,
     BusinessLogicError,
     ConfigurationError,
+    ErrorCollector,
+    ErrorRecord,
     ExternalServiceError,
     ValidationError,
 )
 from .security import (
+    are_safe_filenames,
     is_safe_filename,
+    iter_masked_json,
     mask_email,
+    mask_json_stream,
     mask_sensitive_data,
+    sanitize_log_bytes,
     sanitize_log_message,
+    scan_unsafe_filenames,
     validate_input_length,
 )
 
@@ -26,14 +34,22 @@ __all__ = [
     "AuthenticationError",
     "AuthorizationError",
     "BaseApplicationError",
+    "BulkValidationError",
     "BusinessLogicError",
     "ConfigurationError",
+    "ErrorCollector",
+    "ErrorRecord",
     "ExternalServiceError",
     "ValidationError",
     # セキュリティ関数
+    "are_safe_filenames",
     "is_safe_filename",
+    "iter_masked_json",
     "mask_email",
+    "mask_json_stream",
     "mask_sensitive_data",
+    "sanitize_log_bytes",
     "sanitize_log_message",
+    "scan_unsafe_filenames",
     "validate_input_length",
 ]
@@ -3,8 +3,17 @@
 
 このモジュールでは、アプリケーション全体で使用するカスタム例外クラスを定義します。
 セキュリティを考慮し、外部に漏洩してはいけない情報を含まないエラーメッセージを提供します。
+
+大量の行を扱う一括処理では、失敗した行ごとに例外を送出するとトレースバックの
+作成が処理時間の大半を占めます。そのような処理では ErrorCollector に失敗を
+ErrorRecord として記録し、最後に BulkValidationError へまとめます。
 """
 
+from __future__ import annotations
+
+from collections.abc import Iterable, Iterator
+from dataclasses import dataclass
+
 
 class BaseApplicationError(Exception):
     """アプリケーション共通の基底例外クラス。"""
@@ -62,3 +71,144 @@ class BusinessLogicError(BaseApplicationError):
 
     def __init__(self, message: str) -> None:
         super().__init__(message, "BUSINESS_LOGIC_ERROR")
+
+
+@dataclass(slots=True)
+class ErrorRecord:
+    """一括処理で失敗した1件の情報。"""
+
+    # 入力内の行番号(0始まり)
+    row: int
+    field: str
+    # 失敗の種類を表す機械向けのコード(例: "missing", "greater_than")
+    error_code: str
+    message: str = ""
+
+
+class BulkValidationError(ValidationError):
+    """一括処理で記録された失敗をまとめた入力検証エラー。"""
+
+    def __init__(
+        self,
+        errors: list[ErrorRecord],
+        total: int,
+        counts: dict[str, int],
+        message: str = "入力データが無効です",
+    ) -> None:
+        """
+        失敗のまとめから例外を作成します。
+
+        メッセージには件数とエラーコードごとの件数のみを含め、入力値は含めません。
+
+        Args:
+            errors: 記録された失敗(上限を設定した場合はその件数まで)
+            total: 記録された失敗の総数
+            counts: エラーコードごとの件数
+            message: メッセージの先頭に付ける説明
+        """
+        summary = ", ".join(f"{code}={count}" for code, count in sorted(counts.items()))
+        super().__init__(f"{message}: {total}件 ({summary})")
+        self.errors = errors
+        self.total = total
+        self.counts = counts
+
+
+class ErrorCollector:
+    """
+    一括処理の失敗を、例外を送出せずに ErrorRecord として記録するクラス。
+
+    limit を指定した場合、保持する ErrorRecord はその件数までに抑え、
+    それ以降は件数とエラーコードごとの件数のみを数えます。
+
+    Examples:
+        >>> errors = ErrorCollector()
+        >>> errors.add(3, "price", "greater_than", "Input should be greater than 0")
+        >>> errors.to_error()
+        BulkValidationError('入力データが無効です: 1件 (greater_than=1)')
+    """
+
+    __slots__ = ("_counts", "_limit", "_records", "_total")
+
+    def __init__(self, limit: int | None = None) -> None:
+        """
+        空のコレクターを作成します。
+
+        Args:
+            limit: 保持する ErrorRecord の最大数。Noneの場合は上限なし
+
+        Raises:
+            ValueError: limit が負の場合
+        """
+        if limit is not None and limit < 0:
+            raise ValueError("limitは0以上である必要があります")
+        self._limit = limit
+        self._records: list[ErrorRecord] = []
+        self._counts: dict[str, int] = {}
+        self._total = 0
+
+    def add(self, row: int, field: str, error_code: str, message: str = "") -> None:
+        """失敗を1件記録します。"""
+        self._total += 1
+        counts = self._counts
+        counts[error_code] = counts.get(error_code, 0) + 1
+        if self._limit is None or len(self._records) < self._limit:
+            self._records.append(ErrorRecord(row, field, error_code, message))
+
+    def extend(self, records: Iterable[ErrorRecord], offset: int = 0) -> None:
+        """
+        記録済みの失敗をまとめて追加します。
+
+        Args:
+            records: 追加する失敗
+            offset: 各行番号に加える値(バッチ内の行番号を通し番号にする場合に使う)
+        """
+        for record in records:
+            self.add(record.row + offset, record.field, record.error_code, record.message)
+
+    @property
+    def records(self) -> list[ErrorRecord]:
+        """保持している失敗の一覧(記録した順)。"""
+        return self._records
+
+    @property
+    def total(self) -> int:
+        """記録された失敗の総数(上限を超えて保持しなかった分を含む)。"""
+        return self._total
+
+    def counts(self) -> dict[str, int]:
+        """エラーコードごとの件数を返します。"""
+        return dict(self._counts)
+
+    def rows(self) -> list[int]:
+        """保持している失敗の行番号を、重複を除いて昇順で返します。"""
+        return sorted({record.row for record in self._records})
+
+    def to_error(self, message: str = "入力データが無効です") -> BulkValidationError | None:
+        """
+        記録された失敗を1つの例外にまとめます。
+
+        Args:
+            message: 例外のメッセージの先頭に付ける説明
+
+        Returns:
+            失敗が記録されている場合は BulkValidationError、それ以外はNone
+        """
+        if not self._total:
+            return None
+        return BulkValidationError(list(self._records), self._total, self.counts(), message)
+
+    def raise_if_any(self, message: str = "入力データが無効です") -> None:
+        """
+        失敗が記録されている場合に、まとめた例外を送出します。
+
+        Raises:
+            BulkValidationError: 失敗が1件以上記録されている場合
+        """
+        if (error := self.to_error(message)) is not None:
+            raise error
+
+    def __len__(self) -> int:
+        return self._total
+
+    def __iter__(self) -> Iterator[ErrorRecord]:
+        return iter(self._records)
@@ -0,0 +1,12 @@
+"""
+ファイルの不可分な書き込み。
+
+core層から utils.files を利用するための窓口です。
+"""
+
+from utils.files import atomic_output, write_atomic
+
+__all__ = [
+    "atomic_output",
+    "write_atomic",
+]
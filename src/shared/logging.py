@@ -1,31 +1,530 @@
+import atexit
+import functools
+import json
 import logging
+import queue
+import random
+import sys
+import threading
+import time
+from collections.abc import Callable
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
 
-from rich.logging import RichHandler
+import config
 
-from config import settings
+from .security import sanitize_log_message
 
+# サニタイズ結果をキャッシュするメッセージ数の上限
+DEFAULT_REDACTION_CACHE_SIZE = 1024
+# 繰り返しを集計するログの種類(ロガー・レベル・メッセージの書式の組)の上限
+DEFAULT_DEDUP_MAX_KEYS = 10_000
+# 集計期間が終わったログの繰り返し回数や破棄した件数を確認する間隔(秒)
+_SWEEP_INTERVAL = 1.0
+# RateLimitFilter が出力する集計のレコードに設定する属性(このレコードは制限の対象外にする)
+_SUMMARY_ATTRIBUTE = "rate_limit_summary"
+# RateLimitFilter に反映する設定項目
+_RATE_LIMIT_SETTINGS = (
+    "LOG_DEDUP_INTERVAL",
+    "LOG_RATE_LIMIT",
+    "LOG_RATE_BURST",
+    "LOG_DEBUG_SAMPLE_RATE",
+)
 
-def setup_logging() -> None:
+
+class RedactionFilter(logging.Filter):
+    """
+    出力されるログレコードから機密情報を除去するフィルタ。
+
+    ハンドラに設定すると、ロガーやハンドラのレベルで破棄されたレコードには実行されません。
+    %形式の引数を展開した後のメッセージを sanitize_log_message でサニタイズし、
+    繰り返し出力される同じメッセージの結果は上限付きのキャッシュから返します。
+    """
+
+    def __init__(self, cache_size: int = DEFAULT_REDACTION_CACHE_SIZE) -> None:
+        """
+        フィルタを初期化します。
+
+        Args:
+            cache_size: サニタイズ結果をキャッシュするメッセージ数の上限
+        """
+        super().__init__()
+        self._sanitize = functools.lru_cache(maxsize=cache_size)(sanitize_log_message)
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        try:
+            message = record.getMessage()
+        except (TypeError, ValueError):
+            # 引数の展開に失敗したレコードは、Handlerのエラー処理に委ねる
+            return True
+        record.msg = self._sanitize(message)
+        record.args = None
+        return True
+
+
+@dataclass(slots=True)
+class _Repeats:
+    """同じログの集計期間と、期間内に省略した件数。"""
+
+    started: float
+    last: float
+    count: int
+    # 集計のレコードに設定する、最初のレコードの出力元
+    pathname: str
+    lineno: int
+
+
+class RateLimitFilter(logging.Filter):
+    """
+    同じログの繰り返しをまとめ、ロガーごとの出力数を制限するフィルタ。
+
+    依存先の障害などで同じエラーが大量に出力されると、整形(特にrichのトレースバック)と
+    書き出し自体がボトルネックになります。ハンドラの先頭に設定すると、整形の前に
+    次の順でレコードを破棄します。
+
+    - DEBUGレベル以下のレコードは、debug_sample_rate の確率でのみ出力します。
+    - ロガー・レベル・メッセージの書式(%形式の引数を展開する前のmsg)が同じレコードは、
+      dedup_interval 秒ごとに最初の1件だけを出力します。集計期間が終わると、省略した件数を
+      「N回繰り返されました」というレコードとして出力します。
+    - ロガーごとのトークンバケットで、1秒あたり rate 件(一時的には burst 件)まで出力します。
+      破棄した件数は、ロガーごとにWARNINGのレコードとして出力します。
+
+    集計のレコードは bind() で設定したハンドラ(設定していない場合はレコードのロガー)へ
+    出力します。集計期間の終了は、いずれかのレコードがフィルタを通るたびに最大で1秒に1回
+    確認するため、ログが途絶えた後の集計は flush() を呼び出したときに出力されます。
+    """
+
+    def __init__(
+        self,
+        dedup_interval: float = 0.0,
+        rate: float = 0.0,
+        burst: int = 100,
+        debug_sample_rate: float = 1.0,
+        max_keys: int = DEFAULT_DEDUP_MAX_KEYS,
+        clock: Callable[[], float] = time.monotonic,
+        sample: Callable[[], float] = random.random,
+    ) -> None:
+        """
+        フィルタを初期化します。
+
+        Args:
+            dedup_interval: 同じログを1件にまとめる間隔(秒)。0の場合はまとめない
+            rate: ロガーごとの1秒あたりの出力数の上限。0の場合は制限しない
+            burst: rate を一時的に超えて出力できる件数
+            debug_sample_rate: DEBUGレベル以下のレコードを出力する割合(0〜1)
+            max_keys: 繰り返しを集計するログの種類の上限。超えた場合は最も古いものから
+                集計を出力して破棄する
+            clock: 経過時間の計測に使う時計
+            sample: DEBUGレベルのレコードの抽出に使う、0以上1未満の乱数を返す関数
+
+        Raises:
+            ValueError: 設定値が範囲外の場合
+        """
+        super().__init__()
+        if max_keys < 1:
+            raise ValueError("集計するログの種類の上限は1以上である必要があります")
+        self._lock = threading.Lock()
+        self._clock = clock
+        self._sample = sample
+        self._max_keys = max_keys
+        self._handler: logging.Handler | None = None
+        self._repeats: dict[tuple[str, int, object], _Repeats] = {}
+        # ロガーごとの (残りのトークン, 最後に補充した時刻)
+        self._buckets: dict[str, list[float]] = {}
+        self._dropped: dict[str, int] = {}
+        self._next_sweep = 0.0
+        # DEBUGの抽出・繰り返し・出力数の上限によって破棄したレコードの件数
+        self.sampled_out = 0
+        self.suppressed = 0
+        self.dropped = 0
+        self.configure(dedup_interval, rate, burst, debug_sample_rate)
+
+    def configure(
+        self, dedup_interval: float, rate: float, burst: int, debug_sample_rate: float
+    ) -> None:
+        """
+        設定を変更します。集計中の繰り返し回数は保ち、トークンバケットは満杯に戻します。
+
+        Raises:
+            ValueError: 設定値が範囲外の場合
+        """
+        if dedup_interval < 0 or rate < 0:
+            raise ValueError("ログをまとめる間隔と出力数の上限は0以上である必要があります")
+        if burst < 1:
+            raise ValueError("一時的に超えて出力できる件数は1以上である必要があります")
+        if not 0 <= debug_sample_rate <= 1:
+            raise ValueError("DEBUGレベルのログを出力する割合は0〜1である必要があります")
+        with self._lock:
+            self.dedup_interval = dedup_interval
+            self.rate = rate
+            self.burst = burst
+            self.debug_sample_rate = debug_sample_rate
+            self._buckets.clear()
+            self._enabled = dedup_interval > 0 or rate > 0 or debug_sample_rate < 1
+
+    def bind(self, handler: logging.Handler) -> None:
+        """ハンドラのフィルタの先頭に設定し、集計のレコードの出力先にします。"""
+        handler.removeFilter(self)
+        handler.filters.insert(0, self)
+        self._handler = handler
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if not self._enabled or getattr(record, _SUMMARY_ATTRIBUTE, False):
+            return True
+        if (
+            record.levelno <= logging.DEBUG
+            and self.debug_sample_rate < 1
+            and self._sample() >= self.debug_sample_rate
+        ):
+            self.sampled_out += 1
+            return False
+        summaries: list[logging.LogRecord] = []
+        now = self._clock()
+        with self._lock:
+            if now >= self._next_sweep:
+                self._next_sweep = now + _SWEEP_INTERVAL
+                self._sweep(now, summaries)
+            allowed = self._check_repeats(record, now, summaries) and self._take_token(
+                record.name, now
+            )
+        for summary in summaries:
+            self._emit(summary)
+        return allowed
+
+    def flush(self) -> None:
+        """集計中の繰り返し回数と破棄した件数を、集計期間の終了を待たずに出力します。"""
+        summaries: list[logging.LogRecord] = []
+        with self._lock:
+            for key, repeats in self._repeats.items():
+                if repeats.count:
+                    summaries.append(_repeated_record(key, repeats))
+            self._repeats.clear()
+            self._drain_dropped(summaries)
+        for summary in summaries:
+            self._emit(summary)
+
+    def _check_repeats(
+        self, record: logging.LogRecord, now: float, summaries: list[logging.LogRecord]
+    ) -> bool:
+        """同じログの集計期間内であれば件数を数えて False を返します。"""
+        interval = self.dedup_interval
+        if interval <= 0:
+            return True
+        msg = record.msg
+        key = (record.name, record.levelno, msg if isinstance(msg, str) else str(msg))
+        repeats = self._repeats.get(key)
+        if repeats is not None:
+            if now - repeats.started < interval:
+                repeats.count += 1
+                repeats.last = now
+                self.suppressed += 1
+                return False
+            # 集計期間が終わったため、省略した件数を出力して新しい期間を始める
+            del self._repeats[key]
+            if repeats.count:
+                summaries.append(_repeated_record(key, repeats))
+        elif len(self._repeats) >= self._max_keys:
+            oldest = next(iter(self._repeats))
+            evicted = self._repeats.pop(oldest)
+            if evicted.count:
+                summaries.append(_repeated_record(oldest, evicted))
+        self._repeats[key] = _Repeats(now, now, 0, record.pathname, record.lineno)
+        return True
+
+    def _take_token(self, name: str, now: float) -> bool:
+        """ロガーのトークンバケットから1件分を取り出せた場合に True を返します。"""
+        rate = self.rate
+        if rate <= 0:
+            return True
+        bucket = self._buckets.get(name)
+        if bucket is None:
+            bucket = self._buckets[name] = [float(self.burst), now]
+        else:
+            bucket[0] = min(float(self.burst), bucket[0] + (now - bucket[1]) * rate)
+            bucket[1] = now
+        if bucket[0] < 1:
+            self._dropped[name] = self._dropped.get(name, 0) + 1
+            self.dropped += 1
+            return False
+        bucket[0] -= 1
+        return True
+
+    def _sweep(self, now: float, summaries: list[logging.LogRecord]) -> None:
+        """集計期間が終わったログの繰り返し回数と、破棄した件数を集計のレコードにします。"""
+        interval = self.dedup_interval
+        repeats = self._repeats
+        # 辞書は集計期間の開始順に並んでいるため、期間内のものが見つかった時点で終える
+        while repeats:
+            key = next(iter(repeats))
+            entry = repeats[key]
+            if now - entry.started < interval:
+                break
+            del repeats[key]
+            if entry.count:
+                summaries.append(_repeated_record(key, entry))
+        self._drain_dropped(summaries)
+
+    def _drain_dropped(self, summaries: list[logging.LogRecord]) -> None:
+        for name, count in self._dropped.items():
+            summaries.append(
+                _summary_record(
+                    name,
+                    logging.WARNING,
+                    "",
+                    0,
+                    "ログの出力数の上限(1秒あたり%g件)を超えたため、%d件のログを破棄しました",
+                    (self.rate, count),
+                )
+            )
+        self._dropped.clear()
+
+    def _emit(self, summary: logging.LogRecord) -> None:
+        target = self._handler
+        if target is not None:
+            target.handle(summary)
+        else:
+            logging.getLogger(summary.name).handle(summary)
+
+
+def _summary_record(
+    name: str, level: int, pathname: str, lineno: int, msg: str, args: tuple[object, ...]
+) -> logging.LogRecord:
+    record = logging.LogRecord(name, level, pathname, lineno, msg, args, None)
+    setattr(record, _SUMMARY_ATTRIBUTE, True)
+    return record
+
+
+def _repeated_record(key: tuple[str, int, object], repeats: _Repeats) -> logging.LogRecord:
+    name, level, msg = key
+    return _summary_record(
+        name,
+        level,
+        repeats.pathname,
+        repeats.lineno,
+        "次のログが%.1f秒間にさらに%d回繰り返されました: %s",
+        (repeats.last - repeats.started, repeats.count, msg),
+    )
+
+
+class JsonLinesFormatter(logging.Formatter):
+    """ログレコードを1行のコンパクトなJSONに整形するフォーマッタ。"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        payload = {
+            "time": datetime.fromtimestamp(record.created, timezone.utc).isoformat(
+                timespec="milliseconds"
+            ),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            payload["exc_info"] = record.exc_text
+        if record.stack_info:
+            payload["stack_info"] = record.stack_info
+        return json.dumps(payload, ensure_ascii=False, separators=(",", ":"))
+
+
+class _EnqueueHandler(QueueHandler):
+    """
+    呼び出し元のスレッドでは最小限の準備だけを行い、レコードをキューに積むハンドラ。
+
+    標準の QueueHandler はメッセージ全体を整形してからキューに積みますが、ここでは
+    %形式の引数の展開と例外情報の文字列化のみを行い、JSONへの整形や機密情報の除去は
+    QueueListener のスレッドに任せます。
     """
-    richライブラリを使用して、見やすいフォーマットのロガーをセットアップします。
 
-    ログレベルは config.settings から取得します。
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        message = record.getMessage()
+        exc_text = record.exc_text
+        if record.exc_info and not exc_text:
+            exc_text = _EXCEPTION_FORMATTER.formatException(record.exc_info)
+        # 他のハンドラに影響しないよう複製する(copy.copyより軽量な浅いコピー)
+        prepared = type(record).__new__(type(record))
+        prepared.__dict__.update(record.__dict__)
+        prepared.msg = message
+        prepared.args = None
+        prepared.exc_info = None
+        prepared.exc_text = exc_text
+        return prepared
+
+
+_EXCEPTION_FORMATTER = logging.Formatter()
+_queue_listener: QueueListener | None = None
+# setup_logging がハンドラに設定した RateLimitFilter
+_rate_limit_filters: list[RateLimitFilter] = []
+# .envファイルの変更を確認するスレッドと、その停止を指示するイベント
+_settings_watcher: tuple[threading.Thread, threading.Event] | None = None
+# 設定の変更を確認する最短の間隔(秒)。SETTINGS_RELOAD_INTERVAL が0の場合に使う
+_MIN_SETTINGS_WATCH_INTERVAL = 0.5
+
+
+def shutdown_logging() -> None:
+    """
+    集計中のログの繰り返し回数を出力し、バックグラウンドの出力スレッドを停止して
+    キューに残ったレコードを書き出します。
+
+    プロセス終了時には自動的に呼び出されます。
+    """
+    global _queue_listener
+    _stop_settings_watcher()
+    for rate_limit in _rate_limit_filters:
+        rate_limit.flush()
+    _rate_limit_filters.clear()
+    if _queue_listener is not None:
+        _queue_listener.stop()
+        _queue_listener = None
+
+
+atexit.register(shutdown_logging)
+
+
+def _watch_settings(stop: threading.Event) -> None:
+    """
+    SETTINGS_RELOAD_INTERVAL 秒ごとに config.get_settings() を呼び出します。
+
+    設定の再読み込み(と _apply_reloaded_settings への通知)は get_settings() の呼び出しを
+    きっかけに行われるため、ログを出力するだけで設定を取得しないプロセスでも、
+    .envファイルの変更がログの設定に反映されるようにします。
+    """
+    while True:
+        interval = config.get_settings().SETTINGS_RELOAD_INTERVAL
+        if stop.wait(max(interval, _MIN_SETTINGS_WATCH_INTERVAL)):
+            return
+
+
+def _start_settings_watcher() -> None:
+    global _settings_watcher
+    stop = threading.Event()
+    thread = threading.Thread(
+        target=_watch_settings, args=(stop,), name="settings-watcher", daemon=True
+    )
+    thread.start()
+    _settings_watcher = thread, stop
+
+
+def _stop_settings_watcher() -> None:
+    global _settings_watcher
+    if _settings_watcher is not None:
+        thread, stop = _settings_watcher
+        stop.set()
+        thread.join()
+        _settings_watcher = None
+
+
+def _create_rich_handler(redact: bool) -> logging.Handler:
+    # richの読み込みは重いため、rich形式を使う場合にのみ読み込む
+    from rich.logging import RichHandler
+
+    handler = RichHandler(rich_tracebacks=True)
+    if redact:
+        handler.addFilter(RedactionFilter())
+    return handler
+
+
+def _start_queue_listener(redact: bool) -> queue.SimpleQueue[logging.LogRecord]:
+    """JSON Lines を標準エラーへ書き出すバックグラウンドスレッドを開始します。"""
+    global _queue_listener
+    log_queue: queue.SimpleQueue[logging.LogRecord] = queue.SimpleQueue()
+    output = logging.StreamHandler(sys.stderr)
+    output.setFormatter(JsonLinesFormatter())
+    if redact:
+        output.addFilter(RedactionFilter())
+    _queue_listener = QueueListener(log_queue, output)
+    _queue_listener.start()
+    return log_queue
+
+
+def _configure_rate_limit(rate_limit: RateLimitFilter, settings: "config.Settings") -> None:
+    rate_limit.configure(
+        dedup_interval=settings.LOG_DEDUP_INTERVAL,
+        rate=settings.LOG_RATE_LIMIT,
+        burst=settings.LOG_RATE_BURST,
+        debug_sample_rate=settings.LOG_DEBUG_SAMPLE_RATE,
+    )
+
+
+def _with_rate_limit(
+    create_handler: Callable[[], logging.Handler], settings: "config.Settings"
+) -> logging.Handler:
+    """ハンドラを作成し、フィルタの先頭に RateLimitFilter を設定します。"""
+    handler = create_handler()
+    rate_limit = RateLimitFilter()
+    _configure_rate_limit(rate_limit, settings)
+    rate_limit.bind(handler)
+    _rate_limit_filters.append(rate_limit)
+    return handler
+
+
+def _apply_reloaded_settings(previous: "config.Settings", current: "config.Settings") -> None:
+    """再読み込みされたログの設定を、ハンドラを作り直さずに反映します。"""
+    if current.LOG_LEVEL != previous.LOG_LEVEL:
+        logging.getLogger().setLevel(current.LOG_LEVEL.upper())
+    if any(getattr(current, name) != getattr(previous, name) for name in _RATE_LIMIT_SETTINGS):
+        for rate_limit in _rate_limit_filters:
+            _configure_rate_limit(rate_limit, current)
+
+
+def setup_logging(watch_settings: bool = False) -> None:
+    """
+    ロガーをセットアップします。
+
+    設定は config.get_settings() から取得します。
+
+    - LOG_FORMAT が "rich" (デフォルト)の場合、richライブラリを使用して、
+      見やすいフォーマットでログを出力します。開発時の利用を想定しています。
+    - LOG_FORMAT が "json" の場合、ログ呼び出しはレコードをキューに積むだけで戻り、
+      バックグラウンドのスレッドが JSON Lines 形式で標準エラーへ書き出します。
+      本番環境での利用を想定しています。
+
+    LOG_REDACT が有効な場合は、出力するハンドラに RedactionFilter を設定して
+    出力前に機密情報を除去します。
+
+    各ハンドラのフィルタの先頭には RateLimitFilter を設定し、LOG_DEDUP_INTERVAL、
+    LOG_RATE_LIMIT、LOG_RATE_BURST、LOG_DEBUG_SAMPLE_RATE に従って、整形の前に
+    繰り返されるログをまとめ、出力数を制限します(既定ではいずれも無効)。
+
+    設定が再読み込みされた場合は、ハンドラはそのままでルートロガーのレベルと
+    RateLimitFilter の設定だけを更新します。再読み込みは config.get_settings() の
+    呼び出しをきっかけに行われるため、watch_settings を指定した場合は、
+    バックグラウンドのスレッドが SETTINGS_RELOAD_INTERVAL 秒ごとに呼び出して
+    .envファイルの変更を確認します。
+
+    Args:
+        watch_settings: 設定の変更を確認するスレッドを開始するかどうか。
+            すぐに終了するCLIのコマンドでは不要で、長時間動作するプロセスで指定します
     """
+    settings = config.get_settings()
     log_level = settings.LOG_LEVEL.upper()
+    config.add_reload_listener(_apply_reloaded_settings)
+    redact = settings.LOG_REDACT
 
     # ロガーが重複して追加されるのを防ぐ
     if logging.getLogger().hasHandlers():
         logging.getLogger().handlers.clear()
+    shutdown_logging()
+
+    create_handler: Callable[[], logging.Handler]
+    if settings.LOG_FORMAT == "json":
+        create_handler = functools.partial(_EnqueueHandler, _start_queue_listener(redact))
+    else:
+        create_handler = functools.partial(_create_rich_handler, redact)
+    create_handler = functools.partial(_with_rate_limit, create_handler, settings)
 
     logging.basicConfig(
         level=log_level,
         format="%(message)s",
         datefmt="[%X]",
-        handlers=[RichHandler(rich_tracebacks=True)],
+        handlers=[create_handler()],
     )
-    # Uvicornなどの外部ライブラリのログもRichHandlerで処理する
-    logging.getLogger("uvicorn").handlers = [RichHandler(rich_tracebacks=True)]
-    logging.getLogger("uvicorn.access").handlers = [RichHandler(rich_tracebacks=True)]
+    # Uvicornなどの外部ライブラリのログも同じ方式で処理する
+    logging.getLogger("uvicorn").handlers = [create_handler()]
+    logging.getLogger("uvicorn.access").handlers = [create_handler()]
+    if watch_settings:
+        _start_settings_watcher()
 
 
 def get_logger(name: str) -> logging.Logger:
@@ -0,0 +1,398 @@
+"""
+処理時間の計測(スパン)とカウンタ。
+
+span() のコンテキストマネージャ、または timed() で修飾した関数の処理時間を、
+名前ごとのヒストグラムに記録します。ヒストグラムは対数目盛のバケット
+(2倍ごとに 2**_SUB_BUCKET_BITS 個)の件数として保持するため、記録数に関係なく
+大きさは一定で、他のプロセスで記録した結果と統合できます。
+
+計測は既定で無効です。無効な間、span() は何もしない共有のオブジェクトを返し、
+timed() で修飾した関数はフラグを1回確認するだけで元の関数を呼び出します。
+
+Examples:
+    >>> registry = MetricsRegistry()
+    >>> registry.enabled = True
+    >>> with registry.span("parse"):
+    ...     pass
+    >>> registry.histogram("parse").count
+    1
+"""
+
+from __future__ import annotations
+
+import functools
+import threading
+from collections.abc import Callable, Iterable, Mapping
+from dataclasses import dataclass
+from time import perf_counter_ns
+from types import TracebackType
+from typing import Any, ParamSpec, TypeVar
+
+# 2倍ごとのバケット数(2**5 = 32。バケットの幅は値の約3%)
+_SUB_BUCKET_BITS = 5
+_SUB_BUCKETS = 1 << _SUB_BUCKET_BITS
+
+DEFAULT_PERCENTILES: tuple[float, ...] = (50.0, 95.0, 99.0)
+
+_P = ParamSpec("_P")
+_R = TypeVar("_R")
+
+
+def _bucket_index(value: int) -> int:
+    """値(0以上の整数)をバケットの番号に変換します。小さい値はそのままの番号になります。"""
+    length = value.bit_length()
+    if length <= _SUB_BUCKET_BITS:
+        return value
+    shift = length - _SUB_BUCKET_BITS - 1
+    return ((shift + 1) << _SUB_BUCKET_BITS) + (value >> shift) - _SUB_BUCKETS
+
+
+def _bucket_bounds(index: int) -> tuple[int, int]:
+    """バケットに入る値の範囲 [下限, 上限) を返します。"""
+    if index < _SUB_BUCKETS:
+        return index, index + 1
+    shift = (index >> _SUB_BUCKET_BITS) - 1
+    mantissa = (index & (_SUB_BUCKETS - 1)) + _SUB_BUCKETS
+    return mantissa << shift, (mantissa + 1) << shift
+
+
+class Histogram:
+    """
+    対数目盛のバケットで値の分布を保持するヒストグラム。
+
+    値は0以上の整数(スパンの場合はナノ秒)です。パーセンタイルはバケットの
+    中央の値で推定するため、相対誤差は約1.6%以内です。
+    """
+
+    __slots__ = ("_buckets", "count", "max", "min", "total")
+
+    def __init__(self) -> None:
+        self._buckets: dict[int, int] = {}
+        self.count = 0
+        self.total = 0
+        self.min = 0
+        self.max = 0
+
+    def record(self, value: int) -> None:
+        """値を1件記録します。負の値は0として記録します。"""
+        if value < 0:
+            value = 0
+        # _bucket_index() と同じ計算(記録は頻繁に呼ばれるため、関数呼び出しを省いている)
+        length = value.bit_length()
+        if length <= _SUB_BUCKET_BITS:
+            index = value
+        else:
+            shift = length - _SUB_BUCKET_BITS
+            index = (shift << _SUB_BUCKET_BITS) + (value >> (shift - 1)) - _SUB_BUCKETS
+        buckets = self._buckets
+        buckets[index] = buckets.get(index, 0) + 1
+        if not self.count or value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+        self.count += 1
+        self.total += value
+
+    def merge(self, other: Histogram) -> None:
+        """他のヒストグラムの記録を統合します。"""
+        if not other.count:
+            return
+        buckets = self._buckets
+        for index, count in other._buckets.items():
+            buckets[index] = buckets.get(index, 0) + count
+        self.min = other.min if not self.count else min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        self.count += other.count
+        self.total += other.total
+
+    def percentile(self, q: float) -> float:
+        """
+        パーセンタイルを推定します。
+
+        Args:
+            q: 0以上100以下のパーセンタイル
+
+        Returns:
+            推定値(記録がない場合は0.0)
+
+        Raises:
+            ValueError: q が範囲外の場合
+        """
+        if not 0 <= q <= 100:
+            raise ValueError("パーセンタイルは0以上100以下である必要があります")
+        if not self.count:
+            return 0.0
+        rank = int(q / 100 * (self.count - 1))
+        seen = 0
+        for index in sorted(self._buckets):
+            seen += self._buckets[index]
+            if seen > rank:
+                low, high = _bucket_bounds(index)
+                estimate = (low + high - 1) / 2
+                return float(min(max(estimate, self.min), self.max))
+        return float(self.max)
+
+    def to_dict(self) -> dict[str, Any]:
+        """他のプロセスへ渡せる(JSONに変換できる)辞書にします。"""
+        return {
+            "count": self.count,
+            "total": self.total,
+            "min": self.min,
+            "max": self.max,
+            "buckets": {str(index): count for index, count in self._buckets.items()},
+        }
+
+    @classmethod
+    def from_dict(cls, data: Mapping[str, Any]) -> Histogram:
+        """to_dict() の結果からヒストグラムを復元します。"""
+        histogram = cls()
+        histogram._buckets = {int(index): count for index, count in data["buckets"].items()}
+        histogram.count = data["count"]
+        histogram.total = data["total"]
+        histogram.min = data["min"]
+        histogram.max = data["max"]
+        return histogram
+
+
+@dataclass(slots=True)
+class SpanSummary:
+    """1つのスパンの集計結果(時間はミリ秒)。"""
+
+    name: str
+    count: int
+    total_ms: float
+    max_ms: float
+    # パーセンタイルからミリ秒への辞書
+    percentiles: dict[float, float]
+
+
+class _NullSpan:
+    """計測が無効な場合に span() が返す、何もしないコンテキストマネージャ。"""
+
+    __slots__ = ()
+
+    def __enter__(self) -> None:
+        return None
+
+    def __exit__(self, exc_type: object, exc: object, traceback: object) -> None:
+        return None
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class _Span:
+    """処理時間を計測し、終了時にレジストリへ記録するコンテキストマネージャ。"""
+
+    __slots__ = ("_name", "_registry", "_started")
+
+    def __init__(self, registry: MetricsRegistry, name: str) -> None:
+        self._registry = registry
+        self._name = name
+        self._started = 0
+
+    def __enter__(self) -> None:
+        self._started = perf_counter_ns()
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        self._registry.record(self._name, perf_counter_ns() - self._started)
+
+
+class MetricsRegistry:
+    """名前ごとのヒストグラムとカウンタを保持するレジストリ。スレッドセーフです。"""
+
+    def __init__(self) -> None:
+        self.enabled = False
+        self._histograms: dict[str, Histogram] = {}
+        self._counters: dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def record(self, name: str, value: int) -> None:
+        """名前のヒストグラムに値(スパンの場合はナノ秒)を1件記録します。"""
+        with self._lock:
+            histogram = self._histograms.get(name)
+            if histogram is None:
+                histogram = self._histograms[name] = Histogram()
+            histogram.record(value)
+
+    def increment(self, name: str, value: int = 1) -> None:
+        """計測が有効な場合、名前のカウンタに値を加えます。"""
+        if not self.enabled:
+            return
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + value
+
+    def span(self, name: str) -> _Span | _NullSpan:
+        """
+        with文の処理時間を名前のヒストグラムに記録するコンテキストマネージャを返します。
+
+        計測が無効な場合は何もしない共有のオブジェクトを返します。
+        """
+        return _Span(self, name) if self.enabled else _NULL_SPAN
+
+    def histogram(self, name: str) -> Histogram | None:
+        """名前のヒストグラムを返します。記録がない場合はNoneを返します。"""
+        return self._histograms.get(name)
+
+    def counter(self, name: str) -> int:
+        """名前のカウンタの値を返します。"""
+        return self._counters.get(name, 0)
+
+    def snapshot(self) -> dict[str, Any]:
+        """記録をJSONに変換できる辞書にします。他のプロセスで merge() できます。"""
+        with self._lock:
+            return {
+                "histograms": {name: h.to_dict() for name, h in self._histograms.items()},
+                "counters": dict(self._counters),
+            }
+
+    def merge(self, snapshot: Mapping[str, Any]) -> None:
+        """snapshot() の結果を統合します。"""
+        with self._lock:
+            for name, data in snapshot.get("histograms", {}).items():
+                histogram = self._histograms.get(name)
+                if histogram is None:
+                    histogram = self._histograms[name] = Histogram()
+                histogram.merge(Histogram.from_dict(data))
+            for name, value in snapshot.get("counters", {}).items():
+                self._counters[name] = self._counters.get(name, 0) + value
+
+    def reset(self) -> None:
+        """すべての記録を消去します。"""
+        with self._lock:
+            self._histograms.clear()
+            self._counters.clear()
+
+    def summary(self, percentiles: Iterable[float] = DEFAULT_PERCENTILES) -> list[SpanSummary]:
+        """
+        スパンごとの集計結果を名前順に返します。
+
+        Args:
+            percentiles: 計算するパーセンタイル
+
+        Returns:
+            スパンごとの件数、合計時間、最大時間、パーセンタイル(ミリ秒)
+        """
+        qs = list(percentiles)
+        with self._lock:
+            histograms = sorted(self._histograms.items())
+        return [
+            SpanSummary(
+                name,
+                h.count,
+                h.total / 1e6,
+                h.max / 1e6,
+                {q: h.percentile(q) / 1e6 for q in qs},
+            )
+            for name, h in histograms
+        ]
+
+    def counters(self) -> dict[str, int]:
+        """カウンタの値を名前順の辞書で返します。"""
+        with self._lock:
+            return dict(sorted(self._counters.items()))
+
+
+# アプリケーション全体で使うレジストリ
+_registry = MetricsRegistry()
+
+
+def get_registry() -> MetricsRegistry:
+    """アプリケーション全体で使うレジストリを返します。"""
+    return _registry
+
+
+def enable() -> None:
+    """計測を有効にします。"""
+    _registry.enabled = True
+
+
+def disable() -> None:
+    """計測を無効にします。記録済みの値は残ります。"""
+    _registry.enabled = False
+
+
+def is_enabled() -> bool:
+    """計測が有効かどうかを返します。"""
+    return _registry.enabled
+
+
+def span(name: str) -> _Span | _NullSpan:
+    """
+    with文の処理時間を記録するコンテキストマネージャを返します。
+
+    Examples:
+        >>> with span("item_import.read"):
+        ...     pass
+    """
+    return _Span(_registry, name) if _registry.enabled else _NULL_SPAN
+
+
+def increment(name: str, value: int = 1) -> None:
+    """計測が有効な場合、名前のカウンタに値を加えます。"""
+    _registry.increment(name, value)
+
+
+def timed(name: str | None = None) -> Callable[[Callable[_P, _R]], Callable[_P, _R]]:
+    """
+    関数の処理時間を記録するデコレータを返します。
+
+    Args:
+        name: スパンの名前。省略時は「モジュール名.関数の修飾名」
+
+    Returns:
+        デコレータ
+    """
+
+    def decorate(func: Callable[_P, _R]) -> Callable[_P, _R]:
+        label = name or f"{func.__module__}.{func.__qualname__}"
+        registry = _registry
+
+        @functools.wraps(func)
+        def wrapper(*args: _P.args, **kwargs: _P.kwargs) -> _R:
+            if not registry.enabled:
+                return func(*args, **kwargs)
+            started = perf_counter_ns()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                registry.record(label, perf_counter_ns() - started)
+
+        return wrapper
+
+    return decorate
+
+
+def format_summary(percentiles: Iterable[float] = DEFAULT_PERCENTILES) -> str:
+    """
+    スパンごとのパーセンタイルとカウンタを表形式の文字列にします。
+
+    Args:
+        percentiles: 表示するパーセンタイル
+
+    Returns:
+        1行に1スパン(またはカウンタ)の文字列。記録がない場合は空文字列
+    """
+    qs = list(percentiles)
+    spans = _registry.summary(qs)
+    counters = _registry.counters()
+    lines: list[str] = []
+    if spans:
+        width = max(len(s.name) for s in spans)
+        columns = "".join(f"{f'p{q:g}':>10}" for q in qs)
+        lines.append(f"{'span':<{width}} {'count':>8}{columns}{'max':>10}{'total':>10}  (ms)")
+        for s in spans:
+            values = "".join(f"{s.percentiles[q]:>10.3f}" for q in qs)
+            lines.append(
+                f"{s.name:<{width}} {s.count:>8}{values}{s.max_ms:>10.3f}{s.total_ms:>10.1f}"
+            )
+    if counters:
+        width = max(len(name) for name in counters)
+        lines.append(f"{'counter':<{width}} {'value':>12}")
+        lines.extend(f"{name:<{width}} {value:>12}" for name, value in counters.items())
+    return "\n".join(lines)
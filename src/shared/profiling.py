@@ -0,0 +1,21 @@
+"""
+CPU時間とメモリ確保のプロファイリング。
+
+core層から utils.profiling を利用するための窓口です。
+"""
+
+from utils.profiling import (
+    CpuProfile,
+    MemoryProfile,
+    ModuleAllocation,
+    profile_cpu,
+    profile_memory,
+)
+
+__all__ = [
+    "CpuProfile",
+    "MemoryProfile",
+    "ModuleAllocation",
+    "profile_cpu",
+    "profile_memory",
+]
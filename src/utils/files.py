@@ -0,0 +1,97 @@
+"""
+ファイルを不可分に置き換える書き込み。
+
+atomic_output() は同じディレクトリの一時ファイルに書き込み、with文を正常に抜けたときに
+fsync してから os.replace で置き換え、ディレクトリも fsync して置き換えを確定します。
+途中で例外が発生したりプロセスが中断したりしても、置き換え先のファイルは以前の内容の
+まま残り、書きかけの内容が見えることはありません。ファイルのパーミッションは、
+既存のファイルがあればそれを引き継ぎ、なければ open() で作成した場合と同じく
+umask に従います。
+
+Examples:
+    >>> import tempfile, os
+    >>> path = os.path.join(tempfile.mkdtemp(), "data.bin")
+    >>> with atomic_output(path) as file:
+    ...     _ = file.write(b"data")
+    >>> open(path, "rb").read()
+    b'data'
+"""
+
+from __future__ import annotations
+
+import functools
+import os
+import stat
+import tempfile
+from collections.abc import Iterator
+from contextlib import contextmanager, suppress
+from os import PathLike
+from typing import BinaryIO
+
+
+@functools.cache
+def _umask() -> int:
+    # umask は設定しないと取得できないため、最初の1回だけ取得して元に戻す
+    mask = os.umask(0)
+    os.umask(mask)
+    return mask
+
+
+def _file_mode(path: str | PathLike[str]) -> int:
+    """置き換えたファイルに設定するパーミッションを返します。"""
+    try:
+        return stat.S_IMODE(os.stat(path).st_mode)
+    except FileNotFoundError:
+        return 0o666 & ~_umask()
+
+
+def _fsync_directory(directory: str) -> None:
+    """ディレクトリのエントリの変更(ファイルの置き換え)をディスクに書き込みます。"""
+    if os.name != "posix":
+        # Windowsではディレクトリを開いて fsync できない
+        return
+    fd = os.open(directory, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+@contextmanager
+def atomic_output(path: str | PathLike[str]) -> Iterator[BinaryIO]:
+    """
+    ファイルの内容を不可分に置き換えるための、書き込み用のバイナリストリームを返します。
+
+    with文の中で例外が発生した場合は一時ファイルを削除し、置き換え先は変更しません。
+
+    Args:
+        path: 置き換えるファイルのパス
+
+    Yields:
+        一時ファイルのバイナリストリーム(シークも可能)
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, temporary = tempfile.mkstemp(prefix=".tmp-", dir=directory)
+    try:
+        with os.fdopen(fd, "w+b") as file:
+            yield file
+            file.flush()
+            os.fsync(file.fileno())
+        # mkstemp は所有者だけが読み書きできる 0600 で作成するため、置き換える前に戻す
+        os.chmod(temporary, _file_mode(path))
+        os.replace(temporary, path)
+        _fsync_directory(directory)
+    except BaseException:
+        with suppress(OSError):
+            os.unlink(temporary)
+        raise
+
+
+def write_atomic(path: str | PathLike[str], data: bytes) -> None:
+    """
+    ファイルの内容を不可分に置き換えます。
+
+    読み手からは置き換え前か置き換え後の内容のどちらかしか見えません。
+    """
+    with atomic_output(path) as file:
+        file.write(data)
@@ -0,0 +1,216 @@
+"""
+CPU時間とメモリ確保のプロファイリング。
+
+profile_cpu() は with文の区間を cProfile で計測し、結果を pstats 形式で書き出します。
+profile_memory() は区間を tracemalloc で計測し、ピークのメモリ使用量と、区間の
+終了時点で確保されているメモリの多いモジュールを報告します。
+
+どちらも名前を付けた任意の区間に使えるため、CLI全体だけでなくパイプラインや
+サービスの一部の処理だけを計測できます。
+
+Examples:
+    >>> with profile_memory("build") as report:
+    ...     data = [bytes(1024) for _ in range(100)]
+    >>> report.peak >= 100 * 1024
+    True
+"""
+
+from __future__ import annotations
+
+import cProfile
+import io
+import os
+import pstats
+import sys
+import tracemalloc
+from collections.abc import Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from os import PathLike
+
+# 報告するモジュール数の既定値
+DEFAULT_TOP = 10
+
+# 計測の仕組み自体(profile_cpu() と同時に使う場合のcProfileを含む)によるメモリ確保は報告から除く
+_MEMORY_FILTERS = (
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, cProfile.__file__),
+    tracemalloc.Filter(False, pstats.__file__),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+    tracemalloc.Filter(False, "<unknown>"),
+)
+
+# 計測中の profile_memory() の区間ごとに、内側の区間の reset_peak() で失われたピークの最大値
+_peak_floors: list[int] = []
+
+
+@dataclass(slots=True)
+class CpuProfile:
+    """profile_cpu() の結果。"""
+
+    name: str
+    # pstats形式で書き出したファイルのパス(書き出していない場合はNone)
+    path: str | None = None
+    stats: pstats.Stats | None = None
+
+    def format(self, limit: int = 20, sort: str = "cumulative") -> str:
+        """
+        処理時間の多い関数を表形式の文字列にします。
+
+        Args:
+            limit: 表示する関数の数
+            sort: 並べ替えの基準(pstats.Stats.sort_stats に渡す値)
+
+        Returns:
+            pstatsの表。計測が終わっていない場合は空文字列
+        """
+        if self.stats is None:
+            return ""
+        output = io.StringIO()
+        self.stats.stream = output  # type: ignore[attr-defined]
+        self.stats.sort_stats(sort).print_stats(limit)
+        return output.getvalue()
+
+
+@dataclass(slots=True)
+class ModuleAllocation:
+    """1モジュール分のメモリ確保の集計。"""
+
+    module: str
+    size: int
+    count: int
+
+
+@dataclass(slots=True)
+class MemoryProfile:
+    """profile_memory() の結果(大きさはバイト)。"""
+
+    name: str
+    peak: int = 0
+    # 区間の開始時点から増えたメモリ(区間の終了時点)
+    current: int = 0
+    # current の内訳(大きい順)
+    modules: list[ModuleAllocation] = field(default_factory=list)
+
+    def format(self) -> str:
+        """ピークのメモリ使用量とモジュールごとの内訳を文字列にします。"""
+        lines = [
+            f"{self.name}: ピーク {_format_size(self.peak)}, 終了時点 {_format_size(self.current)}"
+        ]
+        if self.modules:
+            width = max(len(m.module) for m in self.modules)
+            lines.extend(
+                f"  {m.module:<{width}} {_format_size(m.size):>10} {m.count:>8}件"
+                for m in self.modules
+            )
+        return "\n".join(lines)
+
+
+def _format_size(size: int) -> str:
+    value = float(size)
+    for unit in ("B", "KiB", "MiB"):
+        if abs(value) < 1024:
+            return f"{value:.1f} {unit}"
+        value /= 1024
+    return f"{value:.1f} GiB"
+
+
+@contextmanager
+def profile_cpu(
+    path: str | PathLike[str] | None = None, name: str = "profile"
+) -> Iterator[CpuProfile]:
+    """
+    with文の区間を cProfile で計測します。
+
+    cProfile は同時に1つしか有効にできないため、入れ子にはできません。
+
+    Args:
+        path: 結果を pstats 形式で書き出すファイルのパス。Noneの場合は書き出さない
+        name: 区間の名前
+
+    Yields:
+        区間の終了時に結果が設定される CpuProfile
+    """
+    result = CpuProfile(name, os.fspath(path) if path is not None else None)
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        yield result
+    finally:
+        profiler.disable()
+        result.stats = pstats.Stats(profiler)
+        if result.path is not None:
+            result.stats.dump_stats(result.path)
+
+
+@contextmanager
+def profile_memory(
+    name: str = "profile", top: int = DEFAULT_TOP, frames: int = 1
+) -> Iterator[MemoryProfile]:
+    """
+    with文の区間のメモリ確保を tracemalloc で計測します。
+
+    すでに tracemalloc が有効な場合はそのまま使い、区間の終了後も有効なままにします。
+    入れ子にした場合も、外側の区間のピークには内側の区間のピークが含まれます。
+
+    Args:
+        name: 区間の名前
+        top: 報告するモジュールの数
+        frames: 確保した場所として記録するスタックの深さ
+
+    Yields:
+        区間の終了時に結果が設定される MemoryProfile
+    """
+    result = MemoryProfile(name)
+    started = not tracemalloc.is_tracing()
+    if started:
+        tracemalloc.start(frames)
+    elif _peak_floors:
+        # reset_peak() で外側の区間のピークが失われるため、ここまでの値を残しておく
+        _peak_floors[-1] = max(_peak_floors[-1], tracemalloc.get_traced_memory()[1])
+    # スナップショット自体のメモリを計測に含めないよう、計測値の前後で取得する
+    before = tracemalloc.take_snapshot().filter_traces(_MEMORY_FILTERS)
+    tracemalloc.reset_peak()
+    _peak_floors.append(0)
+    baseline = tracemalloc.get_traced_memory()[0]
+    try:
+        yield result
+    finally:
+        current, peak = tracemalloc.get_traced_memory()
+        after = tracemalloc.take_snapshot().filter_traces(_MEMORY_FILTERS)
+        peak = max(peak, _peak_floors.pop())
+        if _peak_floors:
+            _peak_floors[-1] = max(_peak_floors[-1], peak)
+        if started:
+            tracemalloc.stop()
+        result.peak = max(peak - baseline, 0)
+        result.current = current - baseline
+        result.modules = _group_by_module(after.compare_to(before, "filename"))[:top]
+
+
+def _module_names() -> dict[str, str]:
+    """読み込み済みのモジュールのファイルパスからモジュール名への辞書を作成します。"""
+    names: dict[str, str] = {}
+    for module_name, module in list(sys.modules.items()):
+        filename = getattr(module, "__file__", None)
+        if isinstance(filename, str):
+            names[filename] = module_name
+    return names
+
+
+def _group_by_module(differences: list[tracemalloc.StatisticDiff]) -> list[ModuleAllocation]:
+    """ファイルごとの増加量を、モジュール名ごとの集計にまとめます(大きい順)。"""
+    names = _module_names()
+    grouped: dict[str, ModuleAllocation] = {}
+    for difference in differences:
+        if difference.size_diff <= 0:
+            continue
+        filename = difference.traceback[0].filename
+        module = names.get(filename, filename)
+        entry = grouped.get(module)
+        if entry is None:
+            entry = grouped[module] = ModuleAllocation(module, 0, 0)
+        entry.size += difference.size_diff
+        entry.count += difference.count_diff
+    return sorted(grouped.values(), key=lambda m: m.size, reverse=True)
@@ -0,0 +1,305 @@
+"""
+ベンチマークスイートの共通処理。
+
+各ベンチマークは `benchmark` フィクスチャで1操作あたりの時間とピークメモリ
+(tracemalloc)を計測します。データセットは乱数シードを固定して合成するため、
+どの環境でも同じ入力になります。
+
+    pytest tests/benchmarks                      # 計測して結果を表示する
+    pytest tests/benchmarks --benchmark-save     # 結果をベースラインに保存する
+    pytest tests/benchmarks --benchmark-compare  # ベースラインより悪化したら失敗する
+"""
+
+from __future__ import annotations
+
+import gc
+import json
+import platform
+import random
+import time
+import tracemalloc
+from collections.abc import Callable
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any
+
+import pytest
+
+BASELINE_VERSION = 1
+# この値以下のピークメモリの差は誤差として扱う(バイト)
+MEMORY_ABSOLUTE_TOLERANCE = 4096
+# 時間を計測する最大の回数
+MAX_REPEAT = 50
+SEED = 20240501
+
+
+@dataclass(slots=True)
+class BenchmarkResult:
+    """1つのベンチマークの計測結果。"""
+
+    seconds_per_op: float
+    peak_bytes: int
+    ops: int
+
+
+class BenchmarkSession:
+    """計測結果を集め、ベースラインとの比較と保存を行う。"""
+
+    def __init__(self, config: pytest.Config) -> None:
+        self.baseline_path: Path = config.getoption("--benchmark-baseline")
+        self.save = bool(config.getoption("--benchmark-save"))
+        self.compare = bool(config.getoption("--benchmark-compare"))
+        self.time_threshold: float = config.getoption("--benchmark-time-threshold")
+        self.memory_threshold: float = config.getoption("--benchmark-memory-threshold")
+        self.results: dict[str, BenchmarkResult] = {}
+        self.baseline = self._load_baseline()
+
+    def _load_baseline(self) -> dict[str, dict[str, Any]]:
+        if not self.baseline_path.exists():
+            return {}
+        data = json.loads(self.baseline_path.read_text(encoding="utf-8"))
+        if data.get("version") != BASELINE_VERSION:
+            raise pytest.UsageError(f"未対応のベースラインです: {self.baseline_path}")
+        return dict(data["benchmarks"])
+
+    def regressions(self, name: str, result: BenchmarkResult) -> list[str]:
+        """ベースラインに対してしきい値を超えて悪化した指標を返します。"""
+        baseline = self.baseline.get(name)
+        if baseline is None:
+            return []
+        problems = []
+        limit = baseline["seconds_per_op"] * (1 + self.time_threshold)
+        if result.seconds_per_op > limit:
+            problems.append(
+                f"{name}: seconds_per_op {result.seconds_per_op:.3e} > "
+                f"{baseline['seconds_per_op']:.3e} (+{self.time_threshold:.0%})"
+            )
+        memory_limit = max(
+            baseline["peak_bytes"] * (1 + self.memory_threshold),
+            baseline["peak_bytes"] + MEMORY_ABSOLUTE_TOLERANCE,
+        )
+        if result.peak_bytes > memory_limit:
+            problems.append(
+                f"{name}: peak_bytes {result.peak_bytes:,} > "
+                f"{baseline['peak_bytes']:,} (+{self.memory_threshold:.0%})"
+            )
+        return problems
+
+    def record(self, name: str, result: BenchmarkResult) -> None:
+        """計測結果を記録し、比較モードでは悪化した場合にテストを失敗させます。"""
+        self.results[name] = result
+        if not self.compare:
+            return
+        if name not in self.baseline:
+            pytest.skip(f"{name} のベースラインがありません")
+        if problems := self.regressions(name, result):
+            pytest.fail("ベースラインより悪化しました:\n" + "\n".join(problems), pytrace=False)
+
+    def write_baseline(self) -> None:
+        """計測したベンチマークの結果で、ベースラインを更新します。"""
+        benchmarks = {**self.baseline, **{k: asdict(v) for k, v in self.results.items()}}
+        data = {
+            "version": BASELINE_VERSION,
+            "python": platform.python_version(),
+            "platform": platform.platform(terse=True),
+            "benchmarks": dict(sorted(benchmarks.items())),
+        }
+        self.baseline_path.write_text(
+            json.dumps(data, indent=2, ensure_ascii=False) + "\n", encoding="utf-8"
+        )
+
+
+def measure(
+    func: Callable[[], object], ops: int, repeat: int = 5, min_time: float = 0.2
+) -> BenchmarkResult:
+    """
+    関数の1操作あたりの時間とピークメモリを計測します。
+
+    時間はGCを止めた状態で、少なくとも repeat 回かつ合計 min_time 秒以上
+    (最大 MAX_REPEAT 回)実行した最良値を ops で割った値です。
+    ピークメモリは別の1回の実行を tracemalloc で計測した値です。
+
+    Args:
+        func: 1回の呼び出しで ops 回の操作を行う関数
+        ops: 1回の呼び出しに含まれる操作数
+        repeat: 時間を計測する最小の回数
+        min_time: 時間の計測に使う最小の合計時間(秒)
+    """
+    func()  # ウォームアップ(遅延読み込みやキャッシュの初期化を計測から外す)
+    gc.collect()
+    gc_was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        best = float("inf")
+        total = 0.0
+        runs = 0
+        while runs < MAX_REPEAT and (runs < repeat or total < min_time):
+            started = time.perf_counter()
+            func()
+            elapsed = time.perf_counter() - started
+            best = min(best, elapsed)
+            total += elapsed
+            runs += 1
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+
+    gc.collect()
+    tracemalloc.start()
+    try:
+        func()
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return BenchmarkResult(seconds_per_op=best / ops, peak_bytes=peak, ops=ops)
+
+
+_SESSION_KEY = pytest.StashKey[BenchmarkSession]()
+
+
+def pytest_configure(config: pytest.Config) -> None:
+    config.stash[_SESSION_KEY] = BenchmarkSession(config)
+
+
+def pytest_sessionfinish(session: pytest.Session) -> None:
+    bench = session.config.stash.get(_SESSION_KEY, None)
+    if bench is not None and bench.save and bench.results:
+        bench.write_baseline()
+
+
+def pytest_terminal_summary(terminalreporter: Any, config: pytest.Config) -> None:
+    bench = config.stash.get(_SESSION_KEY, None)
+    if bench is None or not bench.results:
+        return
+    terminalreporter.section("benchmarks")
+    for name, result in sorted(bench.results.items()):
+        baseline = bench.baseline.get(name)
+        change = ""
+        if baseline:
+            ratio = result.seconds_per_op / baseline["seconds_per_op"] - 1
+            change = f" ({ratio:+.0%} vs baseline)"
+        terminalreporter.write_line(
+            f"{name:<36} {result.seconds_per_op * 1e6:>12.3f} us/op"
+            f" {result.peak_bytes / 1024:>10.1f} KiB peak{change}"
+        )
+    if bench.save:
+        terminalreporter.write_line(f"ベースラインを保存しました: {bench.baseline_path}")
+
+
+@pytest.fixture
+def benchmark(request: pytest.FixtureRequest) -> Callable[..., BenchmarkResult]:
+    """
+    関数を計測して結果を記録する関数を返すフィクスチャ。
+
+    名前を省略した場合はテスト名を使います。
+    """
+    bench = request.config.stash[_SESSION_KEY]
+
+    def run(
+        func: Callable[[], object], ops: int, repeat: int = 5, name: str | None = None
+    ) -> BenchmarkResult:
+        result = measure(func, ops, repeat)
+        bench.record(name or request.node.name.removeprefix("test_"), result)
+        return result
+
+    return run
+
+
+@pytest.fixture
+def record_benchmark(request: pytest.FixtureRequest) -> Callable[..., None]:
+    """
+    独自の方法で計測した結果を記録する関数を返すフィクスチャ。
+
+    返される関数は name, seconds_per_op, peak_bytes, ops(省略時は1)を受け取ります。
+    """
+    bench = request.config.stash[_SESSION_KEY]
+
+    def record(name: str, seconds_per_op: float, peak_bytes: int, ops: int = 1) -> None:
+        bench.record(name, BenchmarkResult(seconds_per_op, peak_bytes, ops))
+
+    return record
+
+
+def _rng() -> random.Random:
+    return random.Random(SEED)
+
+
+@pytest.fixture(scope="session")
+def item_records() -> list[dict[str, Any]]:
+    """create_item / create_items 用の商品レコード(10,000件)。"""
+    rng = _rng()
+    return [
+        {
+            "id": i,
+            "name": f"item-{rng.randrange(1_000_000)}",
+            "price": round(rng.uniform(1, 10_000), 2),
+            "description": None if rng.random() < 0.3 else f"description {i}",
+        }
+        for i in range(10_000)
+    ]
+
+
+@pytest.fixture(scope="session")
+def dirty_item_records() -> list[dict[str, Any]]:
+    """30%が不正な商品レコード(10,000件)。不正な行は5種類の誤りが同じ割合で混在します。"""
+    rng = _rng()
+    records: list[dict[str, Any]] = []
+    for i in range(10_000):
+        record: dict[str, Any] = {
+            "id": i,
+            "name": f"item-{i}",
+            "price": round(rng.uniform(1, 10_000), 2),
+            "description": None,
+        }
+        if rng.random() < 0.3:
+            kind = rng.randrange(5)
+            if kind == 0:
+                record["price"] = -record["price"]
+            elif kind == 1:
+                record["name"] = ""
+            elif kind == 2:
+                record["price"] = rng.choice(["N/A", "", "abc"])
+            elif kind == 3:
+                record["id"] = rng.choice([None, "x-1"])
+            else:
+                del record["name"]
+        records.append(record)
+    return records
+
+
+@pytest.fixture(scope="session")
+def log_messages() -> list[str]:
+    """機密情報を含むものと含まないものが混在したログメッセージ(10,000件)。"""
+    rng = _rng()
+    templates = [
+        "Request handled in {n}ms",
+        "GET /api/v1/items/{n} 200 OK",
+        "worker-{n} finished batch",
+        "User user{n}@example.com logged in",
+        "Using key sk-{n:016d}abcdef for upstream",
+        "Processing request 123e4567-e89b-12d3-a456-{n:012d}",
+    ]
+    return [rng.choice(templates).format(n=rng.randint(0, 59)) for _ in range(10_000)]
+
+
+@pytest.fixture(scope="session")
+def nested_payload() -> dict[str, Any]:
+    """ネストした辞書とリストからなる、ユーザー1,000件分のJSON相当のドキュメント。"""
+    rng = _rng()
+    return {
+        "meta": {"generated_by": "benchmark", "token": "t-123"},
+        "users": [
+            {
+                "id": i,
+                "name": f"user{i}",
+                "email": f"user{i}@example.com",
+                "password": "hunter2",
+                "address": {"city": "Tokyo", "phone": "090-0000-0000"},
+                "orders": [
+                    {"order_id": i * 10 + j, "amount": rng.random() * 100, "card_number": "4111"}
+                    for j in range(rng.randint(0, 3))
+                ],
+            }
+            for i in range(1_000)
+        ],
+    }
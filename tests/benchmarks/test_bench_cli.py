@@ -0,0 +1,40 @@
+import os
+import subprocess
+import sys
+from collections.abc import Callable
+from pathlib import Path
+
+import pytest
+
+pytestmark = pytest.mark.benchmark
+
+SRC_DIR = Path(__file__).resolve().parents[2] / "src"
+_MEASURE_IMPORT = """
+import sys, time, tracemalloc
+if sys.argv[1] == "memory":
+    tracemalloc.start()
+started = time.perf_counter()
+import core.cli
+elapsed = time.perf_counter() - started
+print(tracemalloc.get_traced_memory()[1] if sys.argv[1] == "memory" else elapsed)
+"""
+
+
+def _run_child(mode: str) -> float:
+    env = os.environ.copy()
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [str(SRC_DIR), env.get("PYTHONPATH")]))
+    result = subprocess.run(
+        [sys.executable, "-c", _MEASURE_IMPORT, mode],
+        capture_output=True,
+        text=True,
+        env=env,
+        check=True,
+    )
+    return float(result.stdout)
+
+
+def test_cli_startup(record_benchmark: Callable[..., None]) -> None:
+    """新しいプロセスで core.cli を読み込む時間(5回の最良値)とピークメモリ。"""
+    seconds = min(_run_child("time") for _ in range(5))
+    peak = int(_run_child("memory"))
+    record_benchmark("cli_startup", seconds_per_op=seconds, peak_bytes=peak)
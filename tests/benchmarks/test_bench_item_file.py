@@ -0,0 +1,66 @@
+from collections.abc import Callable, Iterator
+from pathlib import Path
+from typing import Any
+
+import pytest
+
+from core.services.item_service import create_items
+from domain.models.item import Item
+from domain.models.item_file import ItemFile, write_item_file
+from domain.models.item_store import ItemStore
+
+pytestmark = pytest.mark.benchmark
+
+
+@pytest.fixture(scope="module")
+def items(item_records: list[dict[str, Any]]) -> list[Item]:
+    return create_items(item_records).items
+
+
+@pytest.fixture(scope="module")
+def item_path(items: list[Item], tmp_path_factory: pytest.TempPathFactory) -> Path:
+    path = tmp_path_factory.mktemp("bench") / "items.items"
+    write_item_file(path, items)
+    return path
+
+
+@pytest.fixture(params=[False, True], ids=["validated", "trusted"])
+def item_file(request: pytest.FixtureRequest, item_path: Path) -> Iterator[ItemFile]:
+    with ItemFile(item_path, trusted=request.param) as opened:
+        yield opened
+
+
+def test_item_file_items(benchmark: Callable[..., Any], item_file: ItemFile) -> None:
+    """ItemFile.items() でまとめて組み立てる場合の1件あたりの時間とメモリ(検証あり/なし)。"""
+    mode = "trusted" if item_file.trusted else "validated"
+    benchmark(item_file.items, ops=len(item_file), name=f"item_file_items_{mode}")
+
+
+def test_item_file_item(benchmark: Callable[..., Any], item_file: ItemFile) -> None:
+    """ItemFile.item() で1件ずつ組み立てる場合の1件あたりの時間とメモリ(検証あり/なし)。"""
+    mode = "trusted" if item_file.trusted else "validated"
+    count = len(item_file)
+    benchmark(
+        lambda: [item_file.item(i) for i in range(count)],
+        ops=count,
+        name=f"item_file_item_{mode}",
+    )
+
+
+def test_item_store_to_items(benchmark: Callable[..., Any], items: list[Item]) -> None:
+    """ItemStore.to_items() で検証せずに組み立てる場合の1件あたりの時間とメモリ。"""
+    store = ItemStore.from_items(items)
+    benchmark(store.to_items, ops=len(store))
+
+
+def test_item_store_to_items_validated(benchmark: Callable[..., Any], items: list[Item]) -> None:
+    """ItemStoreの列から1件ずつ Item(...) で検証して組み立てる場合(比較用)。"""
+    store = ItemStore.from_items(items)
+
+    def run() -> list[Item]:
+        return [
+            Item(id=view.id, name=view.name, price=view.price, description=view.description)
+            for view in store
+        ]
+
+    benchmark(run, ops=len(store))
@@ -0,0 +1,48 @@
+import io
+import json
+from collections.abc import Callable
+from typing import Any
+
+import pytest
+
+from core.services.item_service import create_items
+from domain.models.item import Item
+from domain.models.item_json import items_to_json, items_to_ndjson, write_ndjson
+
+pytestmark = pytest.mark.benchmark
+
+
+@pytest.fixture(scope="module")
+def items(item_records: list[dict[str, Any]]) -> list[Item]:
+    return create_items(item_records).items
+
+
+def test_ndjson_model_dump_json_dumps(benchmark: Callable[..., Any], items: list[Item]) -> None:
+    """1件ずつ model_dump() と json.dumps() でNDJSONにする場合の1件あたりの時間とメモリ。"""
+    benchmark(
+        lambda: b"".join(json.dumps(item.model_dump()).encode() + b"\n" for item in items),
+        ops=len(items),
+    )
+
+
+def test_ndjson_model_dump_json(benchmark: Callable[..., Any], items: list[Item]) -> None:
+    """1件ずつ model_dump_json() でNDJSONにする場合の1件あたりの時間とメモリ。"""
+    benchmark(
+        lambda: b"".join(item.model_dump_json().encode() + b"\n" for item in items),
+        ops=len(items),
+    )
+
+
+def test_items_to_ndjson(benchmark: Callable[..., Any], items: list[Item]) -> None:
+    """items_to_ndjson() でまとめてNDJSONにする場合の1件あたりの時間とメモリ。"""
+    benchmark(lambda: items_to_ndjson(items), ops=len(items))
+
+
+def test_items_to_json(benchmark: Callable[..., Any], items: list[Item]) -> None:
+    """items_to_json() でまとめてJSON配列にする場合の1件あたりの時間とメモリ。"""
+    benchmark(lambda: items_to_json(items), ops=len(items))
+
+
+def test_write_ndjson_stream(benchmark: Callable[..., Any], items: list[Item]) -> None:
+    """write_ndjson() で1,000件ずつストリームに書き出す場合の1件あたりの時間とメモリ。"""
+    benchmark(lambda: write_ndjson(io.BytesIO(), items, chunk_size=1_000), ops=len(items))
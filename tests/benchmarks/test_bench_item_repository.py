@@ -0,0 +1,58 @@
+import random
+from collections.abc import Callable
+from typing import Any
+
+import pytest
+
+from core.services.item_repository import ItemRepository
+from core.services.item_service import create_items
+from domain.models.item import Item
+
+pytestmark = pytest.mark.benchmark
+
+SIZE = 100_000
+OPERATIONS = 5_000
+
+
+@pytest.fixture(scope="module")
+def items() -> list[Item]:
+    rng = random.Random(7)
+    return create_items(
+        {
+            "id": range(SIZE + OPERATIONS),
+            "name": [f"item-{i}" for i in range(SIZE + OPERATIONS)],
+            "price": [round(rng.uniform(1, 100_000), 2) for _ in range(SIZE + OPERATIONS)],
+        }
+    ).items
+
+
+def test_item_repository_extend(benchmark: Callable[..., Any], items: list[Item]) -> None:
+    """空のリポジトリへの一括登録の1件あたりの時間とメモリ。"""
+    benchmark(lambda: ItemRepository().extend(items[:SIZE]), ops=SIZE, repeat=3)
+
+
+def test_item_repository_add_remove(benchmark: Callable[..., Any], items: list[Item]) -> None:
+    """索引を更新しながらの挿入と削除の1組あたりの時間とメモリ。"""
+    repository = ItemRepository()
+    repository.extend(items[:SIZE])
+    extra = items[SIZE:]
+
+    def run() -> None:
+        for item in extra:
+            repository.add(item)
+        for item in extra:
+            repository.remove(item.id)
+
+    benchmark(run, ops=OPERATIONS)
+
+
+def test_item_repository_range_query(benchmark: Callable[..., Any], items: list[Item]) -> None:
+    """価格の範囲検索(上限100件)の1回あたりの時間とメモリ。"""
+    repository = ItemRepository()
+    repository.extend(items[:SIZE])
+    rng = random.Random(11)
+    ranges = [sorted(rng.uniform(1, 100_000) for _ in range(2)) for _ in range(1_000)]
+    benchmark(
+        lambda: [repository.find_by_price(low, high, limit=100) for low, high in ranges],
+        ops=len(ranges),
+    )
@@ -0,0 +1,52 @@
+from collections.abc import Callable
+from typing import Any
+
+import pytest
+
+from core.services.item_service import create_item, create_items
+
+pytestmark = pytest.mark.benchmark
+
+
+def test_create_item(benchmark: Callable[..., Any], item_records: list[dict[str, Any]]) -> None:
+    """create_item を1件ずつ呼び出す場合の1件あたりの時間とメモリ。"""
+    records = item_records[:2_000]
+
+    def run() -> list[Any]:
+        return [create_item(r["id"], r["name"], r["price"], r["description"]) for r in records]
+
+    benchmark(run, ops=len(records))
+
+
+def test_create_items(benchmark: Callable[..., Any], item_records: list[dict[str, Any]]) -> None:
+    """create_items で一括作成する場合の1件あたりの時間とメモリ。"""
+    result = benchmark(lambda: create_items(item_records), ops=len(item_records))
+    assert result.seconds_per_op > 0
+
+
+def test_create_item_dirty(
+    benchmark: Callable[..., Any], dirty_item_records: list[dict[str, Any]]
+) -> None:
+    """30%が不正な入力で、create_item を1件ずつ呼び出して例外を捕捉する場合。"""
+    records = dirty_item_records[:2_000]
+
+    def run() -> list[Any]:
+        items = []
+        for r in records:
+            try:
+                items.append(create_item(r["id"], r.get("name", ""), r["price"], r["description"]))
+            except (ValueError, TypeError):  # noqa: PERF203
+                pass
+        return items
+
+    benchmark(run, ops=len(records))
+
+
+def test_create_items_dirty(
+    benchmark: Callable[..., Any], dirty_item_records: list[dict[str, Any]]
+) -> None:
+    """30%が不正な入力で、create_items が拒否理由を例外なしで記録する場合。"""
+    result = create_items(dirty_item_records)
+    assert 0.25 < len({r.row for r in result.rejections}) / len(dirty_item_records) < 0.35
+    assert result.to_error() is not None
+    benchmark(lambda: create_items(dirty_item_records), ops=len(dirty_item_records))
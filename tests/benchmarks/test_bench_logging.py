@@ -0,0 +1,68 @@
+import logging
+from collections.abc import Callable, Iterator
+from typing import Any
+
+import pytest
+
+import config
+from shared.logging import setup_logging, shutdown_logging
+
+pytestmark = pytest.mark.benchmark
+
+
+@pytest.fixture(autouse=True)
+def _restore_root_logger() -> Iterator[None]:
+    root = logging.getLogger()
+    handlers, level = list(root.handlers), root.level
+    yield
+    shutdown_logging()
+    root.handlers = handlers
+    root.setLevel(level)
+
+
+def test_setup_logging(benchmark: Callable[..., Any]) -> None:
+    """setup_logging(rich形式)の1回あたりの時間とメモリ。"""
+    calls = 20
+
+    def run() -> None:
+        for _ in range(calls):
+            setup_logging()
+
+    benchmark(run, ops=calls)
+
+
+def test_log_call_json_mode(
+    benchmark: Callable[..., Any], monkeypatch: pytest.MonkeyPatch, log_messages: list[str]
+) -> None:
+    """json形式で、呼び出し元がログ1件を出力するのにかかる時間とメモリ。"""
+    json_settings = config.get_settings().model_copy(update={"LOG_FORMAT": "json"})
+    monkeypatch.setattr(config, "get_settings", lambda: json_settings)
+    setup_logging()
+    logger = logging.getLogger("benchmark.json")
+    messages = log_messages[:2_000]
+
+    def run() -> None:
+        for message in messages:
+            logger.warning("event: %s", message)
+
+    benchmark(run, ops=len(messages))
+
+
+def test_log_storm_with_dedup(
+    benchmark: Callable[..., Any], monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """同じ例外のログを LOG_DEDUP_INTERVAL でまとめたときの、1件あたりの時間とメモリ。"""
+    dedup_settings = config.get_settings().model_copy(
+        update={"LOG_FORMAT": "json", "LOG_DEDUP_INTERVAL": 60.0}
+    )
+    monkeypatch.setattr(config, "get_settings", lambda: dedup_settings)
+    setup_logging()
+    logger = logging.getLogger("benchmark.storm")
+    error = ConnectionError("upstream unavailable")
+    calls = 2_000
+
+    def run() -> None:
+        for _ in range(calls):
+            logger.error("依存先への接続に失敗しました: %s", "upstream", exc_info=error)
+
+    benchmark(run, ops=calls)
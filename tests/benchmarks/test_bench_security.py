@@ -0,0 +1,72 @@
+import json
+import random
+import string
+from collections.abc import Callable
+from typing import Any
+
+import pytest
+
+from shared.security import (
+    are_safe_filenames,
+    is_safe_filename,
+    iter_masked_json,
+    mask_sensitive_data,
+    sanitize_log_message,
+)
+
+pytestmark = pytest.mark.benchmark
+
+
+def test_sanitize_log_message(benchmark: Callable[..., Any], log_messages: list[str]) -> None:
+    """sanitize_log_message のメッセージ1件あたりの時間とメモリ。"""
+    benchmark(lambda: [sanitize_log_message(m) for m in log_messages], ops=len(log_messages))
+
+
+def test_mask_sensitive_data(benchmark: Callable[..., Any], nested_payload: dict[str, Any]) -> None:
+    """ネストしたドキュメントに対する mask_sensitive_data のユーザー1件あたりの時間とメモリ。"""
+    benchmark(lambda: mask_sensitive_data(nested_payload), ops=len(nested_payload["users"]))
+
+
+def test_iter_masked_json(benchmark: Callable[..., Any], nested_payload: dict[str, Any]) -> None:
+    """JSONテキストをストリーミングでマスクする場合のユーザー1件あたりの時間とメモリ。"""
+    text = json.dumps(nested_payload)
+    chunks = [text[i : i + 16_384] for i in range(0, len(text), 16_384)]
+    benchmark(
+        lambda: sum(len(c) for c in iter_masked_json(chunks)), ops=len(nested_payload["users"])
+    )
+
+
+def test_iter_masked_json_long_string(benchmark: Callable[..., Any]) -> None:
+    """多数の断片にまたがる長い文字列(2MB)をマスクする場合の、断片1つあたりの時間とメモリ。"""
+    text = json.dumps({"token": "x" * 2_000_000, "note": "y" * 2_000_000, "id": 1})
+    chunks = [text[i : i + 16_384] for i in range(0, len(text), 16_384)]
+    benchmark(lambda: sum(len(c) for c in iter_masked_json(chunks)), ops=len(chunks))
+
+
+@pytest.fixture(scope="module")
+def filenames() -> list[str]:
+    """アップロードされたファイル名を模した10万件(約8%が安全でない名前)。"""
+    rng = random.Random(42)
+    alphabet = string.ascii_letters + string.digits + "._- "
+    names = []
+    for _ in range(100_000):
+        name = "".join(rng.choice(alphabet) for _ in range(rng.randint(1, 30)))
+        r = rng.random()
+        if r < 0.05:
+            name += rng.choice('/\\<>:"|?*')
+        elif r < 0.07:
+            name = "../" + name
+        elif r < 0.08:
+            name = rng.choice(["con", "Com1", "lpt9", "nul"])
+        names.append(name)
+    return names
+
+
+def test_is_safe_filename(benchmark: Callable[..., Any], filenames: list[str]) -> None:
+    """is_safe_filename のファイル名1件あたりの時間とメモリ。"""
+    benchmark(lambda: [is_safe_filename(name) for name in filenames], ops=len(filenames))
+
+
+def test_are_safe_filenames(benchmark: Callable[..., Any], filenames: list[str]) -> None:
+    """are_safe_filenames でまとめて検証する場合のファイル名1件あたりの時間とメモリ。"""
+    benchmark(lambda: are_safe_filenames(filenames), ops=len(filenames))
@@ -0,0 +1,136 @@
+import importlib
+import logging
+from collections.abc import Iterator
+from pathlib import Path
+
+import pytest
+from pydantic import ValidationError
+
+import config
+from config import Settings, get_settings, reload_settings
+
+settings_module = importlib.import_module("config._settings")
+
+
+class _FakeClock:
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def env_dir(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Iterator[Path]:
+    """作業ディレクトリを一時ディレクトリに移し、時計を固定して設定を読み込み直す。"""
+    for name in Settings.model_fields:
+        monkeypatch.delenv(name, raising=False)
+    monkeypatch.chdir(tmp_path)
+    clock = _FakeClock()
+    monkeypatch.setattr(settings_module._SettingsCache, "clock", clock)
+    reload_settings()
+    yield tmp_path
+    monkeypatch.undo()
+    reload_settings()
+
+
+def _advance(seconds: float) -> None:
+    settings_module._SettingsCache.clock.now += seconds
+
+
+def test_get_settings_returns_cached_snapshot(env_dir: Path) -> None:
+    """.envファイルが変わらない限り、同じスナップショットが返されることを確認する。"""
+    first = get_settings()
+    _advance(60)
+    assert get_settings() is first
+    assert config.settings is first
+
+
+def test_settings_attribute_after_submodule_import() -> None:
+    """実装のサブモジュールを読み込んだ後も、config.settings が設定を返すことを確認する。"""
+    importlib.import_module("config._settings")
+    from config import settings
+
+    assert isinstance(settings, Settings)
+    assert settings.APP_NAME == get_settings().APP_NAME
+    assert config.settings is get_settings()
+
+
+def test_settings_submodule_reexports_public_api() -> None:
+    """互換用の config.settings から公開APIをインポートできることを確認する。"""
+    import config.settings
+    from config.settings import Settings as ReexportedSettings
+    from config.settings import get_settings as reexported_get_settings
+    from config.settings import settings
+
+    assert ReexportedSettings is Settings
+    assert reexported_get_settings is get_settings
+    assert settings is get_settings()
+    assert config.settings is get_settings()
+
+
+def test_settings_snapshot_is_frozen() -> None:
+    """スナップショットは変更できないことを確認する。"""
+    with pytest.raises(ValidationError):
+        get_settings().LOG_LEVEL = "DEBUG"
+
+
+def test_env_file_change_is_picked_up_after_interval(env_dir: Path) -> None:
+    """.envファイルの変更は確認間隔が経過した後にのみ反映されることを確認する。"""
+    env_file = env_dir / ".env"
+    env_file.write_text('LOG_LEVEL="WARNING"\nSETTINGS_RELOAD_INTERVAL=10\n')
+    assert reload_settings().LOG_LEVEL == "WARNING"
+
+    env_file.write_text('LOG_LEVEL="DEBUG"\nSETTINGS_RELOAD_INTERVAL=10\n')
+    _advance(5)
+    assert get_settings().LOG_LEVEL == "WARNING"
+    _advance(5)
+    assert get_settings().LOG_LEVEL == "DEBUG"
+
+
+def test_unchanged_env_file_is_not_parsed_again(
+    env_dir: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """確認間隔が経過しても、.envファイルが変わっていなければ解析し直さないことを確認する。"""
+    (env_dir / ".env").write_text("SETTINGS_RELOAD_INTERVAL=0\n")
+    first = reload_settings()
+
+    def parse() -> Settings:
+        raise AssertionError("解析し直してはならない")
+
+    monkeypatch.setattr(settings_module, "Settings", parse)
+    _advance(1)
+    assert get_settings() is first
+
+
+def test_invalid_reload_keeps_previous_settings(
+    env_dir: Path, caplog: pytest.LogCaptureFixture
+) -> None:
+    """再読み込みに失敗した場合は、以前の設定が使われ続けることを確認する。"""
+    env_file = env_dir / ".env"
+    env_file.write_text("SETTINGS_RELOAD_INTERVAL=0\n")
+    first = reload_settings()
+
+    env_file.write_text("SETTINGS_RELOAD_INTERVAL=0\nLOG_FORMAT=xml\n")
+    with caplog.at_level(logging.ERROR, logger="config._settings"):
+        assert get_settings() is first
+    assert "以前の設定を使用します" in caplog.text
+
+
+def test_reload_listeners_receive_previous_and_current(env_dir: Path) -> None:
+    """再読み込み時に、登録した関数が変更前と変更後の設定で呼び出されることを確認する。"""
+    calls: list[tuple[str, str]] = []
+
+    def listener(previous: Settings, current: Settings) -> None:
+        calls.append((previous.APP_NAME, current.APP_NAME))
+
+    config.add_reload_listener(listener)
+    config.add_reload_listener(listener)
+    try:
+        (env_dir / ".env").write_text('APP_NAME="reloaded"\n')
+        reload_settings()
+    finally:
+        config.remove_reload_listener(listener)
+    reload_settings()
+
+    assert calls == [("dev-template-python", "reloaded")]
@@ -0,0 +1,48 @@
+from collections.abc import Iterator
+from pathlib import Path
+
+import pytest
+
+BENCHMARK_BASELINE = Path(__file__).parent / "benchmarks" / "baseline.json"
+
+
+def pytest_addoption(parser: pytest.Parser) -> None:
+    """ベンチマークスイート(tests/benchmarks)のオプションを登録する。"""
+    group = parser.getgroup("benchmark", "ベンチマーク")
+    group.addoption(
+        "--benchmark-save",
+        action="store_true",
+        help="計測結果をベースラインのJSONに保存する",
+    )
+    group.addoption(
+        "--benchmark-compare",
+        action="store_true",
+        help="計測結果をベースラインと比較し、しきい値を超えて悪化した場合に失敗させる",
+    )
+    group.addoption(
+        "--benchmark-baseline",
+        type=Path,
+        default=BENCHMARK_BASELINE,
+        help="ベースラインのJSONファイル(既定: tests/benchmarks/baseline.json)",
+    )
+    group.addoption(
+        "--benchmark-time-threshold",
+        type=float,
+        default=0.30,
+        help="1操作あたりの時間の許容悪化率(既定: 0.30 = 30%%)",
+    )
+    group.addoption(
+        "--benchmark-memory-threshold",
+        type=float,
+        default=0.10,
+        help="ピークメモリの許容悪化率(既定: 0.10 = 10%%)",
+    )
+
+
+@pytest.fixture(autouse=True)
+def _stop_logging_threads() -> Iterator[None]:
+    """setup_logging が開始したバックグラウンドのスレッドを、テストごとに停止する。"""
+    yield
+    from shared.logging import shutdown_logging
+
+    shutdown_logging()
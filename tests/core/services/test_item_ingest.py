@@ -0,0 +1,164 @@
+"""
+core.services.item_ingestモジュールのテスト。
+"""
+
+import asyncio
+import itertools
+from collections.abc import AsyncIterator
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+from typing import Any
+
+import pytest
+
+from core.services import item_ingest
+from core.services.item_ingest import IngestStats, ingest_items
+from core.services.item_service import BulkCreateResult, ItemRecord, create_items
+from domain.models.item import Item
+
+
+async def _records(count: int, invalid_every: int = 0) -> AsyncIterator[ItemRecord]:
+    for i in range(count):
+        price = 0 if invalid_every and i % invalid_every == 0 else i + 1.0
+        yield {"id": i, "name": f"item-{i}", "price": price}
+
+
+async def _collect(records: AsyncIterator[ItemRecord], **kwargs: Any) -> list[Item]:
+    return [item async for item in ingest_items(records, **kwargs)]
+
+
+def test_ingest_items() -> None:
+    """有効な商品が入力順に返され、拒否された行が通し番号で集計されることをテストします。"""
+    stats = IngestStats()
+
+    items = asyncio.run(_collect(_records(100, invalid_every=10), stats=stats, batch_size=7))
+
+    assert [item.id for item in items] == [i for i in range(100) if i % 10]
+    assert (stats.read, stats.imported, stats.rejected) == (100, 90, 10)
+    assert [r.row for r in stats.rejections] == list(range(0, 100, 10))
+    assert {r.field for r in stats.rejections} == {"price"}
+
+
+def test_ingest_items_with_executor() -> None:
+    """Executorを指定した場合もイベントループ上と同じ結果になることをテストします。"""
+    stats = IngestStats()
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        items = asyncio.run(_collect(_records(50, invalid_every=5), stats=stats, executor=executor))
+
+    assert [item.id for item in items] == [i for i in range(50) if i % 5]
+    assert stats.rejected == 10
+    assert stats.longest_block == 0.0
+
+
+def test_backpressure() -> None:
+    """消費が遅い場合、生産側がキューの大きさを超えて先に進まないことをテストします。"""
+    produced = 0
+    queue_size = 8
+    batch_size = 4
+
+    async def source() -> AsyncIterator[ItemRecord]:
+        nonlocal produced
+        for i in range(200):
+            produced += 1
+            yield {"id": i, "name": "x", "price": 1.0}
+
+    async def main() -> int:
+        lead = 0
+        consumed = 0
+        stream = ingest_items(source(), batch_size=batch_size, queue_size=queue_size)
+        async for _ in stream:
+            consumed += 1
+            await asyncio.sleep(0)
+            lead = max(lead, produced - consumed)
+        return lead
+
+    # 生産側が先行できるのは、キューとバッチ、生産側が保持している1件まで
+    assert asyncio.run(main()) <= queue_size + batch_size + 1
+
+
+def test_event_loop_blocking_is_bounded(monkeypatch: pytest.MonkeyPatch) -> None:
+    """イベントループ上で検証する場合、バッチが分割され、チャンクの間に他のタスクが動くことをテストします。"""
+    max_block = 0.005
+    per_record = 1e-5
+    stats = IngestStats()
+    events: list[int | None] = []
+    now = 0.0
+
+    # 実時間に左右されないよう、1件の検証に per_record 秒かかる時計に置き換える
+    def fake_create_items(records: list[ItemRecord]) -> BulkCreateResult:
+        nonlocal now
+        now += per_record * len(records)
+        events.append(len(records))
+        return create_items(records)
+
+    monkeypatch.setattr(item_ingest, "create_items", fake_create_items)
+    monkeypatch.setattr(item_ingest, "time", SimpleNamespace(perf_counter=lambda: now))
+
+    async def source() -> AsyncIterator[ItemRecord]:
+        for i in range(30_000):
+            yield {"id": i, "name": f"item-{i}", "price": "1.5"}
+
+    async def heartbeat(stop: asyncio.Event) -> None:
+        # イベントループに制御が戻るたびに目印を記録する
+        while not stop.is_set():
+            events.append(None)
+            await asyncio.sleep(0)
+
+    async def main() -> int:
+        stop = asyncio.Event()
+        monitor = asyncio.create_task(heartbeat(stop))
+        count = 0
+        async for _ in ingest_items(
+            source(), stats, batch_size=30_000, queue_size=30_000, max_block=max_block
+        ):
+            count += 1
+        stop.set()
+        await monitor
+        return count
+
+    assert asyncio.run(main()) == 30_000
+
+    sizes = [event for event in events if event is not None]
+    assert sum(sizes) == 30_000
+    # 2回目以降のチャンクは、計測した時間から上限の半分に収まる件数になる
+    # (時計の値の丸め誤差で1件ずれることがある)
+    assert max(sizes[1:]) <= max_block / 2 / per_record + 1
+    assert stats.longest_block <= max_block
+    # 連続するチャンクの検証の間には、必ず他のタスクが実行されている
+    positions = [i for i, event in enumerate(events) if event is not None]
+    assert all(
+        None in events[before + 1 : after] for before, after in itertools.pairwise(positions)
+    )
+
+
+def test_source_error_is_propagated() -> None:
+    """入力の非同期イテレータで発生した例外が消費側に伝わることをテストします。"""
+
+    async def source() -> AsyncIterator[ItemRecord]:
+        yield {"id": 1, "name": "A", "price": 1.0}
+        raise RuntimeError("upstream failed")
+
+    with pytest.raises(RuntimeError, match="upstream failed"):
+        asyncio.run(_collect(source()))
+
+
+def test_early_exit_stops_producer() -> None:
+    """消費側が途中で終了すると、生産側のタスクも停止することをテストします。"""
+
+    async def main() -> None:
+        stream = ingest_items(_records(10_000), queue_size=4, batch_size=2)
+        async for item in stream:
+            assert item.id == 0
+            break
+        await stream.aclose()
+        # 生産側のタスク以外に残っているタスクがないこと
+        assert asyncio.all_tasks() == {asyncio.current_task()}
+
+    asyncio.run(main())
+
+
+@pytest.mark.parametrize("kwargs", [{"batch_size": 0}, {"queue_size": 0}, {"max_block": 0}])
+def test_invalid_arguments(kwargs: dict[str, Any]) -> None:
+    """不正な引数でValueErrorが発生することをテストします。"""
+    with pytest.raises(ValueError):
+        asyncio.run(_collect(_records(1), **kwargs))
@@ -0,0 +1,94 @@
+import random
+
+import pytest
+
+from core.services.item_repository import ItemRepository
+from domain.models.item import Item
+
+
+def _item(item_id: int, price: float) -> Item:
+    return Item(id=item_id, name=f"item-{item_id}", price=price, description=None)
+
+
+def _reference(items: dict[int, Item]) -> list[tuple[float, int]]:
+    return sorted((item.price, item.id) for item in items.values())
+
+
+def test_add_get_remove() -> None:
+    """idでの追加・取得・削除ができることをテストします。"""
+    repository = ItemRepository()
+    repository.add(_item(1, 10.0))
+    repository.add(_item(2, 5.0))
+
+    assert len(repository) == 2
+    assert 1 in repository
+    assert repository.get(2) == _item(2, 5.0)
+    assert repository.get(3) is None
+
+    assert repository.remove(1) == _item(1, 10.0)
+    assert 1 not in repository
+    assert [item.id for item in repository.cheapest(10)] == [2]
+    with pytest.raises(KeyError):
+        repository.remove(1)
+
+
+def test_add_duplicate_id() -> None:
+    """同じidの商品を追加するとValueErrorが発生することをテストします。"""
+    repository = ItemRepository()
+    repository.add(_item(1, 10.0))
+    with pytest.raises(ValueError, match="すでに存在します"):
+        repository.add(_item(1, 20.0))
+    with pytest.raises(ValueError, match="重複しています"):
+        ItemRepository().extend([_item(1, 1.0), _item(1, 2.0)])
+
+
+def test_find_by_price_range_and_order() -> None:
+    """価格の範囲検索が価格順(同じ価格はid順)で返されることをテストします。"""
+    repository = ItemRepository(bucket_size=2)
+    repository.extend(_item(i, p) for i, p in enumerate([5.0, 1.0, 3.0, 3.0, 9.0, 7.0]))
+
+    assert [i.id for i in repository.find_by_price(min_price=3, max_price=7)] == [2, 3, 0, 5]
+    assert [i.id for i in repository.find_by_price(3, 7, descending=True)] == [5, 0, 3, 2]
+    assert [i.id for i in repository.find_by_price(min_price=8)] == [4]
+    assert [i.id for i in repository.find_by_price(max_price=0.5)] == []
+    assert repository.find_by_price(min_price=7, max_price=3) == []
+    assert [i.price for i in repository.cheapest(2)] == [1.0, 3.0]
+    assert [i.price for i in repository.priciest(2)] == [9.0, 7.0]
+
+
+@pytest.mark.parametrize("bulk", [True, False])
+def test_incremental_updates_match_reference(bulk: bool) -> None:
+    """挿入と削除を繰り返しても、索引が全件を並べ直した結果と一致することをテストします。"""
+    rng = random.Random(1)
+    repository = ItemRepository(bucket_size=4)
+    items: dict[int, Item] = {}
+    initial = [_item(i, float(rng.randint(1, 50))) for i in range(200)]
+    if bulk:
+        repository.extend(initial)
+    else:
+        for item in initial:
+            repository.add(item)
+    items.update((item.id, item) for item in initial)
+
+    next_id = 200
+    for _ in range(2_000):
+        if items and rng.random() < 0.45:
+            item_id = rng.choice(list(items))
+            repository.remove(item_id)
+            del items[item_id]
+        else:
+            item = _item(next_id, float(rng.randint(1, 50)))
+            next_id += 1
+            repository.add(item)
+            items[item.id] = item
+
+        if rng.random() < 0.05:
+            low, high = sorted(rng.uniform(0, 55) for _ in range(2))
+            expected = [(p, i) for p, i in _reference(items) if low <= p <= high]
+            assert [(i.price, i.id) for i in repository.find_by_price(low, high)] == expected
+            assert [
+                (i.price, i.id) for i in repository.find_by_price(low, high, descending=True)
+            ] == (expected[::-1])
+
+    assert [(i.price, i.id) for i in repository.cheapest(len(items))] == _reference(items)
+    assert len(repository) == len(items)
@@ -9,8 +9,9 @@
 # -----------------------------------------------------------------------------
 import pytest
 
-from core.services.item_service import create_item
+from core.services.item_service import create_item, create_items
 from domain.models.item import Item
+from shared.errors import BulkValidationError
 
 
 def test_create_item_success() -> None:
@@ -42,3 +43,168 @@ def test_create_item_without_description() -> None:
     item = create_item(item_id=4, name="Simple Item", price=50.0)
     assert item.description is None
     assert item.name == "Simple Item"
+
+
+def test_create_items_from_dicts() -> None:
+    """辞書のリストから商品が一括作成されることをテストします。"""
+    result = create_items(
+        [
+            {"id": 1, "name": "A", "price": 10.0, "description": "first"},
+            {"id": 2, "name": "B", "price": 20},
+        ]
+    )
+    assert result.rejections == []
+    assert result.items == [
+        Item(id=1, name="A", price=10.0, description="first"),
+        Item(id=2, name="B", price=20.0, description=None),
+    ]
+    assert isinstance(result.items[1].price, float)
+
+
+def test_create_items_from_tuples_and_columns() -> None:
+    """タプルのリストと列形式の入力が同じ結果になることをテストします。"""
+    from_tuples = create_items([(1, "A", 10.0), (2, "B", 20.0, "second")])
+    from_columns = create_items(
+        {"id": [1, 2], "name": ["A", "B"], "price": [10.0, 20.0], "description": [None, "second"]}
+    )
+    assert from_tuples.items == from_columns.items
+    assert [item.description for item in from_tuples.items] == [None, "second"]
+
+
+def test_create_items_returns_mutable_items() -> None:
+    """一括作成した商品が変更・コピーでき、他の商品に影響しないことをテストします。"""
+    first, second = create_items([(1, "A", 10.0), (2, "B", 20.0)]).items
+
+    first.name = "changed"
+    copied = second.model_copy(update={"price": 30.0})
+
+    assert first.name == "changed"
+    assert copied.price == 30.0
+    assert second.model_fields_set == {"id", "name", "price", "description"}
+    assert first.model_fields_set is not second.model_fields_set
+
+
+def test_create_items_from_mixed_rows() -> None:
+    """辞書とタプルが混在するバッチが行ごとに判定されることをテストします。"""
+    result = create_items([{"id": 1, "name": "A", "price": 10.0}, (2, "B", 20.0), None])  # type: ignore[list-item]
+
+    assert result.items == [
+        Item(id=1, name="A", price=10.0, description=None),
+        Item(id=2, name="B", price=20.0, description=None),
+    ]
+    assert {(r.row, r.field, r.error_code) for r in result.rejections} == {
+        (2, "id", "missing"),
+        (2, "name", "missing"),
+        (2, "price", "missing"),
+    }
+
+
+def test_create_items_matches_item_validation() -> None:
+    """高速チェック外の値もItemと同じ規則で変換・検証されることをテストします。"""
+    result = create_items([{"id": "7", "name": "Seven", "price": "7.5"}])
+    expected = Item.model_validate({"id": "7", "name": "Seven", "price": "7.5"})
+    assert result.items == [expected]
+
+
+def test_create_items_reports_rejections_per_row() -> None:
+    """不正な行が拒否理由とともに報告され、有効な行のみが返されることをテストします。"""
+    result = create_items(
+        [
+            (1, "Valid", 10.0),
+            (2, "", 10.0),
+            (3, "Negative", -1.0),
+            (4, "NaN", float("nan")),
+            (5,),
+        ]
+    )
+    assert [item.id for item in result.items] == [1]
+    assert [(r.row, r.field) for r in result.rejections] == [
+        (1, "name"),
+        (2, "price"),
+        (3, "price"),
+        (4, "name"),
+        (4, "price"),
+    ]
+    assert result.rejections[-1].message == "Field required"
+
+
+def test_create_items_rejects_mismatched_columns() -> None:
+    """列の長さが揃っていない場合にValueErrorが発生することをテストします。"""
+    with pytest.raises(ValueError, match="同じ長さ"):
+        create_items({"id": [1, 2], "name": ["A"], "price": [1.0, 2.0]})
+
+
+@pytest.mark.parametrize(
+    ("field", "value"),
+    [
+        ("name", ""),
+        ("name", 123),
+        ("price", 0),
+        ("price", -1.5),
+        ("price", "abc"),
+        ("price", 10**400),
+        ("id", "x"),
+        ("id", 2**63),
+        ("id", -(2**63) - 1),
+    ],
+)
+def test_create_items_rejection_messages_match_pydantic(field: str, value: object) -> None:
+    """拒否理由のメッセージがItemの検証エラーと一致することをテストします。"""
+    from pydantic import ValidationError as PydanticValidationError
+
+    record = {"id": 1, "name": "A", "price": 1.0, field: value}
+    with pytest.raises(PydanticValidationError) as exc_info:
+        Item.model_validate(record)
+    result = create_items([record])
+    assert result.items == []
+    assert result.rejections[0].field == field
+    assert result.rejections[0].message == exc_info.value.errors()[0]["msg"]
+
+
+def test_create_items_error_codes() -> None:
+    """拒否理由にpydanticのエラーの種類がエラーコードとして記録されることをテストします。"""
+    result = create_items(
+        [
+            {"id": 1, "name": "", "price": 1.0},
+            {"id": 2, "name": "B", "price": -1.0},
+            {"id": "x", "name": "C", "price": 1.0},
+            {"id": 4, "price": 1.0},
+            {"id": 5, "name": "E", "price": "N/A"},
+        ]
+    )
+    assert [r.error_code for r in result.rejections] == [
+        "string_too_short",
+        "greater_than",
+        "int_parsing",
+        "missing",
+        "float_parsing",
+    ]
+
+
+def test_create_items_repeated_invalid_values() -> None:
+    """同じ値が繰り返し現れても、型ごとにItemと同じ規則で検証されることをテストします。"""
+    from pydantic import ValidationError as PydanticValidationError
+
+    prices = ["N/A", "2", "N/A", True, 1, "", b"3", None] * 2
+    records = [{"id": i, "name": "A", "price": price} for i, price in enumerate(prices)]
+    expected: list[Item] = []
+    rejected: list[int] = []
+    for i, record in enumerate(records):
+        try:
+            expected.append(Item.model_validate(record))
+        except PydanticValidationError:  # noqa: PERF203
+            rejected.append(i)
+
+    result = create_items(records)
+
+    assert result.items == expected
+    assert [r.row for r in result.rejections] == rejected
+
+
+def test_create_items_to_error() -> None:
+    """拒否された行を1つの例外にまとめられることをテストします。"""
+    assert create_items([(1, "A", 1.0)]).to_error() is None
+    error = create_items([(1, "", 1.0), (2, "B", 0)]).to_error()
+    assert isinstance(error, BulkValidationError)
+    assert error.total == 2
+    assert error.counts == {"greater_than": 1, "string_too_short": 1}
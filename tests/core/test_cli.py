@@ -1,3 +1,7 @@
+import json
+from pathlib import Path
+
+import pytest
 from typer.testing import CliRunner
 
 from core.cli import app
@@ -49,3 +53,380 @@ def test_create_item_failure() -> None:
     )
     assert result.exit_code == 1
     assert "商品の作成に失敗しました" in result.stdout
+
+
+def test_import_items_from_file(tmp_path: Path) -> None:
+    """import-itemsコマンドがファイルを読み込み、集計結果を表示することをテストします。"""
+    source = tmp_path / "items.csv"
+    source.write_text("id,name,price,description\n1,A,2.5,\n2,B,-1,x\n", encoding="utf-8")
+    output = tmp_path / "items.ndjson"
+
+    result = runner.invoke(app, ["import-items", str(source), "--output", str(output)])
+
+    assert result.exit_code == 0
+    assert "インポート: 1件" in result.stderr
+    assert "拒否: 1件" in result.stderr
+    assert output.read_text(encoding="utf-8").count("\n") == 1
+
+
+def test_import_items_from_stdin() -> None:
+    """import-itemsコマンドが標準入力から読み込み、標準出力へ書き出すことをテストします。"""
+    result = runner.invoke(
+        app,
+        ["import-items", "-", "--output", "-"],
+        input='{"id": 1, "name": "A", "price": 1.0}\n',
+    )
+    assert result.exit_code == 0
+    assert result.stdout == '{"id":1,"name":"A","price":1.0,"description":null}\n'
+
+
+def test_import_items_with_workers(tmp_path: Path) -> None:
+    """--workersを指定すると並列に検証し、同じ結果を書き出すことをテストします。"""
+    source = tmp_path / "items.ndjson"
+    source.write_text(
+        "".join(f'{{"id": {i}, "name": "item-{i}", "price": {i}}}\n' for i in range(100)),
+        encoding="utf-8",
+    )
+    output = tmp_path / "out.ndjson"
+
+    result = runner.invoke(
+        app,
+        ["import-items", str(source), "-o", str(output), "--workers", "2", "--batch-size", "10"],
+    )
+
+    assert result.exit_code == 0
+    assert "インポート: 99件" in result.stderr
+    ids = [json.loads(line)["id"] for line in output.read_text(encoding="utf-8").splitlines()]
+    assert ids == list(range(1, 100))
+
+
+def test_import_items_with_checkpoint(tmp_path: Path) -> None:
+    """--checkpointと--skip-indexを指定すると、進捗と索引が保存されることをテストします。"""
+    source = tmp_path / "items.ndjson"
+    source.write_text(
+        "".join(f'{{"id": {i}, "name": "item-{i}", "price": {i}}}\n' for i in range(1, 21)),
+        encoding="utf-8",
+    )
+    output = tmp_path / "out.ndjson"
+    checkpoint = tmp_path / "checkpoint.json"
+    index = tmp_path / "items.idx"
+    options = ["--checkpoint", str(checkpoint), "--skip-index", str(index), "--resume"]
+
+    result = runner.invoke(app, ["import-items", str(source), "-o", str(output), *options])
+
+    assert result.exit_code == 0
+    assert "インポート: 20件" in result.stderr
+    assert json.loads(checkpoint.read_text(encoding="utf-8"))["completed"] is True
+    assert index.stat().st_size == 20 * 8
+
+    # チェックポイントを消して再実行すると、索引にある商品はすべて読み飛ばされる
+    checkpoint.unlink()
+    result = runner.invoke(app, ["import-items", str(source), "-o", str(output), *options])
+
+    assert result.exit_code == 0
+    assert "インポート: 0件" in result.stderr
+    assert "読み飛ばし: 20件" in result.stderr
+    assert output.read_text(encoding="utf-8") == ""
+
+
+@pytest.mark.parametrize(
+    "args",
+    [
+        ["items.csv", "--checkpoint", "c.json"],
+        ["items.ndjson", "--resume"],
+        ["-", "--checkpoint", "c.json"],
+        ["items.ndjson", "--checkpoint", "c.json", "--output", "-"],
+    ],
+)
+def test_import_items_checkpoint_errors(args: list[str]) -> None:
+    """チェックポイントを使えない組み合わせでは終了コード2になることをテストします。"""
+    result = runner.invoke(app, ["import-items", *args])
+    assert result.exit_code == 2
+
+
+def test_dedup_items(tmp_path: Path) -> None:
+    """dedup-itemsコマンドが重複を取り除き、偽陽性率とメモリ使用量を表示することをテストします。"""
+    source = tmp_path / "items.ndjson"
+    source.write_text(
+        "".join(f'{{"id": {i % 5}, "name": "item-{i}", "price": 1}}\n' for i in range(10)),
+        encoding="utf-8",
+    )
+
+    result = runner.invoke(app, ["dedup-items", str(source), "--policy", "last"])
+
+    assert result.exit_code == 0
+    names = [json.loads(line)["name"] for line in result.stdout.splitlines()]
+    assert names == [f"item-{i}" for i in range(5, 10)]
+    assert "重複: 5件" in result.stderr
+    assert "偽陽性率" in result.stderr
+
+    result = runner.invoke(app, ["dedup-items", str(source), "--policy", "error"])
+    assert result.exit_code == 1
+    result = runner.invoke(app, ["dedup-items", str(source), "--policy", "newest"])
+    assert result.exit_code == 2
+
+
+def test_dedup_items_conflict_keeps_output(tmp_path: Path) -> None:
+    """内容の異なる重複でエラーになった場合、出力先のファイルを変更しないことをテストします。"""
+    source = tmp_path / "items.ndjson"
+    source.write_text(
+        '{"id": 1, "name": "A", "price": 1}\n'
+        '{"id": 2, "name": "B", "price": 1}\n'
+        '{"id": 1, "name": "C", "price": 1}\n',
+        encoding="utf-8",
+    )
+    output = tmp_path / "unique.ndjson"
+    output.write_text("previous\n", encoding="utf-8")
+
+    result = runner.invoke(
+        app, ["dedup-items", str(source), "-o", str(output), "--policy", "error"]
+    )
+    assert result.exit_code == 1
+    assert "id 1" in result.stderr
+    assert output.read_text(encoding="utf-8") == "previous\n"
+    assert sorted(path.name for path in tmp_path.iterdir()) == ["items.ndjson", "unique.ndjson"]
+
+    result = runner.invoke(app, ["dedup-items", str(source), "-o", str(output)])
+    assert result.exit_code == 0
+    assert [json.loads(line)["name"] for line in output.read_text().splitlines()] == ["A", "B"]
+
+
+def test_import_and_export_items_with_shards(tmp_path: Path) -> None:
+    """--shardsを指定すると、シャードのファイルとマニフェストを書き出すことをテストします。"""
+    source = tmp_path / "items.ndjson"
+    source.write_text(
+        "".join(f'{{"id": {i}, "name": "item-{i}", "price": 1}}\n' for i in range(50)),
+        encoding="utf-8",
+    )
+
+    for command in ("import-items", "export-items"):
+        output = tmp_path / command
+        result = runner.invoke(app, [command, str(source), "-o", str(output), "--shards", "3"])
+
+        assert result.exit_code == 0
+        assert "シャード: 3個" in result.stderr
+        manifest = json.loads((output / "manifest.json").read_text(encoding="utf-8"))
+        assert sum(shard["items"] for shard in manifest["shards"]) == 50
+
+    result = runner.invoke(app, ["import-items", str(source), "-o", "-", "--shards", "3"])
+    assert result.exit_code == 2
+
+
+@pytest.mark.parametrize("shards", [[], ["--shards", "2"]])
+def test_export_items_rejects_ids_outside_int64(tmp_path: Path, shards: list[str]) -> None:
+    """int64に収まらないidの行が、異常終了せずに拒否されることをテストします。"""
+    source = tmp_path / "items.ndjson"
+    source.write_text(
+        f'{{"id": {2**63}, "name": "A", "price": 1}}\n'
+        f'{{"id": {-(2**63) - 1}, "name": "B", "price": 1}}\n'
+        f'{{"id": {2**63 - 1}, "name": "C", "price": 1}}\n',
+        encoding="utf-8",
+    )
+
+    result = runner.invoke(
+        app, ["export-items", str(source), "-o", str(tmp_path / "out.items"), *shards]
+    )
+
+    assert result.exit_code == 0, result.stderr
+    assert "書き出し: 1件" in result.stderr
+    assert "拒否: 2件" in result.stderr
+
+
+def test_query_items(tmp_path: Path) -> None:
+    """query-itemsコマンドが価格の範囲に一致する商品を価格順に出力することをテストします。"""
+    source = tmp_path / "items.ndjson"
+    source.write_text(
+        "".join(
+            f'{{"id": {i}, "name": "item-{i}", "price": {p}}}\n'
+            for i, p in enumerate([50, 10, 30, 20, 40])
+        ),
+        encoding="utf-8",
+    )
+
+    result = runner.invoke(
+        app, ["query-items", str(source), "--min-price", "15", "--max-price", "45", "--limit", "2"]
+    )
+
+    assert result.exit_code == 0
+    assert [json.loads(line)["id"] for line in result.stdout.splitlines()] == [3, 2]
+    assert "該当: 2件" in result.stderr
+
+    result = runner.invoke(app, ["query-items", str(source), "--desc", "--limit", "1"])
+    assert [json.loads(line)["id"] for line in result.stdout.splitlines()] == [0]
+
+
+def test_query_items_duplicate_id() -> None:
+    """重複したidを含む入力でエラー終了することをテストします。"""
+    line = '{"id": 1, "name": "A", "price": 1.0}\n'
+    result = runner.invoke(app, ["query-items", "-"], input=line * 2)
+    assert result.exit_code == 1
+    assert "重複しています" in result.stderr
+
+
+def test_import_items_unknown_format() -> None:
+    """未対応の入力形式でエラー終了することをテストします。"""
+    result = runner.invoke(app, ["import-items", "-", "--format", "xml"])
+    assert result.exit_code == 2
+
+
+def test_export_and_import_binary(tmp_path: Path) -> None:
+    """export-itemsで書き出したバイナリ形式を、import-itemsでNDJSONに戻せることをテストします。"""
+    source = tmp_path / "items.ndjson"
+    source.write_text(
+        '{"id": 1, "name": "A", "price": 1.5}\n'
+        '{"id": 2, "name": "", "price": 1.0}\n'
+        '{"id": 3, "name": "C", "price": 3, "description": "説明"}\n',
+        encoding="utf-8",
+    )
+    binary = tmp_path / "items.items"
+
+    result = runner.invoke(app, ["export-items", str(source), "--output", str(binary)])
+
+    assert result.exit_code == 0
+    assert "書き出し: 2件" in result.stderr
+    assert "拒否: 1件" in result.stderr
+
+    result = runner.invoke(app, ["import-items", str(binary), "--output", "-"])
+
+    assert result.exit_code == 0
+    assert [json.loads(line) for line in result.stdout.splitlines()] == [
+        {"id": 1, "name": "A", "price": 1.5, "description": None},
+        {"id": 3, "name": "C", "price": 3.0, "description": "説明"},
+    ]
+    assert "インポート: 2件" in result.stderr
+
+    result = runner.invoke(app, ["import-items", str(binary), "--trusted"])
+    assert result.exit_code == 0
+    result = runner.invoke(app, ["import-items", str(source), "--trusted"])
+    assert result.exit_code == 2
+
+
+def test_import_items_binary_errors(tmp_path: Path) -> None:
+    """バイナリ形式を標準入力や不正なファイルから読み込むとエラー終了することをテストします。"""
+    result = runner.invoke(app, ["import-items", "-", "--format", "binary"])
+    assert result.exit_code == 2
+
+    source = tmp_path / "broken.items"
+    source.write_bytes(b"not an item file")
+    result = runner.invoke(app, ["import-items", str(source)])
+    assert result.exit_code == 1
+    assert "バイナリ形式のファイルではありません" in result.stderr
+
+
+@pytest.mark.parametrize(
+    "command",
+    [
+        ["import-items", "-"],
+        ["export-items", "-", "--output", "out.items"],
+        ["dedup-items", "-"],
+        ["item-stats", "-"],
+    ],
+)
+def test_batch_size_must_be_positive(command: list[str]) -> None:
+    """--batch-size に0を指定すると、トレースバックなしで使い方のエラーになることをテストします。"""
+    result = runner.invoke(app, [*command, "--batch-size", "0"], input="")
+    assert result.exit_code == 2
+    assert "--batch-size" in result.stderr
+    assert result.exception is None or isinstance(result.exception, SystemExit)
+
+
+@pytest.mark.parametrize(
+    "command",
+    [
+        ["import-items"],
+        ["import-items", "--format", "binary"],
+        ["export-items", "--output", "out.items"],
+        ["dedup-items"],
+        ["query-items"],
+        ["item-stats", "--format", "binary"],
+    ],
+)
+def test_missing_input_file(tmp_path: Path, command: list[str]) -> None:
+    """入力ファイルが存在しない場合、トレースバックなしでエラー終了することをテストします。"""
+    missing = str(tmp_path / "missing.ndjson")
+    result = runner.invoke(app, [command[0], missing, *command[1:]])
+
+    assert result.exit_code == 1
+    assert "ファイルを読み書きできません" in result.stderr
+    assert not isinstance(result.exception, OSError)
+
+
+@pytest.mark.parametrize("command", ["import-items", "export-items", "dedup-items"])
+def test_non_utf8_csv(tmp_path: Path, command: str) -> None:
+    """UTF-8でないCSVを読み込んだ場合、トレースバックなしでエラー終了することをテストします。"""
+    source = tmp_path / "items.csv"
+    source.write_bytes("id,name,price\n1,商品,1.0\n".encode("shift_jis"))
+    result = runner.invoke(app, [command, str(source), "--output", str(tmp_path / "out")])
+
+    assert result.exit_code == 1
+    assert "UTF-8" in result.stderr
+    assert not isinstance(result.exception, UnicodeDecodeError)
+
+
+def test_item_stats(tmp_path: Path) -> None:
+    """item-statsコマンドが価格の統計量をJSONで出力することをテストします。"""
+    pytest.importorskip("numpy")
+    source = tmp_path / "items.ndjson"
+    source.write_text(
+        "".join(
+            f'{{"id": {i}, "name": "item-{i}", "price": {p}}}\n'
+            for i, p in enumerate([5, 50, 500, 0])
+        ),
+        encoding="utf-8",
+    )
+
+    result = runner.invoke(
+        app, ["item-stats", str(source), "--percentiles", "50", "--edges", "10,100", "--exact"]
+    )
+
+    assert result.exit_code == 0
+    stats = json.loads(result.stdout)
+    assert (stats["count"], stats["sum"], stats["min"], stats["max"]) == (3, 555.0, 5.0, 500.0)
+    assert stats["percentiles"] == {"p50": 50.0}
+    assert [bucket["count"] for bucket in stats["histogram"]] == [1, 1, 1]
+    assert "拒否: 1件" in result.stderr
+
+
+def test_item_stats_invalid_arguments() -> None:
+    """item-statsコマンドの不正な引数でエラー終了することをテストします。"""
+    pytest.importorskip("numpy")
+    assert runner.invoke(app, ["item-stats", "-", "--format", "binary"]).exit_code == 2
+    assert runner.invoke(app, ["item-stats", "-", "--trusted"]).exit_code == 2
+    assert runner.invoke(app, ["item-stats", "-", "--percentiles", "abc"]).exit_code == 2
+    assert runner.invoke(app, ["item-stats", "-", "--percentiles", "101"]).exit_code == 2
+    assert runner.invoke(app, ["item-stats", "-", "--edges", "10,1"]).exit_code == 2
+
+
+def test_metrics_option(tmp_path: Path) -> None:
+    """--metricsを指定すると、終了時にスパンごとのパーセンタイルが表示されることをテストします。"""
+    from shared import metrics
+
+    source = tmp_path / "items.ndjson"
+    source.write_text('{"id": 1, "name": "A", "price": 1.5}\n', encoding="utf-8")
+    try:
+        result = runner.invoke(app, ["--metrics", "import-items", str(source)])
+    finally:
+        metrics.disable()
+        metrics.get_registry().reset()
+
+    assert result.exit_code == 0
+    names = [line.split()[0] for line in result.stderr.splitlines() if line]
+    assert "cli.import-items" in names
+    assert "item_service.create_items" in names
+    assert "item_import.read" in names
+
+
+def test_profile_options(tmp_path: Path) -> None:
+    """--profile-cpu と --profile-mem でコマンドの計測結果が報告されることをテストします。"""
+    import pstats
+
+    output = tmp_path / "cpu.pstats"
+
+    result = runner.invoke(
+        app, ["--profile-cpu", str(output), "--profile-mem", "create-item", "--price", "10"]
+    )
+
+    assert result.exit_code == 0
+    assert pstats.Stats(str(output)).total_calls > 0  # type: ignore[attr-defined]
+    assert "CPUプロファイルを書き出しました" in result.stderr
+    assert "create-item: ピーク" in result.stderr
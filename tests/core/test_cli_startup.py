@@ -0,0 +1,122 @@
+import os
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+from core import cli
+from core.startup_profile import format_report, parse_importtime
+from pipelines import item_import
+
+SRC_DIR = Path(__file__).resolve().parents[2] / "src"
+# コマンドの実行に許容する、ベースラインからの超過時間(ミリ秒)。遅い環境では環境変数で調整する
+STARTUP_BUDGET_MS = float(os.environ.get("CLI_STARTUP_BUDGET_MS", "150"))
+# ベースライン: CLIのどのコマンドでも読み込まれる依存ライブラリだけを読み込む時間
+BASELINE_CODE = "import typer, rich.console, rich.logging, pydantic_settings"
+# コマンドを選ぶ前に読み込まれてはならない重いモジュール
+HEAVY_MODULES = ("pydantic", "pydantic_settings", "rich", "config._settings", "pipelines")
+
+
+def _run_python(*args: str, pycache: Path | None = None) -> subprocess.CompletedProcess[str]:
+    env = os.environ.copy()
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [str(SRC_DIR), env.get("PYTHONPATH")]))
+    if pycache is not None:
+        # インストールされた環境と同じく、2回目以降はバイトコードのキャッシュを使う
+        env.pop("PYTHONDONTWRITEBYTECODE", None)
+        env["PYTHONPYCACHEPREFIX"] = str(pycache)
+    return subprocess.run(
+        [sys.executable, *args], capture_output=True, text=True, env=env, check=False
+    )
+
+
+def test_cli_import_does_not_load_heavy_modules() -> None:
+    """core.cliの読み込み時に、設定やrichなどの重いモジュールが読み込まれないことを確認する。"""
+    code = (
+        f"import sys, core.cli; print(','.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))"
+    )
+    result = _run_python("-c", code)
+    assert result.returncode == 0, result.stderr
+    assert result.stdout.strip() == ""
+
+
+def test_services_import_does_not_load_optional_submodules() -> None:
+    """core.servicesの読み込み時に、非同期APIやリポジトリが読み込まれないことを確認する。"""
+    modules = ("asyncio", "core.services.item_ingest", "core.services.item_repository")
+    code = f"import sys, core.services; print(','.join(m for m in {modules!r} if m in sys.modules))"
+    result = _run_python("-c", code)
+    assert result.returncode == 0, result.stderr
+    assert result.stdout.strip() == ""
+
+
+def _elapsed_ms(*args: str, pycache: Path) -> float:
+    started = time.perf_counter()
+    result = _run_python(*args, pycache=pycache)
+    elapsed = time.perf_counter() - started
+    assert result.returncode == 0, result.stderr
+    return elapsed * 1000
+
+
+@pytest.mark.parametrize(
+    "command", [["show-config"], ["create-item", "--name", "abc", "--price", "1"]]
+)
+def test_command_startup_within_budget(command: list[str], tmp_path: Path) -> None:
+    """
+    実際のコマンドの実行時間が、依存ライブラリの読み込み時間から予算内に収まることを確認する。
+
+    負荷の変動の影響を抑えるため、バイトコードのキャッシュを作成した後に
+    ベースラインとコマンドを交互に5回ずつ実行し、それぞれの最小値で判定する。
+    """
+    _elapsed_ms("-m", "core.cli", *command, pycache=tmp_path)
+    baseline_ms = elapsed_ms = float("inf")
+    for _ in range(5):
+        baseline_ms = min(baseline_ms, _elapsed_ms("-c", BASELINE_CODE, pycache=tmp_path))
+        elapsed_ms = min(elapsed_ms, _elapsed_ms("-m", "core.cli", *command, pycache=tmp_path))
+    overhead_ms = elapsed_ms - baseline_ms
+    assert overhead_ms < STARTUP_BUDGET_MS, (
+        f"{elapsed_ms:.1f} ms - {baseline_ms:.1f} ms >= {STARTUP_BUDGET_MS} ms"
+    )
+
+
+def test_profile_startup_prints_breakdown() -> None:
+    """--profile-startupがコマンドを実行し、インポート時間の内訳を表示することを確認する。"""
+    started = time.perf_counter()
+    result = _run_python("-m", "core.cli", "--profile-startup", "show-config")
+    assert time.perf_counter() - started < 60
+    assert result.returncode == 0, result.stderr
+    assert "APP_NAME" in result.stdout
+    assert "パッケージ別" in result.stderr
+    assert "pydantic_settings" in result.stderr
+    assert "import time:" not in result.stderr
+
+
+def test_profile_startup_propagates_exit_code() -> None:
+    """子プロセスの終了コードがそのまま返されることを確認する。"""
+    result = _run_python("-m", "core.cli", "--profile-startup", "create-item", "--price", "-1")
+    assert result.returncode == 1
+
+
+def test_parse_importtime() -> None:
+    """-X importtime の出力を解析し、それ以外の行を分けて返すことを確認する。"""
+    lines = [
+        "import time: self [us] | cumulative | imported package",
+        "import time:       120 |        300 |   json.decoder",
+        "import time:        80 |        380 | json",
+        "warning: something",
+    ]
+    timings, others = parse_importtime(lines)
+    assert [(t.module, t.self_us, t.cumulative_us) for t in timings] == [
+        ("json.decoder", 120, 300),
+        ("json", 80, 380),
+    ]
+    assert others == ["warning: something"]
+
+    report = format_report(timings, wall_seconds=0.01, top=1)
+    assert "  0.2 ms  json" in report
+    assert "json.decoder" not in report
+
+
+def test_default_batch_size_matches_pipeline() -> None:
+    """CLIの--batch-sizeの既定値がパイプラインの既定値と一致することを確認する。"""
+    assert cli._DEFAULT_BATCH_SIZE == item_import.DEFAULT_BATCH_SIZE
@@ -0,0 +1,19 @@
+import pytest
+
+from domain.models.item import Item
+
+
+@pytest.fixture
+def sample_items() -> list[Item]:
+    """
+    domain.models のテストで共通に使う商品。
+
+    非ASCIIの名前、description の None と空文字列、負のid、重複したid、
+    JSONでエスケープが必要な名前を含みます。
+    """
+    return [
+        Item(id=1, name="Apple", price=120.0, description="赤いりんご"),
+        Item(id=2, name="バナナ", price=98.5, description=None),
+        Item(id=-3, name="C", price=0.01, description=""),
+        Item(id=2, name='改行\n と "引用符" と },{"id":', price=1.0, description=None),
+    ]
@@ -0,0 +1,29 @@
+"""
+domain.models.itemモジュールのテスト。
+"""
+
+import pytest
+
+from domain.models.item import Item, construct_item
+
+
+def test_construct_item_matches_validated() -> None:
+    """construct_item() で組み立てた商品が、検証した商品と同じ状態になることをテストします。"""
+    validated = Item(id=1, name="A", price=1.5, description=None)
+    constructed = construct_item(1, "A", 1.5, None)
+
+    assert constructed == validated
+    assert constructed.model_dump_json() == validated.model_dump_json()
+    assert constructed.model_fields_set == validated.model_fields_set
+    assert constructed.model_copy(update={"price": 2.0}).price == 2.0
+
+    # 属性の変更は他のインスタンスに影響しない
+    constructed.name = "B"
+    assert construct_item(1, "A", 1.5, None).name == "A"
+
+
+def test_construct_item_skips_validation() -> None:
+    """construct_item() は検証しないため、制約に反する値もそのまま保持することをテストします。"""
+    assert construct_item(1, "", -1.0, None).price == -1.0
+    with pytest.raises(ValueError):
+        Item(id=1, name="", price=-1.0, description=None)
@@ -0,0 +1,175 @@
+"""
+domain.models.item_fileモジュールのテスト。
+"""
+
+from pathlib import Path
+
+import pytest
+
+from domain.models.item import Item
+from domain.models.item_file import ITEM_FILE_MAGIC, ItemFile, write_item_file
+from domain.models.item_store import ItemStore
+
+
+@pytest.fixture
+def item_path(sample_items: list[Item], tmp_path: Path) -> Path:
+    path = tmp_path / "sample.items"
+    write_item_file(path, sample_items)
+    return path
+
+
+class TestItemFile:
+    """write_item_file関数とItemFileクラスのテスト。"""
+
+    def test_round_trip(self, sample_items: list[Item], item_path: Path) -> None:
+        """書き出した商品が同じ順序・内容で読み込まれることをテストします。"""
+        with ItemFile(item_path) as item_file:
+            assert len(item_file) == 4
+            assert item_file.to_items() == sample_items
+            assert item_file[1] == sample_items[1]
+            assert item_file[-2].description == ""
+
+    def test_write_item_store(self, sample_items: list[Item], tmp_path: Path) -> None:
+        """ItemStoreをそのまま書き出せることをテストします。"""
+        path = tmp_path / "store.items"
+        assert write_item_file(path, ItemStore.from_items(sample_items)) == 4
+        with ItemFile(path) as item_file:
+            assert item_file.to_items() == sample_items
+
+    def test_failed_write_keeps_previous_file(
+        self, item_path: Path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """書き出しの途中で失敗しても、既存のファイルが書きかけの内容にならないことをテストします。"""
+        previous = item_path.read_bytes()
+
+        def fail(*args: object) -> int:
+            raise OSError("disk full")
+
+        monkeypatch.setattr("domain.models.item_file.zlib.crc32", fail)
+        with pytest.raises(OSError, match="disk full"):
+            write_item_file(item_path, [Item(id=1, name="A", price=1.0, description=None)])
+
+        assert item_path.read_bytes() == previous
+        assert [p.name for p in item_path.parent.iterdir()] == [item_path.name]
+
+    def test_find_by_id(self, sample_items: list[Item], item_path: Path) -> None:
+        """idの索引で商品を取得でき、重複したidでは最も前の商品が返ることをテストします。"""
+        with ItemFile(item_path) as item_file:
+            assert item_file.find(-3) == sample_items[2]
+            assert item_file.index_of(2) == 1
+            assert item_file.find(4) is None
+            with pytest.raises(KeyError):
+                item_file.index_of(100)
+
+    def test_find_in_large_file(self, tmp_path: Path) -> None:
+        """多数の商品から任意のidを探索できることをテストします。"""
+        path = tmp_path / "large.items"
+        ids = [(i * 7919) % 10_007 for i in range(10_007)]
+        write_item_file(path, (Item(id=i, name=f"n{i}", price=1.0, description=None) for i in ids))
+        with ItemFile(path) as item_file:
+            for item_id in (0, 1, 5_000, 10_006):
+                assert item_file.index_of(item_id) == ids.index(item_id)
+
+    def test_empty(self, tmp_path: Path) -> None:
+        """空のファイルを読み書きできることをテストします。"""
+        path = tmp_path / "empty.items"
+        assert write_item_file(path, []) == 0
+        with ItemFile(path) as item_file:
+            assert len(item_file) == 0
+            assert item_file.find(1) is None
+
+    def test_index_out_of_range(self, item_path: Path) -> None:
+        """範囲外のインデックスでIndexErrorが発生することをテストします。"""
+        with ItemFile(item_path) as item_file, pytest.raises(IndexError):
+            item_file.item(4)
+
+    def test_not_item_file(self, tmp_path: Path) -> None:
+        """バイナリ形式でないファイルでValueErrorが発生することをテストします。"""
+        path = tmp_path / "items.ndjson"
+        path.write_bytes(b'{"id": 1, "name": "A", "price": 1.0}\n' * 4)
+        with pytest.raises(ValueError, match="バイナリ形式のファイルではありません"):
+            ItemFile(path)
+
+    def test_corrupted(self, item_path: Path) -> None:
+        """データの破損がチェックサムで検出されることをテストします。"""
+        data = bytearray(item_path.read_bytes())
+        data[-1] ^= 0xFF
+        item_path.write_bytes(bytes(data))
+        with pytest.raises(ValueError, match="チェックサム"):
+            ItemFile(item_path)
+        with ItemFile(item_path, verify=False) as item_file:
+            assert len(item_file) == 4
+
+    def test_trusted_matches_validated(self, sample_items: list[Item], item_path: Path) -> None:
+        """trusted=True で検証せずに組み立てた商品が、検証した場合と一致することをテストします。"""
+        with ItemFile(item_path, trusted=True) as item_file:
+            items = item_file.to_items()
+            assert items == sample_items
+            assert [item_file[i] for i in range(4)] == sample_items
+            assert item_file.find(-3) == sample_items[2]
+        assert [item.model_dump_json() for item in items] == [
+            item.model_dump_json() for item in sample_items
+        ]
+        assert items[0].model_fields_set == sample_items[0].model_fields_set
+
+    def test_trusted_requires_checksum(self, item_path: Path) -> None:
+        """trusted=True ではチェックサムを確認し、破損したファイルを拒否することをテストします。"""
+        with pytest.raises(ValueError, match="チェックサムの確認が必要"):
+            ItemFile(item_path, verify=False, trusted=True)
+        data = bytearray(item_path.read_bytes())
+        data[-1] ^= 0xFF
+        item_path.write_bytes(bytes(data))
+        with pytest.raises(ValueError, match="チェックサム"):
+            ItemFile(item_path, trusted=True)
+
+    def test_truncated(self, item_path: Path) -> None:
+        """途中で切れたファイルが検出されることをテストします。"""
+        item_path.write_bytes(item_path.read_bytes()[:-1])
+        with pytest.raises(ValueError, match="ファイルの大きさ"):
+            ItemFile(item_path)
+
+    def test_unsupported_version(self, item_path: Path) -> None:
+        """未対応のバージョンでValueErrorが発生することをテストします。"""
+        data = bytearray(item_path.read_bytes())
+        data[len(ITEM_FILE_MAGIC)] = 99
+        item_path.write_bytes(bytes(data))
+        with pytest.raises(ValueError, match="未対応のバージョン"):
+            ItemFile(item_path)
+
+    def test_items_outlive_file(self, item_path: Path) -> None:
+        """ファイルを閉じた後も取得済みのItemを利用できることをテストします。"""
+        with ItemFile(item_path) as item_file:
+            item = item_file[0]
+        assert item.name == "Apple"
+
+    def test_close_releases_column_views(self, item_path: Path) -> None:
+        """close() で id_column などのビューが解放され、mmap も閉じられることをテストします。"""
+        item_file = ItemFile(item_path)
+        ids = item_file.id_column
+        assert ids.tolist() == [1, 2, -3, 2]
+        item_file.close()
+        with pytest.raises(ValueError):
+            ids.tolist()
+
+    def test_column_views_are_cached(self, item_path: Path) -> None:
+        """列のビューは一度だけ作成され、アクセスしても記録が増えないことをテストします。"""
+        with ItemFile(item_path) as item_file:
+            ids = item_file.id_column
+            prices = item_file.price_column
+            recorded = len(item_file._views)
+            for _ in range(3):
+                assert item_file.id_column is ids
+                assert item_file.price_column is prices
+            assert len(item_file._views) == recorded
+
+    def test_close_with_exported_column(self, item_path: Path) -> None:
+        """列から作成した配列が残っている間は、close() がBufferErrorになることをテストします。"""
+        np = pytest.importorskip("numpy")
+        item_file = ItemFile(item_path)
+        prices = np.frombuffer(item_file.price_column, dtype=np.float64)
+        with pytest.raises(BufferError, match="使用中"):
+            item_file.close()
+        assert prices.tolist() == [120.0, 98.5, 0.01, 1.0]
+        del prices
+        item_file.close()
+        item_file.close()
@@ -0,0 +1,52 @@
+"""
+domain.models.item_jsonモジュールのテスト。
+"""
+
+import io
+import json
+
+import pytest
+
+from domain.models.item import Item
+from domain.models.item_json import (
+    item_to_json,
+    items_to_json,
+    items_to_ndjson,
+    write_json,
+    write_ndjson,
+)
+
+
+def test_matches_model_dump_json(sample_items: list[Item]) -> None:
+    """出力が model_dump_json() と同じバイト列になることをテストします。"""
+    items = sample_items
+    expected = [item.model_dump_json().encode() for item in items]
+
+    assert [item_to_json(item) for item in items] == expected
+    assert items_to_ndjson(items) == b"".join(line + b"\n" for line in expected)
+    assert items_to_json(items) == b"[" + b",".join(expected) + b"]"
+    assert items_to_ndjson([]) == b""
+    assert items_to_json([]) == b"[]"
+
+
+@pytest.mark.parametrize("chunk_size", [1, 2, 10])
+def test_write_streams(sample_items: list[Item], chunk_size: int) -> None:
+    """チャンクごとに書き出した結果が、まとめて変換した結果と一致することをテストします。"""
+    items = sample_items
+    json_stream, ndjson_stream = io.BytesIO(), io.BytesIO()
+
+    assert write_json(json_stream, iter(items), chunk_size) == 4
+    assert write_ndjson(ndjson_stream, iter(items), chunk_size) == 4
+
+    assert json_stream.getvalue() == items_to_json(items)
+    assert ndjson_stream.getvalue() == items_to_ndjson(items)
+    assert [Item(**record) for record in json.loads(json_stream.getvalue())] == items
+
+
+def test_write_empty_and_invalid() -> None:
+    """商品がない場合は空の配列を書き出し、不正なチャンクの大きさでValueErrorになることをテストします。"""
+    stream = io.BytesIO()
+    assert write_json(stream, []) == 0
+    assert stream.getvalue() == b"[]"
+    with pytest.raises(ValueError):
+        write_ndjson(io.BytesIO(), [], chunk_size=0)
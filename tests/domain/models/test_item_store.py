@@ -0,0 +1,68 @@
+"""
+domain.models.item_storeモジュールのテスト。
+"""
+
+import pytest
+
+from domain.models.item import Item
+from domain.models.item_store import ItemStore
+
+
+class TestItemStore:
+    """ItemStoreクラスのテスト。"""
+
+    def test_round_trip(self, sample_items: list[Item]) -> None:
+        """Itemのリストとの相互変換で内容が保たれることをテストします。"""
+        items = sample_items
+        store = ItemStore.from_items(items)
+        assert len(store) == 4
+        assert store.to_items() == items
+
+    def test_views(self, sample_items: list[Item]) -> None:
+        """ビューが各列の値を返すことをテストします。"""
+        store = ItemStore.from_items(sample_items)
+        view = store[1]
+        assert view.id == 2
+        assert view.name == "バナナ"
+        assert view.price == 98.5
+        assert view.description is None
+        assert store[-2].description == ""
+        assert view.to_item() == sample_items[1]
+        assert [v.id for v in store] == [1, 2, -3, 2]
+
+    def test_index_out_of_range(self, sample_items: list[Item]) -> None:
+        """範囲外のインデックスでIndexErrorが発生することをテストします。"""
+        store = ItemStore.from_items(sample_items)
+        with pytest.raises(IndexError):
+            store[4]
+        with pytest.raises(IndexError):
+            store.item(-5)
+
+    def test_columns(self, sample_items: list[Item]) -> None:
+        """数値列が読み取り専用のビューとして公開されることをテストします。"""
+        store = ItemStore.from_items(sample_items)
+        assert store.id_column.tolist() == [1, 2, -3, 2]
+        assert store.price_column.tolist() == [120.0, 98.5, 0.01, 1.0]
+        assert store.price_column.readonly
+
+    def test_all_columns(self, sample_items: list[Item]) -> None:
+        """columns() がすべての列を読み取り専用のビューとして返すことをテストします。"""
+        store = ItemStore.from_items(sample_items)
+        columns = store.columns()
+        names = [
+            bytes(columns.name_heap[begin:end]).decode()
+            for begin, end in zip(columns.name_offsets[:-1], columns.name_offsets[1:], strict=True)
+        ]
+        assert names == [item.name for item in sample_items]
+        assert columns.description_nulls.tolist() == [
+            int(item.description is None) for item in sample_items
+        ]
+        assert columns.ids.tolist() == [1, 2, -3, 2]
+        assert columns.description_heap.readonly
+
+    def test_nbytes_is_compact(self) -> None:
+        """1件あたりの使用バイト数が小さいことをテストします。"""
+        store = ItemStore.from_items(
+            Item(id=i, name=f"item-{i}", price=1.0, description=None) for i in range(10_000)
+        )
+        assert store.nbytes / len(store) < 64
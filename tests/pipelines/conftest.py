@@ -0,0 +1,43 @@
+import io
+import json
+from collections.abc import Callable
+
+import pytest
+
+from domain.models.item import Item
+
+
+def _item(item_id: int, name: str = "item", price: float = 1.0) -> Item:
+    return Item(id=item_id, name=name, price=price, description=None)
+
+
+def _ndjson(*records: object) -> io.BytesIO:
+    return io.BytesIO(b"".join(json.dumps(r).encode() + b"\n" for r in records))
+
+
+def _numbered_ndjson(start: int, stop: int) -> bytes:
+    return b"".join(
+        b'{"id": %d, "name": "item-%d", "price": %d}\n' % (i, i, i + 1) for i in range(start, stop)
+    )
+
+
+@pytest.fixture
+def make_item() -> Callable[..., Item]:
+    """id と name、price を指定して、description のない商品を作成する関数。"""
+    return _item
+
+
+@pytest.fixture
+def ndjson() -> Callable[..., io.BytesIO]:
+    """レコードをNDJSONの入力ストリームに変換する関数。"""
+    return _ndjson
+
+
+@pytest.fixture
+def numbered_ndjson() -> Callable[[int, int], bytes]:
+    """
+    id が start 以上 stop 未満の有効な商品のNDJSONを作成する関数。
+
+    id が i の商品の name は "item-i"、price は i + 1 です。
+    """
+    return _numbered_ndjson
@@ -0,0 +1,147 @@
+"""
+pipelines.item_checkpointモジュールと、再開可能なインポートのテスト。
+"""
+
+import io
+import json
+from collections.abc import Callable
+from pathlib import Path
+
+import pytest
+
+from pipelines.item_checkpoint import (
+    ImportCheckpoint,
+    SkipIndex,
+    read_checkpoint,
+    write_checkpoint,
+)
+from pipelines.item_import import run_import, run_resumable_import
+
+
+class _Interrupted(Exception):
+    pass
+
+
+class _InterruptedStream(io.BytesIO):
+    """指定した行数を読み込んだところで例外を発生させる入力ストリーム。"""
+
+    def __init__(self, data: bytes, lines: int) -> None:
+        super().__init__(data)
+        self._lines = lines
+
+    def __next__(self) -> bytes:
+        if self._lines == 0:
+            raise _Interrupted
+        self._lines -= 1
+        return super().__next__()
+
+
+def test_checkpoint_round_trip(tmp_path: Path) -> None:
+    """チェックポイントを書き込んで読み込めること、不正な内容でValueErrorになることをテストします。"""
+    path = tmp_path / "checkpoint.json"
+    checkpoint = ImportCheckpoint(source="items.ndjson", offset=120, read=3, content_crc=42)
+
+    write_checkpoint(path, checkpoint)
+
+    assert read_checkpoint(path) == checkpoint
+    with pytest.raises(ValueError, match="未対応"):
+        ImportCheckpoint.from_json(json.dumps({"version": 0}))
+    with pytest.raises(ValueError, match="形式が不正"):
+        ImportCheckpoint.from_json("{")
+
+
+def test_skip_index_persists_and_truncates(tmp_path: Path) -> None:
+    """索引がファイルに保存され、切り詰めると追加前の状態に戻ることをテストします。"""
+    path = tmp_path / "items.idx"
+    index = SkipIndex(path)
+    index.filter_new([b"a\n", b"b\n"])
+    size = index.flush()
+    index.filter_new([b"c\n"])
+    index.flush()
+
+    assert len(SkipIndex(path)) == 3
+    index.truncate(size)
+    assert b"b\n" in index
+    assert b"c\n" not in index
+
+    # 追記の途中で中断した半端なバイトは読み込み時に取り除かれる
+    with open(path, "ab") as file:
+        file.write(b"\x01\x02")
+    assert len(SkipIndex(path)) == 2
+    assert path.stat().st_size == size
+
+
+def test_resume_matches_full_run(
+    tmp_path: Path, numbered_ndjson: Callable[[int, int], bytes]
+) -> None:
+    """中断したインポートを再開した結果が、中断しなかった場合と一致することをテストします。"""
+    data = numbered_ndjson(0, 100) + b"not json\n"
+    expected = io.BytesIO()
+    full = run_import(io.BytesIO(data), expected, batch_size=10)
+
+    checkpoint_path = tmp_path / "checkpoint.json"
+    sink = io.BytesIO()
+    with pytest.raises(_Interrupted):
+        run_resumable_import(
+            _InterruptedStream(data, 45), sink, checkpoint_path, batch_size=10, interval=0
+        )
+    checkpoint = read_checkpoint(checkpoint_path)
+    assert checkpoint.read == 40
+    assert not checkpoint.completed
+    # チェックポイントより後に書き出された分は、再開時に取り消される
+    sink.write(b"partial")
+
+    stats = run_resumable_import(
+        io.BytesIO(data), sink, checkpoint_path, resume=True, batch_size=10, interval=0
+    )
+
+    assert sink.getvalue() == expected.getvalue()
+    assert (stats.read, stats.imported, stats.rejected) == (
+        full.read,
+        full.imported,
+        full.rejected,
+    )
+    assert read_checkpoint(checkpoint_path).completed
+
+    # 完了したチェックポイントから再開した場合は何もしない
+    again = run_resumable_import(
+        io.BytesIO(data), sink, checkpoint_path, resume=True, batch_size=10
+    )
+    assert again.imported == full.imported
+    assert sink.getvalue() == expected.getvalue()
+
+
+def test_resume_rejects_changed_input(
+    tmp_path: Path, numbered_ndjson: Callable[[int, int], bytes]
+) -> None:
+    """チェックポイントの後に入力が変わっている場合はValueErrorになることをテストします。"""
+    data = numbered_ndjson(0, 30)
+    checkpoint_path = tmp_path / "checkpoint.json"
+    with pytest.raises(_Interrupted):
+        run_resumable_import(
+            _InterruptedStream(data, 25), None, checkpoint_path, batch_size=10, interval=0
+        )
+
+    changed = data.replace(b"item-15", b"item-51")
+    with pytest.raises(ValueError, match="一致しません"):
+        run_resumable_import(io.BytesIO(changed), None, checkpoint_path, resume=True)
+
+
+def test_skip_index_imports_only_new_items(
+    tmp_path: Path, numbered_ndjson: Callable[[int, int], bytes]
+) -> None:
+    """索引を使うと、2回目以降は新しい商品と変更された商品だけを書き出すことをテストします。"""
+    index_path = tmp_path / "items.idx"
+    first = io.BytesIO()
+    run_resumable_import(
+        io.BytesIO(numbered_ndjson(0, 50)), first, skip_index=SkipIndex(index_path)
+    )
+
+    # id 7 の商品(price は id + 1)の内容を変更する
+    changed = numbered_ndjson(0, 60).replace(b'"price": 8}', b'"price": 9}')
+    second = io.BytesIO()
+    stats = run_resumable_import(io.BytesIO(changed), second, skip_index=SkipIndex(index_path))
+
+    ids = [json.loads(line)["id"] for line in second.getvalue().splitlines()]
+    assert ids == [7, *range(50, 60)]
+    assert (stats.imported, stats.skipped) == (11, 49)
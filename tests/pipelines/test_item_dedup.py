@@ -0,0 +1,184 @@
+"""
+pipelines.item_dedupモジュールのテスト。
+"""
+
+import io
+import json
+import random
+import sqlite3
+from collections.abc import Callable
+from pathlib import Path
+
+import pytest
+
+from domain.models.item import Item
+from pipelines.item_dedup import (
+    BloomFilter,
+    ConflictingItemError,
+    ItemDeduplicator,
+    deduplicate_items,
+)
+from shared.errors import ValidationError
+
+
+def _ids(lines: list[bytes]) -> list[tuple[int, str]]:
+    return [(record["id"], record["name"]) for record in map(json.loads, lines)]
+
+
+class TestBloomFilter:
+    """BloomFilterクラスのテスト。"""
+
+    def test_no_false_negatives(self) -> None:
+        """追加したキーは必ず含まれると判定されることをテストします。"""
+        bloom = BloomFilter(1_000, 0.01)
+        keys = [b"%d" % i for i in range(1_000)]
+        for key in keys:
+            bloom.add(key)
+        assert all(key in bloom for key in keys)
+        assert bloom.count <= 1_000
+
+    def test_false_positive_rate(self) -> None:
+        """容量まで追加した時点の偽陽性率が、目標の値に近いことをテストします。"""
+        bloom = BloomFilter(10_000, 0.01)
+        for i in range(10_000):
+            bloom.add(b"%d" % i)
+
+        positives = sum(b"x%d" % i in bloom for i in range(20_000))
+
+        assert positives / 20_000 < 0.02
+        assert bloom.expected_error_rate == pytest.approx(0.01, rel=0.2)
+        # 1キーあたり約9.6ビット
+        assert bloom.nbytes == pytest.approx(10_000 * 9.6 / 8, rel=0.05)
+
+    def test_invalid_arguments(self) -> None:
+        """不正な容量や偽陽性率でValueErrorになることをテストします。"""
+        with pytest.raises(ValueError, match="容量"):
+            BloomFilter(0)
+        with pytest.raises(ValueError, match="偽陽性率"):
+            BloomFilter(10, 1.0)
+
+
+@pytest.fixture
+def duplicated(make_item: Callable[..., Item]) -> list[Item]:
+    """idの1と2が、内容を変えて重複する入力。"""
+    names = [(1, "a"), (2, "b"), (1, "c"), (3, "d"), (2, "e")]
+    return [make_item(item_id, name) for item_id, name in names]
+
+
+class TestItemDeduplicator:
+    """ItemDeduplicatorクラスのテスト。"""
+
+    def test_first_wins(self, duplicated: list[Item]) -> None:
+        """最初に出現した商品が、入力と同じ順に残ることをテストします。"""
+        with ItemDeduplicator("first", capacity=100) as dedup:
+            lines = list(dedup.deduplicate(duplicated))
+
+        assert _ids(lines) == [(1, "a"), (2, "b"), (3, "d")]
+        assert (dedup.stats.read, dedup.stats.duplicates, dedup.stats.conflicts) == (5, 2, 2)
+
+    def test_last_wins(self, duplicated: list[Item]) -> None:
+        """最後に出現した商品が、最初に出現した位置に残ることをテストします。"""
+        with ItemDeduplicator("last", capacity=100, spill_batch=2) as dedup:
+            lines = list(dedup.deduplicate(duplicated))
+
+        assert _ids(lines) == [(1, "c"), (2, "e"), (3, "d")]
+        assert dedup.stats.unique == 3
+
+    def test_error_on_conflict(
+        self, make_item: Callable[..., Item], duplicated: list[Item]
+    ) -> None:
+        """同じ内容の重複は取り除き、内容の異なる重複でエラーになることをテストします。"""
+        with ItemDeduplicator("error", capacity=100) as dedup:
+            assert len(list(dedup.deduplicate([make_item(1), make_item(2), make_item(1)]))) == 2
+
+        with (
+            ItemDeduplicator("error", capacity=100) as dedup,
+            pytest.raises(ConflictingItemError) as excinfo,
+        ):
+            list(dedup.deduplicate(duplicated))
+        assert excinfo.value.item_id == 1
+        assert isinstance(excinfo.value, ValidationError)
+        assert excinfo.value.error_code == "VALIDATION_ERROR"
+
+    @pytest.mark.parametrize("policy", ["first", "last"])
+    def test_matches_exact_set(
+        self, policy: str, tmp_path: Path, make_item: Callable[..., Item]
+    ) -> None:
+        """容量を超える入力でも、Pythonのsetによる重複除去と結果が一致することをテストします。"""
+        rng = random.Random(0)
+        ids = [rng.randrange(3_000) for _ in range(6_000)]
+        items = [make_item(item_id, f"n{i}") for i, item_id in enumerate(ids)]
+        # 偽陽性が多くなるよう、Bloomフィルタを小さくし、索引にこまめに書き込む
+        with ItemDeduplicator(
+            policy, capacity=500, spill_path=str(tmp_path / "spill.db"), spill_batch=64
+        ) as dedup:
+            lines = list(dedup.deduplicate(items))
+
+        if policy == "first":
+            seen: dict[int, str] = {}
+            for item in items:
+                seen.setdefault(item.id, item.name)
+        else:
+            seen = {}
+            for item in items:
+                seen[item.id] = item.name
+        assert _ids(lines) == list(seen.items())
+        stats = dedup.stats
+        assert stats.false_positives > 0
+        assert stats.false_positive_rate == stats.false_positives / len(seen)
+        assert stats.spill_bytes > 0
+        assert stats.memory_bytes == stats.bloom_bytes + stats.cache_bytes
+
+    def test_reuse_spill_file(self, tmp_path: Path, make_item: Callable[..., Item]) -> None:
+        """以前の索引のファイルを作り直して使えることをテストします。"""
+        spill = str(tmp_path / "spill.db")
+        items = [make_item(1, "a"), make_item(1, "b"), make_item(2, "c")]
+        for _ in range(2):
+            with ItemDeduplicator(capacity=1, spill_path=spill, spill_batch=1) as dedup:
+                assert _ids(list(dedup.deduplicate(items))) == [(1, "a"), (2, "c")]
+
+    def test_refuses_other_database(self, tmp_path: Path) -> None:
+        """索引のファイルではない既存のデータベースを変更せず、ValueErrorになることをテストします。"""
+        path = tmp_path / "app.db"
+        with sqlite3.connect(path) as db:
+            db.execute("CREATE TABLE items (id INTEGER)")
+            db.execute("INSERT INTO items VALUES (1)")
+        db.close()
+
+        with pytest.raises(ValueError, match="既存のデータベース"):
+            ItemDeduplicator(spill_path=str(path))
+
+        db = sqlite3.connect(path)
+        assert db.execute("SELECT id FROM items").fetchall() == [(1,)]
+        db.close()
+
+    def test_refuses_non_database(self, tmp_path: Path) -> None:
+        """SQLiteのデータベースではないファイルでValueErrorになることをテストします。"""
+        path = tmp_path / "notes.txt"
+        path.write_text("not a database\n" * 100)
+
+        with pytest.raises(ValueError, match="索引のファイルを開けません"):
+            ItemDeduplicator(spill_path=str(path))
+        assert path.read_text() == "not a database\n" * 100
+
+    def test_invalid_policy(self) -> None:
+        """未対応の重複の扱いでValueErrorになることをテストします。"""
+        with pytest.raises(ValueError, match="重複の扱い"):
+            ItemDeduplicator("newest")
+
+
+def test_deduplicate_items() -> None:
+    """NDJSONを検証し、重複を除いて書き出すことをテストします。"""
+    source = io.BytesIO(
+        b'{"id": 1, "name": "A", "price": 1}\n'
+        b'{"id": 1, "name": "A", "price": 1}\n'
+        b'{"id": 2, "name": "", "price": 1}\n'
+        b'{"id": 3, "name": "C", "price": 3}\n'
+    )
+    sink = io.BytesIO()
+
+    with ItemDeduplicator(capacity=100) as dedup:
+        stats = deduplicate_items(source, sink, dedup, batch_size=2)
+
+    assert (stats.read, stats.imported, stats.rejected) == (4, 2, 1)
+    assert _ids(sink.getvalue().splitlines()) == [(1, "A"), (3, "C")]
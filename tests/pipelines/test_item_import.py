@@ -0,0 +1,258 @@
+"""
+pipelines.item_importモジュールのテスト。
+"""
+
+import io
+import json
+import tracemalloc
+from collections.abc import Callable, Iterator
+from pathlib import Path
+
+import pytest
+
+from domain.models.item import construct_item
+from domain.models.item_file import write_item_file
+from pipelines.item_import import (
+    ChunkErrors,
+    batched,
+    detect_format,
+    export_item_file,
+    import_item_file,
+    resolve_workers,
+    run_import,
+)
+
+
+class _GeneratedStream(io.RawIOBase):
+    """指定件数のNDJSON行をその場で生成する入力ストリーム。"""
+
+    def __init__(self, count: int) -> None:
+        self._count = count
+
+    def __iter__(self) -> Iterator[bytes]:
+        for i in range(self._count):
+            yield b'{"id": %d, "name": "item-%d", "price": 9.99}\n' % (i, i)
+
+
+def test_detect_format() -> None:
+    """拡張子から入力形式が推定されることをテストします。"""
+    assert detect_format("items.csv") == "csv"
+    assert detect_format("items.CSV") == "csv"
+    assert detect_format("items.ndjson") == "ndjson"
+    assert detect_format("snapshot.items") == "binary"
+    assert detect_format("-") == "ndjson"
+
+
+def test_batched() -> None:
+    """レコードが指定件数ずつにまとめられることをテストします。"""
+    assert list(batched(range(5), 2)) == [[0, 1], [2, 3], [4]]
+    assert list(batched([], 2)) == []
+
+
+def test_run_import_ndjson(ndjson: Callable[..., io.BytesIO]) -> None:
+    """NDJSONが検証され、有効な商品のみが書き出されることをテストします。"""
+    source = ndjson(
+        {"id": 1, "name": "A", "price": 1.5},
+        {"id": 2, "name": "", "price": 1.0},
+        {"id": "3", "name": "C", "price": "3"},
+    )
+    source.seek(0, io.SEEK_END)
+    source.write(b"\nnot json\n[1, 2]\n")
+    source.seek(0)
+    sink = io.BytesIO()
+
+    stats = run_import(source, sink, "ndjson", batch_size=2)
+
+    assert (stats.read, stats.imported, stats.rejected) == (5, 2, 3)
+    lines = [json.loads(line) for line in sink.getvalue().splitlines()]
+    assert lines == [
+        {"id": 1, "name": "A", "price": 1.5, "description": None},
+        {"id": 3, "name": "C", "price": 3.0, "description": None},
+    ]
+
+
+def test_run_import_csv() -> None:
+    """CSVが読み込まれ、空のdescriptionがNoneになることをテストします。"""
+    source = io.BytesIO("id,name,price,description\n1,A,2.5,\n2,B,-1,x\n3,C,1,説明\n".encode())
+    sink = io.BytesIO()
+
+    stats = run_import(source, sink, "csv")
+
+    assert (stats.read, stats.imported, stats.rejected) == (3, 2, 1)
+    lines = [json.loads(line) for line in sink.getvalue().splitlines()]
+    assert [line["description"] for line in lines] == [None, "説明"]
+
+
+def test_run_import_without_sink(ndjson: Callable[..., io.BytesIO]) -> None:
+    """出力先を指定しない場合は検証のみ行われることをテストします。"""
+    stats = run_import(ndjson({"id": 1, "name": "A", "price": 1.0}), None)
+    assert stats.imported == 1
+    assert stats.items_per_second > 0
+
+
+def test_run_import_rejects_invalid_arguments() -> None:
+    """不正な形式やバッチサイズでValueErrorが発生することをテストします。"""
+    with pytest.raises(ValueError, match="未対応の入力形式"):
+        run_import(io.BytesIO(), None, "xml")
+    with pytest.raises(ValueError, match="バッチサイズ"):
+        run_import(io.BytesIO(), None, batch_size=0)
+    with pytest.raises(ValueError, match="ワーカー数"):
+        run_import(io.BytesIO(), None, workers=-1)
+
+
+def test_resolve_workers() -> None:
+    """ワーカー数0がCPUコア数に変換されることをテストします。"""
+    assert resolve_workers(3) == 3
+    assert resolve_workers(0) >= 1
+
+
+def _mixed_ndjson(count: int) -> bytes:
+    lines = []
+    for i in range(count):
+        if i % 7 == 3:
+            lines.append(b"not json")
+        elif i % 5 == 1:
+            lines.append(json.dumps({"id": i, "name": "", "price": -1}).encode())
+        else:
+            lines.append(json.dumps({"id": i, "name": f"item-{i}", "price": i + 0.5}).encode())
+    return b"\n".join(lines) + b"\n"
+
+
+@pytest.mark.parametrize("input_format", ["ndjson", "csv"])
+def test_run_import_parallel_matches_serial(input_format: str) -> None:
+    """並列処理の出力順序と集計結果が1プロセスでの処理と一致することをテストします。"""
+    if input_format == "ndjson":
+        data = _mixed_ndjson(500)
+    else:
+        rows = "".join(f"{i},item-{i},{-1 if i % 4 == 0 else i + 1}\n" for i in range(500))
+        data = ("id,name,price\n" + rows).encode()
+
+    serial_sink, parallel_sink = io.BytesIO(), io.BytesIO()
+    serial = run_import(io.BytesIO(data), serial_sink, input_format, batch_size=64)
+    parallel = run_import(io.BytesIO(data), parallel_sink, input_format, batch_size=64, workers=3)
+
+    assert parallel_sink.getvalue() == serial_sink.getvalue()
+    assert (parallel.read, parallel.imported, parallel.rejected) == (
+        serial.read,
+        serial.imported,
+        serial.rejected,
+    )
+    assert parallel.chunk_errors == serial.chunk_errors
+
+
+def test_run_import_aggregates_errors_per_chunk(ndjson: Callable[..., io.BytesIO]) -> None:
+    """拒否理由がチャンクごとに集計されることをテストします。"""
+    source = ndjson(
+        {"id": 1, "name": "A", "price": 1.0},
+        {"id": 2, "name": "", "price": 0},
+        {"id": 3, "name": "", "price": 1.0},
+        {"id": 4, "name": "D", "price": 1.0},
+    )
+    stats = run_import(source, None, batch_size=2, workers=2)
+
+    assert stats.chunk_errors == [
+        ChunkErrors(
+            index=0,
+            start=0,
+            rejected=1,
+            reasons={
+                "name: String should have at least 1 character": 1,
+                "price: Input should be greater than 0": 1,
+            },
+        ),
+        ChunkErrors(
+            index=1,
+            start=2,
+            rejected=1,
+            reasons={"name: String should have at least 1 character": 1},
+        ),
+    ]
+
+
+def test_run_import_memory_is_flat() -> None:
+    """入力件数を増やしてもピークメモリがバッチサイズ程度に収まることをテストします。"""
+
+    def peak(count: int) -> int:
+        tracemalloc.start()
+        run_import(_GeneratedStream(count), None, batch_size=1_000)  # type: ignore[arg-type]
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        return peak
+
+    small, large = peak(2_000), peak(40_000)
+    assert large < small * 2
+
+
+def test_binary_round_trip(tmp_path: Path, ndjson: Callable[..., io.BytesIO]) -> None:
+    """バイナリ形式への書き出しとNDJSONへの変換で、有効な商品が保たれることをテストします。"""
+    path = str(tmp_path / "items.items")
+    source = ndjson(
+        {"id": 2, "name": "B", "price": 2.0, "description": "x"},
+        {"id": 1, "name": "A", "price": 0},
+        {"id": 1, "name": "A", "price": 1.0},
+    )
+
+    stats = export_item_file(source, path, batch_size=2)
+
+    assert (stats.read, stats.imported, stats.rejected) == (3, 2, 1)
+    sink = io.BytesIO()
+    stats = import_item_file(path, sink, batch_size=1)
+    assert (stats.read, stats.imported, stats.rejected) == (2, 2, 0)
+    assert [json.loads(line)["id"] for line in sink.getvalue().splitlines()] == [2, 1]
+
+
+def test_import_item_file_validates_unless_trusted(tmp_path: Path) -> None:
+    """CRC32が正しくても不正な商品は拒否され、trusted=True では読み込めることをテストします。"""
+    path = str(tmp_path / "forged.items")
+    write_item_file(path, [construct_item(1, "", 0.0, None)])
+
+    with pytest.raises(ValueError):
+        import_item_file(path, io.BytesIO())
+
+    stats = import_item_file(path, io.BytesIO(), trusted=True)
+    assert stats.imported == 1
+
+
+def test_run_import_parallel_merges_worker_metrics(ndjson: Callable[..., io.BytesIO]) -> None:
+    """並列処理でワーカープロセスの計測値が親プロセスに統合されることをテストします。"""
+    from shared import metrics
+
+    records = [{"id": i, "name": f"item-{i}", "price": 1.0} for i in range(100)]
+    registry = metrics.get_registry()
+    registry.reset()
+    metrics.enable()
+    try:
+        run_import(ndjson(*records), None, batch_size=30, workers=2)
+        histogram = registry.histogram("item_import.validate_batch")
+        read = registry.counter("item_import.read")
+    finally:
+        metrics.disable()
+        registry.reset()
+
+    assert histogram is not None
+    assert histogram.count == 4
+    assert read == 100
+
+
+def test_run_import_parallel_metrics_are_not_counted_twice(
+    ndjson: Callable[..., io.BytesIO],
+) -> None:
+    """続けて並列処理しても、親プロセスの計測値がワーカーから送り返されないことをテストします。"""
+    from shared import metrics
+
+    records = [{"id": i, "name": f"item-{i}", "price": 1.0} for i in range(100)]
+    registry = metrics.get_registry()
+    registry.reset()
+    metrics.enable()
+    try:
+        run_import(ndjson(*records), None, batch_size=30, workers=2)
+        run_import(ndjson(*records), None, batch_size=30, workers=2)
+        histogram = registry.histogram("item_import.validate_batch")
+        read = registry.counter("item_import.read")
+    finally:
+        metrics.disable()
+        registry.reset()
+
+    assert histogram is not None
+    assert histogram.count == 8
+    assert read == 200
@@ -0,0 +1,109 @@
+"""
+pipelines.item_shardモジュールのテスト。
+"""
+
+import io
+import json
+import os
+from collections.abc import Callable
+from pathlib import Path
+
+import pytest
+
+from domain.models.item import Item
+from domain.models.item_file import ItemFile
+from pipelines.item_import import run_import
+from pipelines.item_shard import (
+    ShardedWriter,
+    ShardManifest,
+    export_sharded_item_files,
+    read_manifest,
+    shard_of,
+    verify_shards,
+)
+
+
+def test_shard_of_is_stable_and_balanced() -> None:
+    """同じidは常に同じシャードになり、シャードの件数がほぼ均等になることをテストします。"""
+    counts = [0] * 8
+    for item_id in range(8_000):
+        counts[shard_of(item_id, 8)] += 1
+
+    assert shard_of(12_345, 8) == shard_of(12_345, 8)
+    assert min(counts) > 850
+    assert shard_of(2**80, 3) in range(3)
+    assert shard_of(-5, 3) in range(3)
+
+
+def test_sharded_writer(tmp_path: Path, make_item: Callable[..., Item]) -> None:
+    """行がidのシャードに振り分けられ、マニフェストの件数とチェックサムが一致することをテストします。"""
+    items = [make_item(i, f"item-{i}") for i in range(100)]
+
+    with ShardedWriter(tmp_path, 4, buffer_size=64, queue_chunks=1) as writer:
+        writer.write_items(items[:50])
+        writer.write_items(items[50:])
+
+    manifest = read_manifest(tmp_path)
+    assert manifest.format == "ndjson"
+    assert manifest.items == 100
+    for shard in manifest.shards:
+        lines = (tmp_path / shard.path).read_bytes().splitlines()
+        assert len(lines) == shard.items
+        assert all(shard_of(json.loads(line)["id"], 4) == shard.index for line in lines)
+    assert verify_shards(tmp_path) == []
+
+    # ファイルが変更された場合は、照合で検出される
+    with open(tmp_path / manifest.shards[2].path, "ab") as file:
+        file.write(b"\n")
+    assert verify_shards(tmp_path) == [2]
+
+
+def test_sharded_writer_as_import_sink(
+    tmp_path: Path, numbered_ndjson: Callable[[int, int], bytes]
+) -> None:
+    """run_import() の出力先に使うと、分割しない場合と同じ商品が書き出されることをテストします。"""
+    data = numbered_ndjson(0, 300)
+    expected = io.BytesIO()
+    run_import(io.BytesIO(data), expected, batch_size=32)
+
+    with ShardedWriter(tmp_path, 3) as writer:
+        run_import(io.BytesIO(data), writer, batch_size=32)  # type: ignore[arg-type]
+
+    lines = sorted(
+        line for shard in writer.manifest.shards for line in (tmp_path / shard.path).open("rb")
+    )
+    assert lines == sorted(expected.getvalue().splitlines(keepends=True))
+
+
+def test_sharded_writer_errors(tmp_path: Path) -> None:
+    """不正な行や引数でValueErrorになり、失敗した場合はマニフェストを書き込まないことをテストします。"""
+    with pytest.raises(ValueError, match="シャードの数"):
+        ShardedWriter(tmp_path, 0)
+    with pytest.raises(ValueError, match="正規化"), ShardedWriter(tmp_path, 2) as writer:
+        writer.write(b'{"name": "A", "id": 1}\n')
+    assert not os.path.exists(tmp_path / "manifest.json")
+
+
+def test_export_sharded_item_files(
+    tmp_path: Path, numbered_ndjson: Callable[[int, int], bytes]
+) -> None:
+    """バイナリ形式のシャードに書き出し、マニフェストと照合できることをテストします。"""
+    stats, manifest = export_sharded_item_files(io.BytesIO(numbered_ndjson(0, 200)), tmp_path, 3)
+
+    assert stats.imported == manifest.items == 200
+    assert read_manifest(tmp_path) == manifest
+    assert verify_shards(tmp_path) == []
+    ids: list[int] = []
+    for shard in manifest.shards:
+        with ItemFile(tmp_path / shard.path) as item_file:
+            assert len(item_file) == shard.items
+            ids.extend(item.id for item in item_file)
+    assert sorted(ids) == list(range(200))
+
+
+def test_manifest_rejects_invalid_json() -> None:
+    """不正なマニフェストでValueErrorになることをテストします。"""
+    with pytest.raises(ValueError, match="未対応"):
+        ShardManifest.from_json('{"version": 9, "format": "ndjson", "shards": []}')
+    with pytest.raises(ValueError, match="形式が不正"):
+        ShardManifest.from_json('{"version": 1}')
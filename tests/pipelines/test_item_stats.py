@@ -0,0 +1,218 @@
+"""
+pipelines.item_statsモジュールのテスト。
+"""
+
+import io
+import json
+import math
+import random
+from collections.abc import Callable
+from pathlib import Path
+
+import pytest
+
+from domain.models.item import Item, construct_item
+from domain.models.item_file import write_item_file
+
+np = pytest.importorskip("numpy")
+
+from pipelines.item_stats import PriceStats, columns_from_items, compute_item_stats  # noqa: E402
+
+
+def _prices(count: int, seed: int = 0) -> list[float]:
+    rng = random.Random(seed)
+    return [round(rng.lognormvariate(6, 2), 2) + 0.01 for _ in range(count)]
+
+
+def _update_in_chunks(stats: PriceStats, prices: list[float], size: int) -> None:
+    for start in range(0, len(prices), size):
+        chunk = prices[start : start + size]
+        stats.update(np.arange(start, start + len(chunk)), np.array(chunk))
+
+
+def test_columns_from_items(make_item: Callable[..., Item]) -> None:
+    """商品のidとpriceが連続した配列に取り出されることをテストします。"""
+    items = [make_item(i, "A", i + 0.5) for i in range(3)]
+
+    ids, prices = columns_from_items(items)
+
+    assert ids.dtype == np.int64
+    assert prices.dtype == np.float64
+    assert ids.tolist() == [0, 1, 2]
+    assert prices.tolist() == [0.5, 1.5, 2.5]
+
+
+def test_aggregates_match_numpy() -> None:
+    """チャンクごとに更新した統計量が、全体を一度に計算した値と一致することをテストします。"""
+    prices = _prices(10_000)
+    stats = PriceStats()
+
+    _update_in_chunks(stats, prices, 777)
+
+    reference = np.array(prices)
+    assert stats.count == len(prices)
+    assert stats.total == pytest.approx(reference.sum())
+    assert stats.mean == pytest.approx(reference.mean())
+    assert stats.std == pytest.approx(reference.std())
+    assert (stats.min, stats.max) == (reference.min(), reference.max())
+
+
+def test_approximate_percentiles() -> None:
+    """対数目盛のバケットから推定したパーセンタイルの相対誤差が1%以内であることをテストします。"""
+    prices = _prices(20_000, seed=1)
+    stats = PriceStats()
+    _update_in_chunks(stats, prices, 3_000)
+
+    estimates = stats.percentiles([1, 50, 90, 99, 100])
+
+    for q, estimate in estimates.items():
+        expected = np.percentile(prices, q, method="lower")
+        assert estimate == pytest.approx(expected, rel=0.01)
+
+
+def test_exact_percentiles() -> None:
+    """exact=Trueの場合、パーセンタイルがnumpyと一致することをテストします。"""
+    prices = _prices(5_000, seed=2)
+    stats = PriceStats(exact=True)
+    _update_in_chunks(stats, prices, 1_000)
+
+    result = stats.percentiles([50, 95])
+
+    assert result == {q: pytest.approx(np.percentile(prices, q)) for q in (50, 95)}
+
+
+def test_empty_stats() -> None:
+    """件数が0の場合、平均やパーセンタイルがNaNになることをテストします。"""
+    stats = PriceStats()
+    stats.update(np.array([], dtype=np.int64), np.array([]))
+
+    assert stats.count == 0
+    assert math.isnan(stats.mean)
+    assert math.isnan(stats.percentiles([50])[50])
+    assert stats.to_dict([50])["percentiles"] == {"p50": None}
+
+
+def test_histogram() -> None:
+    """価格が境界で区切られた価格帯ごとに数えられることをテストします。"""
+    stats = PriceStats(edges=[10, 100])
+    stats.update(np.arange(5), np.array([1.0, 10.0, 50.0, 100.0, 1000.0]))
+
+    assert stats.histogram() == [
+        (-math.inf, 10.0, 1),
+        (10.0, 100.0, 2),
+        (100.0, math.inf, 2),
+    ]
+
+
+def test_groups_merge_across_chunks() -> None:
+    """idの範囲ごとの集計が、チャンクをまたいで統合されることをテストします。"""
+    stats = PriceStats(group_width=10)
+    stats.update(np.array([25, 1, 12]), np.array([5.0, 1.0, 2.0]))
+    stats.update(np.array([3, 28]), np.array([3.0, 7.0]))
+
+    groups = stats.groups()
+
+    assert [(g.id_from, g.id_to, g.count, g.total) for g in groups] == [
+        (0, 10, 2, 4.0),
+        (10, 20, 1, 2.0),
+        (20, 30, 2, 12.0),
+    ]
+    assert [(g.min, g.max, g.mean) for g in groups] == [
+        (1.0, 3.0, 2.0),
+        (2.0, 2.0, 2.0),
+        (5.0, 7.0, 6.0),
+    ]
+
+
+def test_to_dict_is_json_serializable() -> None:
+    """to_dictの結果がJSONに変換できることをテストします。"""
+    stats = PriceStats(group_width=100)
+    stats.update(np.arange(3), np.array([1.0, 2.0, 3.0]))
+
+    result = json.loads(json.dumps(stats.to_dict([50])))
+
+    assert result["count"] == 3
+    assert result["histogram"][0]["from"] is None
+    assert result["groups"][0]["count"] == 3
+
+
+@pytest.mark.parametrize("kwargs", [{"edges": [10, 1]}, {"edges": [1, 1]}, {"group_width": 0}])
+def test_invalid_arguments(kwargs: dict[str, object]) -> None:
+    """不正な引数でValueErrorが発生することをテストします。"""
+    with pytest.raises(ValueError):
+        PriceStats(**kwargs)  # type: ignore[arg-type]
+
+
+def test_invalid_percentile() -> None:
+    """範囲外のパーセンタイルでValueErrorが発生することをテストします。"""
+    with pytest.raises(ValueError):
+        PriceStats().percentiles([101])
+
+
+def test_compute_item_stats_ndjson() -> None:
+    """NDJSONの有効な商品だけが集計されることをテストします。"""
+    source = io.BytesIO(
+        b'{"id": 1, "name": "A", "price": 1.5}\n'
+        b'{"id": 2, "name": "", "price": 2.0}\n'
+        b'{"id": 3, "name": "C", "price": "4.5"}\n'
+    )
+    stats = PriceStats()
+
+    result = compute_item_stats(stats, source, batch_size=1)
+
+    assert (result.read, result.imported, result.rejected) == (3, 2, 1)
+    assert (stats.count, stats.total) == (2, 6.0)
+
+
+def test_compute_item_stats_binary(tmp_path: Path, make_item: Callable[..., Item]) -> None:
+    """バイナリ形式のファイルの列がチャンクごとに集計されることをテストします。"""
+    prices = _prices(1_000, seed=3)
+    path = tmp_path / "items.items"
+    write_item_file(
+        path,
+        (make_item(i, f"item-{i}", p) for i, p in enumerate(prices)),
+    )
+    stats = PriceStats(group_width=500)
+
+    result = compute_item_stats(stats, str(path), "binary", batch_size=300)
+
+    assert result.imported == 1_000
+    assert stats.total == pytest.approx(sum(prices))
+    assert [g.count for g in stats.groups()] == [500, 500]
+
+
+def test_compute_item_stats_rejects_ids_outside_int64() -> None:
+    """int64に収まらないidの行が、異常終了せずに拒否されることをテストします。"""
+    source = io.BytesIO(
+        b'{"id": %d, "name": "A", "price": 1.5}\n{"id": 1, "name": "B", "price": 2.0}\n' % 2**63
+    )
+    stats = PriceStats()
+
+    result = compute_item_stats(stats, source)
+
+    assert (result.read, result.imported, result.rejected) == (2, 1, 1)
+    assert stats.total == 2.0
+
+
+def test_compute_item_stats_binary_validates_unless_trusted(tmp_path: Path) -> None:
+    """バイナリ形式の不正な商品は拒否され、trusted=True では検証を省くことをテストします。"""
+    path = str(tmp_path / "forged.items")
+    write_item_file(path, [construct_item(1, "A", 1.0, None), construct_item(2, "", -5.0, None)])
+
+    with pytest.raises(ValueError):
+        compute_item_stats(PriceStats(), path, "binary")
+
+    stats = PriceStats()
+    result = compute_item_stats(stats, path, "binary", trusted=True)
+    assert result.imported == 2
+    assert stats.total == -4.0
+
+
+def test_compute_item_stats_invalid_source() -> None:
+    """形式と入力の組み合わせが不正な場合にValueErrorが発生することをテストします。"""
+    with pytest.raises(ValueError):
+        compute_item_stats(PriceStats(), io.BytesIO(), "binary")
+    with pytest.raises(ValueError):
+        compute_item_stats(PriceStats(), "items.ndjson", "ndjson")
+    with pytest.raises(ValueError):
+        compute_item_stats(PriceStats(), io.BytesIO(), batch_size=0)
@@ -2,12 +2,17 @@
 shared.errorsモジュールのテスト。
 """
 
+import pytest
+
 from shared.errors import (
     AuthenticationError,
     AuthorizationError,
     BaseApplicationError,
+    BulkValidationError,
     BusinessLogicError,
     ConfigurationError,
+    ErrorCollector,
+    ErrorRecord,
     ExternalServiceError,
     ValidationError,
 )
@@ -121,6 +126,76 @@ class TestBusinessLogicError:
         assert error.error_code == "BUSINESS_LOGIC_ERROR"
 
 
+class TestErrorCollector:
+    """ErrorCollectorクラスとBulkValidationError例外のテスト。"""
+
+    def test_collects_without_raising(self) -> None:
+        """失敗が例外を送出せずに記録されることをテストします。"""
+        errors = ErrorCollector()
+        errors.add(2, "price", "greater_than", "Input should be greater than 0")
+        errors.add(0, "name", "missing")
+        errors.add(2, "name", "missing")
+
+        assert len(errors) == 3
+        assert errors.records[0] == ErrorRecord(
+            2, "price", "greater_than", "Input should be greater than 0"
+        )
+        assert errors.counts() == {"greater_than": 1, "missing": 2}
+        assert errors.rows() == [0, 2]
+
+    def test_empty(self) -> None:
+        """失敗がない場合は例外にまとめられないことをテストします。"""
+        errors = ErrorCollector()
+        assert not errors
+        assert errors.to_error() is None
+        errors.raise_if_any()
+
+    def test_to_error(self) -> None:
+        """記録した失敗がBaseApplicationErrorのまとめに変換されることをテストします。"""
+        errors = ErrorCollector()
+        errors.add(1, "id", "int_parsing", "secret-value is not an integer")
+        errors.add(5, "id", "int_parsing")
+
+        error = errors.to_error("商品データが無効です")
+
+        assert isinstance(error, BulkValidationError)
+        assert isinstance(error, BaseApplicationError)
+        assert error.error_code == "VALIDATION_ERROR"
+        assert error.message == "商品データが無効です: 2件 (int_parsing=2)"
+        assert error.total == 2
+        assert [r.row for r in error.errors] == [1, 5]
+        # メッセージに入力値由来の文字列を含めない
+        assert "secret" not in str(error)
+        with pytest.raises(BulkValidationError):
+            errors.raise_if_any()
+
+    def test_limit(self) -> None:
+        """上限を超えた失敗は保持されず、件数のみ数えられることをテストします。"""
+        errors = ErrorCollector(limit=2)
+        for row in range(5):
+            errors.add(row, "price", "greater_than")
+
+        assert errors.total == 5
+        assert [r.row for r in errors] == [0, 1]
+        error = errors.to_error()
+        assert error is not None
+        assert error.total == 5
+        assert error.counts == {"greater_than": 5}
+
+    def test_extend_with_offset(self) -> None:
+        """バッチ内の行番号に位置を加えて追加できることをテストします。"""
+        errors = ErrorCollector()
+        errors.extend(
+            [ErrorRecord(0, "name", "missing"), ErrorRecord(3, "id", "int_type")], offset=100
+        )
+        assert errors.rows() == [100, 103]
+
+    def test_invalid_limit(self) -> None:
+        """負の上限でValueErrorが発生することをテストします。"""
+        with pytest.raises(ValueError):
+            ErrorCollector(limit=-1)
+
+
 class TestExceptionInheritance:
     """例外の継承関係のテスト。"""
 
@@ -1,8 +1,24 @@
+import json
 import logging
+import sys
+import threading
+import time
+from logging.handlers import QueueHandler
+from pathlib import Path
+from unittest.mock import patch
 
+import pytest
 from rich.logging import RichHandler
 
-from shared.logging import setup_logging
+import config
+from config import settings
+from shared.logging import (
+    JsonLinesFormatter,
+    RateLimitFilter,
+    RedactionFilter,
+    setup_logging,
+    shutdown_logging,
+)
 
 
 def test_setup_logging_configures_root_logger() -> None:
@@ -55,3 +71,341 @@ def test_setup_logging_sets_level() -> None:
         assert root_logger.level == expected_level
     finally:
         logging.getLogger().handlers.clear()
+
+
+class _ListHandler(logging.Handler):
+    """出力されたレコードを保持するテスト用ハンドラ。"""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.records: list[logging.LogRecord] = []
+
+    def emit(self, record: logging.LogRecord) -> None:
+        self.records.append(record)
+
+
+def _logger_with_redaction(
+    name: str, filter_: RedactionFilter
+) -> tuple[logging.Logger, _ListHandler]:
+    logger = logging.getLogger(name)
+    logger.propagate = False
+    logger.setLevel(logging.INFO)
+    handler = _ListHandler()
+    handler.addFilter(filter_)
+    logger.handlers = [handler]
+    return logger, handler
+
+
+def test_redaction_filter_sanitizes_formatted_message() -> None:
+    """%形式の引数を展開した後のメッセージがサニタイズされることをテストします。"""
+    logger, handler = _logger_with_redaction("test.redaction.format", RedactionFilter())
+
+    logger.info("User %s logged in with %s", "user@example.com", "sk-1234567890abcdef")
+
+    record = handler.records[0]
+    assert record.getMessage() == "User u***@example.com logged in with ***"
+    assert record.args is None
+
+
+def test_redaction_filter_skips_dropped_records() -> None:
+    """レベルで破棄されたレコードはサニタイズされないことをテストします。"""
+    with patch("shared.logging.sanitize_log_message", side_effect=lambda m: m) as sanitize:
+        logger, handler = _logger_with_redaction("test.redaction.level", RedactionFilter())
+        logger.debug("debug %s", "user@example.com")
+        assert sanitize.call_count == 0
+        assert handler.records == []
+
+        logger.info("info %s", "user@example.com")
+        assert sanitize.call_count == 1
+
+
+def test_redaction_filter_caches_repeated_messages() -> None:
+    """同じメッセージの結果が上限付きのキャッシュから返されることをテストします。"""
+    with patch("shared.logging.sanitize_log_message", side_effect=lambda m: m) as sanitize:
+        logger, _ = _logger_with_redaction("test.redaction.cache", RedactionFilter(cache_size=2))
+        for _ in range(3):
+            logger.info("same message")
+        assert sanitize.call_count == 1
+
+        for i in range(3):
+            logger.info("message %d", i)
+        logger.info("same message")
+        assert sanitize.call_count == 5
+
+
+def test_setup_logging_installs_redaction_filter() -> None:
+    """setup_loggingがハンドラにRedactionFilterを設定することをテストします。"""
+    logging.getLogger().handlers.clear()
+
+    try:
+        setup_logging()
+        handler = logging.getLogger().handlers[0]
+        assert any(isinstance(f, RedactionFilter) for f in handler.filters)
+    finally:
+        logging.getLogger().handlers.clear()
+
+
+class _Clock:
+    """テスト用の手動で進める時計。"""
+
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def _logger_with_rate_limit(
+    name: str, filter_: RateLimitFilter
+) -> tuple[logging.Logger, _ListHandler]:
+    logger = logging.getLogger(name)
+    logger.propagate = False
+    logger.setLevel(logging.DEBUG)
+    handler = _ListHandler()
+    filter_.bind(handler)
+    logger.handlers = [handler]
+    return logger, handler
+
+
+def test_rate_limit_filter_collapses_repeated_records() -> None:
+    """同じ書式のログが集計期間ごとに1件にまとめられ、繰り返し回数が出力されることをテストします。"""
+    clock = _Clock()
+    filter_ = RateLimitFilter(dedup_interval=10, clock=clock)
+    logger, handler = _logger_with_rate_limit("test.rate.dedup", filter_)
+
+    for i in range(5):
+        logger.error("connection failed: %d", i)
+    logger.warning("connection failed: %d", 0)
+    assert [r.getMessage() for r in handler.records] == [
+        "connection failed: 0",
+        "connection failed: 0",
+    ]
+    assert filter_.suppressed == 4
+
+    clock.now = 10.5
+    logger.error("connection failed: %d", 9)
+    messages = [r.getMessage() for r in handler.records[2:]]
+    assert messages == [
+        "次のログが0.0秒間にさらに4回繰り返されました: connection failed: %d",
+        "connection failed: 9",
+    ]
+    assert handler.records[2].levelno == logging.ERROR
+
+
+def test_rate_limit_filter_flush_reports_pending_repeats() -> None:
+    """flushで集計期間の途中の繰り返し回数が出力されることをテストします。"""
+    clock = _Clock()
+    filter_ = RateLimitFilter(dedup_interval=60, clock=clock)
+    logger, handler = _logger_with_rate_limit("test.rate.flush", filter_)
+
+    logger.error("timeout")
+    clock.now = 2.0
+    logger.error("timeout")
+    filter_.flush()
+    filter_.flush()
+
+    assert [r.getMessage() for r in handler.records] == [
+        "timeout",
+        "次のログが2.0秒間にさらに1回繰り返されました: timeout",
+    ]
+
+
+def test_rate_limit_filter_limits_records_per_logger() -> None:
+    """ロガーごとのトークンバケットを超えたレコードが破棄され、件数が出力されることをテストします。"""
+    clock = _Clock()
+    filter_ = RateLimitFilter(rate=2, burst=3, clock=clock)
+    logger, handler = _logger_with_rate_limit("test.rate.bucket", filter_)
+    other = logging.getLogger("test.rate.bucket.other")
+    other.propagate = False
+    other.handlers = [handler]
+
+    for i in range(10):
+        logger.info("event %d", i)
+    other.info("other")
+    assert [r.getMessage() for r in handler.records] == [
+        "event 0",
+        "event 1",
+        "event 2",
+        "other",
+    ]
+    assert filter_.dropped == 7
+
+    # 1秒で2件分が補充され、破棄した件数はWARNINGとして出力される
+    clock.now = 1.0
+    logger.info("event %d", 10)
+    logger.info("event %d", 11)
+    logger.info("event %d", 12)
+    summary = handler.records[4]
+    assert summary.levelno == logging.WARNING
+    assert summary.name == "test.rate.bucket"
+    assert (
+        summary.getMessage()
+        == "ログの出力数の上限(1秒あたり2件)を超えたため、7件のログを破棄しました"
+    )
+    assert [r.getMessage() for r in handler.records[5:]] == ["event 10", "event 11"]
+
+
+def test_rate_limit_filter_samples_debug_records() -> None:
+    """DEBUGレベルのレコードだけが指定の割合で抽出されることをテストします。"""
+    values = iter([0.1, 0.9, 0.2, 0.7])
+    filter_ = RateLimitFilter(debug_sample_rate=0.5, sample=lambda: next(values))
+    logger, handler = _logger_with_rate_limit("test.rate.sample", filter_)
+
+    for i in range(4):
+        logger.debug("debug %d", i)
+    logger.info("info")
+
+    assert [r.getMessage() for r in handler.records] == ["debug 0", "debug 2", "info"]
+    assert filter_.sampled_out == 2
+
+
+def test_rate_limit_filter_bounds_tracked_messages() -> None:
+    """集計するログの種類が上限を超えると、最も古いものの集計が出力されることをテストします。"""
+    filter_ = RateLimitFilter(dedup_interval=60, max_keys=2, clock=_Clock())
+    logger, handler = _logger_with_rate_limit("test.rate.keys", filter_)
+
+    logger.error("first")
+    logger.error("first")
+    logger.error("second")
+    logger.error("third")
+
+    assert [r.getMessage() for r in handler.records] == [
+        "first",
+        "second",
+        "次のログが0.0秒間にさらに1回繰り返されました: first",
+        "third",
+    ]
+
+
+def test_rate_limit_filter_rejects_invalid_settings() -> None:
+    """範囲外の設定値でValueErrorが発生することをテストします。"""
+    with pytest.raises(ValueError):
+        RateLimitFilter(debug_sample_rate=1.5)
+    with pytest.raises(ValueError):
+        RateLimitFilter(rate=-1)
+    with pytest.raises(ValueError):
+        RateLimitFilter(burst=0)
+
+
+def test_setup_logging_installs_rate_limit_filter_first() -> None:
+    """RateLimitFilterがRedactionFilterより前に設定され、再読み込みで設定が反映されることをテストします。"""
+    logging.getLogger().handlers.clear()
+    listeners: list[config.ReloadListener] = []
+
+    try:
+        with patch.object(config, "add_reload_listener", listeners.append):
+            setup_logging()
+        handler = logging.getLogger().handlers[0]
+        rate_limit = handler.filters[0]
+        assert isinstance(rate_limit, RateLimitFilter)
+        assert isinstance(handler.filters[1], RedactionFilter)
+        assert rate_limit.dedup_interval == settings.LOG_DEDUP_INTERVAL
+
+        (listener,) = listeners
+        listener(settings, settings.model_copy(update={"LOG_DEDUP_INTERVAL": 30.0}))
+        assert rate_limit.dedup_interval == 30.0
+    finally:
+        shutdown_logging()
+        logging.getLogger().handlers.clear()
+
+
+def test_setup_logging_json_mode(
+    monkeypatch: pytest.MonkeyPatch, capsys: pytest.CaptureFixture[str]
+) -> None:
+    """jsonモードでは呼び出し元はキューに積むだけで、JSON Linesが出力されることをテストします。"""
+    json_settings = settings.model_copy(update={"LOG_FORMAT": "json"})
+    monkeypatch.setattr(config, "get_settings", lambda: json_settings)
+    logging.getLogger().handlers.clear()
+
+    try:
+        setup_logging()
+        root_logger = logging.getLogger()
+        assert len(root_logger.handlers) == 1
+        assert isinstance(root_logger.handlers[0], QueueHandler)
+
+        logging.getLogger("test.json").warning("User %s failed", "user@example.com")
+        shutdown_logging()
+    finally:
+        logging.getLogger().handlers.clear()
+
+    lines = capsys.readouterr().err.splitlines()
+    payload = json.loads(lines[-1])
+    assert payload["level"] == "WARNING"
+    assert payload["logger"] == "test.json"
+    assert payload["message"] == "User u***@example.com failed"
+
+
+def test_reloaded_log_level_is_applied_without_new_handlers() -> None:
+    """設定の再読み込みでLOG_LEVELが変わると、ハンドラを保ったままレベルが更新されることを確認する。"""
+    logging.getLogger().handlers.clear()
+    listeners: list[config.ReloadListener] = []
+
+    try:
+        with patch.object(config, "add_reload_listener", listeners.append):
+            setup_logging()
+        root_logger = logging.getLogger()
+        handlers = list(root_logger.handlers)
+        (listener,) = listeners
+
+        listener(settings, settings.model_copy(update={"LOG_LEVEL": "debug"}))
+        assert root_logger.level == logging.DEBUG
+        assert root_logger.handlers == handlers
+    finally:
+        logging.getLogger().handlers.clear()
+        logging.getLogger().setLevel(settings.LOG_LEVEL.upper())
+
+
+def test_env_file_change_is_applied_without_get_settings(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """get_settings() を呼び出さなくても、.envの変更がログの設定に反映されることを確認する。"""
+    for name in config.Settings.model_fields:
+        monkeypatch.delenv(name, raising=False)
+    monkeypatch.chdir(tmp_path)
+    env_file = tmp_path / ".env"
+    env_file.write_text('LOG_LEVEL="INFO"\nSETTINGS_RELOAD_INTERVAL=0\n')
+    config.reload_settings()
+    logging.getLogger().handlers.clear()
+
+    try:
+        setup_logging(watch_settings=True)
+        root_logger = logging.getLogger()
+        assert root_logger.level == logging.INFO
+
+        env_file.write_text('LOG_LEVEL="DEBUG"\nSETTINGS_RELOAD_INTERVAL=0\n')
+        deadline = time.monotonic() + 10
+        while root_logger.level != logging.DEBUG and time.monotonic() < deadline:
+            time.sleep(0.05)
+        assert root_logger.level == logging.DEBUG
+    finally:
+        shutdown_logging()
+        logging.getLogger().handlers.clear()
+        monkeypatch.undo()
+        config.reload_settings()
+        logging.getLogger().setLevel(config.get_settings().LOG_LEVEL.upper())
+
+
+def test_json_lines_formatter_includes_exception() -> None:
+    """例外情報がexc_infoとして出力されることをテストします。"""
+    try:
+        raise RuntimeError("boom")
+    except RuntimeError:
+        record = logging.getLogger("test").makeRecord(
+            "test", logging.ERROR, __file__, 1, "failed %d", (1,), sys.exc_info()
+        )
+    payload = json.loads(JsonLinesFormatter().format(record))
+    assert payload["message"] == "failed 1"
+    assert "RuntimeError: boom" in payload["exc_info"]
+
+
+def test_setup_logging_does_not_watch_settings_by_default() -> None:
+    """watch_settings を指定しない場合、設定の変更を確認するスレッドを開始しないことを確認する。"""
+    logging.getLogger().handlers.clear()
+
+    try:
+        setup_logging()
+        names = [thread.name for thread in threading.enumerate()]
+        assert "settings-watcher" not in names
+    finally:
+        shutdown_logging()
+        logging.getLogger().handlers.clear()
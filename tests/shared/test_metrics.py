@@ -0,0 +1,228 @@
+"""
+shared.metricsモジュールのテスト。
+"""
+
+import json
+import random
+import threading
+from collections.abc import Iterator
+
+import pytest
+
+from shared import metrics
+from shared.metrics import (
+    Histogram,
+    MetricsRegistry,
+    _bucket_bounds,
+    _bucket_index,
+    format_summary,
+    span,
+    timed,
+)
+
+
+@pytest.fixture
+def enabled_metrics() -> Iterator[MetricsRegistry]:
+    """アプリケーション全体のレジストリを有効にし、テスト後に元に戻します。"""
+    registry = metrics.get_registry()
+    registry.reset()
+    metrics.enable()
+    try:
+        yield registry
+    finally:
+        metrics.disable()
+        registry.reset()
+
+
+class TestHistogram:
+    """Histogramクラスのテスト。"""
+
+    def test_bucket_bounds_contain_value(self) -> None:
+        """値がバケットの範囲に含まれ、バケットの番号が値の順に並ぶことをテストします。"""
+        previous = -1
+        for value in [*range(200), 1_000, 12_345, 2**40 + 7]:
+            index = _bucket_index(value)
+            low, high = _bucket_bounds(index)
+            assert low <= value < high
+            assert index >= previous
+            previous = index
+
+    def test_record_matches_bucket_index(self) -> None:
+        """record() のバケットの計算が _bucket_index() と一致することをテストします。"""
+        histogram = Histogram()
+        values = [0, 5, 31, 32, 33, 64, 1_000_003]
+        for value in values:
+            histogram.record(value)
+
+        assert histogram.to_dict()["buckets"] == {str(_bucket_index(v)): 1 for v in values}
+
+    def test_percentile_accuracy(self) -> None:
+        """推定したパーセンタイルの相対誤差が2%以内であることをテストします。"""
+        rng = random.Random(0)
+        values = sorted(int(rng.lognormvariate(12, 1.5)) for _ in range(10_000))
+        histogram = Histogram()
+        for value in values:
+            histogram.record(value)
+
+        for q in (1, 50, 95, 99, 100):
+            expected = values[int(q / 100 * (len(values) - 1))]
+            assert histogram.percentile(q) == pytest.approx(expected, rel=0.02)
+        assert (histogram.min, histogram.max) == (values[0], values[-1])
+        assert histogram.total == sum(values)
+
+    def test_small_values_are_exact(self) -> None:
+        """小さい値は誤差なく記録されることをテストします。"""
+        histogram = Histogram()
+        for value in (3, 1, 2):
+            histogram.record(value)
+        assert histogram.percentile(50) == 2.0
+
+    def test_empty_and_invalid(self) -> None:
+        """記録がない場合は0.0を返し、範囲外のパーセンタイルでValueErrorになることをテストします。"""
+        histogram = Histogram()
+        assert histogram.percentile(50) == 0.0
+        with pytest.raises(ValueError):
+            histogram.percentile(101)
+
+    def test_merge(self) -> None:
+        """分けて記録したヒストグラムを統合すると、まとめて記録した結果と一致することをテストします。"""
+        values = [random.Random(1).randrange(10**9) for _ in range(1_000)]
+        whole, first, second = Histogram(), Histogram(), Histogram()
+        for i, value in enumerate(values):
+            whole.record(value)
+            (first if i % 2 else second).record(value)
+
+        first.merge(second)
+        first.merge(Histogram())
+
+        assert first.to_dict() == whole.to_dict()
+
+    def test_round_trip(self) -> None:
+        """to_dict() をJSONに変換して復元できることをテストします。"""
+        histogram = Histogram()
+        for value in (10, 2_000, 300_000):
+            histogram.record(value)
+
+        restored = Histogram.from_dict(json.loads(json.dumps(histogram.to_dict())))
+
+        assert restored.to_dict() == histogram.to_dict()
+        assert restored.percentile(99) == histogram.percentile(99)
+
+
+class TestMetricsRegistry:
+    """MetricsRegistryクラスのテスト。"""
+
+    def test_disabled_registry_records_nothing(self) -> None:
+        """無効なレジストリでは、スパンとカウンタが記録されないことをテストします。"""
+        registry = MetricsRegistry()
+        with registry.span("work"):
+            pass
+        registry.increment("calls")
+
+        assert registry.histogram("work") is None
+        assert registry.counter("calls") == 0
+        assert registry.span("work") is registry.span("other")
+
+    def test_span_records_on_exception(self) -> None:
+        """例外で終了したスパンも記録されることをテストします。"""
+        registry = MetricsRegistry()
+        registry.enabled = True
+
+        with pytest.raises(RuntimeError), registry.span("work"):
+            raise RuntimeError
+
+        histogram = registry.histogram("work")
+        assert histogram is not None
+        assert histogram.count == 1
+
+    def test_snapshot_and_merge(self) -> None:
+        """スナップショットを別のレジストリに統合できることをテストします。"""
+        worker = MetricsRegistry()
+        worker.enabled = True
+        worker.record("validate", 1_000)
+        worker.increment("rows", 5)
+        parent = MetricsRegistry()
+        parent.record("validate", 3_000)
+
+        parent.merge(json.loads(json.dumps(worker.snapshot())))
+
+        histogram = parent.histogram("validate")
+        assert histogram is not None
+        assert (histogram.count, histogram.total) == (2, 4_000)
+        assert parent.counter("rows") == 5
+
+    def test_concurrent_records(self) -> None:
+        """複数のスレッドから記録しても件数が失われないことをテストします。"""
+        registry = MetricsRegistry()
+        registry.enabled = True
+
+        def work() -> None:
+            for _ in range(1_000):
+                registry.record("work", 10)
+                registry.increment("calls")
+
+        threads = [threading.Thread(target=work) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        histogram = registry.histogram("work")
+        assert histogram is not None
+        assert histogram.count == 4_000
+        assert registry.counter("calls") == 4_000
+
+    def test_summary(self) -> None:
+        """スパンごとの集計結果がミリ秒で名前順に返されることをテストします。"""
+        registry = MetricsRegistry()
+        registry.record("b", 2_000_000)
+        registry.record("a", 1_000_000)
+
+        summary = registry.summary([50])
+
+        assert [s.name for s in summary] == ["a", "b"]
+        assert summary[0].count == 1
+        assert summary[0].percentiles[50] == pytest.approx(1.0, rel=0.02)
+        assert summary[1].max_ms == 2.0
+
+
+def test_timed(enabled_metrics: MetricsRegistry) -> None:
+    """timed() で修飾した関数の呼び出しが記録され、戻り値が変わらないことをテストします。"""
+
+    @timed("double")
+    def double(value: int) -> int:
+        return value * 2
+
+    @timed()
+    def unnamed() -> None:
+        pass
+
+    assert double(4) == 8
+    unnamed()
+    metrics.disable()
+    assert double(5) == 10
+
+    histogram = enabled_metrics.histogram("double")
+    assert histogram is not None
+    assert histogram.count == 1
+    assert enabled_metrics.histogram(f"{__name__}.{unnamed.__qualname__}") is not None
+    assert double.__name__ == "double"
+
+
+def test_format_summary(enabled_metrics: MetricsRegistry) -> None:
+    """スパンとカウンタが表形式で出力されることをテストします。"""
+    with span("item_import.read"):
+        pass
+    metrics.increment("item_import.rejected", 3)
+
+    lines = format_summary().splitlines()
+
+    assert lines[0].split()[:5] == ["span", "count", "p50", "p95", "p99"]
+    assert lines[1].split()[:2] == ["item_import.read", "1"]
+    assert lines[-1].split() == ["item_import.rejected", "3"]
+
+
+def test_format_summary_empty() -> None:
+    """記録がない場合は空文字列になることをテストします。"""
+    metrics.get_registry().reset()
+    assert format_summary() == ""
@@ -2,17 +2,64 @@
 shared.securityモジュールのテスト。
 """
 
+import io
+import json
+import random
+import re
+from pathlib import Path
+from typing import Any
+
 import pytest
 
 from shared.security import (
+    are_safe_filenames,
     is_safe_filename,
+    iter_masked_json,
     mask_email,
+    mask_json_stream,
     mask_sensitive_data,
+    sanitize_log_bytes,
     sanitize_log_message,
+    scan_unsafe_filenames,
     validate_input_length,
 )
 
 
+def _reference_sanitize_log_message(message: str) -> str:
+    """パターンを1つずつ順に適用する、sanitize_log_messageの基準実装。"""
+    email_pattern = r"\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b"
+    message = re.sub(email_pattern, lambda m: mask_email(m.group()), message)
+    api_key_pattern = r"\b[a-zA-Z]{2,4}-[a-zA-Z0-9]{16,}\b"
+    message = re.sub(api_key_pattern, "***", message)
+    uuid_pattern = r"\b[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}\b"
+    return re.sub(uuid_pattern, "***", message, flags=re.IGNORECASE)
+
+
+def _random_log_message(rng: random.Random) -> str:
+    """メールアドレス、APIキー、UUIDの断片を含むランダムなメッセージを生成します。"""
+    fragments = [
+        "user@example.com",
+        "a@b.co",
+        "x.y+z@mail-host.example.org",
+        "a@ab-1234567890abcdefgh.com",
+        "sk-1234567890abcdef",
+        "ABCD-1234567890abcdefXYZ",
+        "123e4567-e89b-12d3-a456-426614174000",
+        "123E4567-E89B-12D3-A456-426614174000",
+        "-1234567890abcdefghij",
+        "com",
+        "@",
+        "-",
+        ".",
+        " ",
+        "あ",
+        "*",
+        "ab",
+        "0f",
+    ]
+    return "".join(rng.choice(fragments) for _ in range(rng.randint(0, 8)))
+
+
 class TestMaskEmail:
     """mask_email関数のテスト。"""
 
@@ -80,6 +127,129 @@ class TestMaskSensitiveData:
         result = mask_sensitive_data(data)
         assert result == data
 
+    def test_mask_nested_dicts_and_lists(self) -> None:
+        """ネストした辞書とリスト内の機密フィールドがマスクされることをテストします。"""
+        data: dict[str, Any] = {
+            "users": [
+                {"Email": "alice@example.com", "profile": {"phone": "090", "city": "Tokyo"}},
+                {"email": "", "tags": ["a", {"token": "t"}]},
+            ],
+            "meta": {"count": 2},
+        }
+        result = mask_sensitive_data(data)
+        assert result == {
+            "users": [
+                {"Email": "a***@example.com", "profile": {"phone": "***", "city": "Tokyo"}},
+                {"email": "***", "tags": ["a", {"token": "***"}]},
+            ],
+            "meta": {"count": 2},
+        }
+        # 入力は変更されない
+        assert data["users"][0]["Email"] == "alice@example.com"
+
+    def test_mask_sensitive_container_as_single_value(self) -> None:
+        """機密キーの値が辞書やリストの場合、全体が1つの値としてマスクされることをテストします。"""
+        data = {"secret": {"inner": "x"}, "email": ["a@b.co"], "credit_card": 4111}
+        result = mask_sensitive_data(data)
+        assert result == {"secret": "***", "email": "***", "credit_card": "***"}
+
+    def test_deeply_nested_data(self) -> None:
+        """再帰の上限を超える深さの入れ子でもマスクできることをテストします。"""
+        data: dict[str, Any] = {}
+        node = data
+        for _ in range(10_000):
+            child: dict[str, Any] = {"password": "p"}
+            node["next"] = [child]
+            node = child
+        result = mask_sensitive_data(data)
+        node = result
+        depth = 0
+        while "next" in node:
+            node = node["next"][0]
+            assert node["password"] == "***"
+            depth += 1
+        assert depth == 10_000
+
+    def test_shared_and_cyclic_references(self) -> None:
+        """同じオブジェクトへの参照と循環参照が保たれることをテストします。"""
+        shared = {"pwd": "x"}
+        data: dict[str, Any] = {"a": shared, "b": shared}
+        data["self"] = data
+        result = mask_sensitive_data(data)
+        assert result["a"] == {"pwd": "***"}
+        assert result["a"] is result["b"]
+        assert result["self"] is result
+
+
+JSON_DOCUMENT: dict[str, Any] = {
+    "users": [
+        {
+            "email": "alice@example.com",
+            "name": 'アリス "quoted" \\ \u00e9',
+            "password": {"hash": "x", "salt": [1, 2]},
+            "scores": [1.5e3, -2, True, None],
+        },
+        {"mail": None, "TOKEN": "abc", "nested": {"api_key": "k", "ok": False}},
+    ],
+    "phone": [],
+    "empty": {},
+}
+
+
+class TestMaskJsonStream:
+    """iter_masked_json関数とmask_json_stream関数のテスト。"""
+
+    def test_matches_mask_sensitive_data(self) -> None:
+        """出力がmask_sensitive_dataの結果と一致することをテストします。"""
+        text = json.dumps(JSON_DOCUMENT, ensure_ascii=False, indent=2)
+        masked = "".join(iter_masked_json([text]))
+        assert json.loads(masked) == mask_sensitive_data(JSON_DOCUMENT)
+
+    def test_any_chunk_boundaries(self) -> None:
+        """任意の位置で分割された入力でも同じ結果になることをテストします。"""
+        text = json.dumps(JSON_DOCUMENT)
+        expected = "".join(iter_masked_json([text]))
+        rng = random.Random(0)
+        for _ in range(200):
+            cuts = sorted(rng.sample(range(1, len(text)), rng.randint(1, 20)))
+            chunks = [text[i:j] for i, j in zip([0, *cuts], [*cuts, len(text)], strict=True)]
+            assert "".join(iter_masked_json(chunks)) == expected
+
+    def test_escapes_across_chunk_boundaries(self) -> None:
+        """エスケープされた引用符やバックスラッシュの途中で分割されても同じ結果になることをテストします。"""
+        text = json.dumps({"token": 'a"b\\c', "note": 'q\\"r', "id": 1})
+        expected = {"token": "***", "note": 'q\\"r', "id": 1}
+        for i in range(len(text) + 1):
+            for j in range(i, len(text) + 1):
+                chunks = [text[:i], text[i:j], text[j:]]
+                assert json.loads("".join(iter_masked_json(chunks))) == expected
+
+    def test_long_string_in_small_chunks(self) -> None:
+        """多数の断片にまたがる長い文字列が、マスクまたはそのまま出力されることをテストします。"""
+        text = json.dumps({"token": "x" * 500_000, "note": "y\\" * 250_000, "id": 1})
+        chunks = [text[i : i + 64] for i in range(0, len(text), 64)]
+        assert "".join(iter_masked_json(chunks)) == text.replace("x" * 500_000, "***")
+
+    def test_preserves_formatting_of_unmasked_values(self) -> None:
+        """マスクしない部分は入力の表記のまま出力されることをテストします。"""
+        text = '{ "a" : 1.0e2 ,\n "token":"x", "b":[ true ,null ] }'
+        assert "".join(iter_masked_json([text])) == (
+            '{ "a" : 1.0e2 ,\n "token":"***", "b":[ true ,null ] }'
+        )
+
+    def test_mask_json_stream(self) -> None:
+        """ストリーム間でマスクしながらコピーできることをテストします。"""
+        text = json.dumps([JSON_DOCUMENT] * 50)
+        sink = io.StringIO()
+        mask_json_stream(io.StringIO(text), sink, chunk_size=7)
+        assert json.loads(sink.getvalue()) == [mask_sensitive_data(JSON_DOCUMENT)] * 50
+
+    @pytest.mark.parametrize("text", ['{"a": "abc', '{"a": [1, 2}', '{"a": 1', "]"])
+    def test_malformed_json(self, text: str) -> None:
+        """不正なJSONでValueErrorが発生することをテストします。"""
+        with pytest.raises(ValueError):
+            "".join(iter_masked_json([text]))
+
 
 class TestSanitizeLogMessage:
     """sanitize_log_message関数のテスト。"""
@@ -108,6 +278,46 @@ class TestSanitizeLogMessage:
         result = sanitize_log_message(message)
         assert result == message
 
+    @pytest.mark.parametrize(
+        "message",
+        [
+            "a@foo.com-1234567890abcdefghij",
+            "a@ab-1234567890123456.com",
+            "x@123e4567-e89b-12d3-a456-426614174000.io done",
+            "sk-1234567890abcdef@example.com",
+            "あuser@example.com と user@例え.jp",
+            "key=sk-1234567890abcdef; id=123E4567-E89B-12D3-A456-426614174000",
+        ],
+    )
+    def test_sanitize_matches_sequential_patterns(self, message: str) -> None:
+        """パターンが隣接・重複する場合も逐次適用と同じ結果になることをテストします。"""
+        assert sanitize_log_message(message) == _reference_sanitize_log_message(message)
+
+    def test_sanitize_matches_sequential_patterns_randomized(self) -> None:
+        """ランダムなメッセージで逐次適用と同じ結果になることをテストします。"""
+        rng = random.Random(0)
+        for _ in range(5_000):
+            message = _random_log_message(rng)
+            assert sanitize_log_message(message) == _reference_sanitize_log_message(message)
+
+
+class TestSanitizeLogBytes:
+    """sanitize_log_bytes関数のテスト。"""
+
+    def test_sanitize_ascii_bytes(self) -> None:
+        """ASCIIのバッファがバイト列のまま正しくマスクされることをテストします。"""
+        data = b"User user@example.com used sk-1234567890abcdef"
+        assert sanitize_log_bytes(data) == b"User u***@example.com used ***"
+
+    def test_sanitize_non_ascii_bytes(self) -> None:
+        """非ASCIIや不正なUTF-8を含むバッファが文字列版と同じ結果になることをテストします。"""
+        rng = random.Random(1)
+        for _ in range(1_000):
+            message = _random_log_message(rng)
+            expected = _reference_sanitize_log_message(message).encode()
+            assert sanitize_log_bytes(message.encode()) == expected
+        assert sanitize_log_bytes(b"\xff a@b.co") == b"\xff a***@b.co"
+
 
 class TestValidateInputLength:
     """validate_input_length関数のテスト。"""
@@ -162,3 +372,77 @@ class TestIsSafeFilename:
     def test_empty_filename(self) -> None:
         """空のファイル名がFalseを返すことをテストします。"""
         assert is_safe_filename("") is False
+
+    def test_matches_reference(self) -> None:
+        """判定結果が従来の実装と一致することをテストします。"""
+        rng = random.Random(0)
+        alphabet = "abcXYZ019._- " + '/\\<>:"|?*' + "ßıſﬂé日"
+        names = [
+            "".join(rng.choice(alphabet) for _ in range(rng.randint(0, 8))) for _ in range(5_000)
+        ]
+        names += ["con", "CoN", "con.txt", " con", "COM0", "com10", "lpt9", "Nul", ".", "a..b"]
+        names += [chr(c) for c in range(0x3000)]
+
+        expected = [_reference_is_safe_filename(name) for name in names]
+
+        assert [is_safe_filename(name) for name in names] == expected
+        assert are_safe_filenames(names) == expected
+
+
+def _reference_is_safe_filename(filename: str) -> bool:
+    """最適化前の is_safe_filename の実装。"""
+    if not filename:
+        return False
+    dangerous_chars = {"/", "\\", "..", "<", ">", ":", '"', "|", "?", "*"}
+    if any(char in filename for char in dangerous_chars):
+        return False
+    reserved_names = {"CON", "PRN", "AUX", "NUL"}
+    reserved_names |= {f"COM{i}" for i in range(1, 10)} | {f"LPT{i}" for i in range(1, 10)}
+    return filename.upper() not in reserved_names
+
+
+class TestScanUnsafeFilenames:
+    """scan_unsafe_filenames関数のテスト。"""
+
+    @pytest.fixture
+    def tree(self, tmp_path: Path) -> Path:
+        for directory in ("a/b/c", "a/d", "e..f/g"):
+            (tmp_path / directory).mkdir(parents=True)
+        for file in ("a/ok.txt", "a/b/c/bad:name.txt", "a/d/CON", "e..f/g/x.txt", "top|.csv"):
+            (tmp_path / file).write_text("x")
+        return tmp_path
+
+    @pytest.mark.parametrize("workers", [1, 4])
+    def test_reports_unsafe_names(self, tree: Path, workers: int) -> None:
+        """ツリー全体から安全でない名前のパスが昇順で報告されることをテストします。"""
+        result = scan_unsafe_filenames(tree, workers=workers)
+
+        assert result.unsafe == sorted(
+            str(tree / path) for path in ("a/b/c/bad:name.txt", "a/d/CON", "e..f", "top|.csv")
+        )
+        # a, b, c, d, e..f, g の6ディレクトリと5ファイル
+        assert result.scanned == 11
+        assert result.errors == []
+
+    def test_does_not_follow_symlinks(self, tree: Path) -> None:
+        """シンボリックリンクのディレクトリはたどらないことをテストします。"""
+        (tree / "a" / "loop").symlink_to(tree, target_is_directory=True)
+
+        result = scan_unsafe_filenames(tree, workers=2)
+
+        assert result.scanned == 12
+        assert len(result.unsafe) == 4
+
+    def test_unreadable_root(self, tmp_path: Path) -> None:
+        """読み込めないディレクトリが errors に報告されることをテストします。"""
+        missing = tmp_path / "missing"
+
+        result = scan_unsafe_filenames(missing)
+
+        assert result.errors == [str(missing)]
+        assert result.scanned == 0
+
+    def test_invalid_workers(self, tmp_path: Path) -> None:
+        """スレッド数が1未満の場合にValueErrorが発生することをテストします。"""
+        with pytest.raises(ValueError):
+            scan_unsafe_filenames(tmp_path, workers=0)
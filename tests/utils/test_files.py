@@ -0,0 +1,59 @@
+"""
+utils.filesモジュールのテスト。
+"""
+
+import os
+import stat
+from pathlib import Path
+
+import pytest
+
+from utils.files import atomic_output, write_atomic
+
+
+def test_write_atomic_replaces_file(tmp_path: Path) -> None:
+    """内容が置き換えられ、一時ファイルが残らないことをテストします。"""
+    path = tmp_path / "checkpoint.json"
+    write_atomic(path, b"first")
+    write_atomic(path, b"second")
+
+    assert path.read_bytes() == b"second"
+    assert os.listdir(tmp_path) == ["checkpoint.json"]
+
+
+def test_atomic_output_keeps_previous_content_on_error(tmp_path: Path) -> None:
+    """書き込みの途中で例外が発生した場合、以前の内容が残り一時ファイルが削除されることをテストします。"""
+    path = tmp_path / "items.items"
+    path.write_bytes(b"previous")
+
+    with pytest.raises(RuntimeError), atomic_output(path) as file:
+        file.write(b"partial")
+        raise RuntimeError("interrupted")
+
+    assert path.read_bytes() == b"previous"
+    assert os.listdir(tmp_path) == ["items.items"]
+
+
+def test_atomic_output_is_seekable(tmp_path: Path) -> None:
+    """書き込み中のストリームでシークして先頭を書き直せることをテストします。"""
+    path = tmp_path / "data.bin"
+    with atomic_output(path) as file:
+        file.write(bytes(4) + b"body")
+        file.seek(0)
+        file.write(b"head")
+
+    assert path.read_bytes() == b"headbody"
+
+
+@pytest.mark.skipif(os.name != "posix", reason="POSIXのパーミッションが必要")
+def test_atomic_output_permissions(tmp_path: Path) -> None:
+    """新しいファイルはumaskに従い、既存のファイルはパーミッションを引き継ぐことをテストします。"""
+    umask = os.umask(0o022)
+    os.umask(umask)
+    path = tmp_path / "data.bin"
+    write_atomic(path, b"new")
+    assert stat.S_IMODE(path.stat().st_mode) == 0o666 & ~umask
+
+    path.chmod(0o640)
+    write_atomic(path, b"replaced")
+    assert stat.S_IMODE(path.stat().st_mode) == 0o640
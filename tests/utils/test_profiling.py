@@ -0,0 +1,80 @@
+"""
+utils.profilingモジュールのテスト。
+"""
+
+import pstats
+import tracemalloc
+from pathlib import Path
+
+from utils.profiling import profile_cpu, profile_memory
+
+
+def _busy(count: int) -> int:
+    return sum(i * i for i in range(count))
+
+
+def test_profile_cpu_writes_pstats(tmp_path: Path) -> None:
+    """区間の計測結果が pstats 形式で書き出されることをテストします。"""
+    path = tmp_path / "cpu.pstats"
+
+    with profile_cpu(path, "busy") as profile:
+        _busy(10_000)
+
+    stats = pstats.Stats(str(path))
+    functions = {name for _, _, name in stats.stats}  # type: ignore[attr-defined]
+    assert "_busy" in functions
+    assert profile.path == str(path)
+    assert "_busy" in profile.format(limit=5)
+
+
+def test_profile_cpu_without_path() -> None:
+    """パスを省略した場合はファイルを書き出さずに結果だけを返すことをテストします。"""
+    with profile_cpu() as profile:
+        assert profile.format() == ""
+        _busy(100)
+
+    assert profile.path is None
+    assert profile.stats is not None
+
+
+def test_profile_memory_reports_peak_and_modules() -> None:
+    """ピークのメモリ使用量と、確保したモジュールが報告されることをテストします。"""
+    with profile_memory("build") as report:
+        kept = [bytes(1_000) for _ in range(1_000)]
+        temporary = bytes(5_000_000)
+        del temporary
+
+    assert report.peak >= 5_000_000
+    assert 1_000_000 <= report.current < 5_000_000
+    assert report.modules[0].module == __name__
+    assert report.modules[0].count >= 1_000
+    assert report.format().startswith("build: ピーク")
+    assert not tracemalloc.is_tracing()
+    del kept
+
+
+def test_nested_profile_memory_keeps_outer_peak() -> None:
+    """入れ子にした場合も、外側の区間のピークに内側の区間のピークが含まれることをテストします。"""
+    with profile_memory("outer") as outer:
+        with profile_memory("inner") as inner:
+            temporary = bytes(4_000_000)
+            del temporary
+        small = bytes(100)
+
+    assert inner.peak >= 4_000_000
+    assert outer.peak >= inner.peak
+    assert not tracemalloc.is_tracing()
+    del small
+
+
+def test_profile_memory_keeps_existing_tracing() -> None:
+    """すでに tracemalloc が有効な場合は、区間の終了後も有効なままにすることをテストします。"""
+    tracemalloc.start()
+    try:
+        with profile_memory() as report:
+            data = bytes(2_000_000)
+        assert tracemalloc.is_tracing()
+        assert report.peak >= 2_000_000
+        del data
+    finally:
+        tracemalloc.stop()